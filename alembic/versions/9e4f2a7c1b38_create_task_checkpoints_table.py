@@ -0,0 +1,41 @@
+"""create task checkpoints table
+
+Revision ID: 9e4f2a7c1b38
+Revises: 5269cf543947
+Create Date: 2026-10-18 10:12:41.523870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4f2a7c1b38'
+down_revision = '5269cf543947'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_checkpoints',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('task_id', sa.Integer, nullable=False),
+        sa.Column('line', sa.Integer, nullable=False),
+        sa.Column('offset', sa.BigInteger, nullable=False),
+        sa.Column('state', sa.JSON, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False, server_default=func.now()),
+    )
+    op.create_foreign_key(
+        "fk_task_id",
+        "task_checkpoints",
+        "tasks",
+        ["task_id"],
+        ["id"],
+        ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_checkpoints')
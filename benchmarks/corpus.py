@@ -0,0 +1,46 @@
+import random
+
+# Constants
+CORPUS_SEED = 1234
+PREAMBLE = ['G21 G90 G94', 'G0 X0 Y0 Z0', 'G1 F1000']
+
+# Synthetic corpora, by length of their motion lines:
+# - short: ~12 characters, like the output of an optimized post-processor.
+# - medium: ~30 characters, like most CAM outputs.
+# - long: ~60 characters, with many decimals and words repeated in every line.
+SYNTHETIC_CORPORA = ['short', 'medium', 'long']
+
+
+def synthetic_corpus(kind: str, count: int) -> list[str]:
+    """Returns a G-code program with the given amount of motion lines,
+    preceded by a preamble which sets the units and the feed rate.
+
+    The program is always the same for a given kind and count,
+    so results of different runs can be compared.
+    """
+    if kind not in SYNTHETIC_CORPORA:
+        raise Exception(f'Unknown synthetic corpus: {kind}')
+
+    generator = random.Random(CORPUS_SEED)
+    lines = list(PREAMBLE)
+
+    for _ in range(count):
+        x = generator.uniform(0, 100)
+        y = generator.uniform(0, 100)
+        z = generator.uniform(-2, 0)
+
+        if kind == 'short':
+            lines.append(f'X{x:.1f}Y{y:.1f}')
+        elif kind == 'medium':
+            lines.append(f'G1 X{x:.3f} Y{y:.3f} Z{z:.3f}')
+        else:
+            lines.append(f'G01 X{x:.4f} Y{y:.4f} Z{z:.4f} F1000.0000 S10000 ; cut')
+
+    return lines
+
+
+def load_corpus(file_path: str) -> list[str]:
+    """Returns the lines of a G-code file.
+    """
+    with open(file_path, 'r') as gcode:
+        return [line.rstrip('\r\n') for line in gcode]
@@ -0,0 +1,122 @@
+"""Fake GRBL devices to run the benchmarks against.
+
+The emulator can either run in the benchmark process, or in a child process
+attached to a pseudo-terminal, which also exercises the serial I/O and keeps
+the CPU used by the device out of the measurements:
+
+    python -m benchmarks.devices --speedup 1000000
+"""
+
+import argparse
+import os
+import sys
+import threading
+from typing import Optional
+
+try:
+    from ..mocks.grbl_emulator import GrblEmulator
+    from ..utils.transport import EXEC_PREFIX, PtyTransport, Transport
+except ImportError:
+    from mocks.grbl_emulator import GrblEmulator
+    from utils.transport import EXEC_PREFIX, PtyTransport, Transport
+
+# Constants
+DEVICE_EMULATOR = 'emulator'    # In-process emulator
+DEVICE_PTY = 'pty'              # Emulator in a child process, attached to a pseudo-terminal
+DEVICES = [DEVICE_EMULATOR, DEVICE_PTY]
+DEFAULT_SPEEDUP = 1000000.0     # Motions take (almost) no time, to measure the host side
+EMULATOR_PORT = 'emulator'
+OUTPUT_POLL = 0.1   # seconds
+
+
+def create_device(
+        device: str,
+        speedup: float = DEFAULT_SPEEDUP,
+        rx_buffer_size: int = 128,
+        planner_size: int = 15,
+        settings: Optional[dict[int, float]] = None
+) -> tuple[str, Transport, Optional[GrblEmulator]]:
+    """Returns the port and the transport to connect to a fake device,
+    plus the emulator when it runs in this process.
+
+    The settings replace the default GRBL settings of the emulator.
+    """
+    if device == DEVICE_EMULATOR:
+        emulator = GrblEmulator(
+            rx_buffer_size=rx_buffer_size,
+            planner_size=planner_size,
+            speedup=speedup,
+            settings=settings
+        )
+        return EMULATOR_PORT, emulator, emulator
+
+    if device == DEVICE_PTY:
+        command = (
+            f'{sys.executable} -m benchmarks.devices --speedup {speedup} '
+            f'--rx-buffer {rx_buffer_size} --planner {planner_size}'
+        )
+        for key, value in (settings or {}).items():
+            command += f' --setting {key}={value}'
+        return f'{EXEC_PREFIX}{command}', PtyTransport(), None
+
+    raise Exception(f'Unknown device: {device}')
+
+
+def serve_stdio(emulator: GrblEmulator):
+    """Serves the emulator through the standard input and output,
+    until the input is closed.
+    """
+    emulator.open('stdio', 115200)
+    emulator.timeout = OUTPUT_POLL
+    stop = threading.Event()
+
+    def forward_output():
+        while not stop.is_set():
+            data = emulator.readAvailable()
+            if data:
+                os.write(sys.stdout.fileno(), data)
+
+    output_thread = threading.Thread(target=forward_output, daemon=True)
+    output_thread.start()
+
+    while True:
+        try:
+            data = os.read(sys.stdin.fileno(), 4096)
+        except OSError:
+            break
+        if not data:
+            break
+        emulator.sendBytes(data)
+
+    stop.set()
+    emulator.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emulated GRBL device on stdin/stdout')
+    parser.add_argument('--speedup', type=float, default=DEFAULT_SPEEDUP)
+    parser.add_argument('--rx-buffer', type=int, default=128)
+    parser.add_argument('--planner', type=int, default=15)
+    parser.add_argument(
+        '--setting',
+        action='append',
+        default=[],
+        help='GRBL setting, like 110=1000, can be repeated'
+    )
+    args = parser.parse_args()
+
+    settings = {}
+    for setting in args.setting:
+        key, value = setting.split('=')
+        settings[int(key)] = float(value)
+
+    serve_stdio(GrblEmulator(
+        rx_buffer_size=args.rx_buffer,
+        planner_size=args.planner,
+        speedup=args.speedup,
+        settings=settings
+    ))
+
+
+if __name__ == '__main__':
+    main()
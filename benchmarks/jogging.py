@@ -0,0 +1,203 @@
+"""Release-to-stop latency of the jogs.
+
+Simulates an operator holding a jog button: the user interface sends a small
+incremental jog at a fixed interval while the button is held, and then releases it.
+Reports for every jogging mode:
+    - Jog commands requested by the user interface, and sent to GRBL.
+    - Time since the button is released until the machine stops.
+    - Distance travelled by the machine after the release (overrun).
+
+The jogging modes are:
+    - plain: Every jog is queued, and nothing is done on release.
+    - cancel: Every jog is queued, and the jog cancel is sent on release.
+    - session: Jog session (see GrblController.startJogSession), ended on release.
+
+The emulated device runs in real time, with a status poll of a few milliseconds.
+
+Usage (from the repository root):
+    python -m benchmarks.jogging
+    python -m benchmarks.jogging --device pty --hold 2 --interval 0.02 --step 0.5
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing_extensions import TypedDict
+
+try:
+    from ..benchmarks.devices import DEVICE_EMULATOR, DEVICES, create_device
+    from ..benchmarks.streaming import NullPubSub, get_metadata
+    from ..grbl.grblController import GrblController
+    from ..grbl.grblUtils import JOG_DISTANCE_INCREMENTAL
+except ImportError:
+    from benchmarks.devices import DEVICE_EMULATOR, DEVICES, create_device
+    from benchmarks.streaming import NullPubSub, get_metadata
+    from grbl.grblController import GrblController
+    from grbl.grblUtils import JOG_DISTANCE_INCREMENTAL
+
+# Constants
+MODE_PLAIN = 'plain'
+MODE_CANCEL = 'cancel'
+MODE_SESSION = 'session'
+MODES = [MODE_PLAIN, MODE_CANCEL, MODE_SESSION]
+STATUS_POLL = 0.005     # seconds
+STOP_TIMEOUT = 60.0     # seconds
+JOG_SETTINGS = {        # Max rate (mm/min) and acceleration (mm/s^2) of a small router
+    110: 1000.0, 111: 1000.0, 112: 1000.0,
+    120: 200.0, 121: 200.0, 122: 200.0
+}
+
+# Types definition
+JogResult = TypedDict('JogResult', {
+    'mode': str,
+    'device': str,
+    'jogs_requested': int,
+    'jogs_sent': int,
+    'release_to_stop_ms': float,
+    'overrun_mm': float
+})
+
+
+class JogTracker(GrblController):
+    """GRBL controller which records the jogs sent, and when every status report arrives.
+    """
+
+    def __init__(self, logger: logging.Logger, *args, **kwargs):
+        super().__init__(logger, *args, **kwargs)
+        self.jogs_sent = 0
+        self.reports: list[tuple[float, str, float]] = []   # Time, state and X position
+
+    def _writeCommand(self, tosend: str) -> bool:
+        if tosend.startswith('$J='):
+            self.jogs_sent += 1
+        return super()._writeCommand(tosend)
+
+    def parseResponse(self, response: str):
+        super().parseResponse(response)
+        if response.startswith('<'):
+            status = self.grbl_status.get_status_report()
+            self.reports.append((time.perf_counter(), status['activeState'], status['mpos']['x']))
+
+    def waitForIdle(self, since: float, timeout: float) -> tuple[float, float]:
+        """Waits for a status report received after the given time, with the machine idle.
+        Returns the time of the report and the X position.
+        """
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            for received, state, x in reversed(self.reports):
+                if received <= since:
+                    break
+                if state == 'Idle':
+                    return received, x
+            time.sleep(STATUS_POLL / 5)
+        raise Exception('Timeout waiting for the machine to stop')
+
+
+def run_jogging(
+        mode: str,
+        device: str = DEVICE_EMULATOR,
+        hold: float = 1.0,
+        interval: float = 0.02,
+        step: float = 0.5,
+        feedrate: float = 1000.0
+) -> JogResult:
+    """Holds a jog button for some time (seconds), sending a jog of the given
+    step (millimeters) every interval (seconds), and measures how the machine stops.
+    """
+    if mode not in MODES:
+        raise Exception(f'Unknown jogging mode: {mode}')
+
+    logger = logging.getLogger('benchmark')
+    port, transport, _ = create_device(device, speedup=1.0, settings=JOG_SETTINGS)
+    cnc = JogTracker(logger, transport)
+    cnc.grbl_monitor.redis = NullPubSub()
+    cnc.setPollingRates(fast=STATUS_POLL, slow=STATUS_POLL)
+
+    try:
+        cnc.connect(port, 115200)
+        if mode == MODE_SESSION:
+            cnc.startJogSession()
+
+        # Hold the button
+        requested = 0
+        start = time.perf_counter()
+        next_jog = start
+        while next_jog < start + hold:
+            cnc.jog(step, 0.0, 0.0, feedrate, distance_mode=JOG_DISTANCE_INCREMENTAL)
+            requested += 1
+            next_jog += interval
+            time.sleep(max(next_jog - time.perf_counter(), 0))
+
+        # Release it
+        released = time.perf_counter()
+        if mode == MODE_SESSION:
+            cnc.stopJogSession()
+        if mode == MODE_CANCEL:
+            cnc.grbl_jog_cancel()
+        reports = [report for report in cnc.reports if report[0] <= released]
+        released_x = reports[-1][2] if reports else 0.0
+
+        # The machine is stopped once every jog is planned and the planner is empty
+        if not cnc.waitUntilProcessed(STOP_TIMEOUT):
+            raise Exception('Timeout waiting for the jogs to be processed')
+        stopped, stopped_x = cnc.waitForIdle(time.perf_counter(), STOP_TIMEOUT)
+    finally:
+        cnc.disconnect()
+
+    return {
+        'mode': mode,
+        'device': device,
+        'jogs_requested': requested,
+        'jogs_sent': cnc.jogs_sent,
+        'release_to_stop_ms': (stopped - released) * 1000,
+        'overrun_mm': stopped_x - released_x
+    }
+
+
+def print_results(results: list[JogResult]):
+    header = (
+        f"{'mode':<10}{'device':<10}{'requested':>11}{'sent':>6}"
+        f"{'release-to-stop ms':>20}{'overrun mm':>12}"
+    )
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(
+            f"{result['mode']:<10}{result['device']:<10}{result['jogs_requested']:>11}"
+            f"{result['jogs_sent']:>6}{result['release_to_stop_ms']:>20.1f}"
+            f"{result['overrun_mm']:>12.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Release-to-stop latency of the jogs')
+    parser.add_argument('--mode', nargs='*', choices=MODES, default=MODES)
+    parser.add_argument('--device', choices=DEVICES, default=DEVICE_EMULATOR)
+    parser.add_argument('--hold', type=float, default=1.0, help='seconds holding the button')
+    parser.add_argument('--interval', type=float, default=0.02, help='seconds between jogs')
+    parser.add_argument('--step', type=float, default=0.5, help='millimeters of each jog')
+    parser.add_argument('--feed', type=float, default=1000.0, help='jog feed rate (mm/min)')
+    parser.add_argument('--output', help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = [
+        run_jogging(
+            mode,
+            device=args.device,
+            hold=args.hold,
+            interval=args.interval,
+            step=args.step,
+            feedrate=args.feed
+        )
+        for mode in args.mode
+    ]
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'metadata': get_metadata(), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Cost of the logging in the serial hot path.
+
+Measures the time used by the controller and the monitor for every streamed line
+(sending it and processing its 'ok') and for every status report, without any
+device or serial I/O, for each combination of:
+    - Log level: messages discarded (WARNING) or formatted (DEBUG).
+    - Subscribers of the PubSub channel: none, or one.
+
+The records are formatted but not written anywhere, and the PubSub only counts the
+published messages, so the results show the cost of building the messages.
+
+Usage (from the repository root):
+    python -m benchmarks.logging_cost
+    python -m benchmarks.logging_cost --iterations 100000 --output results.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing_extensions import TypedDict
+
+try:
+    from ..benchmarks.streaming import get_metadata
+    from ..grbl.grblController import GrblController
+except ImportError:
+    from benchmarks.streaming import get_metadata
+    from grbl.grblController import GrblController
+
+# Constants
+DEFAULT_ITERATIONS = 20000
+LOG_LEVELS = [logging.WARNING, logging.DEBUG]
+STREAMED_LINE = 'G1 X10.5 Y20.25 Z-1.0 F1000'
+STATUS_REPORT = '<Run|MPos:10.500,20.250,-1.000|Bf:15,128|FS:1000,0|WCO:0.000,0.000,0.000>'
+
+# Types definition
+LoggingCostResult = TypedDict('LoggingCostResult', {
+    'level': str,
+    'subscribers': int,
+    'line_us': float,
+    'status_us': float,
+    'published': int
+})
+
+
+class FormattingHandler(logging.Handler):
+    """Formats every record, like a file handler would, and discards it.
+    """
+
+    def emit(self, record: logging.LogRecord):
+        self.format(record)
+
+
+class CountingPubSub:
+    """Replaces the Redis publisher of the monitor, with a fixed amount of subscribers.
+    """
+
+    def __init__(self, subscribers: int):
+        self.subscribers = subscribers
+        self.published = 0
+
+    def count_subscribers(self, channel: str) -> int:
+        return self.subscribers
+
+    def publish(self, channel: str, message: str):
+        self.published += 1
+
+    def disconnect(self):
+        pass
+
+
+def time_per_call(function, iterations: int) -> float:
+    """Returns the time used by every call to the function, in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) * 1000000 / iterations
+
+
+def run_logging_cost(
+        level: int,
+        subscribers: int,
+        iterations: int = DEFAULT_ITERATIONS
+) -> LoggingCostResult:
+    """Measures the logging cost per streamed line and per status report.
+    """
+    logger = logging.getLogger(f'benchmark.logging.{logging.getLevelName(level)}')
+    logger.propagate = False
+    logger.setLevel(level)
+
+    cnc = GrblController(logger)
+    pubsub = CountingPubSub(subscribers)
+    cnc.grbl_monitor.redis = pubsub
+
+    # Format the records instead of writing them to the logs file
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = FormattingHandler()
+    handler.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s'))
+    logger.addHandler(handler)
+
+    def stream_line():
+        cnc.grbl_monitor.sent(STREAMED_LINE)
+        cnc.parseResponse('ok')
+
+    def status_report():
+        cnc.parseResponse(STATUS_REPORT)
+
+    try:
+        # Warm up
+        time_per_call(stream_line, 100)
+        time_per_call(status_report, 100)
+        pubsub.published = 0
+
+        line_us = time_per_call(stream_line, iterations)
+        status_us = time_per_call(status_report, iterations)
+    finally:
+        logger.removeHandler(handler)
+
+    return {
+        'level': logging.getLevelName(level),
+        'subscribers': subscribers,
+        'line_us': line_us,
+        'status_us': status_us,
+        'published': pubsub.published
+    }
+
+
+def print_results(results: list[LoggingCostResult]):
+    header = f"{'level':<10}{'subscribers':>12}{'line us':>10}{'status us':>11}{'published':>11}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(
+            f"{result['level']:<10}{result['subscribers']:>12}{result['line_us']:>10.2f}"
+            f"{result['status_us']:>11.2f}{result['published']:>11}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost of the logging in the serial hot path')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--output', help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = [
+        run_logging_cost(level, subscribers, args.iterations)
+        for level in LOG_LEVELS
+        for subscribers in [0, 1]
+    ]
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'metadata': get_metadata(), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Replay of recorded serial sessions, to measure the host side with real traffic.
+
+The captures are recorded by the worker when GRBL_CAPTURE_FOLDER is set
+(see utils.sessionCapture), and replayed into:
+    - parser: GrblLineParser, parsing every line received from the device.
+    - controller: GrblController, connected to a ReplayTransport which answers
+    the lines of the session in the same order than the device did.
+
+Reports the lines processed per second and the CPU time used per line.
+The replay runs as fast as possible, unless a speed is given (1 for real time).
+
+Usage (from the repository root):
+    python -m benchmarks.replay captures/task_1_20240101_120000.cap
+    python -m benchmarks.replay session.cap --target controller --speed 1
+    python -m benchmarks.replay session.cap --output results.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Optional
+from typing_extensions import TypedDict
+
+try:
+    from ..benchmarks.streaming import NullPubSub, get_metadata
+    from ..grbl.grblController import GrblController
+    from ..grbl.grblLineParser import GrblLineParser
+    from ..utils.sessionCapture import ReplayTransport, get_received_lines, get_sent_lines, \
+        read_capture
+except ImportError:
+    from benchmarks.streaming import NullPubSub, get_metadata
+    from grbl.grblController import GrblController
+    from grbl.grblLineParser import GrblLineParser
+    from utils.sessionCapture import ReplayTransport, get_received_lines, get_sent_lines, \
+        read_capture
+
+# Constants
+TARGET_PARSER = 'parser'
+TARGET_CONTROLLER = 'controller'
+TARGETS = [TARGET_PARSER, TARGET_CONTROLLER]
+REPLAY_PORT = 'replay'
+REPLAY_TIMEOUT = 600.0  # seconds
+
+# Types definition
+ReplayResult = TypedDict('ReplayResult', {
+    'capture': str,
+    'target': str,
+    'speed': Optional[float],
+    'lines': int,
+    'sent_lines': int,
+    'elapsed': float,
+    'lines_per_second': float,
+    'cpu_per_line_us': float
+})
+
+
+def run_replay(path: str, target: str, speed: Optional[float] = None) -> ReplayResult:
+    """Replays a capture into the given target, and returns the measurements.
+    """
+    if target not in TARGETS:
+        raise Exception(f'Unknown target: {target}')
+
+    records = list(read_capture(path))
+    received = get_received_lines(records)
+    sent = get_sent_lines(records)
+
+    if target == TARGET_PARSER:
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        for line in received:
+            GrblLineParser.parse(line)
+        elapsed = time.perf_counter() - start
+        cpu_time = time.process_time() - start_cpu
+    else:
+        elapsed, cpu_time = replay_controller(records, sent, speed)
+
+    return {
+        'capture': path,
+        'target': target,
+        'speed': speed,
+        'lines': len(received),
+        'sent_lines': len(sent),
+        'elapsed': elapsed,
+        'lines_per_second': len(received) / elapsed if elapsed else 0.0,
+        'cpu_per_line_us': cpu_time * 1000000 / max(len(received), 1)
+    }
+
+
+def replay_controller(records, sent: list[str], speed: Optional[float]) -> tuple[float, float]:
+    """Connects a GrblController to the replayed device, and sends the lines of the session.
+    Returns the elapsed and CPU times.
+    """
+    replay = ReplayTransport(records, speed)
+    cnc = GrblController(logging.getLogger('benchmark'), replay)
+    cnc.grbl_monitor.redis = NullPubSub()
+
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    deadline = time.time() + REPLAY_TIMEOUT
+    try:
+        cnc.connect(REPLAY_PORT, 115200)
+
+        # The controller already sent some lines when connecting ($I)
+        for line in sent[replay.sent_lines:]:
+            cnc.sendCommand(line, timeout=max(deadline - time.time(), 0))
+
+        while not replay.finished() and time.time() < deadline:
+            cnc.waitForAck(cnc.getAcksCount(), timeout=0.1)
+        if not replay.finished():
+            raise Exception(f'Timeout replaying the capture, {replay.sent_lines} lines sent')
+
+        cnc.waitUntilProcessed(max(deadline - time.time(), 0))
+        elapsed = time.perf_counter() - start
+        cpu_time = time.process_time() - start_cpu
+    finally:
+        cnc.disconnect()
+
+    return elapsed, cpu_time
+
+
+def print_results(results: list[ReplayResult]):
+    header = f"{'target':<12}{'lines':>8}{'sent':>8}{'lines/s':>12}{'cpu/line us':>13}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(
+            f"{result['target']:<12}{result['lines']:>8}{result['sent_lines']:>8}"
+            f"{result['lines_per_second']:>12.0f}{result['cpu_per_line_us']:>13.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay of recorded serial sessions')
+    parser.add_argument('capture', help='capture file (.cap)')
+    parser.add_argument('--target', nargs='*', choices=TARGETS, default=TARGETS)
+    parser.add_argument('--speed', type=float, help='1 for real time, as fast as possible if none')
+    parser.add_argument('--output', help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = [run_replay(args.capture, target, args.speed) for target in args.target]
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'metadata': get_metadata(), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Cost of reading the responses of GRBL from a serial port.
+
+Sends a fast stream of responses ('ok', with a status report every few lines)
+through a pseudo-terminal, and reads them with a serial port (pyserial) using:
+    - readline: pyserial's readline, which reads one byte per call, and
+    decodes and strips every line (the previous SerialService.readLine).
+    - framed: SerialService.readLine, which reads everything already received
+    at once and splits it in lines with a LineFramer.
+
+Reports the lines read per second and the CPU time used per line.
+Only available in POSIX systems.
+
+Usage (from the repository root):
+    python -m benchmarks.serial_framing
+    python -m benchmarks.serial_framing --lines 50000 --output results.json
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing_extensions import TypedDict
+
+try:
+    from ..benchmarks.streaming import get_metadata
+    from ..utils.serial import SerialService
+except ImportError:
+    from benchmarks.streaming import get_metadata
+    from utils.serial import SerialService
+
+# Constants
+DEFAULT_LINES = 20000
+READER_READLINE = 'readline'
+READER_FRAMED = 'framed'
+READERS = [READER_READLINE, READER_FRAMED]
+STATUS_EVERY = 10   # Lines between status reports
+STATUS_REPORT = b'<Run|MPos:10.500,20.250,-1.000|Bf:15,128|FS:1000,0>\r\n'
+WRITE_CHUNK_SIZE = 4096
+READ_TIMEOUT = 1.0  # seconds
+
+# Types definition
+FramingResult = TypedDict('FramingResult', {
+    'reader': str,
+    'lines': int,
+    'bytes': int,
+    'elapsed': float,
+    'lines_per_second': float,
+    'cpu_per_line_us': float
+})
+
+
+def build_responses(lines: int) -> bytes:
+    """Returns the responses of GRBL to stream, with a status report every STATUS_EVERY lines.
+    """
+    return b''.join(
+        STATUS_REPORT if index % STATUS_EVERY == STATUS_EVERY - 1 else b'ok\r\n'
+        for index in range(lines)
+    )
+
+
+def run_framing(reader: str, lines: int = DEFAULT_LINES) -> FramingResult:
+    """Streams the responses through a pseudo-terminal, and reads them with the given reader.
+    """
+    if reader not in READERS:
+        raise Exception(f'Unknown reader: {reader}')
+
+    master, slave = os.openpty()
+    service = SerialService()
+    service.timeout = READ_TIMEOUT
+    responses = build_responses(lines)
+
+    def write_responses():
+        for start in range(0, len(responses), WRITE_CHUNK_SIZE):
+            os.write(master, responses[start:start + WRITE_CHUNK_SIZE])
+
+    if reader == READER_READLINE:
+        def read_line() -> str:
+            return str(service.interface.readline().decode('ascii', 'ignore')).strip()
+    else:
+        read_line = service.readLine
+
+    try:
+        service.open(os.ttyname(slave), 115200)
+        writer = threading.Thread(target=write_responses, daemon=True)
+
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        writer.start()
+
+        received = 0
+        while received < lines:
+            if not read_line():
+                raise Exception(f'Timeout reading the responses, {received} lines received')
+            received += 1
+
+        elapsed = time.perf_counter() - start
+        cpu_time = time.process_time() - start_cpu
+        writer.join()
+    finally:
+        service.stopConnection()
+        os.close(slave)
+        os.close(master)
+
+    return {
+        'reader': reader,
+        'lines': lines,
+        'bytes': len(responses),
+        'elapsed': elapsed,
+        'lines_per_second': lines / elapsed,
+        'cpu_per_line_us': cpu_time * 1000000 / lines
+    }
+
+
+def print_results(results: list[FramingResult]):
+    header = f"{'reader':<10}{'lines':>8}{'lines/s':>12}{'cpu/line us':>13}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(
+            f"{result['reader']:<10}{result['lines']:>8}"
+            f"{result['lines_per_second']:>12.0f}{result['cpu_per_line_us']:>13.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost of reading the responses of GRBL')
+    parser.add_argument('--reader', nargs='*', choices=READERS, default=READERS)
+    parser.add_argument('--lines', type=int, default=DEFAULT_LINES)
+    parser.add_argument('--output', help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = [run_framing(reader, args.lines) for reader in args.reader]
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'metadata': get_metadata(), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""Streaming throughput benchmark of GrblController and GcodeFileSender.
+
+Streams synthetic and real G-code corpora to a fake GRBL device, the same way
+the worker does, and reports for every combination of corpus and poll interval:
+    - Lines and bytes streamed per second.
+    - Latency between sending a line and receiving its acknowledgement.
+    - Histogram of the GRBL RX buffer occupancy, right after sending each line.
+    - CPU time used by the process per streamed line.
+    - Latency of the commands of each lane, optionally sending interactive
+    queries through the priority lane while streaming.
+
+Usage (from the repository root):
+    python -m benchmarks.streaming
+    python -m benchmarks.streaming --device pty --lines 20000 --poll 0.05 0.125 1
+    python -m benchmarks.streaming --corpus medium --file program.nc --output results.json
+    python -m benchmarks.streaming --normalize
+    python -m benchmarks.streaming --interactive 0.2
+
+The results are printed as a table, and optionally saved as JSON to be
+compared with the ones of previous runs.
+"""
+
+import argparse
+from collections import deque
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from typing import Optional
+from typing_extensions import TypedDict
+
+try:
+    from ..benchmarks.corpus import SYNTHETIC_CORPORA, load_corpus, synthetic_corpus
+    from ..benchmarks.devices import DEFAULT_SPEEDUP, DEVICE_EMULATOR, DEVICES, create_device
+    from ..gcode.gcodeFileSender import FinishedFile, GcodeFileSender
+    from ..gcode.gcodeNormalizer import GcodeNormalizer
+    from ..grbl.grblController import STATUS_POLL_FAST, GrblController
+    from ..grbl.types import LaneLatency
+    from ..mocks.grbl_emulator import EmulatorStats
+except ImportError:
+    from benchmarks.corpus import SYNTHETIC_CORPORA, load_corpus, synthetic_corpus
+    from benchmarks.devices import DEFAULT_SPEEDUP, DEVICE_EMULATOR, DEVICES, create_device
+    from gcode.gcodeFileSender import FinishedFile, GcodeFileSender
+    from gcode.gcodeNormalizer import GcodeNormalizer
+    from grbl.grblController import STATUS_POLL_FAST, GrblController
+    from grbl.types import LaneLatency
+    from mocks.grbl_emulator import EmulatorStats
+
+# Constants
+DEFAULT_LINES = 5000
+STREAM_TIMEOUT = 120.0  # seconds
+ACK_WAIT = 0.1  # seconds, like the status refresh of the worker
+HISTOGRAM_BINS = 10     # Buckets of 10% of the RX buffer
+PERCENTILES = [50, 90, 99]
+
+# Types definition
+LatencyStats = TypedDict('LatencyStats', {
+    'p50': float,
+    'p90': float,
+    'p99': float,
+    'max': float,
+    'mean': float
+})
+BenchmarkResult = TypedDict('BenchmarkResult', {
+    'corpus': str,
+    'device': str,
+    'poll_interval': float,
+    'normalized': bool,
+    'lines': int,
+    'bytes': int,
+    'elapsed': float,
+    'lines_per_second': float,
+    'bytes_per_second': float,
+    'ack_latency_ms': LatencyStats,
+    'lane_latency_ms': dict[str, LaneLatency],
+    'buffer_occupancy': list[int],
+    'cpu_time': float,
+    'cpu_per_line_us': float,
+    'status_queries': int,
+    'device_stats': Optional[EmulatorStats]
+})
+
+
+class NullPubSub:
+    """Replaces the Redis publisher of the monitor,
+    so the benchmark measures the streaming and not the Redis server.
+    """
+
+    def count_subscribers(self, channel: str) -> int:
+        return 0
+
+    def publish(self, channel: str, message: str):
+        pass
+
+    def disconnect(self):
+        pass
+
+
+class InstrumentedGrblController(GrblController):
+    """GRBL controller which records when every line is sent and acknowledged.
+    """
+
+    def __init__(self, logger: logging.Logger, *args, **kwargs):
+        super().__init__(logger, *args, **kwargs)
+        self.send_times: deque[float] = deque()
+        self.latencies: list[float] = []
+        self.occupancy = [0] * HISTOGRAM_BINS
+        self.sent_bytes = 0
+        self.status_queries = 0
+
+    def _writeCommand(self, tosend: str) -> bool:
+        # Registered before sending, the response may arrive right away
+        self.send_times.append(time.perf_counter())
+        self.sent_bytes += len(tosend) + 1
+
+        fill = self.getBufferFill()
+        self.occupancy[min(int(fill * HISTOGRAM_BINS / 100), HISTOGRAM_BINS - 1)] += 1
+
+        return super()._writeCommand(tosend)
+
+    def notifyAck(self):
+        if self.send_times:
+            self.latencies.append(time.perf_counter() - self.send_times.popleft())
+        super().notifyAck()
+
+    def queryStatusReport(self):
+        self.status_queries += 1
+        super().queryStatusReport()
+
+
+def latency_stats(latencies: list[float]) -> LatencyStats:
+    """Returns the percentiles of the given latencies (seconds), in milliseconds.
+    """
+    if not latencies:
+        return {'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'max': 0.0, 'mean': 0.0}
+
+    ordered = sorted(latencies)
+
+    def percentile(p: int) -> float:
+        index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+        return ordered[index] * 1000
+
+    return {
+        'p50': percentile(50),
+        'p90': percentile(90),
+        'p99': percentile(99),
+        'max': ordered[-1] * 1000,
+        'mean': sum(ordered) * 1000 / len(ordered)
+    }
+
+
+def run_benchmark(
+        name: str,
+        lines: list[str],
+        device: str = DEVICE_EMULATOR,
+        poll_interval: float = STATUS_POLL_FAST,
+        speedup: float = DEFAULT_SPEEDUP,
+        rx_buffer_size: int = 128,
+        planner_size: int = 15,
+        normalize: bool = False,
+        interactive_interval: Optional[float] = None
+) -> BenchmarkResult:
+    """Streams a G-code program to a fake device, and returns the measurements.
+    When normalize is set, the lines go through a GcodeNormalizer before being sent.
+
+    With an interactive interval (seconds), the parser state is queried ($G)
+    through the priority lane at that rate, like a user interface would.
+    """
+    logger = logging.getLogger('benchmark')
+    port, transport, emulator = create_device(device, speedup, rx_buffer_size, planner_size)
+
+    with tempfile.NamedTemporaryFile('w', suffix='.gcode', delete=False) as gcode:
+        gcode.write('\n'.join(lines) + '\n')
+
+    cnc = InstrumentedGrblController(logger, transport)
+    cnc.grbl_monitor.redis = NullPubSub()
+    cnc.setPollingRates(fast=poll_interval, slow=poll_interval)
+
+    try:
+        cnc.connect(port, 115200)
+        normalizer = GcodeNormalizer() if normalize else None
+        file_sender = GcodeFileSender(cnc, gcode.name, normalizer)
+        file_sender.start()
+
+        # Measure only the streaming
+        cnc.latencies.clear()
+        cnc.occupancy = [0] * HISTOGRAM_BINS
+        cnc.sent_bytes = 0
+        cnc.status_queries = 0
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        deadline = time.time() + STREAM_TIMEOUT
+        queried_at = start
+
+        # Same loop as the worker, without the progress reports
+        while time.time() < deadline:
+            if interactive_interval and time.perf_counter() - queried_at >= interactive_interval:
+                cnc.queryGcodeParserState()
+                queried_at = time.perf_counter()
+
+            acks_count = cnc.getAcksCount()
+            try:
+                file_sender.fill_buffer()
+            except FinishedFile:
+                break
+            cnc.waitForAck(acks_count, timeout=ACK_WAIT)
+
+        if not cnc.waitUntilProcessed(max(deadline - time.time(), 0)):
+            raise Exception(f'Timeout streaming the corpus {name}')
+
+        elapsed = time.perf_counter() - start
+        cpu_time = time.process_time() - start_cpu
+    finally:
+        cnc.disconnect()
+        os.remove(gcode.name)
+
+    sent_lines = len(cnc.latencies)
+    return {
+        'corpus': name,
+        'device': device,
+        'poll_interval': poll_interval,
+        'normalized': normalize,
+        'lines': sent_lines,
+        'bytes': cnc.sent_bytes,
+        'elapsed': elapsed,
+        'lines_per_second': sent_lines / elapsed,
+        'bytes_per_second': cnc.sent_bytes / elapsed,
+        'ack_latency_ms': latency_stats(cnc.latencies),
+        'lane_latency_ms': cnc.getLatencyStats(),
+        'buffer_occupancy': cnc.occupancy,
+        'cpu_time': cpu_time,
+        'cpu_per_line_us': cpu_time * 1000000 / max(sent_lines, 1),
+        'status_queries': cnc.status_queries,
+        'device_stats': dict(emulator.stats) if emulator else None
+    }
+
+
+def get_metadata() -> dict[str, str]:
+    """Returns information to identify the run, when comparing results over time.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ''
+
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor()
+    }
+
+
+def print_results(results: list[BenchmarkResult]):
+    header = (
+        f"{'corpus':<16}{'device':<10}{'poll':>6}{'norm':>6}{'lines':>8}{'lines/s':>10}"
+        f"{'KB/s':>8}{'p50 ms':>8}{'p99 ms':>8}{'cpu/line us':>13}{'prio p99 ms':>13}"
+    )
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(
+            f"{result['corpus']:<16}{result['device']:<10}{result['poll_interval']:>6g}"
+            f"{'yes' if result['normalized'] else 'no':>6}"
+            f"{result['lines']:>8}{result['lines_per_second']:>10.0f}"
+            f"{result['bytes_per_second'] / 1024:>8.1f}"
+            f"{result['ack_latency_ms']['p50']:>8.2f}{result['ack_latency_ms']['p99']:>8.2f}"
+            f"{result['cpu_per_line_us']:>13.1f}"
+            f"{result['lane_latency_ms']['priority']['p99']:>13.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming throughput benchmark')
+    parser.add_argument(
+        '--corpus',
+        nargs='*',
+        choices=SYNTHETIC_CORPORA,
+        default=SYNTHETIC_CORPORA,
+        help='synthetic corpora to stream'
+    )
+    parser.add_argument(
+        '--file',
+        action='append',
+        default=[],
+        help='G-code file to stream, can be repeated'
+    )
+    parser.add_argument('--lines', type=int, default=DEFAULT_LINES, help='lines per corpus')
+    parser.add_argument(
+        '--poll',
+        nargs='+',
+        type=float,
+        default=[STATUS_POLL_FAST],
+        help='status poll intervals (seconds) to compare'
+    )
+    parser.add_argument('--device', choices=DEVICES, default=DEVICE_EMULATOR)
+    parser.add_argument('--speedup', type=float, default=DEFAULT_SPEEDUP)
+    parser.add_argument('--rx-buffer', type=int, default=128)
+    parser.add_argument('--planner', type=int, default=15)
+    parser.add_argument(
+        '--normalize',
+        action='store_true',
+        help='normalize the G-code lines before sending them'
+    )
+    parser.add_argument(
+        '--interactive',
+        type=float,
+        help='interval (seconds) between interactive queries sent through the priority lane'
+    )
+    parser.add_argument('--output', help='JSON file to save the results')
+    args = parser.parse_args()
+
+    corpora = [(kind, synthetic_corpus(kind, args.lines)) for kind in args.corpus]
+    corpora += [(os.path.basename(path), load_corpus(path)) for path in args.file]
+
+    results = [
+        run_benchmark(
+            name,
+            lines,
+            device=args.device,
+            poll_interval=poll,
+            speedup=args.speedup,
+            rx_buffer_size=args.rx_buffer,
+            planner_size=args.planner,
+            normalize=args.normalize,
+            interactive_interval=args.interactive
+        )
+        for name, lines in corpora
+        for poll in args.poll
+    ]
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'metadata': get_metadata(), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,7 @@ REDIS_PORT = int(os.environ.get('REDIS_PORT', ''))
 REDIS_DB_CELERY = int(os.environ.get('REDIS_DB_CELERY', ''))
 REDIS_DB_STORAGE = int(os.environ.get('REDIS_DB_STORAGE', ''))
 GRBL_SIMULATION = bool(os.environ.get('GRBL_SIMULATION', ''))
+GRBL_CAPTURE_FOLDER = os.environ.get('GRBL_CAPTURE_FOLDER', '')  # Empty to disable
 
 # Generate global constants
 FILES_FOLDER_PATH = './gcode_files'
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy import String, Integer, BigInteger, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from typing import List, Literal, Optional
@@ -75,6 +75,12 @@ class Task(Base):
         foreign_keys=[user_id],
         init=False
     )
+    checkpoints: Mapped[List["TaskCheckpoint"]] = relationship(
+        back_populates='task',
+        cascade='all, delete-orphan',
+        default_factory=list,
+        init=False
+    )
 
     def __repr__(self):
         return f"<Task: {self.name}, status: {self.status}, created at: {self.created_at}>"
@@ -102,6 +108,38 @@ class Task(Base):
         }
 
 
+class TaskCheckpoint(Base):
+    __tablename__ = 'task_checkpoints'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    # Foreign keys
+    task_id: Mapped[int] = mapped_column(ForeignKey('tasks.id'))
+    # Other attributes
+    line: Mapped[int] = mapped_column(Integer)
+    offset: Mapped[int] = mapped_column(BigInteger)
+    state: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default_factory=datetime.now)
+
+    # Virtual columns
+    task: Mapped["Task"] = relationship(back_populates="checkpoints", init=False)
+
+    def __repr__(self):
+        return (
+            f"<TaskCheckpoint: task ID: {self.task_id}, "
+            f"line: {self.line}, created at: {self.created_at}>"
+        )
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "task_id": self.task_id,
+            "line": self.line,
+            "offset": self.offset,
+            "state": self.state,
+            "created_at": self.created_at
+        }
+
+
 class File(Base):
     __tablename__ = 'files'
 
@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Optional
 from ..base import Session
 from ..exceptions import DatabaseError, EntityNotFoundError, Unauthorized
-from ..models import Task, TASK_PENDING_APPROVAL_STATUS, TASK_APPROVED_STATUS, \
+from ..models import Task, TaskCheckpoint, TASK_PENDING_APPROVAL_STATUS, TASK_APPROVED_STATUS, \
     TASK_IN_PROGRESS_STATUS, TASK_CANCELLED_STATUS, TASK_EMPTY_NOTE, VALID_STATUSES
 try:
     from ...utils.validators import validate_transition
@@ -201,5 +201,37 @@ class TaskRepository:
             self.session.rollback()
             raise DatabaseError(f'Error removing the task from the DB: {e}')
 
+    def create_checkpoint(self, task_id: int, line: int, offset: int, state: dict):
+        try:
+            new_checkpoint = TaskCheckpoint(task_id, line, offset, state)
+
+            self.session.add(new_checkpoint)
+            self.session.commit()
+            return new_checkpoint
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise DatabaseError(f'Error creating the checkpoint in the DB: {e}')
+
+    def get_checkpoints(self, task_id: int):
+        """Returns the checkpoints of a task, the most recent first.
+        """
+        try:
+            query = select(
+                TaskCheckpoint
+            ).where(
+                TaskCheckpoint.task_id == task_id
+            ).order_by(
+                TaskCheckpoint.id.desc()
+            )
+            return self.session.scalars(query).all()
+        except SQLAlchemyError as e:
+            raise DatabaseError(f'Error retrieving checkpoints from the DB: {e}')
+
+    def get_checkpoint_by_id(self, id: int):
+        try:
+            return self.session.get(TaskCheckpoint, id)
+        except SQLAlchemyError as e:
+            raise DatabaseError(f'Error looking for checkpoint with ID {id} in the DB: {e}')
+
     def close_session(self):
         self.session.close()
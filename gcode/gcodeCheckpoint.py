@@ -0,0 +1,237 @@
+from typing import Optional
+from typing_extensions import TypedDict
+
+try:
+    from ..grbl.grblModalState import CoolantState, GrblModalState, normalize_code
+    from ..grbl.grblUtils import COMMENT_PATTERN, split_gcode_words
+except ImportError:
+    from grbl.grblModalState import CoolantState, GrblModalState, normalize_code
+    from grbl.grblUtils import COMMENT_PATTERN, split_gcode_words
+
+# Constants
+SPINDLE_DELAY = 5   # Seconds to wait for the spindle to reach its speed
+MILLIMETERS_PER_INCH = 25.4
+AXES = 'XYZ'
+# Commands after which the position in the work coordinates system is unknown
+UNKNOWN_POSITION_COMMANDS = [
+    'G10', 'G28', 'G30', 'G38.2', 'G38.3', 'G38.4', 'G38.5', 'G53', 'G92', 'G92.1'
+]
+
+# Types definition
+Position = TypedDict('Position', {
+    'x': Optional[float],
+    'y': Optional[float],
+    'z': Optional[float]
+})
+Checkpoint = TypedDict('Checkpoint', {
+    'line': int,
+    'offset': int,
+    'modal': dict[str, Optional[CoolantState]],
+    'feedrate': Optional[float],
+    'spindle': Optional[float],
+    'tool': Optional[int],
+    'position': Position,
+    'safe_z': Optional[float]
+})
+
+
+class GcodeCheckpointTracker:
+    """Follows the execution of a G-code file to build checkpoints from which
+    the job can be resumed: the amount of executed lines, the byte offset of the
+    next line in the file, and the state of the machine after the executed lines.
+
+    The state is reconstructed from the file itself: the modal state, the feed rate,
+    the spindle speed and the last position commanded in the work coordinates system
+    (when it is known), plus the highest Z commanded so far, used as the safe height.
+
+    The file is opened on its own when the first line is registered,
+    so the tracker can lag behind the sender.
+    """
+
+    def __init__(self, file_path: str, start: Optional[Checkpoint] = None):
+        self.file_path = file_path
+        self.gcode = None
+        self.modal_state = GrblModalState()
+        self.line = 0
+        self.offset = 0
+        self.position: dict[str, Optional[float]] = {axis: None for axis in AXES}
+        self.safe_z: Optional[float] = None
+
+        if start:
+            self._restore(start)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if not self.gcode:
+            return
+        self.gcode.close()
+        self.gcode = None
+
+    def advance(self, line: int) -> Checkpoint:
+        """Registers the lines executed until the given line (included),
+        and returns the checkpoint to resume the job from the next one.
+        """
+        if self.line < line and not self.gcode:
+            self.gcode = open(self.file_path, 'rb')
+            self.gcode.seek(self.offset)
+
+        while self.line < line:
+            raw = self.gcode.readline()
+            if not raw:
+                break
+            self.line += 1
+            self.offset += len(raw)
+            self._update(raw.decode('utf-8', errors='replace'))
+
+        return self.get_checkpoint()
+
+    def get_checkpoint(self) -> Checkpoint:
+        return {
+            'line': self.line,
+            'offset': self.offset,
+            'modal': self.modal_state.get_modal(),
+            'feedrate': self.modal_state.feedrate,
+            'spindle': self.modal_state.spindle,
+            'tool': self.modal_state.tool,
+            'position': {
+                'x': self.position['X'],
+                'y': self.position['Y'],
+                'z': self.position['Z']
+            },
+            'safe_z': self.safe_z
+        }
+
+    # UTILITIES
+
+    def _restore(self, checkpoint: Checkpoint):
+        self.line = checkpoint['line']
+        self.offset = checkpoint['offset']
+        self.modal_state = GrblModalState(
+            checkpoint['modal'],
+            checkpoint['feedrate'],
+            checkpoint['spindle'],
+            checkpoint['tool']
+        )
+        self.position = {axis: checkpoint['position'][axis.lower()] for axis in AXES}
+        self.safe_z = checkpoint['safe_z']
+
+    def _update(self, line: str):
+        line = COMMENT_PATTERN.sub('', line).strip()
+        if not line or line.startswith('$'):
+            return
+
+        words = split_gcode_words(line)
+        if not words:
+            return
+
+        units = self.modal_state.modal['units']
+        self.modal_state.update_words(words)
+        self._convert_units(units, self.modal_state.modal['units'])
+
+        codes = {normalize_code(letter, value) for letter, value in words if letter in 'GM'}
+        if not codes.isdisjoint(UNKNOWN_POSITION_COMMANDS):
+            self.position = {axis: None for axis in AXES}
+            return
+
+        incremental = self.modal_state.modal['distance'] == 'G91'
+        for letter, value in words:
+            if letter not in AXES:
+                continue
+            current = self.position[letter]
+            if not incremental:
+                self.position[letter] = float(value)
+            elif current is not None:
+                self.position[letter] = current + float(value)
+
+        z = self.position['Z']
+        if z is not None and (self.safe_z is None or z > self.safe_z):
+            self.safe_z = z
+
+    def _convert_units(self, previous: Optional[str], current: Optional[str]):
+        if previous == current:
+            return
+
+        if previous is None:
+            # The position was tracked in unknown units
+            self.position = {axis: None for axis in AXES}
+            self.safe_z = None
+            return
+
+        factor = MILLIMETERS_PER_INCH if current == 'G21' else 1 / MILLIMETERS_PER_INCH
+        self.position = {
+            axis: None if value is None else value * factor
+            for axis, value in self.position.items()
+        }
+        if self.safe_z is not None:
+            self.safe_z = self.safe_z * factor
+
+
+def format_number(value: float) -> str:
+    """Formats a coordinate or a speed, with up to 4 decimals.
+
+    For example: 10.0 -> '10', -2.50001 -> '-2.5'
+    """
+    text = f'{value:.4f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def build_resume_preamble(checkpoint: Checkpoint, spindle_delay: int = SPINDLE_DELAY) -> list[str]:
+    """Returns the G-code lines to send before resuming a job from a checkpoint,
+    which restore the state of the machine without crashing the tool:
+        1. Units, plane and coordinates system.
+        2. Retract to the safe height, then move to the XY position in rapid mode.
+        3. Start the spindle and wait for it to reach its speed, and restore the coolant.
+        4. Plunge to the Z position at the feed rate.
+        5. Restore the distance mode, the feed rate mode, the motion mode and the feed rate.
+
+    The unknown values (never set by the file) are left as they are: GRBL starts with
+    its defaults after connecting, as it did when the job started.
+    """
+    modal = checkpoint['modal']
+    position = checkpoint['position']
+    # In inverse time mode (G93) the feed rate is not modal
+    inverse_time = modal['feedrate'] == 'G93'
+    feedrate = None if inverse_time else checkpoint['feedrate']
+    preamble = []
+
+    setup = [modal[group] for group in ['units', 'plane', 'wcs'] if modal[group]]
+    preamble.append(' '.join(setup + ['G90', 'G94']))
+
+    if checkpoint['safe_z'] is not None:
+        preamble.append(f"G0 Z{format_number(checkpoint['safe_z'])}")
+
+    xy = [f'{axis.upper()}{format_number(position[axis])}' for axis in 'xy'
+          if position[axis] is not None]
+    if xy:
+        preamble.append(' '.join(['G0'] + xy))
+
+    spindle = modal['spindle']
+    if spindle in ['M3', 'M4']:
+        speed = checkpoint['spindle']
+        preamble.append(spindle if speed is None else f'{spindle} S{format_number(speed)}')
+        preamble.append(f'G4 P{spindle_delay}')
+
+    coolant = modal['coolant']
+    for code in (coolant if isinstance(coolant, list) else [coolant]):
+        if code in ['M7', 'M8']:
+            preamble.append(code)
+
+    if position['z'] is not None:
+        if feedrate:
+            preamble.append(f"G1 Z{format_number(position['z'])} F{format_number(feedrate)}")
+        else:
+            preamble.append(f"G0 Z{format_number(position['z'])}")
+
+    # Arcs (G2, G3) and probing can't be selected without axis words
+    restore = [modal['distance'] or 'G90']
+    if inverse_time:
+        restore.append('G93')
+    if modal['motion'] in ['G0', 'G1', 'G80']:
+        restore.append(modal['motion'])
+    if feedrate:
+        restore.append(f'F{format_number(feedrate)}')
+    preamble.append(' '.join(restore))
+
+    return preamble
@@ -1,10 +1,33 @@
+from collections import deque
+import time
+from typing import Optional
+from typing_extensions import TypedDict
+
 try:
+    from ..gcode.gcodeNormalizer import GcodeNormalizer, NormalizerStats
+    from ..gcode.gcodeStreamThrottle import GcodeStreamThrottle, ThrottleStats
     from ..grbl.grblController import GrblController
+    from ..grbl.grblUtils import COMMENT_LINE_PATTERN
 except ImportError:
+    from gcode.gcodeNormalizer import GcodeNormalizer, NormalizerStats
+    from gcode.gcodeStreamThrottle import GcodeStreamThrottle, ThrottleStats
     from grbl.grblController import GrblController
+    from grbl.grblUtils import COMMENT_LINE_PATTERN
 
 # Constants
 MAX_BUFFER_FILL = 75    # Percentage
+SENDS_RATE_WINDOW = 1.0     # Seconds
+ACKNOWLEDGED_HISTORY = 64   # Lines, more than the planner of any GRBL build
+
+# Types definition
+FileSenderStats = TypedDict('FileSenderStats', {
+    'sent_lines': int,
+    'sends_per_second': float,
+    'lines_in_flight': int,
+    'buffer_fill': float,
+    'throttle': ThrottleStats,
+    'normalizer': Optional[NormalizerStats]
+})
 
 
 # Custom exceptions
@@ -14,24 +37,50 @@ class FinishedFile(Exception):
 
 class GcodeFileSender:
     """Utility class to open a file and send it to the GRBL device, line by line.
+
+    The lines can go through a GcodeNormalizer before being sent,
+    to reduce the bytes to transmit.
     """
     # CONSTRUCTOR
 
-    def __init__(self, grbl_controller: GrblController, file_path: str):
+    def __init__(
+            self,
+            grbl_controller: GrblController,
+            file_path: str,
+            normalizer: Optional[GcodeNormalizer] = None
+    ):
         # Attributes definition
         self.grbl_controller = grbl_controller
+        self.throttle = GcodeStreamThrottle(grbl_controller)
+        self.normalizer = normalizer
         self.file_path = file_path
         self.gcode = None
         self._paused = False
         self.current_line = 0
+        # Line read from the file which didn't fit in the GRBL buffer yet
+        self._next_line: Optional[str] = None
+        # Timestamps of the most recent sends, to calculate the sending rate
+        self._send_times: deque[float] = deque()
+        # Progress tracking: file lines sent to GRBL and not acknowledged yet,
+        # the most recent acknowledged ones, and the lines not sent (empty or comments)
+        self._sent_lines: deque[int] = deque()
+        self._acknowledged: deque[int] = deque()
+        self._acknowledged_lines = 0
+        self._skipped_lines = 0
+        self._executed_line = 0
 
     def __del__(self):
         self._close_file()
 
     # FLOW CONTROL
 
-    def start(self) -> int:
-        return self._open_file()
+    def start(self, line: int = 0, offset: int = 0) -> int:
+        """Opens the file and returns its total amount of lines.
+
+        To resume a job, the sending starts after the given line,
+        whose end is at the given byte offset in the file.
+        """
+        return self._open_file(line, offset)
 
     def pause(self):
         self._paused = True
@@ -53,16 +102,25 @@ class GcodeFileSender:
     def set_file(self, file_path: str):
         self.file_path = file_path
 
-    def _open_file(self) -> int:
+    def _open_file(self, line: int = 0, offset: int = 0) -> int:
         self.gcode = open(self.file_path, 'r')
-        self.current_line = 0
+        self.current_line = line
         self._paused = False
+        self._next_line = None
+        self._send_times.clear()
+        self._sent_lines.clear()
+        self._acknowledged.clear()
+        self._acknowledged_lines = 0
+        self._skipped_lines = 0
+        self._executed_line = line
+        if self.normalizer:
+            self.normalizer.reset()
 
         # Total amount of lines in file
         total_lines = len(self.gcode.readlines())
 
-        # Reset file pointer to the beginning
-        self.gcode.seek(0)
+        # Reset file pointer to the beginning, or to the line to resume from
+        self.gcode.seek(offset)
 
         return total_lines
 
@@ -72,6 +130,7 @@ class GcodeFileSender:
 
         self.gcode.close()
         self.gcode = None
+        self._next_line = None
 
     # SLOTS
 
@@ -89,8 +148,106 @@ class GcodeFileSender:
         if not line:
             raise FinishedFile
 
-        self.grbl_controller.sendCommand(line)
+        self._send(self._normalize(line))
 
         # Return amount of sent lines so far
-        self.current_line += 1
         return self.current_line
+
+    def fill_buffer(self) -> int:
+        """Sends as many lines as fit in the remaining space of the GRBL RX buffer,
+        limited by the throttle according to the buffers feedback from GRBL.
+
+        The line that doesn't fit is kept and sent first on the next call,
+        which is expected to happen as soon as GRBL acknowledges a command.
+        """
+        if not self.gcode or self._paused:
+            return self.current_line
+
+        budget = self.throttle.get_send_budget()
+
+        while True:
+            if self._next_line is None:
+                line = self.gcode.readline()
+
+                # EOF
+                if not line:
+                    raise FinishedFile
+
+                self._next_line = self._normalize(line)
+
+            # Stop when the line doesn't fit in the GRBL buffer,
+            # unless the buffer is empty and waiting would be useless
+            required = len(self._next_line.strip()) + 1  # Account for the EOL character
+            if required > budget and self.grbl_controller.getPendingBytes() > 0:
+                return self.current_line
+
+            self._send(self._next_line)
+            self._next_line = None
+            budget -= required
+
+    def _normalize(self, line: str) -> str:
+        if self.normalizer is None:
+            return line
+        return self.normalizer.normalize(line)
+
+    def _send(self, line: str):
+        self.grbl_controller.sendCommand(line)
+        self.current_line += 1
+
+        # The controller counts the lines it doesn't send as soon as they are queued
+        command = line.strip()
+        if not command or COMMENT_LINE_PATTERN.match(command):
+            self._skipped_lines += 1
+        else:
+            self._sent_lines.append(self.current_line)
+
+        now = time.time()
+        self._send_times.append(now)
+        self._discard_old_sends(now)
+
+    # PROGRESS
+
+    def get_executed_line(self, commands_count: int) -> int:
+        """Returns the last line of the file which GRBL has surely executed,
+        given the count of processed commands of the controller since the sending started.
+
+        GRBL acknowledges a line once it is planned, so the most recent acknowledged
+        lines are considered to be still in the planner, which is lost on an alarm.
+        A job resumed from the next line may repeat a few lines, but never skips one.
+        """
+        acknowledged = commands_count - self._skipped_lines
+        while self._sent_lines and self._acknowledged_lines < acknowledged:
+            self._acknowledged.append(self._sent_lines.popleft())
+            self._acknowledged_lines += 1
+            if len(self._acknowledged) > ACKNOWLEDGED_HISTORY:
+                self._executed_line = self._acknowledged.popleft()
+
+        planned = min(self.grbl_controller.getBuildInfo()['blockBufferSize'], ACKNOWLEDGED_HISTORY)
+        index = len(self._acknowledged) - 1 - planned
+        return self._acknowledged[index] if index >= 0 else self._executed_line
+
+    # METRICS
+
+    def _discard_old_sends(self, now: float):
+        limit = now - SENDS_RATE_WINDOW
+        while self._send_times and self._send_times[0] < limit:
+            self._send_times.popleft()
+
+    def get_sends_per_second(self) -> float:
+        """Returns the amount of lines sent during the last second.
+        """
+        self._discard_old_sends(time.time())
+        return len(self._send_times) / SENDS_RATE_WINDOW
+
+    def get_stats(self) -> FileSenderStats:
+        """Returns the sender's performance metrics, useful to confirm
+        the GRBL planner is kept full.
+        """
+        return {
+            'sent_lines': self.current_line,
+            'sends_per_second': self.get_sends_per_second(),
+            'lines_in_flight': self.grbl_controller.getLinesInFlight(),
+            'buffer_fill': self.grbl_controller.getBufferFill(),
+            'throttle': self.throttle.get_stats(),
+            'normalizer': self.normalizer.get_stats() if self.normalizer else None
+        }
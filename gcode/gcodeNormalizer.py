@@ -0,0 +1,153 @@
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+from typing_extensions import TypedDict
+
+try:
+    from ..grbl.grblModalState import GrblModalState, normalize_code
+    from ..grbl.grblUtils import COMMENT_LINE_PATTERN, COMMENT_PATTERN, split_gcode_words
+except ImportError:
+    from grbl.grblModalState import GrblModalState, normalize_code
+    from grbl.grblUtils import COMMENT_LINE_PATTERN, COMMENT_PATTERN, split_gcode_words
+
+# Constants
+DEFAULT_PRECISION = 4   # Decimals, 0.1 um in millimeters and 2.5 um in inches
+ROUNDED_WORDS = 'XYZABCIJKRFS'
+# Commands whose words must be kept as they are, even when repeating the modal state
+NON_MODAL_COMMANDS = ['G4', 'G10', 'G28', 'G28.1', 'G30', 'G30.1', 'G53', 'G92', 'G92.1']
+
+# Types definition
+NormalizerStats = TypedDict('NormalizerStats', {
+    'lines': int,
+    'bytes_in': int,
+    'bytes_out': int,
+    'bytes_saved': int,
+    'dropped_words': int
+})
+
+
+class GcodeNormalizer:
+    """Shrinks the G-code lines before sending them to GRBL, so they take
+    less time in the serial line and less space in the GRBL RX buffer.
+
+    Each stage can be disabled:
+        - strip_comments: Removes the inline comments, '(...)' and '; ...'.
+        - compact_whitespace: Removes the whitespace between words.
+        - drop_modal_words: Removes the modal words which repeat the current
+        state, like the G1 or the feed rate of consecutive moves.
+        - precision: Rounds the coordinates (and F, S) to the given decimals,
+        and removes the trailing zeros. None to keep every decimal.
+
+    The modal state is tracked from the normalized lines, so they must be
+    sent in the same order, and a new job must start with reset().
+    """
+    def __init__(
+            self,
+            strip_comments: bool = True,
+            compact_whitespace: bool = True,
+            drop_modal_words: bool = True,
+            precision: Optional[int] = DEFAULT_PRECISION
+    ):
+        self.strip_comments = strip_comments
+        self.compact_whitespace = compact_whitespace
+        self.drop_modal_words = drop_modal_words
+        self.precision = precision
+        self._quantum = None if precision is None else Decimal(1).scaleb(-precision)
+
+        self.modal_state = GrblModalState()
+        self.lines = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.dropped_words = 0
+
+    def reset(self):
+        """Starts a new job: the modal state is unknown again and the metrics restart.
+        """
+        self.modal_state.reset()
+        self.lines = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.dropped_words = 0
+
+    def normalize(self, line: str) -> str:
+        """Returns the normalized line, which is empty when there is nothing to send.
+        """
+        original = line.strip()
+        self.lines += 1
+
+        # The controller doesn't send empty lines and comments
+        if original and not COMMENT_LINE_PATTERN.match(original):
+            self.bytes_in += len(original) + 1
+
+        normalized = self._normalize(original)
+        if normalized:
+            self.bytes_out += len(normalized) + 1
+        return normalized
+
+    def get_stats(self) -> NormalizerStats:
+        return {
+            'lines': self.lines,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'bytes_saved': self.bytes_in - self.bytes_out,
+            'dropped_words': self.dropped_words
+        }
+
+    # UTILITIES
+
+    def _normalize(self, line: str) -> str:
+        if self.strip_comments:
+            line = COMMENT_PATTERN.sub('', line).strip()
+
+        # GRBL system commands and jogs are sent as they are
+        if not line or line.startswith('$'):
+            return line
+
+        words = split_gcode_words(line)
+        if words is None:
+            # Not valid G-code (or with comments), sent as it is,
+            # and its effect on the modal state is unknown
+            self.modal_state.reset()
+            return line
+
+        codes = {normalize_code(letter, value) for letter, value in words if letter in 'GM'}
+        can_drop = self.drop_modal_words and codes.isdisjoint(NON_MODAL_COMMANDS)
+        # The feed rate isn't modal in inverse time mode (G93)
+        can_drop_feed = can_drop and self.modal_state.modal['feedrate'] == 'G94' \
+            and codes.isdisjoint(['G93', 'G94'])
+
+        formatted = [(letter, self._format_value(letter, value)) for letter, value in words]
+        result = []
+        for letter, value in formatted:
+            if can_drop and (letter != 'F' or can_drop_feed) \
+                    and self.modal_state.is_current(letter, value):
+                self.dropped_words += 1
+                continue
+            result.append(letter + value)
+
+        self.modal_state.update_words(formatted)
+
+        separator = '' if self.compact_whitespace else ' '
+        return separator.join(result)
+
+    def _format_value(self, letter: str, value: str) -> str:
+        if letter in 'GM':
+            return normalize_code(letter, value)[1:]
+        if letter not in ROUNDED_WORDS:
+            return value
+
+        try:
+            number = Decimal(value)
+            if self._quantum is not None:
+                number = number.quantize(self._quantum)
+            text = format(number.normalize(), 'f')
+        except InvalidOperation:
+            return value
+
+        if text == '-0':
+            return '0'
+        # Leading zeros aren't needed: 0.5 -> .5, -0.5 -> -.5
+        if text.startswith('0.'):
+            return text[1:]
+        if text.startswith('-0.'):
+            return '-' + text[2:]
+        return text
@@ -0,0 +1,120 @@
+import time
+from typing import Optional
+from typing_extensions import TypedDict
+
+try:
+    from ..grbl.constants import GRBL_ACTIVE_STATE_RUN
+    from ..grbl.grblController import GrblController
+    from ..grbl.grblUtils import STATUS_FIELD_BUFFER
+except ImportError:
+    from grbl.constants import GRBL_ACTIVE_STATE_RUN
+    from grbl.grblController import GrblController
+    from grbl.grblUtils import STATUS_FIELD_BUFFER
+
+# Constants
+MIN_TARGET_FILL = 0.5   # RX buffer fill to aim for when the planner is full
+STATUS_SUBSCRIBER = 'stream_throttle'
+
+# Types definition
+ThrottleStats = TypedDict('ThrottleStats', {
+    'planner_free': Optional[int],
+    'rx_free': Optional[int],
+    'starvation_count': int,
+    'starvation_time': float
+})
+
+
+class GcodeStreamThrottle:
+    """Decides how many bytes to stream to GRBL, using the state of its buffers
+    from the last status report (Bf: field).
+
+    The fuller the planner is, the less urgent it is to fill the RX buffer,
+    so the target fill of the RX buffer goes from MIN_TARGET_FILL (full planner)
+    up to the whole buffer (empty planner).
+    When the machine is running with an empty planner, it is starving: motion
+    stutters because GRBL ran out of blocks to execute, so it streams at full capacity.
+
+    Without buffer feedback (status reports without Bf:), it only applies
+    the character counting limit. The feedback is requested to the controller,
+    in case it tunes the status report mask ($10).
+    """
+    def __init__(self, grbl_controller: GrblController, min_target_fill: float = MIN_TARGET_FILL):
+        self.grbl_controller = grbl_controller
+        self.min_target_fill = min_target_fill
+        grbl_controller.setStatusRequirements(STATUS_SUBSCRIBER, [STATUS_FIELD_BUFFER])
+
+        # Planner starvation metrics
+        self.starvation_count = 0
+        self.starvation_time = 0.0
+        self._starving_since: Optional[float] = None
+
+    def get_buffer_feedback(self) -> Optional[dict[str, int]]:
+        """Returns the state of the GRBL buffers in the last status report, if reported.
+
+        Example: { 'planner': 15, 'rx': 128 }
+        """
+        return self.grbl_controller.grbl_status.get_status_report().get('buffer')
+
+    def is_starving(self) -> bool:
+        """Checks if the machine is running with an empty planner.
+        """
+        buffer = self.get_buffer_feedback()
+        if not buffer:
+            return False
+
+        active_state = self.grbl_controller.grbl_status.get_status_report()['activeState']
+        planner_size = self.grbl_controller.getBuildInfo()['blockBufferSize']
+        return active_state == GRBL_ACTIVE_STATE_RUN and buffer['planner'] >= planner_size
+
+    def _update_starvation(self, starving: bool):
+        now = time.time()
+
+        if starving and self._starving_since is None:
+            self.starvation_count += 1
+            self._starving_since = now
+            return
+
+        if not starving and self._starving_since is not None:
+            self.starvation_time += now - self._starving_since
+            self._starving_since = None
+
+    def get_send_budget(self) -> int:
+        """Returns the amount of bytes which should be streamed right now.
+        """
+        available = self.grbl_controller.getBufferAvailable()
+        buffer = self.get_buffer_feedback()
+        if not buffer:
+            return available
+
+        starving = self.is_starving()
+        self._update_starvation(starving)
+        if starving:
+            return available
+
+        # Target fill of the RX buffer, depending on how much work is queued in the planner
+        planner_size = self.grbl_controller.getBuildInfo()['blockBufferSize']
+        planner_free = min(buffer['planner'], planner_size)
+        planner_free_ratio = planner_free / planner_size if planner_size else 1.0
+        target_fill = self.min_target_fill + (1 - self.min_target_fill) * planner_free_ratio
+
+        # Use the most conservative estimation of the RX buffer usage
+        capacity = self.grbl_controller.streaming.capacity()
+        used = max(self.grbl_controller.getPendingBytes(), capacity - buffer['rx'])
+
+        budget = int(target_fill * capacity) - used
+        return max(min(budget, available), 0)
+
+    def get_stats(self) -> ThrottleStats:
+        """Returns the last buffers feedback and the planner starvation metrics.
+        """
+        buffer = self.get_buffer_feedback()
+        starvation_time = self.starvation_time
+        if self._starving_since is not None:
+            starvation_time += time.time() - self._starving_since
+
+        return {
+            'planner_free': buffer['planner'] if buffer else None,
+            'rx_free': buffer['rx'] if buffer else None,
+            'starvation_count': self.starvation_count,
+            'starvation_time': starvation_time
+        }
@@ -0,0 +1,368 @@
+import asyncio
+from collections import deque
+import logging
+from queue import Full
+from serial import SerialException
+import sys
+from typing import Optional
+from .grblController import GrblController, BUILD_INFO_TIMEOUT, LANE_PRIORITY
+from .grblStatus import FLAG_STOP
+from .streaming.streamingStrategy import STREAMING_CHARACTER_COUNTING
+from .types import Status
+
+try:
+    from ..utils.transport import Transport
+except ImportError:
+    from utils.transport import Transport
+
+
+class AsyncGrblController(GrblController):
+    """GRBL controller driven by an asyncio event loop, instead of I/O threads.
+
+    The serial port is watched by the event loop, so a single loop can also
+    serve Redis and the clients without any thread hand-off.
+
+    The commands keep the same surface than GrblController, but they return
+    futures which can be awaited for the GRBL response:
+
+        response = await controller.sendCommand('G0 X10')   # 'ok', 'error:20'...
+        status = await controller.queryStatusReport()
+
+    Awaiting them is optional, they are resolved anyway.
+    """
+
+    def __init__(self, logger: logging.Logger, transport: Optional[Transport] = None):
+        super().__init__(logger, transport)
+        self._poll_wakeup = asyncio.Event()     # Raised to query the status immediately
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._serial_fd: Optional[int] = None   # Serial port watched by the event loop
+        self._poller: Optional[asyncio.Task] = None
+        self._flush_scheduled = False
+
+        # Futures of the commands, in the same order than they are sent to GRBL
+        self._queued_futures: deque[asyncio.Future[str]] = deque()
+        self._priority_futures: deque[asyncio.Future[str]] = deque()
+        self._sent_futures: deque[asyncio.Future[str]] = deque()
+        self._status_waiters: list[asyncio.Future[Status]] = []
+        self._ack_waiters: list[asyncio.Future[None]] = []
+        self._space_waiters: list[asyncio.Future[None]] = []
+        self._parser_future: Optional[asyncio.Future[str]] = None   # Last $G, to reconcile
+
+    async def connect(
+            self,
+            port: str,
+            baudrate: int,
+            streaming: str = STREAMING_CHARACTER_COUNTING,
+            fast: bool = False
+    ) -> Optional[dict[str, str]]:
+        """Starts the GRBL device connected to the given port.
+
+        Opening the port blocks until GRBL sends its welcome message,
+        so that step runs in the loop's default executor.
+        """
+        self._loop = asyncio.get_running_loop()
+        responsePayload = await self._loop.run_in_executor(
+            None,
+            self._openConnection,
+            port,
+            baudrate,
+            streaming,
+            fast
+        )
+        if responsePayload is None:
+            return None
+
+        # Start serial communication
+        self.startIO()
+
+        # Query the size of the firmware buffers, to use the whole RX buffer,
+        # and the parser state, tracked from now on without querying it
+        self.queryBuildInfo()
+        self._reconcileParserState()
+        if not await self.waitUntilProcessed(BUILD_INFO_TIMEOUT):
+            self.grbl_monitor.warning(
+                'GRBL build info not received, '
+                f"using a RX buffer of {self.streaming.rx_buffer_size} bytes"
+            )
+        self.restartCommandsCount()
+        self._loadSettingsSnapshot(port)
+
+        return responsePayload
+
+    def setStatusMaskTuning(self, enabled: bool = True):
+        """Not available: restoring the status report mask on disconnection
+        requires waiting for GRBL, which would block the event loop.
+        """
+        if enabled:
+            raise Exception('Status report mask tuning is not supported by AsyncGrblController')
+
+    def syncSettings(self, settings: dict[str, str], timeout: Optional[float] = None):
+        """Not available: it waits for GRBL to accept the settings, which would block
+        the event loop. Use getChangedSettings and setSettings instead.
+        """
+        raise Exception('Settings sync is not supported by AsyncGrblController')
+
+    # INTERNAL STATE MANAGEMENT
+
+    def _reconcileParserState(self):
+        """Queries the parser state ($G) like GrblController, with a future of
+        the event loop, unless there is already a query pending.
+        """
+        query = self._parser_future
+        if query is not None and not query.done():
+            return
+        self._parser_future = self.sendCommand('$G', priority=True)
+
+    def parseResponse(self, response: str):
+        """Process the response from GRBL and update controller state,
+        resolving the futures waiting for it.
+        """
+        pending = self.streaming.pending_lines()
+        super().parseResponse(response)
+
+        # Commands acknowledged by this response ('ok', 'error' or an alarm)
+        for _ in range(pending - self.streaming.pending_lines()):
+            if not self._sent_futures:
+                break
+            self._resolve(self._sent_futures.popleft(), response)
+
+        if response.startswith('<') and self._status_waiters:
+            status = dict(self.grbl_status.get_status_report())
+            waiters, self._status_waiters = self._status_waiters, []
+            for waiter in waiters:
+                self._resolve(waiter, status)
+
+    def notifyAck(self):
+        """Registers an acknowledged command and wakes up any task waiting for it.
+        """
+        super().notifyAck()
+        waiters, self._ack_waiters = self._ack_waiters, []
+        for waiter in waiters:
+            self._resolve(waiter, None)
+
+    async def waitForAck(self, acks_count: int, timeout: Optional[float] = None) -> bool:
+        """Waits until GRBL acknowledges a command after the given count of acks,
+        or until the timeout (in seconds) expires.
+
+        Returns True if a new acknowledgement arrived.
+        """
+        if self.acks_count != acks_count:
+            return True
+
+        waiter = self._getLoop().create_future()
+        self._ack_waiters.append(waiter)
+        done, _ = await asyncio.wait([waiter], timeout=timeout)
+        if not done:
+            self._ack_waiters.remove(waiter)
+        return bool(done)
+
+    async def waitUntilProcessed(self, timeout: Optional[float] = None) -> bool:
+        """Waits until GRBL acknowledges every queued command,
+        or until the timeout (in seconds) expires.
+
+        Returns True if there are no commands left to be processed.
+        """
+        pending = [*self._sent_futures, *self._priority_futures, *self._queued_futures]
+        if pending:
+            _, not_done = await asyncio.wait(pending, timeout=timeout)
+            return not not_done
+        return True
+
+    # ACTIONS
+
+    def sendCommand(self, command: str, priority: bool = False) -> 'asyncio.Future[str]':
+        """Adds a GCODE line or a GRBL command to the serial queue,
+        or to the priority lane (see GrblController.sendCommand).
+
+        Returns a future resolved with the GRBL response to the command,
+        or with an empty string for lines which are not sent (comments, empty lines).
+
+        It never blocks: when the queue is full, the future fails with queue.Full.
+        Use waitForQueueSpace to wait until there is space for the command.
+        """
+        future = self._getLoop().create_future()
+
+        queued = self.getQueueDepth()
+        if not super().sendCommand(command, block=False, priority=priority):
+            future.set_exception(Full())
+            return future
+        if self.getQueueDepth() == queued:
+            future.set_result('')
+            return future
+
+        if priority:
+            self._priority_futures.append(future)
+        else:
+            self._queued_futures.append(future)
+        self._scheduleFlush()
+        return future
+
+    def queryStatusReport(self) -> 'asyncio.Future[Status]':
+        """Queries the GRBL device's current status.
+
+        Returns a future resolved with the next status report.
+        """
+        future = self._getLoop().create_future()
+        self._status_waiters.append(future)
+        super().queryStatusReport()
+        return future
+
+    # Message queue management
+
+    async def waitForQueueSpace(self, timeout: Optional[float] = None) -> bool:
+        """Waits until there is space in the command queue,
+        or until the timeout (in seconds) expires.
+
+        Returns True if a command can be queued.
+        """
+        loop = self._getLoop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while self.isQueueFull():
+            waiter = loop.create_future()
+            self._space_waiters.append(waiter)
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            done, _ = await asyncio.wait([waiter], timeout=remaining)
+            if not done:
+                self._space_waiters.remove(waiter)
+                return False
+        return True
+
+    def emptyQueue(self):
+        """Empty command queue, cancelling the futures of the discarded commands.
+        """
+        super().emptyQueue()
+        self._cancelFutures(self._queued_futures)
+        self._cancelFutures(self._priority_futures)
+        self._notifyQueueSpace()
+
+    # Event loop
+
+    def startIO(self):
+        """Starts watching the serial port, and polling the GRBL status, in the event loop.
+        """
+        loop = self._getLoop()
+
+        self._io_stop.clear()
+        self._poll_wakeup.clear()
+        self._rx_framer.clear()
+
+        self._serial_fd = self.serial.fileno()
+        loop.add_reader(self._serial_fd, self.serialReader)
+        self._poller = loop.create_task(self.statusPoller())
+        self._scheduleFlush()
+
+    def stopIO(self):
+        """Stops watching the serial port, and cancels any pending future.
+        """
+        self._io_stop.set()
+        self._poll_wakeup.set()
+
+        if self._serial_fd is not None:
+            self._getLoop().remove_reader(self._serial_fd)
+            self._serial_fd = None
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+        self._cancelFutures(self._queued_futures)
+        self._cancelFutures(self._priority_futures)
+        self._cancelFutures(self._sent_futures)
+        self._cancelFutures(self._status_waiters)
+
+    def notifyWriter(self):
+        """Schedules a new attempt to send the queued commands.
+        """
+        self._scheduleFlush()
+
+    def serialReader(self):
+        """Callback of the event loop, run when the serial port has data to read.
+        """
+        try:
+            data = self.serial.readAvailable()
+        except SerialException:
+            self.grbl_monitor.error(
+                f'Error reading response from GRBL: {str(sys.exc_info()[1])}'
+            )
+            self.emptyQueue()
+            self.disconnect()
+            return
+
+        self._processReceived(data)
+
+        # GRBL may have freed space in its RX buffer
+        self._flush()
+
+    async def statusPoller(self):
+        """Task querying the GRBL status periodically,
+        at a rate which depends on the machine's state.
+        """
+        while not self._io_stop.is_set():
+            self._poll_wakeup.clear()
+            super().queryStatusReport()
+            try:
+                await asyncio.wait_for(self._poll_wakeup.wait(), self.getPollInterval())
+            except asyncio.TimeoutError:
+                pass
+
+    def _scheduleFlush(self):
+        """Sends the queued commands in the next iteration of the event loop,
+        so consecutive calls are sent together.
+        """
+        if self._serial_fd is None or self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        self._getLoop().call_soon(self._flush)
+
+    def _flush(self):
+        """Sends every queued command which fits in the GRBL buffer.
+        """
+        self._flush_scheduled = False
+        if not self._io_stop.is_set():
+            self._sendAvailable()
+
+    def _fetchNextCommand(self) -> Optional[str]:
+        """Returns the next command to send if it fits in the GRBL buffer, None otherwise,
+        keeping the futures in the same order than the commands.
+        """
+        # GRBL discards its buffer on a soft reset
+        if self.grbl_status.get_flag(FLAG_STOP):
+            self._cancelFutures(self._sent_futures)
+
+        tosend = super()._fetchNextCommand()
+        if tosend is None:
+            return None
+
+        # The lane of the command just sent
+        lane = self._sent_lanes[-1][0]
+        futures = self._priority_futures if lane == LANE_PRIORITY else self._queued_futures
+        if futures:
+            self._sent_futures.append(futures.popleft())
+        self._notifyQueueSpace()
+        return tosend
+
+    # Futures management
+
+    def _notifyQueueSpace(self):
+        if not self._space_waiters:
+            return
+        waiters, self._space_waiters = self._space_waiters, []
+        for waiter in waiters:
+            self._resolve(waiter, None)
+
+    def _getLoop(self) -> asyncio.AbstractEventLoop:
+        return self._loop or asyncio.get_running_loop()
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result):
+        # The future may have been cancelled, for example by a timeout
+        if not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _cancelFutures(futures):
+        while futures:
+            future = futures.pop()
+            if not future.done():
+                future.cancel()
@@ -8,6 +8,7 @@ GRBL = 'Grbl'
 GRBL_ACTIVE_STATE_IDLE = 'Idle'
 GRBL_ACTIVE_STATE_RUN = 'Run'
 GRBL_ACTIVE_STATE_HOLD = 'Hold'
+GRBL_ACTIVE_STATE_JOG = 'Jog'
 GRBL_ACTIVE_STATE_DOOR = 'Door'
 GRBL_ACTIVE_STATE_HOME = 'Home'
 GRBL_ACTIVE_STATE_SLEEP = 'Sleep'
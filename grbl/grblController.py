@@ -1,69 +1,129 @@
+from collections import deque
+from concurrent.futures import CancelledError, Future, InvalidStateError, TimeoutError
+import itertools
 import logging
 from serial import SerialException
-from typing import Optional
+from typing import Any, Optional
+from .grblDiscovery import STARTUP_TIMEOUT, wait_for_startup
 from .grblLineParser import GrblLineParser
+from .grblModalState import GrblModalState
 from .grblMonitor import GrblMonitor
+from .grblStats import GrblStats
 from .grblStatus import GrblStatus, FLAG_CONNECTED, FLAG_STOP, FLAG_FINISHED, FLAG_PAUSED, \
     FLAG_ALARM
-from .grblUtils import build_jog_command, get_grbl_setting
+from .constants import GRBL_ACTIVE_STATE_ALARM, GRBL_ACTIVE_STATE_HOLD, GRBL_ACTIVE_STATE_IDLE, \
+    GRBL_ACTIVE_STATE_RUN, GRBL_ACTIVE_STATE_SLEEP
+from .grblUtils import COMMENT_LINE_PATTERN, COMMENT_PATTERN, JOG_DISTANCE_INCREMENTAL, \
+    build_jog_command, get_grbl_setting, get_status_mask, get_status_mask_savings, \
+    is_setting_update_command, split_gcode_words
 from .parsers.grblMsgTypes import GRBL_MSG_ALARM, GRBL_MSG_FEEDBACK, GRBL_MSG_HELP, \
     GRBL_MSG_OPTIONS, GRBL_MSG_PARSER_STATE, GRBL_MSG_PARAMS, GRBL_MSG_SETTING, \
     GRBL_MSG_STARTUP, GRBL_MSG_STATUS, GRBL_MSG_VERSION, GRBL_RESULT_ERROR, GRBL_RESULT_OK
-from queue import Empty, Queue
+from .streaming.adaptiveStrategy import AdaptiveStrategy
+from .streaming.characterCountingStrategy import CharacterCountingStrategy
+from .streaming.sendResponseStrategy import SendResponseStrategy
+from .streaming.streamingStrategy import StreamingStrategy, STREAMING_ADAPTIVE, \
+    STREAMING_CHARACTER_COUNTING, STREAMING_SEND_RESPONSE
+from queue import Empty, Full, Queue
 import sys
 import threading
 import time
-from .types import GrblControllerParameters, \
-    GrblSetting, GrblSettings, GrblBuildInfo
+from .types import CommandResult, GrblControllerParameters, GrblControllerStats, \
+    GrblSetting, GrblSettings, GrblBuildInfo, JogParameters, LaneLatency, ParserState, \
+    PendingCommand
 
 try:
     from ..config import GRBL_SIMULATION
     from ..utils.serial import SerialService
+    from ..utils.transport import LineFramer, Transport
 except ImportError:
     from config import GRBL_SIMULATION
     from utils.serial import SerialService
+    from utils.transport import LineFramer, Transport
 
 # Constants
 DISCONNECTED = 'DISCONNECTED'
-SERIAL_POLL = 0.125  # seconds
+STATUS_POLL_FAST = 0.125  # seconds
+STATUS_POLL_SLOW = 1.0  # seconds
+STATUS_POLL_BURST = 0.05  # seconds
+STATUS_BURST_DURATION = 2.0  # seconds
 SERIAL_TIMEOUT = 0.10  # seconds
-G_POLL = 10  # seconds
-RX_BUFFER_SIZE = 128
+WRITER_TIMEOUT = 1.0  # seconds
+BUILD_INFO_TIMEOUT = 1.0  # seconds
+COMMAND_TIMEOUT = 5.0   # seconds, to wait for the response of a query ($$, $#, $G, $I)
+STATUS_MASK_TIMEOUT = 1.0   # seconds, to restore the status report mask on disconnection
+RX_BUFFER_SIZE = 128    # Default, for firmware versions which don't report it
+COMMAND_QUEUE_SIZE = 1000   # Commands waiting to be sent, 0 for no limit
+LANE_PRIORITY = 'priority'  # Interactive and system commands: jogs, queries, $X...
+LANE_BULK = 'bulk'          # Lines of G-code programs
+LATENCY_SAMPLES = 1000      # Latencies kept per lane, to calculate their statistics
+JOG_MAX_IN_FLIGHT = 2       # Jogs queued or not yet planned by GRBL, during a jog session
+JOG_PRECISION = 4           # Decimals of the merged jog distances
 GRBL_HELP_MESSAGE = '$$ $# $G $I $N $x=val $Nx=line $J=line $C $X $H ~ ! ? ctrl-x'
+STREAMING_STRATEGIES: dict[str, type[StreamingStrategy]] = {
+    STREAMING_CHARACTER_COUNTING: CharacterCountingStrategy,
+    STREAMING_SEND_RESPONSE: SendResponseStrategy,
+    STREAMING_ADAPTIVE: AdaptiveStrategy
+}
+
+# Settings of each device (port) and firmware version, kept across connections
+_settings_snapshots: dict[tuple[str, str], GrblSettings] = {}
 
 
 class GrblController:
-    parameters: GrblControllerParameters = {
-        'G54': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G55': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G56': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G57': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G58': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G59': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G28': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G30': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'G92': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-        'TLO': 0.000,
-        'PRB': {'x': 0.0, 'y': 0.0, 'z': 0.0, 'result': True}
-    }
-
-    build_info: GrblBuildInfo = {
-        'version': '',
-        'comment': '',
-        'optionCode': '',
-        'blockBufferSize': 15,
-        'rxBufferSize': RX_BUFFER_SIZE
-    }
-
-    settings: GrblSettings = {}
-
-    help_text = GRBL_HELP_MESSAGE
-
-    def __init__(self, logger: logging.Logger):
+    def __init__(
+            self,
+            logger: logging.Logger,
+            transport: Optional[Transport] = None,
+            queue_size: int = COMMAND_QUEUE_SIZE
+    ):
+        """The transport defaults to a serial port (pyserial),
+        see utils.transport.get_transport for the alternatives.
+
+        The queue size limits the commands waiting to be sent (0 for no limit),
+        see sendCommand for the behaviour when it is full.
+
+        Interactive commands (jogs, queries, $X...) have their own queue, the
+        priority lane, whose commands are sent before the queued program lines.
+        """
+        # Device state, owned by each controller
+        self.parameters: GrblControllerParameters = {
+            'G54': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G55': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G56': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G57': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G58': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G59': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G28': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G30': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'G92': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+            'TLO': 0.000,
+            'PRB': {'x': 0.0, 'y': 0.0, 'z': 0.0, 'result': True}
+        }
+        self.build_info: GrblBuildInfo = {
+            'version': '',
+            'comment': '',
+            'optionCode': '',
+            'blockBufferSize': 15,
+            'rxBufferSize': RX_BUFFER_SIZE
+        }
+        self.settings: GrblSettings = {}
+        self.help_text = GRBL_HELP_MESSAGE
+
         # Configure serial interface
-        self.serial = SerialService()
+        self.serial: Transport = transport or SerialService()
         self.queue: Queue[str] = Queue()        # Command queue to be sent to GRBL
-        self.serial_thread: Optional[threading.Thread] = None
+        self.queue_size = queue_size            # Capacity of the queue, enforced by sendCommand
+        self.priority_queue: Queue[str] = Queue()   # Priority lane, sent before the queue
+        self.io_threads: list[threading.Thread] = []
+        self._io_stop = threading.Event()       # Raised to stop the I/O threads
+        self._poll_wakeup = threading.Event()   # Raised to query the status immediately
+
+        # Status polling rates (seconds)
+        self.poll_fast = STATUS_POLL_FAST       # Machine in motion, or commands in flight
+        self.poll_slow = STATUS_POLL_SLOW       # Machine idle, asleep or in alarm
+        self.poll_burst = STATUS_POLL_BURST     # On demand, for a short period of time
+        self._burst_until = 0.0
 
         # Configure logger
         self.grbl_monitor = GrblMonitor(logger)
@@ -71,15 +131,127 @@ class GrblController:
         # Configure status manager
         self.grbl_status = GrblStatus()
 
+        # Configure performance counters
+        self.grbl_stats = GrblStats()
+
+        # Flow control of the commands sent to GRBL
+        self.streaming: StreamingStrategy = CharacterCountingStrategy(RX_BUFFER_SIZE)
+
         # State variables
-        self._sumcline = 0          # Amount of bytes in GRBL buffer
+        self._next_command: Optional[str] = None    # Command waiting for space in GRBL buffer
+        self._next_priority: Optional[str] = None   # Same, for the priority lane
+        self._rx_framer = LineFramer()  # Received data, split in lines
+        self._queued_bytes = 0      # Amount of bytes waiting in the command queue
         self.commands_count = 0     # Amount of already processed commands
-
-    def connect(self, port: str, baudrate: int) -> dict[str, str]:
+        self.acks_count = 0         # Amount of 'ok' and 'error' responses received
+
+        # Parser state tracked from the lines GRBL accepts, see _trackParserState
+        self.modal_state = GrblModalState()
+        self._parser_query: Optional[Future[CommandResult]] = None  # Last $G, to reconcile
+
+        # Jog session, see startJogSession
+        self._jog_session = False
+        self._jog_max_in_flight = JOG_MAX_IN_FLIGHT
+        self._pending_jogs: deque[JogParameters] = deque()  # Held until others are planned
+        self._jog_cancel_pending = False    # Cancel again once the jogs in flight are planned
+
+        # Commands waiting for their response, see submitCommand
+        self._command_ids = itertools.count(1)
+        self._queued_commands: dict[str, deque[PendingCommand]] = {
+            LANE_PRIORITY: deque(),
+            LANE_BULK: deque()
+        }
+        self._sent_commands: deque[Optional[PendingCommand]] = deque()
+
+        # Latency of each lane, since a command is queued until GRBL acknowledges it
+        self._queued_at: dict[str, deque[float]] = {LANE_PRIORITY: deque(), LANE_BULK: deque()}
+        # Lane, queue time and send time of the commands sent
+        self._sent_lanes: deque[tuple[str, float, float]] = deque()
+        self._latencies: dict[str, deque[float]] = {
+            LANE_PRIORITY: deque(maxlen=LATENCY_SAMPLES),
+            LANE_BULK: deque(maxlen=LATENCY_SAMPLES)
+        }
+
+        # Status report mask ($10) tuning, see setStatusMaskTuning
+        self._status_mask_tuning = False
+        self._status_fields: dict[str, list[str]] = {}  # Fields required by each subscriber
+        self._status_mask: Optional[int] = None         # Current value in the device, if known
+        self._original_status_mask: Optional[int] = None    # Restored on disconnection
+        self._status_mask_queried = False
+        self._status_mask_pending = False   # Waiting for the machine to be idle
+
+        # Notifies when a command is queued, GRBL acknowledges a command,
+        # or any other event the writer thread may be waiting for
+        self._io_condition = threading.Condition()
+
+    def connect(
+            self,
+            port: str,
+            baudrate: int,
+            streaming: str = STREAMING_CHARACTER_COUNTING,
+            fast: bool = False
+    ) -> dict[str, str]:
         """Starts the GRBL device connected to the given port.
+
+        The size of the GRBL RX buffer is queried to the firmware ($I),
+        with a fallback to 128 bytes for versions which don't report it.
+
+        The streaming protocol can be any of:
+            - STREAMING_CHARACTER_COUNTING: Fill the GRBL RX buffer (default).
+            - STREAMING_SEND_RESPONSE: Wait for a response before sending the next command.
+            - STREAMING_ADAPTIVE: Switch between both, depending on the rate of errors.
+
+        With fast, the connection is ready as soon as the startup message arrives,
+        ignoring any other line before it, and a soft reset is sent to the devices
+        which don't reset when the port is opened (see grblDiscovery.wait_for_startup).
         """
+        responsePayload = self._openConnection(port, baudrate, streaming, fast)
+        if responsePayload is None:
+            return
+
+        # Start serial communication
+        self.startIO()
+
+        # Query the size of the firmware buffers, to use the whole RX buffer,
+        # and the parser state, tracked from now on without querying it
+        self.queryBuildInfo()
+        self._reconcileParserState()
+        if not self.waitUntilProcessed(BUILD_INFO_TIMEOUT):
+            self.grbl_monitor.warning(
+                'GRBL build info not received, '
+                f"using a RX buffer of {self.streaming.rx_buffer_size} bytes"
+            )
+        self.restartCommandsCount()
+        self._loadSettingsSnapshot(port)
+        self._tuneStatusMask()
+
+        return responsePayload
+
+    def _openConnection(
+            self,
+            port: str,
+            baudrate: int,
+            streaming: str,
+            fast: bool = False
+    ) -> Optional[dict[str, str]]:
+        """Opens the serial port and waits for the GRBL welcome message.
+        Returns the parsed welcome message, or None if the connection failed.
+        """
+        if streaming not in STREAMING_STRATEGIES:
+            raise Exception(f'Invalid streaming protocol: {streaming}')
+        self.streaming = STREAMING_STRATEGIES[streaming](RX_BUFFER_SIZE)
+        self._sent_lanes.clear()
+        self._cancelCommands(self._sent_commands)
+        self._resetStatusMask()
+        self.modal_state.reset()
+        self._parser_query = None
+
         try:
-            response = self.serial.startConnection(port, baudrate, SERIAL_TIMEOUT)
+            if fast:
+                self.serial.openConnection(port, baudrate, SERIAL_TIMEOUT)
+                response, _ = wait_for_startup(self.serial, STARTUP_TIMEOUT)
+            else:
+                response = self.serial.startConnection(port, baudrate, SERIAL_TIMEOUT)
         except SerialException:
             self.grbl_monitor.critical(
                 f'Failed opening serial port {port} with a baudrate of {baudrate}',
@@ -130,10 +302,6 @@ class GrblController:
         self.grbl_status.set_flag(FLAG_FINISHED, False)
         self.commands_count = 0
 
-        # Start serial communication
-        self.serial_thread = threading.Thread(target=self.serialIO)
-        self.serial_thread.start()
-
         return responsePayload
 
     def disconnect(self):
@@ -142,49 +310,76 @@ class GrblController:
         if not self.grbl_status.connected():
             return
 
+        # Leave the device as it was found
+        self._restoreStatusMask()
+
         # Stops communication with serial port
-        self.serial_thread = None
+        self.stopIO()
         self.serial.stopConnection()
         self.grbl_monitor.info('**Disconnected from device**')
 
+        # The commands already sent will never be answered
+        with self._io_condition:
+            self._cancelCommands(self._sent_commands)
+
         # State variables
         self.grbl_status.set_flag(FLAG_CONNECTED, False)
         self.grbl_status.set_active_state(DISCONNECTED)
 
-    def parseResponse(self, response: str, cline: list[int], sline: list[str]):
+    def parseResponse(self, response: str):
         """Process the response from GRBL and update controller state.
         """
-        def removeProcessedCommand() -> str:
-            if cline:
-                del cline[0]
-            if sline:
-                return sline.pop(0)
-            return ''
-
         msgType, payload = GrblLineParser.parse(response)
         self.grbl_monitor.received(response, msgType, payload)
+        self.grbl_stats.register_received(response, msgType)
 
         # Process parsed response
         if msgType == GRBL_RESULT_OK:
-            removeProcessedCommand()
-            self._sumcline = sum(cline)
-            self.commands_count += 1
+            with self._io_condition:
+                self.streaming.acknowledged()
+                # Only the program lines are counted, not the interactive commands
+                if self._registerLatency() != LANE_PRIORITY:
+                    self.commands_count += 1
+                command = self._sent_commands.popleft() if self._sent_commands else None
+                self.notifyAck()
+                jog_cancel = self._processJogs()
+            self._resolveCommand(command, response)
+            if command is not None:
+                if command['command'].startswith('$'):
+                    self._updateSettings(command['command'])
+                else:
+                    self._trackParserState(command['command'])
+            if jog_cancel:
+                self.grbl_jog_cancel()
             return
 
         if msgType == GRBL_RESULT_ERROR:
             self.setPaused(True)
-            error_line = removeProcessedCommand()
+            with self._io_condition:
+                error_line = self.streaming.acknowledged(error=True)
+                self._registerLatency()
+                command = self._sent_commands.popleft() if self._sent_commands else None
+                self.notifyAck()
+                jog_cancel = self._processJogs()
+            self._resolveCommand(command, response)
+            if jog_cancel:
+                self.grbl_jog_cancel()
             del payload['raw']
             self.grbl_status.set_error(error_line, payload)
             self.grbl_monitor.error(
                 f"Error: {payload['message']}. Description: {payload['description']}"
             )
+            self._reconcileParserState()
             return
 
         if msgType == GRBL_MSG_ALARM:
             self.grbl_status.set_flag(FLAG_ALARM, True)
             self.grbl_status.set_flag(FLAG_PAUSED, True)
-            error_line = removeProcessedCommand()
+            with self._io_condition:
+                error_line = self.streaming.acknowledged()
+                self._registerLatency()
+                command = self._sent_commands.popleft() if self._sent_commands else None
+            self._resolveCommand(command, response)
             del payload['raw']
             self.grbl_status.set_error(error_line, payload)
             self.grbl_monitor.critical(
@@ -192,12 +387,20 @@ class GrblController:
             )
             return
 
+        # Lines sent by GRBL in response to a command, before its 'ok'
+        if msgType not in [GRBL_MSG_STATUS, GRBL_MSG_STARTUP]:
+            with self._io_condition:
+                command = self._sent_commands[0] if self._sent_commands else None
+                if command is not None:
+                    command['lines'].append(response)
+
         if (msgType == GRBL_MSG_PARAMS):
             name = payload['name']
             self.parameters[name] = payload['value']
-            self.grbl_monitor.debug(
-                f'Device parameters were successfully updated to {self.parameters}'
-            )
+            if self.grbl_monitor.isEnabledFor(logging.DEBUG):
+                self.grbl_monitor.debug(
+                    f'Device parameters were successfully updated to {self.parameters}'
+                )
             return
 
         if (msgType == GRBL_MSG_VERSION):
@@ -209,6 +412,9 @@ class GrblController:
             self.build_info['optionCode'] = payload['optionCode']
             self.build_info['blockBufferSize'] = int(payload['blockBufferSize'])
             self.build_info['rxBufferSize'] = int(payload['rxBufferSize'])
+            with self._io_condition:
+                self.streaming.set_buffer_size(self.build_info['rxBufferSize'])
+                self._io_condition.notify_all()
             return
 
         if (msgType == GRBL_MSG_HELP):
@@ -218,30 +424,47 @@ class GrblController:
         if (msgType == GRBL_MSG_PARSER_STATE):
             del payload['raw']
             self.grbl_status.update_parser_state(payload)
-            self.grbl_monitor.debug(
-                f"Parser state was successfully updated to {self.grbl_status.get_parser_state()}"
+            # The tracking of the parser state continues from the reported one
+            parser_state = self.grbl_status.get_parser_state()
+            self.modal_state = GrblModalState(
+                {**parser_state['modal']},
+                parser_state['feedrate'],
+                parser_state['spindle'],
+                parser_state['tool']
             )
+            if self.grbl_monitor.isEnabledFor(logging.DEBUG):
+                self.grbl_monitor.debug(
+                    'Parser state was successfully updated to '
+                    f'{self.grbl_status.get_parser_state()}'
+                )
+            return
+
+        # GRBL was reset, and its parser state with it
+        if (msgType == GRBL_MSG_STARTUP):
+            self.modal_state.reset()
+            self._reconcileParserState()
             return
 
         if (msgType == GRBL_MSG_STATUS):
             del payload['raw']
             self.grbl_status.update_status(payload)
-            self.grbl_monitor.debug(
-                f"Device status was successfully updated to {self.grbl_status.get_status_report()}"
-            )
+            if self._status_mask_pending:
+                self._tuneStatusMask()
+            if self.grbl_monitor.isEnabledFor(logging.DEBUG):
+                self.grbl_monitor.debug(
+                    'Device status was successfully updated to '
+                    f'{self.grbl_status.get_status_report()}'
+                )
             return
 
         if (msgType == GRBL_MSG_SETTING):
             key = payload['name']
-            setting = get_grbl_setting(key)
-            if setting:
-                value: GrblSetting = {
-                    'value': payload['value'],
-                    'message': setting['message'],
-                    'units': setting['units'],
-                    'description': setting['description'],
-                }
-                self.settings[key] = value
+            self._cacheSetting(key, payload['value'])
+
+            # The status report mask before any tuning
+            if key == '$10' and self._status_mask_tuning and self._status_mask is None:
+                self._status_mask = self._original_status_mask = int(float(payload['value']))
+                self._tuneStatusMask()
 
         # Response to alarm disable
         if (msgType == GRBL_MSG_FEEDBACK) and ('Caution: Unlocked' in payload['message']):
@@ -260,7 +483,8 @@ class GrblController:
                 )
                 return
 
-        self.grbl_monitor.debug(f'Unprocessed message from GRBL: {response}')
+        if self.grbl_monitor.isEnabledFor(logging.DEBUG):
+            self.grbl_monitor.debug(f'Unprocessed message from GRBL: {response}')
 
     # INTERNAL STATE MANAGEMENT
 
@@ -274,6 +498,42 @@ class GrblController:
         """
         return self.commands_count
 
+    def getAcksCount(self) -> int:
+        """Get the count of 'ok' and 'error' responses received from GRBL.
+        """
+        return self.acks_count
+
+    def notifyAck(self):
+        """Registers an acknowledged command and wakes up any thread waiting for it.
+        """
+        with self._io_condition:
+            self.acks_count += 1
+            self._io_condition.notify_all()
+
+    def waitForAck(self, acks_count: int, timeout: Optional[float] = None) -> bool:
+        """Blocks until GRBL acknowledges a command after the given count of acks,
+        or until the timeout (in seconds) expires.
+
+        Returns True if a new acknowledgement arrived.
+        """
+        with self._io_condition:
+            return self._io_condition.wait_for(
+                lambda: self.acks_count != acks_count,
+                timeout
+            )
+
+    def waitUntilProcessed(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until GRBL acknowledges every queued command,
+        or until the timeout (in seconds) expires.
+
+        Returns True if there are no commands left to be processed.
+        """
+        with self._io_condition:
+            return self._io_condition.wait_for(
+                lambda: self.getLinesInFlight() == 0,
+                timeout
+            )
+
     # ACTIONS
 
     def setPaused(self, paused: bool):
@@ -284,24 +544,96 @@ class GrblController:
             return
 
         self.grbl_resume()
+        self.notifyWriter()
 
-    def sendCommand(self, command: str):
+    def sendCommand(
+            self,
+            command: str,
+            block: bool = True,
+            timeout: Optional[float] = None,
+            priority: bool = False
+    ) -> bool:
         """Adds a GCODE line or a GRBL command to the serial queue.
-        """
-        tosend = command.strip()
 
-        if not tosend:
-            self.commands_count += 1
-            return
+        When the queue is full, waits until there is space for the command
+        (up to the timeout, in seconds, if given), unless block is False.
 
-        import re
+        With priority, the command goes to the priority lane instead: it is sent
+        before any queued command, as soon as it fits in the GRBL RX buffer,
+        and it never waits for space. Meant for interactive commands only.
 
-        comment_pattern = re.compile(r'(^\(.*\)$)|(^;.*)')
-        if comment_pattern.match(tosend):
-            self.commands_count += 1
-            return
+        Returns False if the command couldn't be queued.
+        See submitCommand to wait for the response of the command.
+        """
+        future = self.submitCommand(command, block, timeout, priority)
+        return not future.done() or future.exception() is None
+
+    def submitCommand(
+            self,
+            command: str,
+            block: bool = True,
+            timeout: Optional[float] = None,
+            priority: bool = False
+    ) -> 'Future[CommandResult]':
+        """Queues a command like sendCommand, and returns a future resolved when GRBL
+        answers it ('ok', 'error:N' or an alarm), with the lines it sent in response
+        ($$ settings, $# parameters, [GC:...], [MSG:...]...):
+
+            result = controller.submitCommand('$G', priority=True).result(timeout=5)
+            result['lines']     # ['[GC:G0 G54 G17 G21 G90 G94 M5 M9 T0 F0 S0]']
+
+        Each command gets an id. The future is resolved right away, with an empty
+        response, for lines which are not sent (comments, empty lines).
+        It fails with queue.Full if the command couldn't be queued, and it is
+        cancelled if the command is discarded (stop, disconnection).
+        """
+        future: Future[CommandResult] = Future()
+        command_id = next(self._command_ids)
+        tosend = command.strip()
 
-        self.queue.put(tosend)
+        if not tosend or COMMENT_LINE_PATTERN.match(tosend):
+            self.commands_count += 1
+            future.set_result({'id': command_id, 'command': tosend, 'response': '', 'lines': []})
+            return future
+
+        with self._io_condition:
+            if not priority and self.isQueueFull():
+                if not block or not self._io_condition.wait_for(
+                    lambda: not self.isQueueFull(),
+                    timeout
+                ):
+                    future.set_exception(Full())
+                    return future
+
+            # Query the status as soon as the machine leaves the idle state
+            if self.getLinesInFlight() == 0:
+                self._poll_wakeup.set()
+
+            self._queued_bytes += len(tosend) + 1
+            lane = LANE_PRIORITY if priority else LANE_BULK
+            self._queued_at[lane].append(time.perf_counter())
+            self._queued_commands[lane].append(
+                {'id': command_id, 'command': tosend, 'future': future, 'lines': []}
+            )
+            if priority:
+                self.priority_queue.put(tosend)
+            else:
+                self.queue.put(tosend)
+            self._io_condition.notify_all()
+        return future
+
+    def executeCommand(
+            self,
+            command: str,
+            timeout: Optional[float] = COMMAND_TIMEOUT,
+            priority: bool = True
+    ) -> CommandResult:
+        """Sends a command and waits for its response, up to the timeout (in seconds).
+        By default through the priority lane, meant for interactive commands and queries.
+
+        Raises concurrent.futures.TimeoutError if GRBL doesn't answer in time.
+        """
+        return self.submitCommand(command, priority=priority).result(timeout)
 
     def handleHomingCycle(self):
         """Runs the GRBL device's homing cycle.
@@ -314,7 +646,7 @@ class GrblController:
     def disableAlarm(self):
         """Disables an alarm.
         """
-        self.sendCommand('$X')
+        return self.sendCommand('$X', priority=True)
 
     def toggleCheckMode(self):
         """Enables/Disables the "check G-code" mode.
@@ -323,7 +655,7 @@ class GrblController:
         where it will parse it, error-check it, and report ok's and errors
         without powering on anything or moving.
         """
-        self.sendCommand('$C')
+        return self.sendCommand('$C', priority=True)
 
     def jog(
             self,
@@ -339,7 +671,21 @@ class GrblController:
 
         JOG mode is also called jogging mode.
         In this mode, the CNC machine is used to operate manually.
+
+        During a jog session the jog may be held, and merged with the following ones,
+        see startJogSession.
         """
+        if self._jog_session:
+            return self._holdJog({
+                'x': x,
+                'y': y,
+                'z': z,
+                'feedrate': feedrate,
+                'units': units,
+                'distance_mode': distance_mode,
+                'machine_coordinates': machine_coordinates
+            })
+
         jog_command = build_jog_command(
             x, y, z,
             feedrate,
@@ -347,13 +693,122 @@ class GrblController:
             distance_mode=distance_mode,
             machine_coordinates=machine_coordinates
         )
-        self.sendCommand(jog_command)
+        return self.sendCommand(jog_command, priority=True)
+
+    def startJogSession(self, max_in_flight: int = JOG_MAX_IN_FLIGHT):
+        """Starts a jog session, for example while the user holds a jog button.
+
+        During the session, a jog is held while max_in_flight jogs are either queued
+        or waiting in the GRBL RX buffer, and the consecutive incremental jogs held
+        are merged into a single command. That way the motion requested to GRBL
+        stays short, no matter how many jogs the user interface sends.
+        """
+        with self._io_condition:
+            self._jog_session = True
+            self._jog_max_in_flight = max_in_flight
+
+    def stopJogSession(self):
+        """Ends the jog session (the user released the jog button) and stops the motion:
+        the held jogs are discarded, and the running ones are cancelled.
+        """
+        with self._io_condition:
+            self._jog_session = False
+            self._pending_jogs.clear()
+            # The jogs GRBL didn't plan yet would move after the cancel,
+            # so it is sent again once they are planned
+            self._jog_cancel_pending = self.getJogsInFlight() > 0
+        self.grbl_jog_cancel()
+
+    def isJogSession(self) -> bool:
+        return self._jog_session
 
     def setSettings(self, settings: dict[str, str]):
         """Updates the value of the given GRBL settings.
         """
         for key, value in settings.items():
-            self.sendCommand(f'{key}={value}')
+            self.sendCommand(f'{key}={value}', priority=True)
+
+    def syncSettings(
+            self,
+            settings: dict[str, str],
+            timeout: Optional[float] = COMMAND_TIMEOUT
+    ) -> dict[str, str]:
+        """Updates the value of the given GRBL settings, sending only the ones
+        which changed, and waits for GRBL to accept them. Returns the settings sent.
+
+        Each setting is written to the EEPROM, which stalls the stream of GRBL,
+        so the update is refused while a program is being streamed.
+        The current values are the ones known from the last $$ query, kept across
+        connections (see getGrblSettings), and only queried if there is none.
+        """
+        self._validateSettings(settings)
+        if self.isStreaming():
+            raise Exception('GRBL settings can not be updated while a program is being streamed')
+
+        if not self.settings:
+            self.fetchGrblSettings(timeout)
+
+        changed = self.getChangedSettings(settings)
+        futures = {
+            key: self.submitCommand(f'{key}={value}', priority=True)
+            for key, value in changed.items()
+        }
+        for key, future in futures.items():
+            result = future.result(timeout)
+            if result['response'] != 'ok':
+                raise Exception(
+                    f"GRBL failed updating the setting {key}={changed[key]}: {result['response']}"
+                )
+
+        self.grbl_monitor.info(
+            f'GRBL settings updated: {changed}, {len(settings) - len(changed)} unchanged'
+        )
+        return changed
+
+    def getChangedSettings(self, settings: dict[str, str]) -> dict[str, str]:
+        """Returns the given settings whose value differs from the known one,
+        including the ones whose value is not known.
+        """
+        self._validateSettings(settings)
+        return {
+            key: value for key, value in settings.items()
+            if key not in self.settings or float(self.settings[key]['value']) != float(value)
+        }
+
+    @staticmethod
+    def _validateSettings(settings: dict[str, str]):
+        for key, value in settings.items():
+            if not is_setting_update_command(f'{key}={value}') or not get_grbl_setting(key):
+                raise Exception(f'Invalid GRBL setting: {key}={value}')
+
+    def _cacheSetting(self, key: str, value: str):
+        setting = get_grbl_setting(key)
+        if setting:
+            cached: GrblSetting = {
+                'value': value,
+                'message': setting['message'],
+                'units': setting['units'],
+                'description': setting['description'],
+            }
+            self.settings[key] = cached
+
+    def _updateSettings(self, command: str):
+        """Keeps the known settings up to date with the commands GRBL accepted.
+        """
+        if command in ['$RST=$', '$RST=*']:
+            # Settings restored to their defaults, unknown until queried again
+            self.settings.clear()
+            return
+        if is_setting_update_command(command):
+            key, value = command.split('=')
+            self._cacheSetting(key, value)
+
+    def _loadSettingsSnapshot(self, port: str):
+        """Uses the settings known from previous connections to the same device and
+        firmware version, so there is no need to query them again ($$).
+        """
+        key = (port, self.build_info['version'])
+        self.settings = _settings_snapshots.setdefault(key, {})
 
     # REAL TIME COMMANDS
 
@@ -368,6 +823,7 @@ class GrblController:
                 f'Error sending PAUSE command to GRBL: {str(sys.exc_info()[1])}'
             )
             return
+        self.grbl_stats.register_realtime()
         self.grbl_monitor.sent('!')
         self.grbl_monitor.info('Requested PAUSE')
 
@@ -382,6 +838,7 @@ class GrblController:
                 f'Error sending RESUME command to GRBL: {str(sys.exc_info()[1])}'
             )
             return
+        self.grbl_stats.register_realtime()
         self.grbl_monitor.sent('~')
         self.grbl_monitor.info('Requested RESUME')
 
@@ -398,11 +855,28 @@ class GrblController:
                 f'Error sending STOP command to GRBL: {str(sys.exc_info()[1])}'
             )
             return
+        self.grbl_stats.register_realtime()
         self.grbl_monitor.sent('0x18')
         self.grbl_monitor.info('Requested STOP')
 
-        # Tell the serialIO thread to stop streaming
+        # Tell the writer thread to stop streaming
         self.grbl_status.set_flag(FLAG_STOP, True)
+        self.notifyWriter()
+
+    def grbl_jog_cancel(self):
+        """Jog Cancel: Stops the current jog motion, discarding the jogs
+        already planned. Ignored by GRBL when it isn't jogging.
+        """
+        try:
+            self.serial.sendBytes(b'\x85')
+        except SerialException:
+            self.grbl_monitor.error(
+                f'Error sending JOG CANCEL command to GRBL: {str(sys.exc_info()[1])}'
+            )
+            return
+        self.grbl_stats.register_realtime()
+        self.grbl_monitor.sent('0x85')
+        self.grbl_monitor.info('Requested JOG CANCEL')
 
     def queryStatusReport(self):
         """Queries the GRBL device's current status.
@@ -414,6 +888,8 @@ class GrblController:
                 f'Error sending STATUS command to GRBL: {str(sys.exc_info()[1])}'
             )
             return
+        self.grbl_stats.register_realtime()
+        self.grbl_stats.register_occupancy(self.getBufferFill())
         self.grbl_monitor.sent('?', debug=True)
 
     # QUERIES
@@ -421,28 +897,93 @@ class GrblController:
     def queryGcodeParserState(self):
         """Queries the GRBL device's current parser state.
         """
-        self.sendCommand('$G')
+        return self.sendCommand('$G', priority=True)
 
     def queryGrblHelp(self):
         """Queries the GRBL 'help' message.
         This message contains all valid GRBL commands.
         """
-        self.sendCommand('$')
+        return self.sendCommand('$', priority=True)
 
     def queryGrblParameters(self):
         """Queries the GRBL device's current parameter data.
         """
-        self.sendCommand('$#')
+        return self.sendCommand('$#', priority=True)
 
     def queryGrblSettings(self):
         """Queries the list of GRBL settings with their current values.
         """
-        self.sendCommand('$$')
+        return self.sendCommand('$$', priority=True)
 
     def queryBuildInfo(self):
         """Queries some GRBL device's (firmware) build information.
         """
-        self.sendCommand('$I')
+        return self.sendCommand('$I', priority=True)
+
+    def fetchGcodeParserState(self, timeout: Optional[float] = COMMAND_TIMEOUT) -> ParserState:
+        """Queries the GRBL device's current parser state, and waits for it.
+        """
+        self._executeQuery('$G', timeout)
+        return self.grbl_status.get_parser_state()
+
+    def fetchGrblParameters(
+            self,
+            timeout: Optional[float] = COMMAND_TIMEOUT
+    ) -> GrblControllerParameters:
+        """Queries the GRBL device's current parameter data, and waits for it.
+        """
+        self._executeQuery('$#', timeout)
+        return self.getParameters()
+
+    def fetchGrblSettings(self, timeout: Optional[float] = COMMAND_TIMEOUT) -> GrblSettings:
+        """Queries the list of GRBL settings with their current values, and waits for it.
+        """
+        self._executeQuery('$$', timeout)
+        return self.getGrblSettings()
+
+    def fetchBuildInfo(self, timeout: Optional[float] = COMMAND_TIMEOUT) -> GrblBuildInfo:
+        """Queries the firmware's build information, and waits for it.
+        """
+        self._executeQuery('$I', timeout)
+        return self.getBuildInfo()
+
+    def _trackParserState(self, line: str):
+        """Updates the parser state with a line accepted by GRBL, the same state
+        a $G query would report, without querying it.
+        """
+        if '(' in line or ';' in line:
+            line = COMMENT_PATTERN.sub('', line)
+        words = split_gcode_words(line)
+        if words is None:
+            # Not a sequence of G-code words, its effect on the parser is unknown
+            self._reconcileParserState()
+            return
+
+        self.modal_state.update_words(words)
+        known = {group: mode for group, mode in self.modal_state.modal.items() if mode}
+        parser_state: dict[str, Any] = {'modal': {**self.grbl_status.get_modal(), **known}}
+        if self.modal_state.feedrate is not None:
+            parser_state['feedrate'] = self.modal_state.feedrate
+        if self.modal_state.spindle is not None:
+            parser_state['spindle'] = self.modal_state.spindle
+        if self.modal_state.tool is not None:
+            parser_state['tool'] = self.modal_state.tool
+        self.grbl_status.update_parser_state(parser_state)
+
+    def _reconcileParserState(self):
+        """Queries the parser state ($G), unless there is already a query pending,
+        to correct the tracked state: at connection, and after errors and resets.
+        """
+        query = self._parser_query
+        if query is not None and not query.done():
+            return
+        self._parser_query = self.submitCommand('$G', priority=True)
+
+    def _executeQuery(self, command: str, timeout: Optional[float]) -> CommandResult:
+        result = self.executeCommand(command, timeout)
+        if result['response'] != 'ok':
+            raise Exception(f"GRBL failed answering the query {command}: {result['response']}")
+        return result
 
     # GETTERS
 
@@ -464,111 +1005,564 @@ class GrblController:
     def getBufferFill(self) -> float:
         """Returns how filled the GRBL command buffer is as a percentage,
         useful to monitor buffer usage.
+
+        The size of the buffer is the one reported by the firmware, if any.
+        """
+        return self.streaming.used_bytes() * 100.0 / self.streaming.rx_buffer_size
+
+    def getPendingBytes(self) -> int:
+        """Returns the amount of bytes either waiting in the command queue
+        or occupying the GRBL RX buffer.
+        """
+        return self._queued_bytes + self.streaming.used_bytes()
+
+    def getBufferAvailable(self) -> int:
+        """Returns the amount of bytes that can still be queued
+        without overflowing the GRBL RX buffer.
+        """
+        return max(self.streaming.capacity() - self.getPendingBytes(), 0)
+
+    def isStreaming(self) -> bool:
+        """Checks if a program is being streamed: there are program lines waiting
+        to be sent or acknowledged, or the machine is running (or holding) them.
+        """
+        with self._io_condition:
+            if self._queued_commands[LANE_BULK]:
+                return True
+            if any(lane == LANE_BULK for lane, _, _ in self._sent_lanes):
+                return True
+        active_state = self.grbl_status.get_status_report()['activeState']
+        return active_state in [GRBL_ACTIVE_STATE_RUN, GRBL_ACTIVE_STATE_HOLD]
+
+    def getLinesInFlight(self) -> int:
+        """Returns the amount of lines either waiting in the command queue
+        or already sent to GRBL and not yet acknowledged.
+        """
+        return self.getQueueDepth() + self.streaming.pending_lines()
+
+    def getLatencyStats(self) -> dict[str, LaneLatency]:
+        """Returns the latency of each lane (LANE_PRIORITY and LANE_BULK), in milliseconds,
+        since a command is queued until GRBL acknowledges it.
+
+        Calculated from the last LATENCY_SAMPLES commands of each lane.
+        """
+        with self._io_condition:
+            return {
+                lane: self._calculateLatency(list(latencies))
+                for lane, latencies in self._latencies.items()
+            }
+
+    @staticmethod
+    def _calculateLatency(latencies: list[float]) -> LaneLatency:
+        if not latencies:
+            return {'samples': 0, 'mean': 0.0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+
+        ordered = sorted(latencies)
+        return {
+            'samples': len(ordered),
+            'mean': sum(ordered) * 1000 / len(ordered),
+            'p50': ordered[len(ordered) // 2] * 1000,
+            'p99': ordered[min(len(ordered) * 99 // 100, len(ordered) - 1)] * 1000,
+            'max': ordered[-1] * 1000
+        }
+
+    def getStats(self) -> GrblControllerStats:
+        """Returns a snapshot of the performance counters of the controller:
+        traffic, responses, rates, send-to-ok latency, RX buffer occupancy
+        and time spent paused. See GrblStats for the details.
+        """
+        return self.grbl_stats.get_stats(self.grbl_status.get_paused_time())
+
+    def getJogsInFlight(self) -> int:
+        """Returns the amount of jogs either waiting in the priority lane
+        or already sent to GRBL and not yet acknowledged (planned).
         """
-        return self._sumcline * 100.0 / RX_BUFFER_SIZE
+        with self._io_condition:
+            commands = [
+                self._next_priority,
+                *self.priority_queue.queue,
+                *self.streaming.pending_commands()
+            ]
+        return sum(1 for command in commands if command and command.startswith('$J='))
 
     # Message queue management
 
+    def getQueueDepth(self) -> int:
+        """Returns the amount of commands waiting to be sent to GRBL,
+        so producers can pace themselves.
+        """
+        waiting = (self._next_command is not None) + (self._next_priority is not None)
+        return self.queue.qsize() + self.priority_queue.qsize() + waiting
+
+    def isQueueFull(self) -> bool:
+        return self.queue_size > 0 and self.queue.qsize() >= self.queue_size
+
+    def waitForQueueSpace(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until there is space in the command queue,
+        or until the timeout (in seconds) expires.
+
+        Returns True if a command can be queued.
+        """
+        with self._io_condition:
+            return self._io_condition.wait_for(lambda: not self.isQueueFull(), timeout)
+
     def emptyQueue(self):
         """Empty command queue.
         """
-        while self.queue.qsize() > 0:
+        with self._io_condition:
+            for queue in [self.queue, self.priority_queue]:
+                while queue.qsize() > 0:
+                    try:
+                        queue.get_nowait()
+                    except Empty:
+                        break
+            self._next_command = None
+            self._next_priority = None
+            self._queued_bytes = 0
+            self._pending_jogs.clear()
+            self._jog_cancel_pending = False
+            for queued_at in self._queued_at.values():
+                queued_at.clear()
+            for commands in self._queued_commands.values():
+                self._cancelCommands(commands)
+            self._io_condition.notify_all()
+
+    # Status polling
+
+    def setPollingRates(
+            self,
+            fast: Optional[float] = None,
+            slow: Optional[float] = None,
+            burst: Optional[float] = None
+    ):
+        """Configures the intervals (in seconds) between status queries.
+
+        Args:
+            fast: While the machine is moving (Run, Jog, Home...) or commands are in flight.
+            slow: While the machine is Idle, asleep or in Alarm state.
+            burst: During a burst requested on demand, for example when a client subscribes.
+        """
+        if fast is not None:
+            self.poll_fast = fast
+        if slow is not None:
+            self.poll_slow = slow
+        if burst is not None:
+            self.poll_burst = burst
+        self._poll_wakeup.set()
+
+    # Status report mask
+
+    def setStatusMaskTuning(self, enabled: bool = True):
+        """Enables (or disables) the automatic tuning of the status report mask ($10):
+        GRBL is configured to report only the fields required by the subscribers
+        (see setStatusRequirements), to reduce the size of every status report.
+
+        The original value is restored on disconnection, or when disabled.
+        The setting is only changed while the machine is idle.
+        """
+        self._status_mask_tuning = enabled
+        if enabled:
+            self._tuneStatusMask()
+        else:
+            self._status_mask_pending = False
+            self._restoreStatusMask()
+
+    def setStatusRequirements(self, subscriber: str, fields: list[str]):
+        """Registers the fields of the status reports a subscriber needs:
+        STATUS_FIELD_MPOS, STATUS_FIELD_WPOS and STATUS_FIELD_BUFFER (see grblUtils).
+        An empty list removes the requirements of the subscriber.
+        """
+        if fields:
+            self._status_fields[subscriber] = list(fields)
+        else:
+            self._status_fields.pop(subscriber, None)
+        self._tuneStatusMask()
+
+    def getRequiredStatusFields(self) -> set[str]:
+        """Returns the fields of the status reports required by any subscriber.
+        """
+        return {field for fields in self._status_fields.values() for field in fields}
+
+    def getStatusMask(self) -> Optional[int]:
+        """Returns the current status report mask ($10) of the device, if known.
+        """
+        return self._status_mask
+
+    def _tuneStatusMask(self):
+        """Updates the status report mask to the smallest one with the required fields.
+        """
+        if not self._status_mask_tuning or not self.grbl_status.connected():
+            return
+
+        # Query the current value first (if not known), the tuning continues when it arrives
+        if self._status_mask is None and '$10' in self.settings:
+            self._status_mask = self._original_status_mask = int(
+                float(self.settings['$10']['value'])
+            )
+        if self._status_mask is None:
+            if not self._status_mask_queried:
+                self._status_mask_queried = True
+                self.queryGrblSettings()
+            return
+
+        # GRBL rejects the settings while running (error:8)
+        active_state = self.grbl_status.get_status_report()['activeState']
+        if active_state != GRBL_ACTIVE_STATE_IDLE or self.getPendingBytes() > 0:
+            self._status_mask_pending = True
+            return
+        self._status_mask_pending = False
+
+        mask = get_status_mask(self.getRequiredStatusFields(), self._status_mask)
+        if mask != self._status_mask:
+            self._writeStatusMask(mask)
+
+    def _restoreStatusMask(self):
+        """Restores the status report mask found when connecting, and waits for it.
+        """
+        original = self._original_status_mask
+        if original is None or self._status_mask == original:
+            return
+
+        # Disconnecting from the I/O thread, after a serial error: the device is gone
+        if self.isIOThread():
+            return
+
+        future = self._writeStatusMask(original)
+        try:
+            result = future.result(STATUS_MASK_TIMEOUT)
+        except (CancelledError, TimeoutError):
+            result = None
+        if not result or result['response'] != 'ok':
+            self.grbl_monitor.warning(f'Failed restoring the status report mask to {original}')
+
+    def _writeStatusMask(self, mask: int) -> 'Future[CommandResult]':
+        future = self.submitCommand(f'$10={mask}', priority=True)
+        self._status_mask = mask
+        original = self._original_status_mask
+        self.grbl_stats.set_status_report_savings(
+            0 if original is None else get_status_mask_savings(original, mask)
+        )
+        self.grbl_monitor.info(f'Status report mask ($10) updated to {mask}')
+        return future
+
+    def _resetStatusMask(self):
+        """Forgets the status report mask of the previous device.
+        """
+        self._status_mask = None
+        self._original_status_mask = None
+        self._status_mask_queried = False
+        self._status_mask_pending = False
+        self.grbl_stats.set_status_report_savings(0)
+
+    def requestStatusBurst(self, duration: float = STATUS_BURST_DURATION):
+        """Queries the status immediately, and then at the burst rate for a while.
+        """
+        self._burst_until = time.time() + duration
+        self._poll_wakeup.set()
+
+    def getPollInterval(self) -> float:
+        """Returns the time to wait before the next status query,
+        according to what the machine is doing.
+        """
+        if time.time() < self._burst_until:
+            return self.poll_burst
+
+        if self.getLinesInFlight() > 0:
+            return self.poll_fast
+
+        active_state = self.grbl_status.get_status_report()['activeState']
+        if active_state in [
+            GRBL_ACTIVE_STATE_IDLE,
+            GRBL_ACTIVE_STATE_ALARM,
+            GRBL_ACTIVE_STATE_SLEEP
+        ]:
+            return self.poll_slow
+
+        return self.poll_fast
+
+    # Threads
+
+    def startIO(self):
+        """Starts the threads performing I/O on the serial line.
+        """
+        self._io_stop.clear()
+        self._poll_wakeup.clear()
+        self.io_threads = [
+            threading.Thread(target=self.serialReader, daemon=True),
+            threading.Thread(target=self.serialWriter, daemon=True),
+            threading.Thread(target=self.statusPoller, daemon=True)
+        ]
+        for thread in self.io_threads:
+            thread.start()
+
+    def isIOThread(self) -> bool:
+        """Checks if the current thread performs the I/O of the controller.
+        """
+        return threading.current_thread() in self.io_threads
+
+    def stopIO(self):
+        """Stops the threads performing I/O on the serial line.
+        """
+        self._io_stop.set()
+        self._poll_wakeup.set()
+        self.notifyWriter()
+
+        current = threading.current_thread()
+        for thread in self.io_threads:
+            if thread is not current and thread.is_alive():
+                thread.join(WRITER_TIMEOUT)
+        self.io_threads = []
+
+    def notifyWriter(self):
+        """Wakes up the writer thread, to re-evaluate if it can send a command.
+        """
+        with self._io_condition:
+            self._io_condition.notify_all()
+
+    def serialReader(self):
+        """Thread blocking on the serial line, parsing the responses from GRBL.
+        """
+        while not self._io_stop.is_set():
             try:
-                self.queue.get_nowait()
+                response = self.serial.readLine()
+            except SerialException:
+                self.grbl_monitor.error(
+                    f'Error reading response from GRBL: {str(sys.exc_info()[1])}'
+                )
+                self.emptyQueue()
+                self.disconnect()
+                return
+
+            if response:
+                self.parseResponse(response)
+
+    def statusPoller(self):
+        """Thread querying the GRBL status periodically,
+        at a rate which depends on the machine's state.
+        """
+        while not self._io_stop.is_set():
+            self._poll_wakeup.clear()
+            self.queryStatusReport()
+            self._poll_wakeup.wait(self.getPollInterval())
+
+    def _fetchNextCommand(self) -> Optional[str]:
+        """Returns the next command to send if it fits in the GRBL buffer, None otherwise.
+        Must be called while holding the I/O condition.
+        """
+        # Received external message to stop
+        if self.grbl_status.get_flag(FLAG_STOP):
+            self.emptyQueue()
+            self.streaming.reset()
+            self._sent_lanes.clear()
+            self._cancelCommands(self._sent_commands)
+            self.grbl_status.set_flag(FLAG_STOP, False)
+            self.grbl_monitor.info('STOP request processed')
+
+        # Fetch new command to send, the priority lane first
+        if self._next_priority is None and not self.grbl_status.paused():
+            try:
+                self._next_priority = self.priority_queue.get_nowait()
             except Empty:
-                break
+                pass
 
-    # Threads
+        if self._next_command is None and not self.grbl_status.paused():
+            try:
+                self._next_command = self.queue.get_nowait()
+            except Empty:
+                pass
+            else:
+                # Wake up the producers waiting for space in the queue
+                if self.queue.qsize() == self.queue_size - 1:
+                    self._io_condition.notify_all()
+
+        # A priority command jumps ahead of the program line waiting for space,
+        # which is kept to be sent next, and waits for space itself
+        lane = LANE_BULK if self._next_priority is None else LANE_PRIORITY
+        tosend = self._next_command if lane == LANE_BULK else self._next_priority
+
+        # Check if it can be sent, according to the streaming protocol
+        if tosend is None or not self.streaming.can_send(tosend):
+            return None
+
+        # Bookkeeping of the buffers
+        if lane == LANE_BULK:
+            self._next_command = None
+        else:
+            self._next_priority = None
+        self._queued_bytes = max(self._queued_bytes - len(tosend) - 1, 0)
+        self.streaming.sent(tosend)
+
+        queued_at = self._queued_at[lane]
+        now = time.perf_counter()
+        self._sent_lanes.append((lane, queued_at.popleft() if queued_at else now, now))
+        queued = self._queued_commands[lane]
+        self._sent_commands.append(queued.popleft() if queued else None)
+        return tosend
+
+    def _holdJog(self, jog: JogParameters) -> bool:
+        """Holds a jog of the jog session, merging it with the last held one if possible,
+        and sends the held jogs which fit in the amount of jogs in flight.
+        """
+        with self._io_condition:
+            last = self._pending_jogs[-1] if self._pending_jogs else None
+            if last is not None and self._canMergeJogs(last, jog):
+                last['x'] = round(last['x'] + jog['x'], JOG_PRECISION)
+                last['y'] = round(last['y'] + jog['y'], JOG_PRECISION)
+                last['z'] = round(last['z'] + jog['z'], JOG_PRECISION)
+            else:
+                self._pending_jogs.append(jog)
+            self._dispatchJogs()
+        return True
+
+    @staticmethod
+    def _canMergeJogs(first: JogParameters, second: JogParameters) -> bool:
+        """Only incremental jogs with the same feed rate, units and coordinates can be added.
+        """
+        return first['distance_mode'] == second['distance_mode'] == JOG_DISTANCE_INCREMENTAL \
+            and first['feedrate'] == second['feedrate'] \
+            and first['units'] == second['units'] \
+            and first['machine_coordinates'] == second['machine_coordinates']
+
+    def _dispatchJogs(self):
+        """Queues the held jogs, while there is room for more jogs in flight.
+        Must be called while holding the I/O condition.
+        """
+        while self._pending_jogs and self.getJogsInFlight() < self._jog_max_in_flight:
+            jog = self._pending_jogs.popleft()
+            jog_command = build_jog_command(
+                jog['x'], jog['y'], jog['z'],
+                jog['feedrate'],
+                units=jog['units'],
+                distance_mode=jog['distance_mode'],
+                machine_coordinates=jog['machine_coordinates']
+            )
+            self.sendCommand(jog_command, priority=True)
 
-    def serialIO(self):
-        """Thread performing I/O on serial line.
-        """
-        cline: list[int] = []  # length of pipeline commands
-        sline: list[str] = []  # pipeline commands
-        tosend = None  # next string to send
-        tr = tg = time.time()  # last time a ? or $G was send to grbl
-
-        while self.serial_thread:
-            t = time.time()
-
-            # Refresh machine position?
-            if t - tr > SERIAL_POLL:
-                self.queryStatusReport()
-                tr = t
-
-            # Fetch new command to send if...
-            if (
-                tosend is None
-                and not self.grbl_status.paused()
-                and self.queue.qsize() > 0
-            ):
-                try:
-                    tosend = self.queue.get_nowait()
-                except Empty:
-                    break
+    def _processJogs(self) -> bool:
+        """Sends the held jogs once GRBL plans the previous ones.
+        Must be called while holding the I/O condition.
 
-                if tosend is not None:
-                    # If necessary, all modifications in tosend should be
-                    # done before adding it to cline
-
-                    # Bookkeeping of the buffers
-                    sline.append(tosend)
-                    cline.append(len(tosend))
-
-            # Anything to receive?
-            if self.serial.waiting() or tosend is None:
-                try:
-                    response = self.serial.readLine()
-                except SerialException:
-                    self.grbl_monitor.error(
-                        f'Error reading response from GRBL: {str(sys.exc_info()[1])}'
-                    )
-                    self.emptyQueue()
-                    self.disconnect()
-                    return
+        Returns True when the jog cancel must be sent again, because
+        every jog in flight when the session ended is already planned.
+        """
+        if self._pending_jogs:
+            self._dispatchJogs()
 
-                if not response:
-                    pass
-                else:
-                    self.parseResponse(response, cline, sline)
+        if self._jog_cancel_pending and self.getJogsInFlight() == 0:
+            self._jog_cancel_pending = False
+            return True
+        return False
 
-            # Received external message to stop
-            if self.grbl_status.get_flag(FLAG_STOP):
-                self.emptyQueue()
-                tosend = None
-                self.grbl_status.set_flag(FLAG_STOP, False)
-                self.grbl_monitor.info('STOP request processed')
-
-            # Send command to GRBL
-            if tosend is not None and sum(cline) < RX_BUFFER_SIZE:
-                self._sumcline = sum(cline)
-
-                try:
-                    self.serial.sendLine(tosend)
-                except SerialException:
-                    self.grbl_monitor.error(
-                        f'Error sending command to GRBL: {str(sys.exc_info()[1])}'
-                    )
-                    error_data = {
-                        'code': 0,
-                        'message': 'Communication error',
-                        'description': str(sys.exc_info()[1])
-                    }
-                    self.grbl_status.set_error(tosend, error_data)
-                    self.emptyQueue()
-                    self.disconnect()
-                    return
-                self.grbl_monitor.sent(tosend)
+    def _registerLatency(self) -> Optional[str]:
+        """Registers the latency of the oldest command sent and not yet acknowledged,
+        both since it was queued (per lane) and since it was sent.
+        Must be called while holding the I/O condition.
 
-                # Check if end of program
-                if tosend.strip() in ['M2', 'M02', 'M30']:
-                    self.grbl_monitor.info(f'A program end command was found: {tosend}')
-                    self.grbl_status.set_flag(FLAG_FINISHED, True)
-                    self.emptyQueue()
+        Returns the lane of the command, if known.
+        """
+        if not self._sent_lanes:
+            return None
+        lane, queued_at, sent_at = self._sent_lanes.popleft()
+        now = time.perf_counter()
+        self._latencies[lane].append(now - queued_at)
+        self.grbl_stats.register_latency(now - sent_at)
+        return lane
+
+    @staticmethod
+    def _resolveCommand(command: Optional[PendingCommand], response: str):
+        """Resolves the future of a command with the GRBL response.
+        """
+        if command is None:
+            return
+        try:
+            command['future'].set_result({
+                'id': command['id'],
+                'command': command['command'],
+                'response': response,
+                'lines': command['lines']
+            })
+        except InvalidStateError:
+            # Cancelled by the caller
+            pass
+
+    @staticmethod
+    def _cancelCommands(commands: deque[Optional[PendingCommand]]):
+        """Cancels the futures of the discarded commands.
+        """
+        while commands:
+            command = commands.popleft()
+            if command is not None:
+                command['future'].cancel()
+
+    def _waitNextCommand(self) -> Optional[str]:
+        """Waits until there is a command to send which fits in the GRBL buffer.
+        Returns None when the I/O threads are stopped.
+        """
+        with self._io_condition:
+            while not self._io_stop.is_set():
+                tosend = self._fetchNextCommand()
+                if tosend is not None:
+                    return tosend
+                self._io_condition.wait(WRITER_TIMEOUT)
+        return None
+
+    def _sendAvailable(self):
+        """Sends every queued command which fits in the GRBL buffer, without blocking.
+        """
+        with self._io_condition:
+            while True:
+                tosend = self._fetchNextCommand()
+                if tosend is None:
+                    return
+                if not self._writeCommand(tosend):
                     return
 
-                tosend = None
-                if t - tg > G_POLL:
-                    self.queryGcodeParserState()
-                    self.commands_count -= 1    # Avoid counting non-sent commands
-                    tg = t
+    def _processReceived(self, data: bytes):
+        """Splits the data received from GRBL in lines, and parses the complete ones.
+        """
+        self._rx_framer.feed(data)
+        lines = self._rx_framer.lines
+        while lines:
+            self.parseResponse(lines.popleft())
+
+    def _writeCommand(self, tosend: str) -> bool:
+        """Sends a command to GRBL, already accounted in the streaming buffer.
+        Returns False when the streaming must stop.
+        """
+        try:
+            self.serial.sendLine(tosend)
+        except SerialException:
+            self.grbl_monitor.error(
+                f'Error sending command to GRBL: {str(sys.exc_info()[1])}'
+            )
+            error_data = {
+                'code': 0,
+                'message': 'Communication error',
+                'description': str(sys.exc_info()[1])
+            }
+            self.grbl_status.set_error(tosend, error_data)
+            self.emptyQueue()
+            self.disconnect()
+            return False
+        self.grbl_stats.register_sent(tosend, self.getBufferFill())
+        self.grbl_monitor.sent(tosend)
+
+        # Check if end of program
+        if tosend.strip() in ['M2', 'M02', 'M30']:
+            self.grbl_monitor.info(f'A program end command was found: {tosend}')
+            self.grbl_status.set_flag(FLAG_FINISHED, True)
+            self.emptyQueue()
+            return False
+        return True
+
+    def serialWriter(self):
+        """Thread sending the queued commands to GRBL, waiting until
+        a command is queued or GRBL frees space in its RX buffer.
+        """
+        while True:
+            tosend = self._waitNextCommand()
+            if tosend is None:
+                return
+
+            if not self._writeCommand(tosend):
+                return
@@ -0,0 +1,298 @@
+from concurrent.futures import Future
+import heapq
+import itertools
+import logging
+import selectors
+from serial import SerialException
+import socket
+import sys
+import threading
+import time
+from typing import Optional
+from .grblController import GrblController
+from .types import CommandResult
+from .streaming.streamingStrategy import STREAMING_CHARACTER_COUNTING
+
+try:
+    from ..utils.transport import Transport
+except ImportError:
+    from utils.transport import Transport
+
+# Constants
+HUB_IDLE_TIMEOUT = 1.0  # seconds
+
+
+class HubGrblController(GrblController):
+    """GRBL controller whose I/O is performed by a GrblDeviceHub,
+    instead of its own threads.
+
+    Besides the I/O, it behaves like a regular GrblController,
+    so it can be used from any thread.
+    """
+
+    def __init__(
+            self,
+            logger: logging.Logger,
+            hub: 'GrblDeviceHub',
+            transport: Optional[Transport] = None
+    ):
+        super().__init__(logger, transport)
+        self.hub = hub
+        self._poll_seq = 0      # Identifies the last status query scheduled in the hub
+
+    def startIO(self):
+        """Registers the serial port in the hub.
+        """
+        self._io_stop.clear()
+        self._poll_wakeup.set()     # Query the status as soon as possible
+        self._rx_framer.clear()
+        self.hub.register(self)
+
+    def isIOThread(self) -> bool:
+        """Checks if the current thread is the one of the hub.
+        """
+        return threading.current_thread() is self.hub._thread
+
+    def stopIO(self):
+        """Unregisters the serial port from the hub.
+        """
+        self._io_stop.set()
+        self.hub.unregister(self)
+        super().notifyWriter()
+
+    def notifyWriter(self):
+        """Wakes up the hub, to re-evaluate if it can send a command.
+        """
+        super().notifyWriter()
+        self.hub.wakeup(self)
+
+    def submitCommand(
+            self,
+            command: str,
+            block: bool = True,
+            timeout: Optional[float] = None,
+            priority: bool = False
+    ) -> 'Future[CommandResult]':
+        future = super().submitCommand(command, block, timeout, priority)
+        self.hub.wakeup(self)
+        return future
+
+    def setPollingRates(
+            self,
+            fast: Optional[float] = None,
+            slow: Optional[float] = None,
+            burst: Optional[float] = None
+    ):
+        super().setPollingRates(fast, slow, burst)
+        self.hub.wakeup(self)
+
+    def requestStatusBurst(self, *args, **kwargs):
+        super().requestStatusBurst(*args, **kwargs)
+        self.hub.wakeup(self)
+
+    def serialReader(self):
+        """Called by the hub when the serial port has data to read.
+        """
+        try:
+            data = self.serial.readAvailable()
+        except SerialException:
+            self.grbl_monitor.error(
+                f'Error reading response from GRBL: {str(sys.exc_info()[1])}'
+            )
+            self.emptyQueue()
+            self.disconnect()
+            return
+
+        self._processReceived(data)
+
+        # GRBL may have freed space in its RX buffer
+        self._sendAvailable()
+
+
+class GrblDeviceHub:
+    """Performs the I/O of many GRBL devices in a single thread.
+
+    Every serial port is registered in a selector, so the thread only wakes up
+    to read a response, to send a queued command or to query a status report.
+    The resources used then depend on the traffic, instead of the amount of devices.
+
+    Usage:
+        hub = GrblDeviceHub()
+        cnc_1 = hub.connect('/dev/ttyUSB0', 115200, logger)
+        cnc_2 = hub.connect('/dev/ttyUSB1', 115200, logger)
+        ...
+        hub.close()
+    """
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.devices: list[HubGrblController] = []
+
+        # Guards the hub state, which is modified by the controllers from any thread
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Controllers which have new commands to send or status queries to schedule
+        self._dirty: set[HubGrblController] = set()
+
+        # Status queries, ordered by time: (time, sequence, controller)
+        self._polls: list[tuple[float, int, HubGrblController]] = []
+        self._poll_seq = itertools.count(1)
+
+        # Socket pair to interrupt the selector from other threads
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._wakeup_pending = False
+        self.selector.register(self._wakeup_reader, selectors.EVENT_READ, None)
+
+    def connect(
+            self,
+            port: str,
+            baudrate: int,
+            logger: logging.Logger,
+            streaming: str = STREAMING_CHARACTER_COUNTING,
+            transport: Optional[Transport] = None,
+            fast: bool = False
+    ) -> HubGrblController:
+        """Connects to the GRBL device in the given port, whose I/O is done by the hub.
+        """
+        controller = HubGrblController(logger, self, transport)
+        controller.connect(port, baudrate, streaming, fast)
+        return controller
+
+    def close(self):
+        """Disconnects every device and stops the hub thread.
+        """
+        for controller in list(self.devices):
+            controller.disconnect()
+
+        self._stop.set()
+        self._notify()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread() and thread.is_alive():
+            thread.join(HUB_IDLE_TIMEOUT)
+        self._thread = None
+
+        self.selector.close()
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+
+    # Devices management
+
+    def register(self, controller: HubGrblController):
+        """Starts performing the I/O of a connected controller.
+        """
+        with self._lock:
+            self.selector.register(controller.serial.fileno(), selectors.EVENT_READ, controller)
+            self.devices.append(controller)
+            self._dirty.add(controller)
+
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, daemon=True)
+                self._thread.start()
+        self._notify()
+
+    def unregister(self, controller: HubGrblController):
+        """Stops performing the I/O of a controller.
+        """
+        with self._lock:
+            if controller not in self.devices:
+                return
+            self.selector.unregister(controller.serial.fileno())
+            self.devices.remove(controller)
+            self._dirty.discard(controller)
+            controller._poll_seq = 0
+
+    def wakeup(self, controller: HubGrblController):
+        """Tells the hub that a controller may have something to do.
+        """
+        with self._lock:
+            if controller not in self.devices:
+                return
+            self._dirty.add(controller)
+        self._notify()
+
+    def _notify(self):
+        """Interrupts the selector, unless it was already interrupted.
+        """
+        if threading.current_thread() is self._thread:
+            return
+
+        with self._lock:
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        try:
+            self._wakeup_writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    # I/O loop
+
+    def run(self):
+        """Thread performing the I/O of every registered device.
+        """
+        while not self._stop.is_set():
+            self._runOnce()
+
+    def _runOnce(self, max_wait: float = HUB_IDLE_TIMEOUT):
+        """Waits for any I/O event, or the next status query, and processes them.
+        """
+        timeout = max_wait
+        if self._dirty:
+            timeout = 0.0
+        elif self._polls:
+            timeout = min(max(self._polls[0][0] - time.time(), 0.0), max_wait)
+
+        for key, _ in self.selector.select(timeout):
+            if key.data is None:
+                self._clearWakeup()
+                continue
+
+            with self._lock:
+                controller: HubGrblController = key.data
+                if controller in self.devices:
+                    controller.serialReader()
+
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+
+            now = time.time()
+            for controller in dirty:
+                controller._sendAvailable()
+                if controller._poll_wakeup.is_set():
+                    self._schedulePoll(controller, now)
+
+            self._runPolls(now)
+
+    def _clearWakeup(self):
+        with self._lock:
+            self._wakeup_pending = False
+            try:
+                while self._wakeup_reader.recv(1024):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+
+    def _schedulePoll(self, controller: HubGrblController, when: float):
+        """Schedules the next status query of a controller,
+        replacing any previously scheduled one.
+        """
+        controller._poll_seq = next(self._poll_seq)
+        heapq.heappush(self._polls, (when, controller._poll_seq, controller))
+
+    def _runPolls(self, now: float):
+        """Queries the status of the devices whose time has come.
+        """
+        while self._polls and self._polls[0][0] <= now:
+            _, seq, controller = heapq.heappop(self._polls)
+            if seq != controller._poll_seq or controller not in self.devices:
+                continue
+
+            controller._poll_wakeup.clear()
+            controller.queryStatusReport()
+            self._schedulePoll(controller, now + controller.getPollInterval())
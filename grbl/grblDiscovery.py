@@ -0,0 +1,138 @@
+"""Discovery of the GRBL devices connected to the host.
+
+Every candidate port is probed at the same time, each one in a thread of a pool:
+the port is opened and the GRBL startup message ("Grbl 1.1h ['$' for help]")
+awaited, with a soft reset if the device doesn't print it by itself.
+
+Usage (from the repository root):
+    python -m grbl.grblDiscovery
+    python -m grbl.grblDiscovery --port /dev/ttyUSB0 /dev/ttyACM0 --baudrate 115200 9600
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from serial import SerialException
+import time
+from typing import Optional
+from .grblLineParser import GrblLineParser
+from .parsers.grblMsgTypes import GRBL_MSG_STARTUP
+from .types import DiscoveredDevice
+
+try:
+    from ..utils.serial import SerialService
+    from ..utils.transport import Transport, get_transport
+except ImportError:
+    from utils.serial import SerialService
+    from utils.transport import Transport, get_transport
+
+# Constants
+BAUDRATES = [115200]            # Tried in order, for each port
+STARTUP_TIMEOUT = 3.0           # seconds, the bootloader of an Arduino may take ~2 seconds
+STARTUP_RESET_AFTER = 0.25      # seconds without a startup message before a soft reset
+MAX_WORKERS = 16                # Ports probed at the same time
+SOFT_RESET = b'\x18'
+
+
+def wait_for_startup(
+        transport: Transport,
+        timeout: float = STARTUP_TIMEOUT,
+        reset_after: Optional[float] = STARTUP_RESET_AFTER
+) -> tuple[str, Optional[dict[str, str]]]:
+    """Waits for the GRBL startup message on an open connection, ignoring any other line,
+    and returns it as soon as it arrives, with its parsed payload.
+    Returns an empty message and None if the timeout (seconds) expires.
+
+    A device which didn't reset when the port was opened doesn't print the message,
+    so a soft reset is sent after reset_after seconds (None to never send it).
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    reset_at = None if reset_after is None else start + reset_after
+
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return '', None
+
+        if reset_at is not None and now >= reset_at:
+            transport.sendBytes(SOFT_RESET)
+            reset_at = None
+
+        wakeup = deadline if reset_at is None else min(deadline, reset_at)
+        line = transport.waitForLine(wakeup - now)
+        if not line:
+            continue
+
+        msgType, payload = GrblLineParser.parse(line)
+        if msgType == GRBL_MSG_STARTUP:
+            return line, payload
+
+
+def probe_port(
+        port: str,
+        baudrates: list[int] = BAUDRATES,
+        timeout: float = STARTUP_TIMEOUT
+) -> Optional[DiscoveredDevice]:
+    """Looks for a GRBL device in the given port, trying each baud rate in order.
+    Returns the device found, or None.
+    """
+    for baudrate in baudrates:
+        transport = get_transport(port)
+        try:
+            transport.openConnection(port, baudrate, timeout)
+            _, payload = wait_for_startup(transport, timeout)
+        except SerialException:
+            # The port can't be opened, no baud rate would work
+            return None
+        finally:
+            transport.stopConnection()
+
+        if payload:
+            return {
+                'port': port,
+                'baudrate': baudrate,
+                'firmware': payload['firmware'],
+                'version': payload['version'],
+                'message': payload['message']
+            }
+    return None
+
+
+def discover_devices(
+        ports: Optional[list[str]] = None,
+        baudrates: list[int] = BAUDRATES,
+        timeout: float = STARTUP_TIMEOUT,
+        max_workers: int = MAX_WORKERS
+) -> list[DiscoveredDevice]:
+    """Probes all the given ports at the same time (by default, every serial port
+    of the host), and returns the GRBL devices found, in the order of the ports.
+
+    The whole discovery takes about the time to probe a single port,
+    that is, up to timeout seconds per baud rate.
+    """
+    if ports is None:
+        ports = [port_info.device for port_info in SerialService.get_ports()]
+    if not ports:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ports))) as executor:
+        results = executor.map(lambda port: probe_port(port, baudrates, timeout), ports)
+        return [device for device in results if device]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Discovery of the connected GRBL devices')
+    parser.add_argument('--port', nargs='*', help='ports to probe, all the serial ports if none')
+    parser.add_argument('--baudrate', nargs='+', type=int, default=BAUDRATES)
+    parser.add_argument('--timeout', type=float, default=STARTUP_TIMEOUT, help='seconds')
+    args = parser.parse_args()
+
+    devices = discover_devices(args.port or None, args.baudrate, args.timeout)
+    if not devices:
+        print('No GRBL device found')
+    for device in devices:
+        print(f"{device['port']}\t{device['baudrate']}\t{device['firmware']} {device['version']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+from decimal import Decimal
+from typing import Optional, Union
+from .constants import GRBL_MODAL_GROUPS
+from .grblUtils import split_gcode_words
+
+# Constants
+MODAL_GROUP_BY_CODE = {
+    mode: element['group'] for element in GRBL_MODAL_GROUPS for mode in element['modes']
+}
+PROGRAM_END_CODES = ['M2', 'M30']
+
+# Modes restored by GRBL at the end of a program (M2, M30)
+PROGRAM_END_MODAL = {
+    'motion': 'G1',
+    'wcs': 'G54',
+    'plane': 'G17',
+    'distance': 'G90',
+    'feedrate': 'G94',
+    'spindle': 'M5',
+    'coolant': 'M9'
+}
+
+# Types definition
+CoolantState = Union[str, list[str]]
+
+
+def normalize_code(letter: str, value: str) -> str:
+    """Returns the canonical form of a G or M code.
+
+    For example: ('G', '01') -> 'G1', ('G', '38.20') -> 'G38.2'
+    """
+    return letter + format(Decimal(value).normalize(), 'f')
+
+
+class GrblModalState:
+    """Tracks the modal state of the GRBL G-code parser from the lines sent to it,
+    the same state reported by a $G query, without querying the device.
+
+    Every value starts as unknown (None), unless an initial state is given.
+
+    The lines must be tracked in the same order they are sent, and it assumes
+    GRBL accepts them: a line rejected with an error doesn't change the GRBL state.
+    """
+
+    def __init__(
+            self,
+            modal: Optional[dict[str, Optional[CoolantState]]] = None,
+            feedrate: Optional[float] = None,
+            spindle: Optional[float] = None,
+            tool: Optional[int] = None
+    ):
+        self.modal: dict[str, Optional[CoolantState]] = {
+            element['group']: None for element in GRBL_MODAL_GROUPS
+        }
+        self.feedrate = feedrate
+        self.spindle = spindle
+        self.tool = tool
+
+        if modal:
+            self.modal.update(modal)
+
+    def reset(self):
+        """Forgets the tracked state, every value becomes unknown.
+        """
+        for group in self.modal:
+            self.modal[group] = None
+        self.feedrate = None
+        self.spindle = None
+        self.tool = None
+
+    def update(self, line: str):
+        """Updates the state with a G-code line, without comments.
+        """
+        if line.startswith('$'):
+            return
+        words = split_gcode_words(line)
+        if words:
+            self.update_words(words)
+
+    def update_words(self, words: list[tuple[str, str]]):
+        """Updates the state with the words of a G-code line.
+        """
+        program_end = False
+
+        for letter, value in words:
+            if letter in 'GM':
+                code = normalize_code(letter, value)
+                group = MODAL_GROUP_BY_CODE.get(code)
+                if group == 'coolant':
+                    self._update_coolant(code)
+                elif group:
+                    self.modal[group] = code
+                program_end = program_end or code in PROGRAM_END_CODES
+            elif letter == 'F':
+                self.feedrate = float(value)
+            elif letter == 'S':
+                self.spindle = float(value)
+            elif letter == 'T':
+                self.tool = int(float(value))
+
+        if program_end:
+            self.modal.update(PROGRAM_END_MODAL)
+
+    def is_current(self, letter: str, value: str) -> bool:
+        """Checks if a G-code word only repeats the current state.
+        Unknown values are never current.
+        """
+        if letter in 'GM':
+            code = normalize_code(letter, value)
+            group = MODAL_GROUP_BY_CODE.get(code)
+            if group is None or group in ['coolant', 'program']:
+                return False
+            return self.modal[group] == code
+        if letter == 'F':
+            return self.feedrate is not None and self.feedrate == float(value)
+        if letter == 'S':
+            return self.spindle is not None and self.spindle == float(value)
+        return False
+
+    def get_modal(self) -> dict[str, Optional[CoolantState]]:
+        """Returns the tracked modal state, in the same format than GrblStatus.get_modal,
+        with None for the unknown values.
+        """
+        return dict(self.modal)
+
+    def _update_coolant(self, code: str):
+        if code == 'M9':
+            self.modal['coolant'] = 'M9'
+            return
+
+        current = self.modal['coolant']
+        if current is None or current == 'M9' or current == code:
+            self.modal['coolant'] = code
+            return
+        if isinstance(current, list):
+            return
+        # Mist and flood coolant enabled at the same time
+        self.modal['coolant'] = sorted([current, code])
@@ -3,6 +3,7 @@ import logging
 from .parsers.grblMsgTypes import GRBL_MSG_STATUS
 from pathlib import Path
 from queue import Empty, Queue
+import time
 from typing import Optional
 
 try:
@@ -12,6 +13,7 @@ except ImportError:
 
 # Constants
 PUBSUB_CHANNEL = 'grbl_messages'
+SUBSCRIBERS_CHECK_INTERVAL = 1.0    # seconds
 
 
 class GrblMonitor:
@@ -35,6 +37,8 @@ class GrblMonitor:
         # Start a PubSub manager to notify updates to external apps
         self.redis = RedisPubSubManagerSync()
         self.redis.connect()
+        self._subscribers = 0
+        self._subscribers_checked_at: Optional[float] = None
 
     def __del__(self):
         # Removes the file handler from the logger
@@ -46,6 +50,12 @@ class GrblMonitor:
 
     # LOGGER
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Tells if a message of the given level would be logged, so the callers
+        can skip building messages which would be discarded.
+        """
+        return self.logger.isEnabledFor(level)
+
     def debug(self, log: str, queue: bool = False):
         self.logger.debug(log)
         if queue:
@@ -78,12 +88,7 @@ class GrblMonitor:
             return
         self.logger.info('[Sent] command: %s', command)
         self.queueLog(command)
-        # Publish in PubSub
-        pubsub_message = json.dumps({
-            'type': 'sent',
-            'message': command
-        })
-        self.redis.publish(PUBSUB_CHANNEL, pubsub_message)
+        self.publish('sent', command)
 
     def received(self, message: str, msgType: Optional[str], payload: dict[str, str]):
         if (msgType == GRBL_MSG_STATUS):
@@ -94,9 +99,29 @@ class GrblMonitor:
         self.logger.info('[Received] Message from GRBL: %s', message)
         self.logger.info('[Parsed] Message type: %s| Payload: %s', msgType, payload)
         self.queueLog(message)
-        # Publish in PubSub
+        self.publish('received', message)
+
+    # PUBSUB
+
+    def hasSubscribers(self) -> bool:
+        """Tells if any external app is subscribed to the GRBL messages.
+        Redis is queried at most once every SUBSCRIBERS_CHECK_INTERVAL seconds,
+        so a new subscriber may miss the messages of that interval.
+        """
+        now = time.monotonic()
+        checked_at = self._subscribers_checked_at
+        if checked_at is None or now - checked_at >= SUBSCRIBERS_CHECK_INTERVAL:
+            self._subscribers = self.redis.count_subscribers(PUBSUB_CHANNEL)
+            self._subscribers_checked_at = now
+        return self._subscribers > 0
+
+    def publish(self, msgType: str, message: str):
+        """Notifies a message to the external apps, if any of them is listening.
+        """
+        if not self.hasSubscribers():
+            return
         pubsub_message = json.dumps({
-            'type': 'received',
+            'type': msgType,
             'message': message
         })
         self.redis.publish(PUBSUB_CHANNEL, pubsub_message)
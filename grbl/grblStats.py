@@ -0,0 +1,192 @@
+from collections import deque
+import threading
+import time
+from typing import Optional
+from .parsers.grblMsgTypes import GRBL_MSG_ALARM, GRBL_MSG_STATUS, GRBL_RESULT_ERROR, \
+    GRBL_RESULT_OK
+from .types import GrblControllerStats, LatencyHistogram, RxBufferOccupancy
+
+# Constants
+RATE_WINDOW = 1.0           # Seconds, to calculate the acks and status reports per second
+LATENCY_SAMPLES = 1000      # Send-to-ok latencies kept, to calculate the percentiles
+LATENCY_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]    # Upper bounds, milliseconds
+OCCUPANCY_SAMPLES = 600     # RX buffer fill samples kept, one per status query
+OCCUPANCY_BINS = 10         # Buckets of 10% of the RX buffer
+EOL_BYTES = 2               # GRBL ends its responses with '\r\n'
+
+
+class GrblStats:
+    """Performance counters of the communication with a GRBL device.
+
+    Every registered event only updates a few counters, so they can be kept
+    enabled in production; the statistics are calculated by get_stats.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status_report_savings = 0     # Bytes saved per status report, see $10
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._started_at = time.monotonic()
+
+            # Traffic
+            self._bytes_sent = 0
+            self._lines_sent = 0
+            self._realtime_sent = 0
+            self._bytes_received = 0
+            self._lines_received = 0
+            self._status_bytes_saved = 0
+
+            # Responses
+            self._oks = 0
+            self._errors = 0
+            self._alarms = 0
+            self._status_reports = 0
+            self._parse_failures = 0
+            self._ack_times: deque[float] = deque()
+            self._report_times: deque[float] = deque()
+
+            # Send-to-ok latency
+            self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+            self._latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+            # RX buffer occupancy
+            self._occupancy: deque[tuple[float, float]] = deque(maxlen=OCCUPANCY_SAMPLES)
+            self._occupancy_counts = [0] * OCCUPANCY_BINS
+
+    # REGISTER EVENTS
+
+    def register_sent(self, command: str, fill: float):
+        """Registers a line sent to GRBL, and the RX buffer fill (percentage) after sending it.
+        """
+        with self._lock:
+            self._bytes_sent += len(command) + 1
+            self._lines_sent += 1
+            self._occupancy_counts[min(int(fill * OCCUPANCY_BINS / 100), OCCUPANCY_BINS - 1)] += 1
+
+    def register_realtime(self):
+        """Registers a real-time command (single byte) sent to GRBL.
+        """
+        with self._lock:
+            self._bytes_sent += 1
+            self._realtime_sent += 1
+
+    def register_received(self, response: str, msg_type: Optional[str]):
+        """Registers a line received from GRBL, and its type (None if it couldn't be parsed).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._bytes_received += len(response) + EOL_BYTES
+            self._lines_received += 1
+
+            if msg_type == GRBL_RESULT_OK:
+                self._oks += 1
+                self._register_time(self._ack_times, now)
+            elif msg_type == GRBL_RESULT_ERROR:
+                self._errors += 1
+                self._register_time(self._ack_times, now)
+            elif msg_type == GRBL_MSG_STATUS:
+                self._status_reports += 1
+                self._status_bytes_saved += self._status_report_savings
+                self._register_time(self._report_times, now)
+            elif msg_type == GRBL_MSG_ALARM:
+                self._alarms += 1
+            elif msg_type is None:
+                self._parse_failures += 1
+
+    def register_latency(self, latency: float):
+        """Registers the time (seconds) since a line was sent until GRBL acknowledged it.
+        """
+        latency_ms = latency * 1000
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and latency_ms > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._latency_counts[bucket] += 1
+
+    def set_status_report_savings(self, saved: int):
+        """Sets the bytes saved in each status report received from now on,
+        by a smaller status report mask ($10).
+        """
+        with self._lock:
+            self._status_report_savings = saved
+
+    def register_occupancy(self, fill: float):
+        """Registers a sample of the RX buffer fill (percentage) over time.
+        """
+        with self._lock:
+            self._occupancy.append((time.time(), fill))
+
+    # STATISTICS
+
+    def get_stats(self, paused_time: float = 0.0) -> GrblControllerStats:
+        """Returns a snapshot of the counters, with the rates of the last RATE_WINDOW
+        seconds and the latency percentiles of the last LATENCY_SAMPLES lines.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for times in [self._ack_times, self._report_times]:
+                self._discard_old(times, now)
+
+            return {
+                'elapsed': now - self._started_at,
+                'bytes_sent': self._bytes_sent,
+                'lines_sent': self._lines_sent,
+                'realtime_sent': self._realtime_sent,
+                'bytes_received': self._bytes_received,
+                'lines_received': self._lines_received,
+                'oks': self._oks,
+                'errors': self._errors,
+                'alarms': self._alarms,
+                'parse_failures': self._parse_failures,
+                'status_reports': self._status_reports,
+                'acks_per_second': len(self._ack_times) / RATE_WINDOW,
+                'status_reports_per_second': len(self._report_times) / RATE_WINDOW,
+                'status_bytes_saved': self._status_bytes_saved,
+                'latency_ms': self._calculate_latency(),
+                'rx_buffer': self._calculate_occupancy(),
+                'paused_time': paused_time
+            }
+
+    # UTILITIES
+
+    def _register_time(self, times: deque[float], now: float):
+        times.append(now)
+        self._discard_old(times, now)
+
+    @staticmethod
+    def _discard_old(times: deque[float], now: float):
+        limit = now - RATE_WINDOW
+        while times and times[0] < limit:
+            times.popleft()
+
+    def _calculate_latency(self) -> LatencyHistogram:
+        ordered = sorted(self._latencies)
+
+        def percentile(p: int) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) * p // 100, len(ordered) - 1)]
+
+        return {
+            'samples': len(ordered),
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'max': ordered[-1] if ordered else 0.0,
+            'buckets': LATENCY_BUCKETS,
+            'counts': list(self._latency_counts)
+        }
+
+    def _calculate_occupancy(self) -> RxBufferOccupancy:
+        fills = [fill for _, fill in self._occupancy]
+        return {
+            'mean': sum(fills) / len(fills) if fills else 0.0,
+            'max': max(fills, default=0.0),
+            'histogram': list(self._occupancy_counts),
+            'samples': list(self._occupancy)
+        }
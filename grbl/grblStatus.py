@@ -1,6 +1,7 @@
 from .constants import GRBL_ACTIVE_STATE_ALARM, GRBL_ACTIVE_STATE_IDLE, GRBL_ACTIVE_STATE_CHECK
 from .types import GrblControllerState, GrblError
-from typing import Optional
+import time
+from typing import Any, Optional
 
 # Flags
 FLAG_CONNECTED = 'connected'
@@ -11,46 +12,51 @@ FLAG_ALARM = 'alarm'
 
 
 class GrblStatus:
-    _state: GrblControllerState = {
-        'status': {
-            'activeState': '',
-            'mpos': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-            'wpos': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-            'ov': [],
-            'subState': None,
-            'wco': {'x': 0.0, 'y': 0.0, 'z': 0.0},
-            'pinstate': None,
-            'buffer': None,
-            'line': None,
-            'accessoryState': None
-        },
-        'parserstate': {
-            'modal': {
-                'motion': 'G0',
-                'wcs': 'G54',
-                'plane': 'G17',
-                'units': 'G21',
-                'distance': 'G90',
-                'feedrate': 'G94',
-                'program': 'M0',
-                'spindle': 'M5',
-                'coolant': 'M9'
+    def __init__(self):
+        # Machine state, owned by each controller
+        self._state: GrblControllerState = {
+            'status': {
+                'activeState': '',
+                'mpos': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+                'wpos': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+                'ov': [],
+                'subState': None,
+                'wco': {'x': 0.0, 'y': 0.0, 'z': 0.0},
+                'pinstate': None,
+                'buffer': None,
+                'line': None,
+                'accessoryState': None
             },
-            'tool': 0,
-            'feedrate': 0.0,
-            'spindle': 0.0
+            'parserstate': {
+                'modal': {
+                    'motion': 'G0',
+                    'wcs': 'G54',
+                    'plane': 'G17',
+                    'units': 'G21',
+                    'distance': 'G90',
+                    'feedrate': 'G94',
+                    'program': 'M0',
+                    'spindle': 'M5',
+                    'coolant': 'M9'
+                },
+                'tool': 0,
+                'feedrate': 0.0,
+                'spindle': 0.0
+            }
+        }
+
+        self._flags = {
+            'connected': False,     # Machine is connected
+            'stop': False,          # Raise to stop current run
+            'finished': False,      # Notification of program end (M2/M30)
+            'paused': False,        # Machine is on Hold
+            'alarm': False,         # Display alarm message
         }
-    }
 
-    _flags = {
-        'connected': False,     # Machine is connected
-        'stop': False,          # Raise to stop current run
-        'finished': False,      # Notification of program end (M2/M30)
-        'paused': False,        # Machine is on Hold
-        'alarm': False,         # Display alarm message
-    }
+        # Time spent paused, since the controller was created
+        self._paused_since: Optional[float] = None
+        self._paused_time = 0.0
 
-    def __init__(self):
         # Errors management
         self._error_line: Optional[str] = None
         self._error_data: Optional[GrblError] = None
@@ -58,6 +64,8 @@ class GrblStatus:
     # SETTERS
 
     def set_flag(self, key: str, value: bool):
+        if key == FLAG_PAUSED and value != self._flags[key]:
+            self._update_paused_time(value)
         self._flags[key] = value
 
     def set_active_state(self, state: str):
@@ -66,7 +74,7 @@ class GrblStatus:
     def update_status(self, status: dict[str, str]):
         self._state['status'].update(status)
 
-    def update_parser_state(self, parser_state: dict[str, str]):
+    def update_parser_state(self, parser_state: dict[str, Any]):
         self._state['parserstate'].update(parser_state)
 
     def set_tool(self, tool_index: int):
@@ -93,6 +101,14 @@ class GrblStatus:
     def get_flag(self, key: str):
         return self._flags[key]
 
+    def get_paused_time(self) -> float:
+        """Returns the time (seconds) the device has spent paused,
+        including the current pause, if any.
+        """
+        if self._paused_since is None:
+            return self._paused_time
+        return self._paused_time + time.monotonic() - self._paused_since
+
     def get_mpos(self) -> dict[str, float]:
         """Returns the GRBL device's current machine position.
 
@@ -212,3 +228,12 @@ class GrblStatus:
             f'while executing line: {self._error_line}\n'
             f'{self._error_data["message"]}:{self._error_data["description"]}'
         )
+
+    def _update_paused_time(self, paused: bool):
+        now = time.monotonic()
+        if paused:
+            self._paused_since = now
+            return
+        if self._paused_since is not None:
+            self._paused_time += now - self._paused_since
+        self._paused_since = None
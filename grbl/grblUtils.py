@@ -1,4 +1,5 @@
 import re
+from typing import Optional
 from .constants import GRBL_SETTINGS
 
 # Constants
@@ -6,6 +7,18 @@ JOG_UNIT_MILIMETERS = 'milimeters'
 JOG_UNIT_INCHES = 'inches'
 JOG_DISTANCE_ABSOLUTE = 'distance_absolute'
 JOG_DISTANCE_INCREMENTAL = 'distance_incremental'
+GCODE_WORD_PATTERN = re.compile(r'([A-Z])([-+]?(?:\d+\.?\d*|\.\d+))')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+COMMENT_LINE_PATTERN = re.compile(r'(^\(.*\)$)|(^;.*)')  # Lines with only a comment
+COMMENT_PATTERN = re.compile(r'\([^)]*\)|;.*$')   # Inline comments
+
+# Fields of the status reports enabled by the status report mask ($10)
+STATUS_FIELD_MPOS = 'mpos'
+STATUS_FIELD_WPOS = 'wpos'
+STATUS_FIELD_BUFFER = 'buffer'
+STATUS_MASK_MPOS = 1        # Machine position instead of the work position
+STATUS_MASK_BUFFER = 2      # Buffer state (Bf:)
+STATUS_BUFFER_BYTES = len('|Bf:15,128')     # Approximate size of the buffer state field
 
 
 def build_jog_command(
@@ -66,8 +79,65 @@ def is_setting_update_command(command) -> bool:
     return True
 
 
+def is_interactive_command(command: str) -> bool:
+    """Checks if the command is a GRBL system command or a jog, which are sent
+    from the user interface instead of from a G-code program.
+
+    For example:
+    $X
+    $J=G91 X10 F100
+    """
+    return command.strip().startswith('$')
+
+
 def get_grbl_setting(key: str):
     for element in GRBL_SETTINGS:
         if element['setting'] == key:
             return element
     return None
+
+
+def split_gcode_words(line: str) -> Optional[list[tuple[str, str]]]:
+    """Splits a G-code line, without comments, in its words (letter and value).
+    Returns None if the line is not a sequence of valid words.
+
+    For example:
+    'G1 X10.5 y-2' -> [('G', '1'), ('X', '10.5'), ('Y', '-2')]
+    """
+    compact = WHITESPACE_PATTERN.sub('', line).upper()
+    words = GCODE_WORD_PATTERN.findall(compact)
+    if sum(len(letter) + len(value) for letter, value in words) != len(compact):
+        return None
+    return words
+
+
+def get_status_mask(fields: set[str], current: int) -> int:
+    """Returns the smallest status report mask ($10) which includes the required fields.
+
+    GRBL always reports one position, with the same size either way, so the
+    current one is kept unless a field requires the other. The machine position
+    is preferred when both are required.
+
+    For example:
+    {'buffer'}, 1 -> 3
+    {'wpos'}, 3 -> 0
+    """
+    mask = current & STATUS_MASK_MPOS
+    if STATUS_FIELD_MPOS in fields:
+        mask = STATUS_MASK_MPOS
+    elif STATUS_FIELD_WPOS in fields:
+        mask = 0
+
+    if STATUS_FIELD_BUFFER in fields:
+        mask |= STATUS_MASK_BUFFER
+    return mask
+
+
+def get_status_mask_savings(original: int, mask: int) -> int:
+    """Returns the approximate amount of bytes saved in each status report
+    by using the given status report mask ($10) instead of the original one.
+    Negative if the reports are larger.
+    """
+    return STATUS_BUFFER_BYTES * (
+        bool(original & STATUS_MASK_BUFFER) - bool(mask & STATUS_MASK_BUFFER)
+    )
@@ -65,7 +65,7 @@ class GrblParserMsgStatus(GrblParserGeneric):
         if 'WPos' in result.keys():
             wPos = result['WPos']
             payload['wpos'] = {}
-            for i in range(len(mPos)):
+            for i in range(len(wPos)):
                 payload['wpos'][axes[i]] = float(wPos[i])
 
         # Work Coordinate Offset
@@ -0,0 +1,82 @@
+from collections import deque
+from ..streaming.streamingStrategy import StreamingStrategy, \
+    STREAMING_CHARACTER_COUNTING, STREAMING_SEND_RESPONSE
+
+# Constants
+ERRORS_WINDOW = 50          # Amount of responses used to calculate the error rate
+MAX_ERROR_RATE = 0.05       # Error rate over which the link is considered unreliable
+RECOVERY_RESPONSES = 200    # Clean responses required to go back to character counting
+
+
+class AdaptiveStrategy(StreamingStrategy):
+    """Streams with character counting while the link is reliable, and falls back
+    to send-response when the rate of error responses goes over a threshold.
+
+    Switches back to character counting after enough consecutive clean responses.
+    """
+    def __init__(
+            self,
+            rx_buffer_size: int, *,
+            errors_window: int = ERRORS_WINDOW,
+            max_error_rate: float = MAX_ERROR_RATE,
+            recovery_responses: int = RECOVERY_RESPONSES
+    ):
+        super().__init__(rx_buffer_size)
+        self.mode = STREAMING_CHARACTER_COUNTING
+        self.switches = 0
+        self.max_error_rate = max_error_rate
+        self.recovery_responses = recovery_responses
+        self._results: deque[bool] = deque(maxlen=errors_window)
+        self._errors = 0
+        self._clean_streak = 0
+
+    def can_send(self, command: str) -> bool:
+        if not self._pending:
+            return True
+        if self.mode == STREAMING_SEND_RESPONSE:
+            return False
+        return self._used + len(command) + 1 <= self.capacity()
+
+    def acknowledged(self, error: bool = False) -> str:
+        command = super().acknowledged(error)
+        self._register_result(error)
+        return command
+
+    def get_error_rate(self) -> float:
+        """Returns the rate of error responses within the last responses.
+        """
+        if not self._results:
+            return 0.0
+        return self._errors / len(self._results)
+
+    def _register_result(self, error: bool):
+        # Keep the count of errors within the window
+        if len(self._results) == self._results.maxlen and self._results[0]:
+            self._errors -= 1
+        self._results.append(error)
+        if error:
+            self._errors += 1
+
+        self._clean_streak = 0 if error else self._clean_streak + 1
+
+        is_full_window = len(self._results) == self._results.maxlen
+        if (
+            self.mode == STREAMING_CHARACTER_COUNTING
+            and is_full_window
+            and self.get_error_rate() > self.max_error_rate
+        ):
+            self._switch_mode(STREAMING_SEND_RESPONSE)
+            return
+
+        if (
+            self.mode == STREAMING_SEND_RESPONSE
+            and self._clean_streak >= self.recovery_responses
+        ):
+            self._switch_mode(STREAMING_CHARACTER_COUNTING)
+
+    def _switch_mode(self, mode: str):
+        self.mode = mode
+        self.switches += 1
+        self._results.clear()
+        self._errors = 0
+        self._clean_streak = 0
@@ -0,0 +1,15 @@
+from ..streaming.streamingStrategy import StreamingStrategy
+
+
+class CharacterCountingStrategy(StreamingStrategy):
+    """Streams commands as long as they fit in the GRBL RX buffer.
+
+    Keeps the RX buffer as full as possible, so GRBL can parse the next
+    command while it is executing the current one.
+    This is the fastest protocol, and the one recommended by GRBL.
+    """
+    def can_send(self, command: str) -> bool:
+        # A command longer than the whole buffer can only be sent when it is empty
+        if not self._pending:
+            return True
+        return self._used + len(command) + 1 <= self.capacity()
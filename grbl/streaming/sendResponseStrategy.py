@@ -0,0 +1,11 @@
+from ..streaming.streamingStrategy import StreamingStrategy
+
+
+class SendResponseStrategy(StreamingStrategy):
+    """Sends a command only after the previous one was acknowledged.
+
+    Slower than character counting, since the serial round trip is added
+    to every command, but more robust on unreliable links.
+    """
+    def can_send(self, command: str) -> bool:
+        return not self._pending
@@ -0,0 +1,81 @@
+from abc import abstractmethod
+from collections import deque
+
+# Streaming protocols
+STREAMING_CHARACTER_COUNTING = 'character_counting'
+STREAMING_SEND_RESPONSE = 'send_response'
+STREAMING_ADAPTIVE = 'adaptive'
+
+
+class StreamingStrategy:
+    """Base class to define the flow control used to stream commands to GRBL.
+
+    Keeps track of the commands sent to GRBL and not yet acknowledged,
+    in the same order GRBL will respond to them.
+    Every operation is O(1): a running total of the occupied bytes is kept,
+    instead of summing the pending commands each time.
+    """
+    def __init__(self, rx_buffer_size: int):
+        self.rx_buffer_size = rx_buffer_size
+        self._pending: deque[str] = deque()     # Commands in GRBL buffer
+        self._used = 0                          # Amount of bytes in GRBL buffer
+
+    @abstractmethod
+    def can_send(self, command: str) -> bool:
+        """Checks whether the command can be sent to GRBL right now.
+
+        Args:
+            command: The command to send, without the EOL character.
+        """
+        raise NotImplementedError   # pragma: no cover
+
+    def sent(self, command: str):
+        """Registers a command sent to GRBL.
+        """
+        self._pending.append(command)
+        self._used += len(command) + 1  # Account for the EOL character
+
+    def acknowledged(self, error: bool = False) -> str:
+        """Registers a response ('ok' or 'error') from GRBL and returns
+        the command it belongs to, or an empty string if there was none.
+        """
+        if not self._pending:
+            return ''
+
+        command = self._pending.popleft()
+        self._used -= len(command) + 1
+        return command
+
+    def reset(self):
+        """Forgets all pending commands, for example after a soft-reset.
+        """
+        self._pending.clear()
+        self._used = 0
+
+    def set_buffer_size(self, rx_buffer_size: int):
+        """Updates the size of the GRBL RX buffer.
+        """
+        self.rx_buffer_size = rx_buffer_size
+
+    # GETTERS
+
+    def capacity(self) -> int:
+        """Returns the amount of bytes GRBL can actually hold in its RX buffer,
+        since its ring buffer always keeps one slot free.
+        """
+        return self.rx_buffer_size - 1
+
+    def used_bytes(self) -> int:
+        """Returns the amount of bytes currently occupied in the GRBL RX buffer.
+        """
+        return self._used
+
+    def pending_lines(self) -> int:
+        """Returns the amount of commands sent and not yet acknowledged.
+        """
+        return len(self._pending)
+
+    def pending_commands(self) -> list[str]:
+        """Returns the commands sent and not yet acknowledged, oldest first.
+        """
+        return list(self._pending)
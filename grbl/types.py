@@ -1,4 +1,5 @@
-from typing import List, Dict, Optional
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Tuple
 from typing_extensions import TypedDict
 
 # Definition of types
@@ -64,4 +65,73 @@ GrblBuildInfo = TypedDict('GrblBuildInfo', {
     'blockBufferSize': int,
     'rxBufferSize': int
 })
+JogParameters = TypedDict('JogParameters', {
+    'x': float,
+    'y': float,
+    'z': float,
+    'feedrate': float,
+    'units': Optional[str],
+    'distance_mode': Optional[str],
+    'machine_coordinates': bool
+})
+LaneLatency = TypedDict('LaneLatency', {
+    'samples': int,
+    'mean': float,
+    'p50': float,
+    'p99': float,
+    'max': float
+})
 GrblResponse = tuple[Optional[str], dict[str, str]]
+LatencyHistogram = TypedDict('LatencyHistogram', {
+    'samples': int,
+    'p50': float,
+    'p95': float,
+    'p99': float,
+    'max': float,
+    'buckets': List[int],
+    'counts': List[int]
+})
+RxBufferOccupancy = TypedDict('RxBufferOccupancy', {
+    'mean': float,
+    'max': float,
+    'histogram': List[int],
+    'samples': List[Tuple[float, float]]
+})
+GrblControllerStats = TypedDict('GrblControllerStats', {
+    'elapsed': float,
+    'bytes_sent': int,
+    'lines_sent': int,
+    'realtime_sent': int,
+    'bytes_received': int,
+    'lines_received': int,
+    'oks': int,
+    'errors': int,
+    'alarms': int,
+    'parse_failures': int,
+    'status_reports': int,
+    'acks_per_second': float,
+    'status_reports_per_second': float,
+    'status_bytes_saved': int,
+    'latency_ms': LatencyHistogram,
+    'rx_buffer': RxBufferOccupancy,
+    'paused_time': float
+})
+DiscoveredDevice = TypedDict('DiscoveredDevice', {
+    'port': str,
+    'baudrate': int,
+    'firmware': str,
+    'version': str,
+    'message': Optional[str]
+})
+CommandResult = TypedDict('CommandResult', {
+    'id': int,
+    'command': str,
+    'response': str,
+    'lines': List[str]
+})
+PendingCommand = TypedDict('PendingCommand', {
+    'id': int,
+    'command': str,
+    'future': 'Future[CommandResult]',
+    'lines': List[str]
+})
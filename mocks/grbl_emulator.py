@@ -0,0 +1,659 @@
+from collections import deque
+import math
+import re
+import threading
+import time
+from typing import Optional
+from typing_extensions import TypedDict
+
+try:
+    from ..utils.transport import Transport
+except ImportError:
+    from utils.transport import Transport
+
+# Constants
+GRBL_VERSION = '1.1h'
+GRBL_BUILD_DATE = '20190825'
+WELCOME_MESSAGE = f"Grbl {GRBL_VERSION} ['$' for help]"
+HELP_MESSAGE = '[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $SLP $C $X $H ~ ! ? ctrl-x]'
+MM_PER_INCH = 25.4
+
+# Real-time commands, processed as soon as they are received
+CMD_STATUS_REPORT = ord('?')
+CMD_CYCLE_START = ord('~')
+CMD_FEED_HOLD = ord('!')
+CMD_RESET = 0x18
+CMD_JOG_CANCEL = 0x85
+REALTIME_PATTERN = re.compile(rb'[?~!\x18\x80-\xff]')
+
+# Error and alarm codes
+# https://github.com/gnea/grbl/blob/master/doc/csv/error_codes_en_US.csv
+ERROR_EXPECTED_COMMAND_LETTER = 1
+ERROR_BAD_NUMBER_FORMAT = 2
+ERROR_INVALID_STATEMENT = 3
+ERROR_SETTING_DISABLED = 5
+ERROR_SYSTEM_GC_LOCK = 9
+ERROR_SOFT_LIMIT = 10
+ERROR_UNSUPPORTED_COMMAND = 20
+ERROR_UNDEFINED_FEED_RATE = 22
+ERROR_INVALID_JOG_COMMAND = 16
+ALARM_HARD_LIMIT = 1
+ALARM_SOFT_LIMIT = 2
+ALARM_ABORT_CYCLE = 3
+
+# GRBL 1.1 default settings, with the buffer state enabled in the status reports ($10=3)
+DEFAULT_SETTINGS = {
+    0: 10.0, 1: 25.0, 2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0, 6: 0.0,
+    10: 3.0, 11: 0.010, 12: 0.002, 13: 0.0,
+    20: 0.0, 21: 0.0, 22: 0.0, 23: 0.0, 24: 25.0, 25: 500.0, 26: 250.0, 27: 1.0,
+    30: 1000.0, 31: 0.0, 32: 0.0,
+    100: 250.0, 101: 250.0, 102: 250.0,
+    110: 500.0, 111: 500.0, 112: 500.0,
+    120: 10.0, 121: 10.0, 122: 10.0,
+    130: 200.0, 131: 200.0, 132: 200.0
+}
+INTEGER_SETTINGS = {0, 1, 2, 3, 4, 5, 6, 10, 13, 20, 21, 22, 23, 26, 30, 31, 32}
+
+# Modal G-codes accepted by the emulator, besides the motion ones
+MODAL_WORDS = {
+    'G17': 'plane', 'G18': 'plane', 'G19': 'plane',
+    'G20': 'units', 'G21': 'units',
+    'G90': 'distance', 'G91': 'distance',
+    'G93': 'feedrate', 'G94': 'feedrate',
+    'G54': 'wcs', 'G55': 'wcs', 'G56': 'wcs', 'G57': 'wcs', 'G58': 'wcs', 'G59': 'wcs',
+    'M0': 'program', 'M1': 'program', 'M2': 'program', 'M30': 'program',
+    'M3': 'spindle', 'M4': 'spindle', 'M5': 'spindle',
+    'M7': 'coolant', 'M8': 'coolant', 'M9': 'coolant'
+}
+NON_MODAL_WORDS = {'G4', 'G10', 'G28', 'G30', 'G53', 'G92', 'G40', 'G43.1', 'G49', 'G80'}
+MOTION_WORDS = {'G0', 'G1', 'G2', 'G3'}
+AXES = 'XYZ'
+WORD_PATTERN = re.compile(r'([A-Z])([-+]?(?:\d+\.?\d*|\.\d+))')
+
+EmulatorStats = TypedDict('EmulatorStats', {
+    'lines': int,
+    'oks': int,
+    'errors': int,
+    'alarms': int,
+    'status_reports': int,
+    'rx_overflows': int,
+    'rx_max_used': int,
+    'planner_max_used': int,
+    'sim_time': float
+})
+
+
+class PlannerBlock:
+    """Motion (or dwell) queued in the planner.
+    """
+
+    def __init__(self, start: list[float], target: list[float], duration: float, feed: float):
+        self.start = start
+        self.target = target
+        self.duration = duration
+        self.feed = feed
+
+
+class GrblEmulator(Transport):
+    """In-process emulation of a GRBL 1.1 device, to be used as a transport.
+
+    The emulator models:
+        - The serial RX buffer: lines wait there until the planner has room for them,
+        and the characters exceeding its size are lost (and counted).
+        - The planner queue, which executes the motions at the programmed feed rate,
+        with a trapezoidal velocity profile limited by the acceleration settings.
+        - The responses (ok, error:N, ALARM:N), real-time commands (?, !, ~, ctrl-x,
+        jog cancel) and the $$, $#, $G, $I, $X, $H, $C, $J= commands.
+
+    The simulated time runs `speedup` times faster than the real time.
+    With `speedup=None` it only advances when calling advance(), which makes
+    the emulation deterministic.
+    """
+
+    def __init__(
+            self, *,
+            rx_buffer_size: int = 128,
+            planner_size: int = 15,
+            speedup: Optional[float] = 100.0,
+            settings: Optional[dict[int, float]] = None
+    ):
+        super().__init__()
+        self.rx_buffer_size = rx_buffer_size
+        self.planner_size = planner_size
+        self.speedup = speedup
+        self.default_settings = {**DEFAULT_SETTINGS, **(settings or {})}
+
+        # Protects the emulator state, which is accessed by the reader and writer threads
+        self._condition = threading.Condition()
+        self._open = False
+        self._output = bytearray()
+        self.reset()
+
+    # Transport
+
+    def open(self, port: str, baudrate: int):
+        with self._condition:
+            self._open = True
+            self.settings = dict(self.default_settings)
+            self.reset()
+
+    def isOpen(self) -> bool:
+        return self._open
+
+    def close(self):
+        with self._condition:
+            self._open = False
+            self._condition.notify_all()
+
+    def fileno(self) -> int:
+        raise NotImplementedError('The emulator can only be used by threaded controllers')
+
+    def _readChunk(self, timeout: float) -> bytes:
+        deadline = time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                self._update()
+                if self._output:
+                    data = bytes(self._output)
+                    self._output.clear()
+                    return data
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._open:
+                    return b''
+                self._condition.wait(min(remaining, self._timeToNextEvent()))
+
+    def _write(self, data: bytes):
+        with self._condition:
+            self._update()
+
+            if REALTIME_PATTERN.search(data):
+                for byte in data:
+                    if REALTIME_PATTERN.match(bytes([byte])):
+                        self._realtimeCommand(byte)
+                    else:
+                        self._receive(bytes([byte]))
+            else:
+                self._receive(data)
+
+            self._processLines()
+            self._condition.notify_all()
+
+    # Simulation control
+
+    def reset(self):
+        """Resets the firmware state, like a power cycle.
+        """
+        with self._condition:
+            self.settings = dict(self.default_settings)
+            self.position = [0.0, 0.0, 0.0]
+            self.offsets = {
+                wcs: [0.0, 0.0, 0.0] for wcs in ['G54', 'G55', 'G56', 'G57', 'G58', 'G59']
+            }
+            self.g92_offset = [0.0, 0.0, 0.0]
+            self.alarm: Optional[int] = None
+            self.stats: EmulatorStats = {
+                'lines': 0,
+                'oks': 0,
+                'errors': 0,
+                'alarms': 0,
+                'status_reports': 0,
+                'rx_overflows': 0,
+                'rx_max_used': 0,
+                'planner_max_used': 0,
+                'sim_time': 0.0
+            }
+            self._sim_time = 0.0
+            self._real_time = time.monotonic()
+            self._softReset()
+
+    def advance(self, seconds: float):
+        """Advances the simulated time, mainly when it doesn't run by itself (speedup=None).
+        """
+        with self._condition:
+            self._update()
+            self._sim_time += seconds
+            self._update()
+            self._condition.notify_all()
+
+    def triggerAlarm(self, code: int = ALARM_HARD_LIMIT):
+        """Emulates an alarm raised by the machine, like a hard limit.
+        """
+        with self._condition:
+            self._raiseAlarm(code)
+            self._condition.notify_all()
+
+    def getState(self) -> str:
+        with self._condition:
+            self._update()
+            return self._activeState()
+
+    def _softReset(self):
+        self._rx = bytearray()
+        self._planner: deque[PlannerBlock] = deque()
+        self._block_started = self._sim_time
+        self._hold = False
+        self._hold_elapsed = 0.0
+        self._check_mode = False
+        self._jogging = False
+        self.modal = {
+            'motion': 'G0',
+            'wcs': 'G54',
+            'plane': 'G17',
+            'units': 'G21',
+            'distance': 'G90',
+            'feedrate': 'G94',
+            'program': 'M0',
+            'spindle': 'M5',
+            'coolant': 'M9'
+        }
+        self.tool = 0
+        self.feed = 0.0
+        self.spindle = 0.0
+        self._output += f'\r\n{WELCOME_MESSAGE}\r\n'.encode()
+        if self.alarm is not None:
+            self._output += b"[MSG:'$H'|'$X' to unlock]\r\n"
+
+    # Time management
+
+    def _now(self) -> float:
+        if self.speedup is not None:
+            real_time = time.monotonic()
+            self._sim_time += (real_time - self._real_time) * self.speedup
+            self._real_time = real_time
+        return self._sim_time
+
+    def _update(self):
+        """Executes the planner blocks finished until now,
+        and processes the lines waiting for room in the planner.
+        """
+        now = self._now()
+        self.stats['sim_time'] = now
+
+        if self._hold:
+            # The motion is frozen while on hold
+            self._block_started = now - self._hold_elapsed
+            self._processLines()
+            return
+
+        while self._planner:
+            block = self._planner[0]
+            if now - self._block_started < block.duration:
+                break
+            self._planner.popleft()
+            self.position = list(block.target)
+            self._block_started += block.duration
+
+        if not self._planner:
+            self._block_started = now
+            self._jogging = False
+
+        self._processLines()
+
+    def _timeToNextEvent(self) -> float:
+        """Returns the real time until the current planner block finishes.
+        """
+        if not self._planner or self._hold or not self.speedup:
+            return 3600.0
+        sim_remaining = self._planner[0].duration - (self._sim_time - self._block_started)
+        return max(sim_remaining / self.speedup, 0.0)
+
+    # Serial input
+
+    def _receive(self, data: bytes):
+        capacity = self.rx_buffer_size - 1
+        available = capacity - len(self._rx)
+        if len(data) > available:
+            self.stats['rx_overflows'] += len(data) - available
+            data = data[:available]
+        self._rx += data
+        self.stats['rx_max_used'] = max(self.stats['rx_max_used'], len(self._rx))
+
+    def _realtimeCommand(self, byte: int):
+        if byte == CMD_STATUS_REPORT:
+            self._output += self._statusReport().encode() + b'\r\n'
+            self.stats['status_reports'] += 1
+        elif byte == CMD_FEED_HOLD:
+            if self._planner and not self._hold:
+                self._hold = True
+                self._hold_elapsed = self._sim_time - self._block_started
+        elif byte == CMD_CYCLE_START:
+            if self._hold:
+                self._hold = False
+                self._block_started = self._sim_time - self._hold_elapsed
+                self._hold_elapsed = 0.0
+        elif byte == CMD_RESET:
+            if self._planner and not self._hold:
+                self._raiseAlarm(ALARM_ABORT_CYCLE)
+            self._softReset()
+        elif byte == CMD_JOG_CANCEL:
+            # The planned jogs are discarded, but not the lines in the RX buffer,
+            # and the machine stops right away (the deceleration isn't modelled)
+            if self._jogging:
+                self.position = self._currentPosition()
+                self._planner.clear()
+                self._block_started = self._sim_time
+                self._jogging = False
+
+    def _processLines(self):
+        while True:
+            eol = self._rx.find(b'\n')
+            if eol < 0:
+                return
+            line = self._rx[:eol].decode('ascii', 'ignore').strip().upper()
+
+            # The block waits in the RX buffer until the planner has room for it
+            if len(self._planner) >= self.planner_size and self._needsPlanner(line):
+                return
+
+            del self._rx[:eol + 1]
+            self.stats['lines'] += 1
+            self._respond(self._execute(line))
+
+    def _respond(self, error: Optional[int]):
+        if error is None:
+            self._output += b'ok\r\n'
+            self.stats['oks'] += 1
+        else:
+            self._output += f'error:{error}\r\n'.encode()
+            self.stats['errors'] += 1
+
+    def _raiseAlarm(self, code: int):
+        self.alarm = code
+        self._planner.clear()
+        self._rx = bytearray()
+        self._output += f'ALARM:{code}\r\n'.encode()
+        self.stats['alarms'] += 1
+
+    @staticmethod
+    def _needsPlanner(line: str) -> bool:
+        return bool(line) and (not line.startswith('$') or line.startswith('$J='))
+
+    # Commands execution
+
+    def _execute(self, line: str) -> Optional[int]:
+        """Executes a line, returning the error code if it failed.
+        """
+        line = re.sub(r'\(.*?\)|;.*$|\s', '', line)
+        if not line:
+            return None
+        if line.startswith('$J='):
+            if self.alarm is not None:
+                return ERROR_SYSTEM_GC_LOCK
+            return self._executeGcode(line[3:], jog=True)
+        if line.startswith('$'):
+            return self._executeSystemCommand(line)
+        if self.alarm is not None:
+            return ERROR_SYSTEM_GC_LOCK
+        return self._executeGcode(line)
+
+    def _executeSystemCommand(self, line: str) -> Optional[int]:
+        if line == '$':
+            self._output += f'{HELP_MESSAGE}\r\n'.encode()
+            return None
+
+        if line == '$$':
+            for key, value in self.settings.items():
+                number = f'{int(value)}' if key in INTEGER_SETTINGS else f'{value:.3f}'
+                self._output += f'${key}={number}\r\n'.encode()
+            return None
+
+        if line == '$#':
+            for wcs, offset in self.offsets.items():
+                self._output += f'[{wcs}:{self._formatAxes(offset)}]\r\n'.encode()
+            for name in ['G28', 'G30']:
+                self._output += f'[{name}:{self._formatAxes([0.0, 0.0, 0.0])}]\r\n'.encode()
+            self._output += f'[G92:{self._formatAxes(self.g92_offset)}]\r\n'.encode()
+            self._output += b'[TLO:0.000]\r\n[PRB:0.000,0.000,0.000:0]\r\n'
+            return None
+
+        if line == '$G':
+            modal = ' '.join(self.modal[group] for group in [
+                'motion', 'wcs', 'plane', 'units', 'distance', 'feedrate',
+                'program', 'spindle', 'coolant'
+            ])
+            parser_state = f'[GC:{modal} T{self.tool} F{self.feed:g} S{self.spindle:g}]'
+            self._output += f'{parser_state}\r\n'.encode()
+            return None
+
+        if line == '$I':
+            self._output += f'[VER:{GRBL_VERSION}.{GRBL_BUILD_DATE}:]\r\n'.encode()
+            options = f'[OPT:V,{self.planner_size},{self.rx_buffer_size}]'
+            self._output += f'{options}\r\n'.encode()
+            return None
+
+        if line == '$X':
+            if self.alarm is not None:
+                self.alarm = None
+                self._output += b'[MSG:Caution: Unlocked]\r\n'
+            return None
+
+        if line == '$H':
+            if not self.settings[22]:
+                return ERROR_SETTING_DISABLED
+            self.alarm = None
+            self.position = [0.0, 0.0, 0.0]
+            return None
+
+        if line == '$C':
+            self._check_mode = not self._check_mode
+            self._output += b'[MSG:Enabled]\r\n' if self._check_mode else b'[MSG:Disabled]\r\n'
+            return None
+
+        setting = re.match(r'^\$(\d+)=([-+]?(?:\d+\.?\d*|\.\d+))$', line)
+        if setting and int(setting.group(1)) in self.settings:
+            self.settings[int(setting.group(1))] = float(setting.group(2))
+            return None
+
+        return ERROR_INVALID_STATEMENT
+
+    def _executeGcode(self, line: str, jog: bool = False) -> Optional[int]:
+        words = WORD_PATTERN.findall(line)
+        if ''.join(letter + value for letter, value in words) != line:
+            return ERROR_EXPECTED_COMMAND_LETTER if line[:1].isdigit() else ERROR_BAD_NUMBER_FORMAT
+
+        modal = dict(self.modal)
+        if jog:
+            modal['motion'] = 'G1'
+        axes: dict[int, float] = {}
+        feed = self.feed
+        dwell: Optional[float] = None
+        non_modal: Optional[str] = None
+        l_word: Optional[int] = None
+        p_word: Optional[float] = None
+
+        for letter, value in words:
+            number = float(value)
+            if letter in 'GM':
+                code = f'{letter}{number:g}'
+                if code in MOTION_WORDS and not jog:
+                    modal['motion'] = code
+                elif code in MODAL_WORDS:
+                    modal[MODAL_WORDS[code]] = code
+                elif code in NON_MODAL_WORDS:
+                    non_modal = code
+                else:
+                    return ERROR_UNSUPPORTED_COMMAND
+            elif letter in AXES:
+                axes[AXES.index(letter)] = number
+            elif letter == 'F':
+                feed = number
+            elif letter == 'S':
+                self.spindle = number
+            elif letter == 'T':
+                self.tool = int(number)
+            elif letter == 'L':
+                l_word = int(number)
+            elif letter == 'P':
+                p_word = number
+            elif letter in 'IJKRN':
+                continue
+            else:
+                return ERROR_UNSUPPORTED_COMMAND
+
+        scale = MM_PER_INCH if modal['units'] == 'G20' else 1.0
+        if 'F' in line:
+            feed = feed * scale
+
+        # Non-modal commands
+        if non_modal == 'G4':
+            dwell = p_word or 0.0
+        if non_modal == 'G10':
+            if l_word not in (2, 20) or p_word is None or not 0 <= p_word <= 6:
+                return ERROR_UNSUPPORTED_COMMAND
+            wcs = modal['wcs'] if p_word == 0 else f'G{53 + int(p_word)}'
+            for axis, value in axes.items():
+                if l_word == 2:
+                    self.offsets[wcs][axis] = value * scale
+                else:
+                    self.offsets[wcs][axis] = self._plannedPosition()[axis] - value * scale
+            self.modal = modal
+            return None
+        if non_modal == 'G92':
+            position = self._plannedPosition()
+            for axis, value in axes.items():
+                self.g92_offset[axis] = (
+                    position[axis] - self.offsets[modal['wcs']][axis] - value * scale
+                )
+            self.modal = modal
+            return None
+
+        # Motion
+        target: Optional[list[float]] = None
+        if axes and non_modal in (None, 'G53', 'G28', 'G30'):
+            start = self._plannedPosition()
+            target = list(start)
+            for axis, value in axes.items():
+                value = value * scale
+                if non_modal == 'G53':
+                    target[axis] = value
+                elif modal['distance'] == 'G91' or (jog and 'G90' not in line):
+                    target[axis] = start[axis] + value
+                else:
+                    offset = self.offsets[modal['wcs']][axis] + self.g92_offset[axis]
+                    target[axis] = value + offset
+            if non_modal in ('G28', 'G30'):
+                target = [0.0, 0.0, 0.0]
+
+        rapid = (modal['motion'] == 'G0' and not jog) or non_modal in ('G28', 'G30')
+        if target is not None and not rapid and feed <= 0:
+            return ERROR_UNDEFINED_FEED_RATE
+
+        if target is not None and self.settings[20]:
+            for axis, value in enumerate(target):
+                if value > 0 or value < -self.settings[130 + axis]:
+                    if jog:
+                        return ERROR_SOFT_LIMIT
+                    self._raiseAlarm(ALARM_SOFT_LIMIT)
+                    return None
+
+        self.modal = modal
+        self.feed = feed
+        if self._check_mode:
+            return None
+
+        if target is not None:
+            self._plan(target, None if rapid else feed, jog)
+        if dwell is not None:
+            self._planDwell(dwell)
+        return None
+
+    # Motion planning
+
+    def _plannedPosition(self) -> list[float]:
+        """Returns the position at the end of the planned motions.
+        """
+        if self._planner:
+            return list(self._planner[-1].target)
+        return list(self.position)
+
+    def _plan(self, target: list[float], feed: Optional[float], jog: bool):
+        start = self._plannedPosition()
+        deltas = [end - begin for begin, end in zip(start, target)]
+        distance = math.sqrt(sum(delta * delta for delta in deltas))
+        if distance == 0:
+            return
+
+        # Limit the rate and acceleration to the slowest moving axis
+        moving = [axis for axis, delta in enumerate(deltas) if delta]
+        max_rate = min(self.settings[110 + axis] for axis in moving)
+        acceleration = min(self.settings[120 + axis] for axis in moving)
+        rate = max_rate if feed is None else min(feed, max_rate)
+
+        duration = self._duration(distance, rate, acceleration)
+        self._enqueue(PlannerBlock(start, target, duration, rate))
+        self._jogging = self._jogging or jog
+
+    def _planDwell(self, seconds: float):
+        position = self._plannedPosition()
+        self._enqueue(PlannerBlock(position, position, seconds, 0.0))
+
+    def _enqueue(self, block: PlannerBlock):
+        if not self._planner:
+            self._block_started = self._sim_time
+        self._planner.append(block)
+        self.stats['planner_max_used'] = max(self.stats['planner_max_used'], len(self._planner))
+
+    @staticmethod
+    def _duration(distance: float, rate: float, acceleration: float) -> float:
+        """Time (seconds) of a motion starting and ending at rest,
+        with a trapezoidal velocity profile.
+        """
+        velocity = rate / 60.0      # mm/min -> mm/s
+        accel_distance = velocity * velocity / (2 * acceleration)
+
+        if 2 * accel_distance >= distance:
+            # Triangular profile, the programmed rate is never reached
+            return 2 * math.sqrt(distance / acceleration)
+        return 2 * velocity / acceleration + (distance - 2 * accel_distance) / velocity
+
+    # Reports
+
+    def _activeState(self) -> str:
+        if self.alarm is not None:
+            return 'Alarm'
+        if self._hold:
+            return 'Hold:0'
+        if self._check_mode:
+            return 'Check'
+        if self._planner:
+            return 'Jog' if self._jogging else 'Run'
+        return 'Idle'
+
+    def _currentPosition(self) -> list[float]:
+        if not self._planner:
+            return list(self.position)
+
+        block = self._planner[0]
+        elapsed = self._hold_elapsed if self._hold else self._sim_time - self._block_started
+        fraction = min(elapsed / block.duration, 1.0) if block.duration else 1.0
+        return [
+            begin + (end - begin) * fraction for begin, end in zip(block.start, block.target)
+        ]
+
+    def _statusReport(self) -> str:
+        mask = int(self.settings[10])
+        position = self._currentPosition()
+        fields = [self._activeState()]
+
+        if mask & 1:
+            fields.append(f'MPos:{self._formatAxes(position)}')
+        else:
+            wcs_offset = self.offsets[self.modal['wcs']]
+            wco = [offset + g92 for offset, g92 in zip(wcs_offset, self.g92_offset)]
+            work_position = [value - offset for value, offset in zip(position, wco)]
+            fields.append(f'WPos:{self._formatAxes(work_position)}')
+
+        if mask & 2:
+            planner_free = self.planner_size - len(self._planner)
+            rx_free = self.rx_buffer_size - 1 - len(self._rx)
+            fields.append(f'Bf:{planner_free},{rx_free}')
+
+        rate = self._planner[0].feed if self._planner and not self._hold else 0.0
+        fields.append(f'FS:{rate:g},{self.spindle:g}')
+        return f"<{'|'.join(fields)}>"
+
+    @staticmethod
+    def _formatAxes(values: list[float]) -> str:
+        return ','.join(f'{value:.3f}' for value in values)
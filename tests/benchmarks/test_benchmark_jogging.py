@@ -0,0 +1,29 @@
+from benchmarks.jogging import MODE_PLAIN, MODE_SESSION, run_jogging
+from grbl.grblMonitor import GrblMonitor
+import pytest
+from pytest_mock.plugin import MockerFixture
+
+
+def test_run_jogging(mocker: MockerFixture):
+    # Mock logger methods
+    mocker.patch.object(GrblMonitor, 'info')
+    mocker.patch.object(GrblMonitor, 'debug')
+
+    # Call method under test
+    plain = run_jogging(MODE_PLAIN, hold=0.2)
+    session = run_jogging(MODE_SESSION, hold=0.2)
+
+    # Assertions
+    assert plain['jogs_sent'] == plain['jogs_requested']
+    assert session['jogs_sent'] <= session['jogs_requested']
+    assert session['overrun_mm'] < plain['overrun_mm']
+    assert session['release_to_stop_ms'] < plain['release_to_stop_ms']
+
+
+def test_run_jogging_unknown_mode():
+    # Call method under test and assert exception
+    with pytest.raises(Exception) as error:
+        run_jogging('hold')
+
+    # Assertions
+    assert str(error.value) == 'Unknown jogging mode: hold'
@@ -0,0 +1,16 @@
+from benchmarks.logging_cost import run_logging_cost
+import logging
+import pytest
+
+
+@pytest.mark.parametrize('level', [logging.WARNING, logging.DEBUG])
+@pytest.mark.parametrize('subscribers', [0, 1])
+def test_run_logging_cost(level, subscribers):
+    # Call method under test
+    result = run_logging_cost(level, subscribers, iterations=50)
+
+    # Assertions
+    assert result['level'] == logging.getLevelName(level)
+    assert result['line_us'] > 0
+    assert result['status_us'] > 0
+    assert result['published'] == (100 if subscribers else 0)
@@ -0,0 +1,38 @@
+from benchmarks.replay import TARGETS, run_replay
+import pytest
+from utils.sessionCapture import SessionRecorder
+from utils.transport import DIRECTION_RX, DIRECTION_TX
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / 'session.cap')
+    recorder = SessionRecorder(path)
+    recorder.record(DIRECTION_RX, b"\r\nGrbl 1.1h ['$' for help]\r\n")
+    recorder.record(DIRECTION_TX, b'$I\n')
+    recorder.record(DIRECTION_RX, b'[VER:1.1h.20190825:]\r\n[OPT:V,15,128]\r\nok\r\n')
+    for index in range(20):
+        recorder.record(DIRECTION_TX, f'G1 X{index} F100\n'.encode())
+        recorder.record(DIRECTION_RX, b'ok\r\n')
+    recorder.close()
+    return path
+
+
+@pytest.mark.parametrize('target', TARGETS)
+def test_run_replay(capture, target):
+    # Call method under test
+    result = run_replay(capture, target)
+
+    # Assertions
+    assert result['lines'] == 24
+    assert result['sent_lines'] == 21
+    assert result['lines_per_second'] > 0
+
+
+def test_run_replay_unknown(capture):
+    # Call method under test and assert exception
+    with pytest.raises(Exception) as error:
+        run_replay(capture, 'monitor')
+
+    # Assertions
+    assert str(error.value) == 'Unknown target: monitor'
@@ -0,0 +1,33 @@
+from benchmarks.serial_framing import READERS, build_responses, run_framing
+import pytest
+import sys
+
+
+def test_build_responses():
+    # Call method under test
+    responses = build_responses(20)
+
+    # Assertions
+    assert responses.count(b'ok\r\n') == 18
+    assert responses.count(b'<Run|') == 2
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Requires pseudo-terminals')
+@pytest.mark.parametrize('reader', READERS)
+def test_run_framing(reader):
+    # Call method under test
+    result = run_framing(reader, lines=200)
+
+    # Assertions
+    assert result['lines'] == 200
+    assert result['lines_per_second'] > 0
+    assert result['cpu_per_line_us'] > 0
+
+
+def test_run_framing_unknown():
+    # Call method under test and assert exception
+    with pytest.raises(Exception) as error:
+        run_framing('chunked')
+
+    # Assertions
+    assert str(error.value) == 'Unknown reader: chunked'
@@ -0,0 +1,70 @@
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.streaming import latency_stats, run_benchmark
+from grbl.grblMonitor import GrblMonitor
+import pytest
+from pytest_mock.plugin import MockerFixture
+
+
+@pytest.mark.parametrize('kind', ['short', 'medium', 'long'])
+def test_synthetic_corpus(kind):
+    # Call method under test
+    lines = synthetic_corpus(kind, 10)
+
+    # Assertions
+    assert len(lines) == 13
+    assert lines == synthetic_corpus(kind, 10)
+
+
+def test_synthetic_corpus_unknown():
+    # Call method under test and assert exception
+    with pytest.raises(Exception) as error:
+        synthetic_corpus('huge', 10)
+
+    # Assertions
+    assert str(error.value) == 'Unknown synthetic corpus: huge'
+
+
+def test_latency_stats():
+    # Call method under test
+    stats = latency_stats([i / 1000 for i in range(1, 101)])
+
+    # Assertions
+    assert stats['p50'] == pytest.approx(51)
+    assert stats['p99'] == pytest.approx(100)
+    assert stats['max'] == pytest.approx(100)
+    assert stats['mean'] == pytest.approx(50.5)
+
+
+def test_run_benchmark(mocker: MockerFixture):
+    # Mock logger methods
+    mocker.patch.object(GrblMonitor, 'info')
+    mocker.patch.object(GrblMonitor, 'debug')
+
+    # Call method under test
+    result = run_benchmark('medium', synthetic_corpus('medium', 200))
+
+    # Assertions
+    assert result['lines'] == 203
+    assert result['lines_per_second'] > 0
+    assert sum(result['buffer_occupancy']) == result['lines']
+    assert result['device_stats']['errors'] == 0
+    assert result['device_stats']['rx_overflows'] == 0
+
+
+def test_run_benchmark_interactive(mocker: MockerFixture):
+    # Mock logger methods
+    mocker.patch.object(GrblMonitor, 'info')
+    mocker.patch.object(GrblMonitor, 'debug')
+
+    # Call method under test
+    result = run_benchmark(
+        'short',
+        synthetic_corpus('short', 500),
+        speedup=1000.0,
+        interactive_interval=0.01
+    )
+
+    # Assertions
+    assert result['lane_latency_ms']['priority']['samples'] > 0
+    assert result['lane_latency_ms']['bulk']['samples'] >= 503
+    assert result['device_stats']['errors'] == 0
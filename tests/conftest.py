@@ -1,12 +1,20 @@
 import pytest
 from database.base import Base
 from datetime import datetime
+import grbl.grblController as grbl_controller
 
 
 # Constants
 created_time = datetime(2023, 12, 25, 0, 0, 0)
 
 
+# The emulated devices start with the default settings at every connection,
+# so the settings known from previous tests don't apply
+@pytest.fixture(autouse=True)
+def clear_settings_snapshots():
+    grbl_controller._settings_snapshots.clear()
+
+
 # Settings for mocking SQLAlchemy
 @pytest.fixture(scope="function")
 def sqlalchemy_declarative_base():
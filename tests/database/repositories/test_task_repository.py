@@ -1,4 +1,4 @@
-from database.models import Task
+from database.models import Task, TaskCheckpoint
 from database.repositories.taskRepository import TaskRepository
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
@@ -124,6 +124,7 @@ class TestTaskRepository:
                 ('in_progress', 'finished', 1, None),
                 ('in_progress', 'failed', 1, None),
                 ('failed', 'pending_approval', None, None),
+                ('failed', 'in_progress', 1, None),
                 ('cancelled', 'pending_approval', None, None)
             ]
     )
@@ -191,6 +192,44 @@ class TestTaskRepository:
         tasks_after = task_repository.get_all_tasks()
         assert len(tasks_after) == len(tasks_before) - 1
 
+    def test_create_and_get_checkpoints(self, mocked_session):
+        task_repository = TaskRepository(mocked_session)
+        state = {'modal': {'units': 'G21'}, 'feedrate': 300.0}
+
+        # Call methods under test
+        first = task_repository.create_checkpoint(6, 10, 120, state)
+        second = task_repository.create_checkpoint(6, 25, 310, state)
+        checkpoints = task_repository.get_checkpoints(6)
+        checkpoint = task_repository.get_checkpoint_by_id(first.id)
+
+        # Assertions
+        assert isinstance(first, TaskCheckpoint)
+        assert checkpoints == [second, first]
+        assert checkpoint.line == 10
+        assert checkpoint.offset == 120
+        assert checkpoint.state == state
+        assert task_repository.get_checkpoints(1) == []
+
+    def test_error_create_checkpoint_db_error(self, mocker, mocked_session):
+        # Mock DB method to simulate exception
+        mocker.patch.object(mocked_session, 'add', side_effect=SQLAlchemyError('mocked error'))
+        task_repository = TaskRepository(mocked_session)
+
+        # Call the method under test and assert exception
+        with pytest.raises(Exception) as error:
+            task_repository.create_checkpoint(6, 10, 120, {})
+        assert 'Error creating the checkpoint in the DB' in str(error.value)
+
+    def test_error_get_checkpoints_db_error(self, mocker, mocked_session):
+        # Mock DB method to simulate exception
+        mocker.patch.object(mocked_session, 'scalars', side_effect=SQLAlchemyError('mocked error'))
+        task_repository = TaskRepository(mocked_session)
+
+        # Call the method under test and assert exception
+        with pytest.raises(Exception) as error:
+            task_repository.get_checkpoints(6)
+        assert 'Error retrieving checkpoints from the DB' in str(error.value)
+
     def test_error_create_task_db_error(self, mocker, mocked_session):
         # Mock DB method to simulate exception
         mocker.patch.object(mocked_session, 'add', side_effect=SQLAlchemyError('mocked error'))
@@ -297,7 +336,6 @@ class TestTaskRepository:
                 ('finished', 'failed'),
                 ('finished', 'cancelled'),
                 ('failed', 'on_hold'),
-                ('failed', 'in_progress'),
                 ('failed', 'finished'),
                 ('failed', 'cancelled'),
                 ('cancelled', 'on_hold'),
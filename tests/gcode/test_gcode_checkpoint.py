@@ -0,0 +1,143 @@
+from gcode.gcodeCheckpoint import GcodeCheckpointTracker, build_resume_preamble, \
+    format_number
+import pytest
+
+PROGRAM = (
+    'G21 G90 G17 G94 ; setup\n'
+    'G0 Z5\n'
+    'M3 S10000\n'
+    'G0 X10 Y20\n'
+    '(plunge)\n'
+    'G1 Z-1 F100\n'
+    'G1 X30 F300\n'
+    'G91 X5 Y-5\n'
+    'G90 M8\n'
+    'G0 Z5\n'
+)
+
+
+class TestGcodeCheckpointTracker:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.file_path = tmp_path / 'program.nc'
+        self.file_path.write_text(PROGRAM)
+        self.tracker = GcodeCheckpointTracker(str(self.file_path))
+
+    def test_advance(self):
+        # Call method under test
+        checkpoint = self.tracker.advance(8)
+        self.tracker.close()
+
+        # Assertions
+        assert checkpoint['line'] == 8
+        assert checkpoint['offset'] == len(''.join(PROGRAM.splitlines(True)[:8]).encode())
+        assert checkpoint['modal']['units'] == 'G21'
+        assert checkpoint['modal']['distance'] == 'G91'
+        assert checkpoint['modal']['motion'] == 'G1'
+        assert checkpoint['modal']['spindle'] == 'M3'
+        assert checkpoint['feedrate'] == 300.0
+        assert checkpoint['spindle'] == 10000.0
+        assert checkpoint['position'] == {'x': 35.0, 'y': 15.0, 'z': -1.0}
+        assert checkpoint['safe_z'] == 5.0
+
+    def test_advance_past_the_end(self):
+        # Call method under test
+        checkpoint = self.tracker.advance(100)
+        self.tracker.close()
+
+        # Assertions
+        assert checkpoint['line'] == 10
+        assert checkpoint['offset'] == len(PROGRAM.encode())
+        assert checkpoint['modal']['coolant'] == 'M8'
+
+    def test_advance_from_checkpoint(self):
+        # Call method under test
+        checkpoint = self.tracker.advance(4)
+        self.tracker.close()
+        resumed = GcodeCheckpointTracker(str(self.file_path), checkpoint)
+        result = resumed.advance(8)
+        resumed.close()
+
+        # Assertions
+        tracker = GcodeCheckpointTracker(str(self.file_path))
+        assert result == tracker.advance(8)
+        tracker.close()
+
+    @pytest.mark.parametrize(
+            'lines,expected',
+            [
+                (['G21', 'G0 X25.4 Z2.54', 'G20'], {'x': 1.0, 'y': None, 'z': 0.1}),
+                (['G0 X10 Y10 Z1', 'G28'], {'x': None, 'y': None, 'z': None}),
+                (['G0 X10 Y10 Z1', 'G92 X0 Y0'], {'x': None, 'y': None, 'z': None}),
+                (['G91', 'G0 X10', 'G90 Y10'], {'x': None, 'y': 10.0, 'z': None}),
+            ]
+    )
+    def test_advance_position(self, tmp_path, lines, expected):
+        # Mock file
+        file_path = tmp_path / 'position.nc'
+        file_path.write_text('\n'.join(lines) + '\n')
+        tracker = GcodeCheckpointTracker(str(file_path))
+
+        # Call method under test
+        checkpoint = tracker.advance(len(lines))
+        tracker.close()
+
+        # Assertions
+        assert {axis: value and round(value, 4) for axis, value in checkpoint['position'].items()} \
+            == expected
+
+
+@pytest.mark.parametrize(
+        'value,expected',
+        [(10.0, '10'), (-2.50001, '-2.5'), (0.00001, '0'), (-0.00001, '0'), (1.23456, '1.2346')]
+)
+def test_format_number(value, expected):
+    # Call method under test
+    assert format_number(value) == expected
+
+
+def test_build_resume_preamble(tmp_path):
+    # Mock checkpoint
+    file_path = tmp_path / 'program.nc'
+    file_path.write_text(PROGRAM)
+    tracker = GcodeCheckpointTracker(str(file_path))
+    checkpoint = tracker.advance(9)
+    tracker.close()
+
+    # Call method under test
+    preamble = build_resume_preamble(checkpoint, spindle_delay=3)
+
+    # Assertions
+    assert preamble == [
+        'G21 G17 G90 G94',
+        'G0 Z5',
+        'G0 X35 Y15',
+        'M3 S10000',
+        'G4 P3',
+        'M8',
+        'G1 Z-1 F300',
+        'G90 G1 F300'
+    ]
+
+
+def test_build_resume_preamble_unknown_state():
+    # Mock checkpoint
+    checkpoint = {
+        'line': 1,
+        'offset': 4,
+        'modal': {
+            'motion': 'G2', 'wcs': None, 'plane': None, 'units': None, 'distance': 'G91',
+            'feedrate': 'G93', 'program': None, 'spindle': None, 'coolant': None
+        },
+        'feedrate': 2.0,
+        'spindle': None,
+        'tool': None,
+        'position': {'x': None, 'y': None, 'z': None},
+        'safe_z': None
+    }
+
+    # Call method under test
+    preamble = build_resume_preamble(checkpoint)
+
+    # Assertions
+    assert preamble == ['G90 G94', 'G91 G93']
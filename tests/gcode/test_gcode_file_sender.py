@@ -1,6 +1,7 @@
 from grbl.grblController import GrblController
 from gcode.gcodeFileSender import GcodeFileSender, FinishedFile
-from io import BytesIO
+from gcode.gcodeNormalizer import GcodeNormalizer
+from io import BytesIO, StringIO
 from logging import Logger
 import pytest
 from pytest_mock.plugin import MockerFixture
@@ -100,7 +101,7 @@ class TestGcodeFileSender:
         )
 
         # Mock file
-        self.file_sender.gcode = BytesIO(b'G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
+        self.file_sender.gcode = StringIO('G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
 
         # Call method under test
         self.file_sender.send_line()
@@ -176,7 +177,7 @@ class TestGcodeFileSender:
         )
 
         # Mock file
-        self.file_sender.gcode = BytesIO(b'G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
+        self.file_sender.gcode = StringIO('G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
 
         # Call method under test and assert exception
         self.file_sender.send_line()
@@ -188,3 +189,252 @@ class TestGcodeFileSender:
         # Assertions
         assert mock_grbl_get_buffer_fill.call_count == 4
         assert mock_grbl_send_command.call_count == 3
+
+    def test_file_sender_fill_buffer(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(
+            self.file_sender.throttle,
+            'get_send_budget',
+            return_value=25
+        )
+        mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'getPendingBytes',
+            return_value=20
+        )
+        mock_grbl_send_command = mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'sendCommand'
+        )
+
+        # Mock file
+        self.file_sender.gcode = StringIO('G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
+
+        # Call method under test
+        sent_lines = self.file_sender.fill_buffer()
+
+        # Assertions
+        assert sent_lines == 2
+        assert mock_grbl_send_command.call_count == 2
+        assert self.file_sender._next_line == 'G1 X50 Y60'
+
+    def test_file_sender_fill_buffer_keeps_pending_line(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(
+            self.file_sender.throttle,
+            'get_send_budget',
+            side_effect=[5, 12]
+        )
+        mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'getPendingBytes',
+            return_value=120
+        )
+        mock_grbl_send_command = mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'sendCommand'
+        )
+
+        # Mock file
+        self.file_sender.gcode = StringIO('G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
+
+        # Call method under test
+        self.file_sender.fill_buffer()
+        self.file_sender.fill_buffer()
+
+        # Assertions
+        assert mock_grbl_send_command.call_count == 1
+        mock_grbl_send_command.assert_called_with('G1 X10 Y20\n')
+
+    def test_file_sender_fill_buffer_empty_buffer(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(
+            self.file_sender.throttle,
+            'get_send_budget',
+            return_value=128
+        )
+        mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'getPendingBytes',
+            side_effect=[0, 200]
+        )
+        mock_grbl_send_command = mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'sendCommand'
+        )
+
+        # Mock file, with a line longer than the whole buffer
+        long_line = 'G1 X' + '1' * 200
+        self.file_sender.gcode = StringIO(f'{long_line}\n{long_line}')
+
+        # Call method under test
+        self.file_sender.fill_buffer()
+
+        # Assertions
+        assert mock_grbl_send_command.call_count == 1
+
+    def test_file_sender_fill_buffer_whole_file(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(
+            self.file_sender.throttle,
+            'get_send_budget',
+            return_value=128
+        )
+        mock_grbl_send_command = mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'sendCommand'
+        )
+
+        # Mock file
+        self.file_sender.gcode = StringIO('G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60')
+
+        # Call method under test and assert exception
+        with pytest.raises(FinishedFile):
+            self.file_sender.fill_buffer()
+
+        # Assertions
+        assert mock_grbl_send_command.call_count == 3
+        assert self.file_sender.current_line == 3
+
+    @pytest.mark.parametrize("paused", [False, True])
+    def test_file_sender_fill_buffer_no_file_or_paused(self, mocker: MockerFixture, paused):
+        # Mock GRBL methods
+        mock_grbl_send_command = mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'sendCommand'
+        )
+
+        # Mock state
+        if paused:
+            self.file_sender.gcode = StringIO('G1 X10 Y20')
+            self.file_sender._paused = True
+
+        # Call method under test
+        self.file_sender.fill_buffer()
+
+        # Assertions
+        assert mock_grbl_send_command.call_count == 0
+
+    def test_file_sender_get_stats(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'getLinesInFlight',
+            return_value=7
+        )
+        mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'getBufferFill',
+            return_value=50.0
+        )
+        throttle_stats = {
+            'planner_free': 3,
+            'rx_free': 100,
+            'starvation_count': 1,
+            'starvation_time': 0.5
+        }
+        mocker.patch.object(self.file_sender.throttle, 'get_stats', return_value=throttle_stats)
+
+        # Mock state
+        self.file_sender.current_line = 10
+        self.file_sender._send_times.extend([99.0, 100.5, 100.8, 100.9])
+
+        # Mock time
+        mocker.patch('gcode.gcodeFileSender.time.time', return_value=101.0)
+
+        # Call method under test
+        stats = self.file_sender.get_stats()
+
+        # Assertions
+        assert stats == {
+            'sent_lines': 10,
+            'sends_per_second': 3.0,
+            'lines_in_flight': 7,
+            'buffer_fill': 50.0,
+            'throttle': throttle_stats,
+            'normalizer': None
+        }
+
+    def test_file_sender_fill_buffer_normalized(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(
+            self.file_sender.throttle,
+            'get_send_budget',
+            return_value=128
+        )
+        mock_grbl_send_command = mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'sendCommand'
+        )
+
+        # Mock file
+        self.file_sender.normalizer = GcodeNormalizer()
+        self.file_sender.gcode = StringIO('G1 X10.000 Y20 F100 ; start\n\nG1 X30.000 Y40 F100\n')
+
+        # Call method under test and assert exception
+        with pytest.raises(FinishedFile):
+            self.file_sender.fill_buffer()
+
+        # Assertions
+        assert self.file_sender.current_line == 3
+        assert mock_grbl_send_command.call_args_list == [
+            mocker.call('G1X10Y20F100'),
+            mocker.call(''),
+            mocker.call('X30Y40F100')
+        ]
+        assert self.file_sender.get_stats()['normalizer']['bytes_saved'] == 24
+
+    def test_file_sender_start_from_line(self, tmp_path):
+        # Mock file
+        gcode = tmp_path / 'file.nc'
+        gcode.write_text('G1 X10 Y20\nG1 X30 Y40\nG1 X50 Y60\n')
+        self.file_sender.set_file(str(gcode))
+
+        # Call method under test
+        lines = self.file_sender.start(line=1, offset=len('G1 X10 Y20\n'))
+
+        # Assertions
+        assert lines == 3
+        assert self.file_sender.current_line == 1
+        assert self.file_sender.gcode.readline() == 'G1 X30 Y40\n'
+        self.file_sender.stop()
+
+    @pytest.mark.parametrize(
+            'commands_count,planner_size,expected',
+            [
+                (0, 0, 10),
+                (1, 0, 10),     # The comment was counted when queued
+                (2, 0, 11),
+                (3, 0, 13),
+                (4, 0, 14),
+                (4, 1, 13),
+                (4, 2, 11),
+                (4, 15, 10),
+            ]
+    )
+    def test_file_sender_get_executed_line(
+        self,
+        mocker: MockerFixture,
+        commands_count,
+        planner_size,
+        expected
+    ):
+        # Mock GRBL methods
+        mocker.patch.object(self.file_sender.grbl_controller, 'sendCommand')
+        mocker.patch.object(
+            self.file_sender.grbl_controller,
+            'getBuildInfo',
+            return_value={'blockBufferSize': planner_size}
+        )
+
+        # Mock state
+        self.file_sender.current_line = 10
+        self.file_sender._executed_line = 10
+        for line in ['G1 X1', '; comment', 'G1 X2', 'G1 X3']:
+            self.file_sender._send(line)
+
+        # Call method under test
+        line = self.file_sender.get_executed_line(commands_count)
+
+        # Assertions
+        assert line == expected
@@ -0,0 +1,114 @@
+from gcode.gcodeNormalizer import GcodeNormalizer
+import pytest
+
+
+class TestGcodeNormalizer:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.normalizer = GcodeNormalizer()
+
+    @pytest.mark.parametrize(
+        'line,expected',
+        [
+            ('G01 X10.50000 Y-0.25000 F1000.000 ; cut\n', 'G1X10.5Y-.25F1000'),
+            ('G0 X1 (rapid) Y2\n', 'G0X1Y2'),
+            ('g1 x0.00001 y-0.00001\n', 'G1X0Y0'),
+            ('X1.23456789\n', 'X1.2346'),
+            ('M3 S12000.0\n', 'M3S12000'),
+            ('(only a comment)\n', ''),
+            ('; only a comment\n', ''),
+            ('\n', ''),
+            ('$H\n', '$H'),
+            ('$J=G91 X10 F100\n', '$J=G91 X10 F100'),
+        ]
+    )
+    def test_normalize(self, line, expected):
+        # Call method under test
+        result = self.normalizer.normalize(line)
+
+        # Assertions
+        assert result == expected
+
+    def test_normalize_drops_modal_words(self):
+        # Call method under test
+        lines = [
+            self.normalizer.normalize(line)
+            for line in ['G21 G90 G94', 'G1 X1 F100', 'G1 X2 F100', 'G90 G1 X3 F200', 'G0 X0']
+        ]
+
+        # Assertions
+        assert lines == ['G21G90G94', 'G1X1F100', 'X2', 'X3F200', 'G0X0']
+        assert self.normalizer.get_stats()['dropped_words'] == 4
+
+    def test_normalize_keeps_feed_rate_in_inverse_time(self):
+        # Call method under test
+        lines = [
+            self.normalizer.normalize(line)
+            for line in ['G93 G1 X1 F10', 'G1 X2 F10', 'G94 X3 F10', 'X4 F10']
+        ]
+
+        # Assertions
+        assert lines == ['G93G1X1F10', 'X2F10', 'G94X3F10', 'X4']
+
+    def test_normalize_keeps_non_modal_commands(self):
+        # Call method under test
+        lines = [
+            self.normalizer.normalize(line)
+            for line in ['G1 G90 X1', 'G90 G10 L20 P1 X1', 'G53 G0 Z0']
+        ]
+
+        # Assertions
+        assert lines == ['G1G90X1', 'G90G10L20P1X1', 'G53G0Z0']
+
+    def test_normalize_invalid_line_resets_state(self):
+        # Call method under test
+        lines = [
+            self.normalizer.normalize(line)
+            for line in ['G1 X1', 'G1 X#1', 'G1 X2']
+        ]
+
+        # Assertions
+        assert lines == ['G1X1', 'G1 X#1', 'G1X2']
+
+    def test_normalize_stages_disabled(self):
+        normalizer = GcodeNormalizer(
+            strip_comments=False,
+            compact_whitespace=False,
+            drop_modal_words=False,
+            precision=None
+        )
+
+        # Call method under test
+        lines = [
+            normalizer.normalize(line)
+            for line in ['G1 X1.123456 Y2.50', 'G1 X1.123456 Y2.50', 'G1 X1 ; comment']
+        ]
+
+        # Assertions
+        assert lines == ['G1 X1.123456 Y2.5', 'G1 X1.123456 Y2.5', 'G1 X1 ; comment']
+
+    def test_normalizer_get_stats(self):
+        # Call method under test
+        for line in ['G1 X10.000  Y20.000 ; comment\n', '(comment)\n', 'G1 X10.000 Y30.000\n']:
+            self.normalizer.normalize(line)
+        stats = self.normalizer.get_stats()
+
+        # Assertions
+        assert stats == {
+            'lines': 3,
+            'bytes_in': 49,
+            'bytes_out': 16,
+            'bytes_saved': 33,
+            'dropped_words': 1
+        }
+
+    def test_normalizer_reset(self):
+        # Mock state
+        self.normalizer.normalize('G1 X1 F100')
+
+        # Call method under test
+        self.normalizer.reset()
+
+        # Assertions
+        assert self.normalizer.normalize('G1 X2 F100') == 'G1X2F100'
+        assert self.normalizer.get_stats()['lines'] == 1
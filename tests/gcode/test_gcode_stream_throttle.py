@@ -0,0 +1,110 @@
+from grbl.grblController import GrblController
+from gcode.gcodeStreamThrottle import GcodeStreamThrottle
+from logging import Logger
+import pytest
+from pytest_mock.plugin import MockerFixture
+
+
+class TestGcodeStreamThrottle:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        # Mock GRBL controller object
+        self.grbl_controller = GrblController(Logger('test-logger'))
+        self.grbl_controller.build_info = {'blockBufferSize': 15, 'rxBufferSize': 128}
+        self.status = {'activeState': 'Run', 'buffer': None}
+        mocker.patch.object(
+            self.grbl_controller.grbl_status,
+            'get_status_report',
+            return_value=self.status
+        )
+
+        # Create an instance of GcodeStreamThrottle
+        self.throttle = GcodeStreamThrottle(self.grbl_controller)
+
+    def test_requires_buffer_feedback(self):
+        # Assertions
+        assert self.grbl_controller.getRequiredStatusFields() == {'buffer'}
+
+    def test_budget_without_feedback(self):
+        # Set test values
+        self.grbl_controller.streaming.sent('G1 X10 Y10')
+
+        # Call method under test
+        budget = self.throttle.get_send_budget()
+
+        # Assertions
+        assert budget == 116
+        assert self.throttle.starvation_count == 0
+
+    @pytest.mark.parametrize(
+        'state,planner,rx,pending,expected',
+        [
+            # Full planner, empty RX buffer: aim for half the buffer
+            ('Run', 0, 127, 0, 63),
+            # Full planner, RX buffer busier than estimated by the controller
+            ('Run', 0, 107, 0, 43),
+            # Full planner, RX buffer over target
+            ('Run', 0, 50, 0, 0),
+            # Half full planner
+            ('Run', 7, 127, 10, 83),
+            # Empty planner while not running
+            ('Idle', 15, 127, 0, 127),
+        ]
+    )
+    def test_budget_with_feedback(self, state, planner, rx, pending, expected):
+        # Set test values
+        self.status['activeState'] = state
+        self.status['buffer'] = {'planner': planner, 'rx': rx}
+        if pending:
+            self.grbl_controller.streaming.sent('G' * (pending - 1))
+
+        # Call method under test
+        budget = self.throttle.get_send_budget()
+
+        # Assertions
+        assert budget == expected
+        assert self.throttle.starvation_count == 0
+
+    def test_starvation(self, mocker: MockerFixture):
+        # Mock time
+        mocker.patch('gcode.gcodeStreamThrottle.time.time', side_effect=[10.0, 10.5, 12.0, 13.0])
+
+        # Set test values: running with an empty planner
+        self.status['buffer'] = {'planner': 15, 'rx': 60}
+        self.grbl_controller.streaming.sent('G' * 66)
+
+        # Call method under test
+        budget = self.throttle.get_send_budget()
+        self.throttle.get_send_budget()
+
+        # Planner gets filled again
+        self.status['buffer'] = {'planner': 2, 'rx': 60}
+        self.throttle.get_send_budget()
+
+        # Starvation starts again
+        self.status['buffer'] = {'planner': 15, 'rx': 60}
+        self.throttle.get_send_budget()
+
+        # Assertions
+        assert budget == 60
+        assert self.throttle.starvation_count == 2
+        assert self.throttle.starvation_time == 2.0
+
+    def test_get_stats(self, mocker: MockerFixture):
+        # Mock time
+        mocker.patch('gcode.gcodeStreamThrottle.time.time', side_effect=[10.0, 10.25])
+
+        # Set test values: running with an empty planner
+        self.status['buffer'] = {'planner': 15, 'rx': 127}
+        self.throttle.get_send_budget()
+
+        # Call method under test
+        stats = self.throttle.get_stats()
+
+        # Assertions
+        assert stats == {
+            'planner_free': 15,
+            'rx_free': 127,
+            'starvation_count': 1,
+            'starvation_time': 0.25
+        }
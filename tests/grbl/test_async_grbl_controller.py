@@ -0,0 +1,365 @@
+import asyncio
+from grbl.asyncGrblController import AsyncGrblController
+from grbl.grblController import GrblController
+from grbl.grblMonitor import GrblMonitor
+from grbl.grblStatus import GrblStatus, FLAG_STOP
+from grbl.streaming.streamingStrategy import STREAMING_CHARACTER_COUNTING
+from utils.serial import SerialService
+from serial import SerialException
+import logging
+import os
+import pytest
+from pytest_mock.plugin import MockerFixture
+from queue import Full
+
+
+class TestAsyncGrblController:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        grbl_logger = logging.getLogger('test_logger')
+        self.grbl_controller = AsyncGrblController(grbl_logger)
+        self.grbl_status = self.grbl_controller.grbl_status
+
+        # Mock logger methods
+        mocker.patch.object(GrblMonitor, 'debug')
+        mocker.patch.object(GrblMonitor, 'info')
+        mocker.patch.object(GrblMonitor, 'warning')
+        mocker.patch.object(GrblMonitor, 'error')
+        mocker.patch.object(GrblMonitor, 'critical')
+        mocker.patch.object(GrblMonitor, 'sent')
+        mocker.patch.object(GrblMonitor, 'received')
+
+        # Mock serial port, with a file descriptor the event loop can watch
+        self.read_fd, self.write_fd = os.pipe()
+        mocker.patch.object(SerialService, 'fileno', return_value=self.read_fd)
+        self.mock_send_line = mocker.patch.object(SerialService, 'sendLine')
+        self.mock_send_bytes = mocker.patch.object(SerialService, 'sendBytes')
+        self.mock_read = mocker.patch.object(SerialService, 'readAvailable')
+
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        yield
+
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def receive(self, data: bytes):
+        self.mock_read.return_value = data
+        self.grbl_controller.serialReader()
+
+    @pytest.mark.parametrize('build_info', [True, False])
+    def test_connect(self, mocker: MockerFixture, build_info):
+        # Mock controller methods
+        mock_open_connection = mocker.patch.object(
+            GrblController,
+            '_openConnection',
+            return_value={'firmware': 'Grbl', 'version': '1.1'}
+        )
+        mock_start_io = mocker.patch.object(AsyncGrblController, 'startIO')
+        mock_query_build_info = mocker.patch.object(AsyncGrblController, 'queryBuildInfo')
+
+        async def wait_until_processed(timeout):
+            return build_info
+
+        mocker.patch.object(
+            AsyncGrblController,
+            'waitUntilProcessed',
+            side_effect=wait_until_processed
+        )
+
+        # Call method under test
+        response = asyncio.run(self.grbl_controller.connect('port', 9600))
+
+        # Assertions
+        assert response == {'firmware': 'Grbl', 'version': '1.1'}
+        mock_open_connection.assert_called_once_with(
+            'port',
+            9600,
+            STREAMING_CHARACTER_COUNTING,
+            False
+        )
+        assert mock_start_io.call_count == 1
+        assert mock_query_build_info.call_count == 1
+        assert GrblMonitor.warning.call_count == (0 if build_info else 1)
+
+    def test_send_command(self):
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            future_1 = self.grbl_controller.sendCommand('G1 X10 F100')
+            future_2 = self.grbl_controller.sendCommand('G1 X20')
+            await asyncio.sleep(0)
+
+            # Commands are sent together, in the next iteration of the loop
+            assert self.mock_send_line.call_count == 2
+            assert self.grbl_controller.getLinesInFlight() == 2
+
+            self.receive(b'ok\r\nerror:20\r\n')
+            return await future_1, await future_2
+
+        # Assertions
+        assert asyncio.run(test()) == ('ok', 'error:20')
+        assert self.grbl_controller.getLinesInFlight() == 0
+        assert self.grbl_controller.getAcksCount() == 2
+
+    @pytest.mark.parametrize('command', ['', '(comment)', '; comment'])
+    def test_send_command_not_sent(self, command):
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            response = await self.grbl_controller.sendCommand(command)
+            await asyncio.sleep(0)
+            return response
+
+        # Assertions
+        assert asyncio.run(test()) == ''
+        assert self.mock_send_line.call_count == 0
+
+    def test_serial_reader_partial_lines(self):
+        async def test():
+            self.grbl_controller.startIO()
+            future = self.grbl_controller.sendCommand('G1 X10 F100')
+            await asyncio.sleep(0)
+
+            # Call method under test
+            self.receive(b'o')
+            assert not future.done()
+            self.receive(b'k\r\n')
+            return await future
+
+        # Assertions
+        assert asyncio.run(test()) == 'ok'
+
+    def test_serial_reader_error(self, mocker: MockerFixture):
+        # Mock serial methods
+        self.mock_read.side_effect = SerialException('mocked error')
+
+        # Mock controller methods
+        mock_disconnect = mocker.patch.object(AsyncGrblController, 'disconnect')
+
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            self.grbl_controller.serialReader()
+            self.grbl_controller.stopIO()
+
+        asyncio.run(test())
+
+        # Assertions
+        assert mock_disconnect.call_count == 1
+        assert GrblMonitor.error.call_count == 1
+
+    def test_send_command_waits_buffer_space(self):
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            futures = [
+                self.grbl_controller.sendCommand(f'G1 X{i:04d} Y0000 Z0000 F100')
+                for i in range(10)
+            ]
+            await asyncio.sleep(0)
+
+            # Only the commands fitting in the RX buffer (127 bytes) are sent
+            assert self.mock_send_line.call_count == 4
+
+            self.receive(b'ok\r\n')
+            assert self.mock_send_line.call_count == 5
+
+            for _ in range(9):
+                self.receive(b'ok\r\n')
+            return await asyncio.gather(*futures)
+
+        # Assertions
+        assert asyncio.run(test()) == ['ok'] * 10
+        assert self.mock_send_line.call_count == 10
+
+    def test_send_command_priority(self):
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Fill the RX buffer (4 commands), with a program line waiting for space
+            futures = [
+                self.grbl_controller.sendCommand(f'G1 X{i:04d} Y0000 Z0000 F100')
+                for i in range(5)
+            ]
+            await asyncio.sleep(0)
+
+            # Call method under test
+            priority = self.grbl_controller.sendCommand('$G', priority=True)
+            await asyncio.sleep(0)
+
+            # The priority command fits in the RX buffer, before the waiting program line
+            assert self.mock_send_line.call_count == 5
+            self.mock_send_line.assert_called_with('$G')
+
+            for _ in range(4):
+                self.receive(b'ok\r\n')
+            self.receive(b'error:20\r\nok\r\n')
+            return await priority, await asyncio.gather(*futures)
+
+        # Assertions
+        priority, responses = asyncio.run(test())
+        assert priority == 'error:20'
+        assert responses == ['ok'] * 5
+        assert self.grbl_controller.getLinesInFlight() == 0
+
+    def test_send_command_queue_full(self):
+        async def test():
+            self.grbl_controller.queue_size = 1
+            self.grbl_controller.startIO()
+
+            # Fill the RX buffer (4 commands), the next command and the queue
+            for i in range(6):
+                self.grbl_controller.sendCommand(f'G1 X{i:04d} Y0000 Z0000 F100')
+                await asyncio.sleep(0)
+
+            # Call method under test
+            rejected = self.grbl_controller.sendCommand('G1 X0')
+            waiter = asyncio.ensure_future(self.grbl_controller.waitForQueueSpace(1.0))
+            await asyncio.sleep(0)
+            assert not waiter.done()
+
+            self.receive(b'ok\r\n')
+            return rejected, await waiter
+
+        # Assertions
+        rejected, space = asyncio.run(test())
+        assert isinstance(rejected.exception(), Full)
+        assert space is True
+        assert self.grbl_controller.getQueueDepth() == 1
+
+    def test_wait_for_queue_space_timeout(self):
+        async def test():
+            self.grbl_controller.queue_size = 1
+            self.grbl_controller.sendCommand('G1 X0')
+
+            # Call method under test
+            return await self.grbl_controller.waitForQueueSpace(0.01)
+
+        # Assertions
+        assert asyncio.run(test()) is False
+
+    def test_query_status_report(self):
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            future = self.grbl_controller.queryStatusReport()
+            self.receive(b'<Run|MPos:1.000,2.000,3.000|FS:500,0>\r\n')
+            return await future
+
+        # Assertions
+        status = asyncio.run(test())
+        assert status['activeState'] == 'Run'
+        assert status['mpos'] == {'x': 1.0, 'y': 2.0, 'z': 3.0}
+        self.mock_send_bytes.assert_called_with(b'?')
+
+    def test_wait_for_ack(self):
+        async def test():
+            self.grbl_controller.startIO()
+            self.grbl_controller.sendCommand('G1 X10 F100')
+            await asyncio.sleep(0)
+            acks_count = self.grbl_controller.getAcksCount()
+
+            # Call method under test
+            waiter = asyncio.ensure_future(self.grbl_controller.waitForAck(acks_count, 1.0))
+            await asyncio.sleep(0)
+            self.receive(b'ok\r\n')
+            return await waiter
+
+        # Assertions
+        assert asyncio.run(test()) is True
+
+    def test_wait_for_ack_timeout(self):
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            return await self.grbl_controller.waitForAck(0, 0.01)
+
+        # Assertions
+        assert asyncio.run(test()) is False
+
+    def test_wait_until_processed_timeout(self):
+        async def test():
+            self.grbl_controller.startIO()
+            self.grbl_controller.sendCommand('G1 X10 F100')
+
+            # Call method under test
+            return await self.grbl_controller.waitUntilProcessed(0.01)
+
+        # Assertions
+        assert asyncio.run(test()) is False
+
+    def test_soft_reset_cancels_commands(self):
+        async def test():
+            self.grbl_controller.startIO()
+            sent = self.grbl_controller.sendCommand('G1 X10 F100')
+            await asyncio.sleep(0)
+            queued = self.grbl_controller.sendCommand('G1 X20')
+
+            # Call method under test
+            self.grbl_controller.grbl_soft_reset()
+            await asyncio.sleep(0)
+            return sent, queued
+
+        # Assertions
+        sent, queued = asyncio.run(test())
+        assert sent.cancelled()
+        assert queued.cancelled()
+        assert self.grbl_controller.getLinesInFlight() == 0
+        assert self.grbl_status.get_flag(FLAG_STOP) is False
+
+    def test_stop_io(self):
+        async def test():
+            self.grbl_controller.startIO()
+            future = self.grbl_controller.sendCommand('G1 X10 F100')
+
+            # Call method under test
+            self.grbl_controller.stopIO()
+            await asyncio.sleep(0)
+            return future
+
+        # Assertions
+        assert asyncio.run(test()).cancelled()
+        assert self.grbl_controller._serial_fd is None
+        assert self.grbl_controller._poller is None
+
+    def test_status_mask_tuning_not_supported(self):
+        # Call method under test
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.setStatusMaskTuning()
+        self.grbl_controller.setStatusMaskTuning(False)
+
+        # Assertions
+        assert 'not supported' in str(error.value)
+
+    def test_sync_settings_not_supported(self):
+        # Call method under test
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.syncSettings({'$22': '1'})
+
+        # Assertions
+        assert 'not supported' in str(error.value)
+
+    def test_status_poller(self, mocker: MockerFixture):
+        # Mock controller methods
+        mocker.patch.object(AsyncGrblController, 'getPollInterval', return_value=0.01)
+
+        async def test():
+            self.grbl_controller.startIO()
+
+            # Call method under test
+            await asyncio.sleep(0.05)
+            self.grbl_controller.stopIO()
+
+        asyncio.run(test())
+
+        # Assertions
+        assert self.mock_send_bytes.call_count >= 3
+        self.mock_send_bytes.assert_called_with(b'?')
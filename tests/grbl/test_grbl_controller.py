@@ -2,12 +2,20 @@ from grbl.grblController import GrblController
 from grbl.grblLineParser import GrblLineParser
 from grbl.grblMonitor import GrblMonitor
 from grbl.grblStatus import GrblStatus
+from grbl.grblUtils import JOG_DISTANCE_ABSOLUTE, JOG_DISTANCE_INCREMENTAL
 from grbl.parsers.grblMsgTypes import GRBL_MSG_FEEDBACK, GRBL_MSG_STARTUP, GRBL_RESULT_OK
+from grbl.streaming.adaptiveStrategy import AdaptiveStrategy
+from grbl.streaming.characterCountingStrategy import CharacterCountingStrategy
+from grbl.streaming.sendResponseStrategy import SendResponseStrategy
+from grbl.streaming.streamingStrategy import STREAMING_ADAPTIVE, \
+    STREAMING_CHARACTER_COUNTING, STREAMING_SEND_RESPONSE
 import mocks.grbl_mocks as grbl_mocks
 from utils.serial import SerialService
+from utils.transport import TcpTransport
 from serial import SerialException
 import logging
-from queue import Empty, Queue
+from concurrent.futures import Future, TimeoutError
+from queue import Empty, Full, Queue
 import pytest
 from pytest_mock.plugin import MockerFixture
 import threading
@@ -38,6 +46,15 @@ class TestGrblController:
         mocker.patch.object(GrblMonitor, 'sent')
         mocker.patch.object(GrblMonitor, 'received')
 
+    def test_custom_transport(self):
+        # Call method under test
+        transport = TcpTransport()
+        grbl_controller = GrblController(logging.getLogger('test_logger'), transport)
+
+        # Assertions
+        assert grbl_controller.serial is transport
+        assert type(self.grbl_controller.serial) is SerialService
+
     def test_connect_fails_serial(self, mocker: MockerFixture):
         # Mock serial methods
         mocker.patch.object(
@@ -109,6 +126,12 @@ class TestGrblController:
             ]
         )
         mock_handle_homing = mocker.patch.object(GrblController, 'handleHomingCycle')
+        mock_query_build_info = mocker.patch.object(GrblController, 'queryBuildInfo')
+        mock_wait_processed = mocker.patch.object(
+            GrblController,
+            'waitUntilProcessed',
+            return_value=True
+        )
 
         # Call method under test
         response = self.grbl_controller.connect('port', 9600)
@@ -124,8 +147,83 @@ class TestGrblController:
         assert mock_serial_connect.call_count == 1
         assert mock_grbl_parser.call_count == 2
         assert mock_handle_homing.call_count == (1 if initial_homing else 0)
-        assert mock_thread_create.call_count == 1
-        assert mock_thread_start.call_count == 1
+        assert mock_thread_create.call_count == 3
+        assert mock_thread_start.call_count == 3
+        assert mock_query_build_info.call_count == 1
+        assert mock_wait_processed.call_count == 1
+
+    def test_connect_build_info_timeout(self, mocker: MockerFixture):
+        # Mock serial methods
+        mocker.patch.object(SerialService, 'startConnection')
+        mocker.patch.object(SerialService, 'readLine')
+
+        # Mock thread
+        mocker.patch.object(GrblController, 'startIO')
+
+        # Mock GRBL methods
+        mocker.patch.object(
+            GrblLineParser,
+            'parse',
+            side_effect=[
+                (GRBL_MSG_STARTUP, {'version': '0.9', 'raw': 'Grbl 0.9'}),
+                (GRBL_RESULT_OK, {})
+            ]
+        )
+        mocker.patch.object(GrblController, 'waitUntilProcessed', return_value=False)
+
+        # Mock monitor methods
+        mock_monitor_warning = mocker.patch.object(GrblMonitor, 'warning')
+
+        # Call method under test
+        self.grbl_controller.connect('port', 9600)
+
+        # Assertions
+        assert self.grbl_controller.priority_queue.get_nowait() == '$I'
+        assert self.grbl_controller.streaming.rx_buffer_size == 128
+        assert self.grbl_controller.getCommandsCount() == 0
+        mock_monitor_warning.assert_called_once_with(
+            'GRBL build info not received, using a RX buffer of 128 bytes'
+        )
+
+    @pytest.mark.parametrize(
+        'streaming,expected',
+        [
+            (STREAMING_CHARACTER_COUNTING, CharacterCountingStrategy),
+            (STREAMING_SEND_RESPONSE, SendResponseStrategy),
+            (STREAMING_ADAPTIVE, AdaptiveStrategy)
+        ]
+    )
+    def test_connect_streaming_strategy(self, mocker: MockerFixture, streaming, expected):
+        # Mock serial methods
+        mocker.patch.object(SerialService, 'startConnection')
+        mocker.patch.object(SerialService, 'readLine')
+
+        # Mock thread
+        mocker.patch.object(GrblController, 'startIO')
+
+        # Mock GRBL methods
+        mocker.patch.object(
+            GrblLineParser,
+            'parse',
+            side_effect=[
+                (GRBL_MSG_STARTUP, {'version': '1.1', 'raw': 'Grbl 1.1'}),
+                (GRBL_RESULT_OK, {})
+            ]
+        )
+        mocker.patch.object(GrblController, 'queryBuildInfo')
+        mocker.patch.object(GrblController, 'waitUntilProcessed', return_value=True)
+
+        # Call method under test
+        self.grbl_controller.connect('port', 9600, streaming)
+
+        # Assertions
+        assert type(self.grbl_controller.streaming) is expected
+
+    def test_connect_invalid_streaming_strategy(self):
+        # Call the method under test and assert exception
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.connect('port', 9600, 'invalid')
+        assert str(error.value) == 'Invalid streaming protocol: invalid'
 
     @pytest.mark.parametrize('connected', [True, False])
     def test_disconnect(self, mocker: MockerFixture, connected):
@@ -173,6 +271,306 @@ class TestGrblController:
         assert self.grbl_controller.queue.qsize() == 1
         assert self.grbl_controller.queue.get_nowait() == '$'
 
+    def test_send_command_queue_full(self):
+        # Set up command queue for test
+        self.grbl_controller.queue_size = 2
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        self.grbl_controller.sendCommand('G1 X20')
+
+        # Call method under test
+        non_blocking = self.grbl_controller.sendCommand('G1 X30', block=False)
+        timed_out = self.grbl_controller.sendCommand('G1 X30', timeout=0.01)
+        comment = self.grbl_controller.sendCommand('(comment)', block=False)
+
+        # Assertions
+        assert non_blocking is False
+        assert timed_out is False
+        assert comment is True
+        assert self.grbl_controller.isQueueFull()
+        assert self.grbl_controller.getQueueDepth() == 2
+        assert self.grbl_controller.getPendingBytes() == 19
+
+    def test_send_command_waits_queue_space(self, mocker: MockerFixture):
+        # Set up command queue for test
+        self.grbl_controller.queue_size = 1
+        self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Mock the writer fetching the queued command
+        def fetch():
+            with self.grbl_controller._io_condition:
+                self.grbl_controller._fetchNextCommand()
+
+        timer = threading.Timer(0.05, fetch)
+        timer.start()
+
+        # Call method under test
+        queued = self.grbl_controller.sendCommand('G1 X20', timeout=1.0)
+        timer.join()
+
+        # Assertions
+        assert queued is True
+        assert self.grbl_controller.getQueueDepth() == 1
+        assert self.grbl_controller.queue.get_nowait() == 'G1 X20'
+
+    @pytest.mark.parametrize('queue_size,expected', [(1, False), (2, True), (0, True)])
+    def test_wait_for_queue_space(self, queue_size, expected):
+        # Set up command queue for test
+        self.grbl_controller.queue_size = queue_size
+        self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Call method under test
+        result = self.grbl_controller.waitForQueueSpace(0.01)
+
+        # Assertions
+        assert result is expected
+
+    def test_empty_queue_wakes_producers(self):
+        # Set up command queue for test
+        self.grbl_controller.queue_size = 1
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        timer = threading.Timer(0.05, self.grbl_controller.emptyQueue)
+        timer.start()
+
+        # Call method under test
+        result = self.grbl_controller.waitForQueueSpace(1.0)
+        timer.join()
+
+        # Assertions
+        assert result is True
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    def test_send_command_priority(self):
+        # Set up command queue for test
+        self.grbl_controller.queue_size = 1
+        self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Call method under test
+        queued = self.grbl_controller.sendCommand('$J=G91 X1 F100', block=False, priority=True)
+
+        # Assertions
+        assert queued is True
+        assert self.grbl_controller.getQueueDepth() == 2
+        assert self.grbl_controller.getPendingBytes() == 27
+        assert self.grbl_controller.queue.get_nowait() == 'G1 X10 F100'
+        assert self.grbl_controller.priority_queue.get_nowait() == '$J=G91 X1 F100'
+
+    def test_fetch_next_command_priority(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Set up command queue for test
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        self.grbl_controller.sendCommand('G1 X20')
+        self.grbl_controller.sendCommand('$G', priority=True)
+
+        # Call method under test
+        with self.grbl_controller._io_condition:
+            sent = [self.grbl_controller._fetchNextCommand() for _ in range(4)]
+
+        # Assertions
+        assert sent == ['$G', 'G1 X10 F100', 'G1 X20', None]
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    def test_fetch_next_command_priority_ahead_of_waiting_line(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Fill the RX buffer, so the next program line has to wait for space
+        self.grbl_controller.streaming.sent('G1 X' + '0' * 115)
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        with self.grbl_controller._io_condition:
+            assert self.grbl_controller._fetchNextCommand() is None
+
+        # Call method under test
+        self.grbl_controller.sendCommand('$X', priority=True)
+        with self.grbl_controller._io_condition:
+            sent = self.grbl_controller._fetchNextCommand()
+            waiting = self.grbl_controller._fetchNextCommand()
+
+        # Assertions
+        assert sent == '$X'
+        assert waiting is None
+        assert self.grbl_controller.getQueueDepth() == 1
+        assert self.grbl_controller.streaming.pending_commands()[-1] == '$X'
+
+    def test_submit_command(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Call method under test
+        future = self.grbl_controller.submitCommand('$#', priority=True)
+        other = self.grbl_controller.submitCommand('G1 X10 F100')
+        with self.grbl_controller._io_condition:
+            for _ in range(2):
+                self.grbl_controller.streaming.sent(self.grbl_controller._fetchNextCommand())
+
+        # Simulate getting responses from GRBL
+        for response in ['[G54:0.000,0.000,0.000]', '[TLO:0.000]', 'ok', '[MSG:Pgm End]']:
+            self.grbl_controller.parseResponse(response)
+
+        # Assertions
+        assert future.result(timeout=0) == {
+            'id': 1,
+            'command': '$#',
+            'response': 'ok',
+            'lines': ['[G54:0.000,0.000,0.000]', '[TLO:0.000]']
+        }
+        assert not other.done()
+        self.grbl_controller.parseResponse('error:20')
+        assert other.result(timeout=0)['response'] == 'error:20'
+        assert other.result(timeout=0)['lines'] == ['[MSG:Pgm End]']
+
+    def test_submit_command_not_sent(self):
+        # Call method under test
+        future = self.grbl_controller.submitCommand('(comment)')
+
+        # Assertions
+        assert future.result(timeout=0)['response'] == ''
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    def test_submit_command_queue_full(self):
+        # Set up command queue for test
+        self.grbl_controller.queue_size = 1
+        self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Call method under test
+        future = self.grbl_controller.submitCommand('G1 X20', block=False)
+
+        # Assertions
+        assert isinstance(future.exception(timeout=0), Full)
+
+    def test_submit_command_cancelled(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+        mocker.patch.object(GrblStatus, 'connected', return_value=True)
+
+        # Mock serial methods
+        mocker.patch.object(SerialService, 'stopConnection')
+
+        # Set up command queue for test
+        sent = self.grbl_controller.submitCommand('G1 X10 F100')
+        queued = self.grbl_controller.submitCommand('G1 X20')
+        with self.grbl_controller._io_condition:
+            self.grbl_controller._fetchNextCommand()
+
+        # Call method under test
+        self.grbl_controller.emptyQueue()
+
+        # Assertions
+        assert queued.cancelled()
+        assert not sent.done()
+
+        # Call method under test
+        self.grbl_controller.disconnect()
+
+        # Assertions
+        assert sent.cancelled()
+
+    def test_priority_commands_not_counted(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Set up command queue for test
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        self.grbl_controller.sendCommand('$G', priority=True)
+        with self.grbl_controller._io_condition:
+            for _ in range(2):
+                self.grbl_controller.streaming.sent(self.grbl_controller._fetchNextCommand())
+
+        # Simulate getting responses from GRBL
+        self.grbl_controller.parseResponse('ok')
+        self.grbl_controller.parseResponse('ok')
+
+        # Assertions
+        assert self.grbl_controller.getCommandsCount() == 1
+
+    def test_execute_command_timeout(self):
+        # Call method under test
+        with pytest.raises(TimeoutError):
+            self.grbl_controller.executeCommand('$G', timeout=0.01)
+
+    def test_get_latency_stats(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Mock time
+        mocker.patch.object(
+            time,
+            'perf_counter',
+            side_effect=[10.0, 10.0, 10.1, 10.2, 10.5, 10.25]
+        )
+
+        # Send and acknowledge a program line and an interactive command
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        self.grbl_controller.sendCommand('$G', priority=True)
+        with self.grbl_controller._io_condition:
+            self.grbl_controller._fetchNextCommand()
+            self.grbl_controller._fetchNextCommand()
+        self.grbl_controller.parseResponse('ok')
+        self.grbl_controller.parseResponse('ok')
+
+        # Call method under test
+        stats = self.grbl_controller.getLatencyStats()
+
+        # Assertions
+        assert stats['priority'] == {
+            'samples': 1,
+            'mean': 500.0,
+            'p50': 500.0,
+            'p99': 500.0,
+            'max': 500.0
+        }
+        assert stats['bulk']['samples'] == 1
+        assert stats['bulk']['max'] == 250.0
+
+    def test_get_stats(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Mock serial methods
+        mocker.patch.object(SerialService, 'sendLine')
+        mocker.patch.object(SerialService, 'sendBytes')
+
+        # Mock time
+        mocker.patch.object(time, 'perf_counter', side_effect=[10.0, 10.0, 10.02])
+
+        # Send a line, query the status and receive the responses
+        self.grbl_controller._parser_queried_at = time.time()
+        self.grbl_controller.sendCommand('G1 X10 F100')
+        with self.grbl_controller._io_condition:
+            self.grbl_controller._writeCommand(self.grbl_controller._fetchNextCommand())
+        self.grbl_controller.queryStatusReport()
+        self.grbl_controller.parseResponse('ok')
+        self.grbl_controller.parseResponse('<Idle|MPos:0.000,0.000,0.000|FS:0,0>')
+        self.grbl_controller.parseResponse('error:20')
+        self.grbl_controller.parseResponse('invalid')
+
+        # Call method under test
+        stats = self.grbl_controller.getStats()
+
+        # Assertions
+        assert stats['bytes_sent'] == 14
+        assert stats['lines_sent'] == 1
+        assert stats['realtime_sent'] == 2
+        assert stats['lines_received'] == 4
+        assert stats['bytes_received'] == 61
+        assert stats['oks'] == 1
+        assert stats['errors'] == 1
+        assert stats['alarms'] == 0
+        assert stats['parse_failures'] == 1
+        assert stats['status_reports'] == 1
+        assert stats['acks_per_second'] == 2.0
+        assert stats['status_reports_per_second'] == 1.0
+        assert stats['latency_ms']['samples'] == 1
+        assert stats['latency_ms']['p99'] == pytest.approx(20.0)
+        assert stats['latency_ms']['counts'][4] == 1
+        assert stats['rx_buffer']['histogram'][0] == 1
+        assert stats['rx_buffer']['max'] == pytest.approx(9.375)
+        assert stats['paused_time'] >= 0.0
+
     def test_handle_homing_cycle(self, mocker: MockerFixture):
         # Mock GRBL methods
         mock_disable_alarm = mocker.patch.object(GrblController, 'disableAlarm')
@@ -192,7 +590,7 @@ class TestGrblController:
 
         # Assertions
         assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$X')
+        mock_command_send.assert_called_with('$X', priority=True)
 
     def test_query_status_report(self, mocker: MockerFixture):
         # Mock GRBL methods
@@ -232,7 +630,7 @@ class TestGrblController:
 
         # Assertions
         assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$G')
+        mock_command_send.assert_called_with('$G', priority=True)
 
     def test_query_help(self, mocker: MockerFixture):
         # Mock GRBL methods
@@ -243,7 +641,7 @@ class TestGrblController:
 
         # Assertions
         assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$')
+        mock_command_send.assert_called_with('$', priority=True)
 
     def test_toggle_checkmode(self, mocker: MockerFixture):
         # Mock GRBL methods
@@ -254,7 +652,7 @@ class TestGrblController:
 
         # Assertions
         assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$C')
+        mock_command_send.assert_called_with('$C', priority=True)
 
     def test_jog(self, mocker: MockerFixture):
         # Mock GRBL methods
@@ -270,7 +668,92 @@ class TestGrblController:
         # Assertions
         assert mock_build_jog_command.call_count == 1
         assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$J=X1.0 Y2.0 Z3.0 F500.0')
+        mock_command_send.assert_called_with('$J=X1.0 Y2.0 Z3.0 F500.0', priority=True)
+
+    def test_jog_session_merges_jogs(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Call the method under test
+        self.grbl_controller.startJogSession(max_in_flight=1)
+        for x, y in [(1.0, 0.0), (0.1, 0.0), (0.2, 1.0), (0.2, 0.0)]:
+            self.grbl_controller.jog(x, y, 0.0, 500.0, distance_mode=JOG_DISTANCE_INCREMENTAL)
+
+        # Assertions
+        assert self.grbl_controller.isJogSession() is True
+        assert self.grbl_controller.getJogsInFlight() == 1
+        assert self.grbl_controller.priority_queue.get_nowait() == '$J=G91 X1.0 F500.0'
+
+        # Simulate GRBL planning the jog in flight
+        self.grbl_controller.streaming.sent('$J=G91 X1.0 F500.0')
+        self.grbl_controller.parseResponse('ok')
+
+        # Assertions
+        assert self.grbl_controller.priority_queue.get_nowait() == '$J=G91 X0.5 Y1.0 F500.0'
+
+    def test_jog_session_keeps_other_jogs(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mocker.patch.object(GrblController, 'getJogsInFlight', return_value=2)
+
+        # Call the method under test
+        self.grbl_controller.startJogSession()
+        self.grbl_controller.jog(1.0, 0.0, 0.0, 500.0, distance_mode=JOG_DISTANCE_INCREMENTAL)
+        self.grbl_controller.jog(1.0, 0.0, 0.0, 100.0, distance_mode=JOG_DISTANCE_INCREMENTAL)
+        self.grbl_controller.jog(5.0, 0.0, 0.0, 100.0, distance_mode=JOG_DISTANCE_ABSOLUTE)
+        self.grbl_controller.jog(1.0, 0.0, 0.0, 100.0, distance_mode=JOG_DISTANCE_ABSOLUTE)
+
+        # Assertions
+        assert len(self.grbl_controller._pending_jogs) == 4
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    def test_stop_jog_session(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mock_jog_cancel = mocker.patch.object(GrblController, 'grbl_jog_cancel')
+        mocker.patch.object(GrblController, 'grbl_pause')
+
+        # Mock state: a jog not yet planned by GRBL, and another one held
+        self.grbl_controller.startJogSession(max_in_flight=1)
+        self.grbl_controller.streaming.sent('$J=G91 X1.0 F500.0')
+        self.grbl_controller.jog(1.0, 0.0, 0.0, 500.0, distance_mode=JOG_DISTANCE_INCREMENTAL)
+
+        # Call the method under test
+        self.grbl_controller.stopJogSession()
+
+        # Assertions
+        assert self.grbl_controller.isJogSession() is False
+        assert mock_jog_cancel.call_count == 1
+        assert len(self.grbl_controller._pending_jogs) == 0
+
+        # Simulate GRBL planning the jog in flight, after the cancel
+        self.grbl_controller.parseResponse('ok')
+        self.grbl_controller.parseResponse('ok')
+
+        # Assertions
+        assert mock_jog_cancel.call_count == 2
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    def test_grbl_jog_cancel(self, mocker: MockerFixture):
+        # Mock serial methods
+        mock_send_bytes = mocker.patch.object(SerialService, 'sendBytes')
+
+        # Call the method under test
+        self.grbl_controller.grbl_jog_cancel()
+
+        # Assertions
+        mock_send_bytes.assert_called_once_with(b'\x85')
+
+    def test_grbl_jog_cancel_error(self, mocker: MockerFixture):
+        # Mock serial methods
+        mocker.patch.object(SerialService, 'sendBytes', side_effect=SerialException('mocked-error'))
+
+        # Mock monitor methods
+        mock_monitor_error = mocker.patch.object(GrblMonitor, 'error')
+
+        # Call the method under test
+        self.grbl_controller.grbl_jog_cancel()
+
+        # Assertions
+        assert mock_monitor_error.call_count == 1
 
     def test_set_settings(self, mocker: MockerFixture):
         # Mock GRBL methods
@@ -288,6 +771,145 @@ class TestGrblController:
         # Assertions
         assert mock_command_send.call_count == 3
 
+    def test_sync_settings(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        def answer(command: str, priority: bool):
+            future = Future()
+            future.set_result({'id': 1, 'command': command, 'response': 'ok', 'lines': []})
+            return future
+
+        mock_submit = mocker.patch.object(GrblController, 'submitCommand', side_effect=answer)
+        mock_fetch_settings = mocker.patch.object(GrblController, 'fetchGrblSettings')
+
+        # Set test values for controller's settings
+        self.grbl_controller.parseResponse('$22=1')
+        self.grbl_controller.parseResponse('$27=5.200')
+
+        # Call the method under test
+        changed = self.grbl_controller.syncSettings(
+            {
+                '$22': '1',
+                '$23': '5',
+                '$27': '5.2'
+            }
+        )
+
+        # Assertions
+        assert changed == {'$23': '5'}
+        assert mock_submit.call_count == 1
+        mock_submit.assert_called_with('$23=5', priority=True)
+        assert mock_fetch_settings.call_count == 0
+
+    def test_sync_settings_unknown(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        def fetch_settings(timeout: float):
+            self.grbl_controller.parseResponse('$22=1')
+            self.grbl_controller.parseResponse('$23=0')
+
+        mock_fetch_settings = mocker.patch.object(
+            GrblController,
+            'fetchGrblSettings',
+            side_effect=fetch_settings
+        )
+
+        # Call the method under test
+        changed = self.grbl_controller.syncSettings({'$22': '1'})
+
+        # Assertions
+        assert changed == {}
+        assert mock_fetch_settings.call_count == 1
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    def test_sync_settings_rejected(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        def answer(command: str, priority: bool):
+            future = Future()
+            future.set_result({'id': 1, 'command': command, 'response': 'error:8', 'lines': []})
+            return future
+
+        mocker.patch.object(GrblController, 'submitCommand', side_effect=answer)
+
+        # Set test values for controller's settings
+        self.grbl_controller.parseResponse('$22=1')
+
+        # Call the method under test and assert exception
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.syncSettings({'$22': '0'})
+
+        # Assertions
+        assert str(error.value) == 'GRBL failed updating the setting $22=0: error:8'
+
+    @pytest.mark.parametrize('key,value', [('$200', '1'), ('$22', 'on'), ('22', '1')])
+    def test_sync_settings_invalid(self, key, value):
+        # Call the method under test and assert exception
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.syncSettings({key: value})
+
+        # Assertions
+        assert str(error.value) == f'Invalid GRBL setting: {key}={value}'
+
+    @pytest.mark.parametrize('active_state', ['Idle', 'Run', 'Hold'])
+    def test_sync_settings_streaming(self, mocker: MockerFixture, active_state):
+        # Mock status methods
+        mocker.patch.object(
+            GrblStatus,
+            'get_status_report',
+            return_value={'activeState': active_state}
+        )
+
+        # Mock queue contents
+        if active_state == 'Idle':
+            self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Call the method under test and assert exception
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.syncSettings({'$22': '1'})
+
+        # Assertions
+        assert 'while a program is being streamed' in str(error.value)
+        assert self.grbl_controller.priority_queue.qsize() == 0
+
+    def test_settings_updated_by_commands(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Set test values for controller's settings
+        self.grbl_controller.parseResponse('$22=1')
+
+        def send(command: str):
+            self.grbl_controller.sendCommand(command, priority=True)
+            with self.grbl_controller._io_condition:
+                self.grbl_controller._fetchNextCommand()
+            self.grbl_controller.parseResponse('ok')
+
+        # Call the method under test
+        send('$23=5')
+        settings = dict(self.grbl_controller.getGrblSettings())
+        send('$RST=$')
+
+        # Assertions
+        assert settings['$23']['value'] == '5'
+        assert settings['$23']['message'] == 'Homing direction invert'
+        assert settings['$22']['value'] == '1'
+        assert self.grbl_controller.getGrblSettings() == {}
+
+    def test_settings_snapshot(self, mocker: MockerFixture):
+        # Mock another controller, previously connected to the same device
+        previous = GrblController(logging.getLogger('test_logger'))
+        previous.build_info['version'] = '1.1h.20190825'
+        previous._loadSettingsSnapshot('/dev/ttyUSB0')
+        previous.parseResponse('$22=1')
+
+        # Call the method under test
+        self.grbl_controller.build_info['version'] = '1.1h.20190825'
+        self.grbl_controller._loadSettingsSnapshot('/dev/ttyUSB0')
+        settings = self.grbl_controller.getGrblSettings()
+        self.grbl_controller._loadSettingsSnapshot('/dev/ttyUSB1')
+
+        # Assertions
+        assert settings['$22']['value'] == '1'
+        assert self.grbl_controller.getGrblSettings() == {}
+
     def test_query_build_info(self, mocker: MockerFixture):
         # Mock GRBL methods
         mock_command_send = mocker.patch.object(GrblController, 'sendCommand')
@@ -297,29 +919,68 @@ class TestGrblController:
 
         # Assertions
         assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$I')
+        mock_command_send.assert_called_with('$I', priority=True)
+
+    def test_query_settings(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mock_command_send = mocker.patch.object(GrblController, 'sendCommand')
+
+        # Call the method under test
+        self.grbl_controller.queryGrblSettings()
+
+        # Assertions
+        assert mock_command_send.call_count == 1
+        mock_command_send.assert_called_with('$$', priority=True)
+
+    def test_query_grbl_parameters(self, mocker: MockerFixture):
+        # Mock GRBL methods
+        mock_command_send = mocker.patch.object(GrblController, 'sendCommand')
+
+        # Call the method under test
+        self.grbl_controller.queryGrblParameters()
+
+        # Assertions
+        assert mock_command_send.call_count == 1
+        mock_command_send.assert_called_with('$#', priority=True)
 
-    def test_query_settings(self, mocker: MockerFixture):
+    @pytest.mark.parametrize(
+        'method,command',
+        [
+            ('fetchGcodeParserState', '$G'),
+            ('fetchGrblParameters', '$#'),
+            ('fetchGrblSettings', '$$'),
+            ('fetchBuildInfo', '$I')
+        ]
+    )
+    def test_fetch_query(self, mocker: MockerFixture, method, command):
         # Mock GRBL methods
-        mock_command_send = mocker.patch.object(GrblController, 'sendCommand')
+        mock_execute_command = mocker.patch.object(
+            GrblController,
+            'executeCommand',
+            return_value={'id': 1, 'command': command, 'response': 'ok', 'lines': []}
+        )
 
         # Call the method under test
-        self.grbl_controller.queryGrblSettings()
+        result = getattr(self.grbl_controller, method)(timeout=2.0)
 
         # Assertions
-        assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$$')
+        assert result is not None
+        mock_execute_command.assert_called_once_with(command, 2.0)
 
-    def test_query_grbl_parameters(self, mocker: MockerFixture):
+    def test_fetch_query_error(self, mocker: MockerFixture):
         # Mock GRBL methods
-        mock_command_send = mocker.patch.object(GrblController, 'sendCommand')
+        mocker.patch.object(
+            GrblController,
+            'executeCommand',
+            return_value={'id': 1, 'command': '$$', 'response': 'error:9', 'lines': []}
+        )
 
         # Call the method under test
-        self.grbl_controller.queryGrblParameters()
+        with pytest.raises(Exception) as error:
+            self.grbl_controller.fetchGrblSettings()
 
         # Assertions
-        assert mock_command_send.call_count == 1
-        mock_command_send.assert_called_with('$#')
+        assert str(error.value) == 'GRBL failed answering the query $$: error:9'
 
     def test_getters(self):
         # Set test values for controller's parameters
@@ -349,7 +1010,7 @@ class TestGrblController:
     )
     def test_get_buffer_fill(self, occupied, expected):
         # Set test value for controller's active state
-        self.grbl_controller._sumcline = occupied
+        self.grbl_controller.streaming._used = occupied
 
         # Call methods under test
         value = self.grbl_controller.getBufferFill()
@@ -357,6 +1018,65 @@ class TestGrblController:
         # Assertions
         assert value == expected
 
+    def test_get_pending_bytes(self):
+        # Set test values for controller's buffers
+        self.grbl_controller.streaming._used = 40
+        self.grbl_controller._queued_bytes = 30
+
+        # Call methods under test
+        pending = self.grbl_controller.getPendingBytes()
+        available = self.grbl_controller.getBufferAvailable()
+
+        # Assertions
+        assert pending == 70
+        assert available == 57
+
+    def test_get_buffer_available_overflow(self):
+        # Set test values for controller's buffers
+        self.grbl_controller.streaming._used = 100
+        self.grbl_controller._queued_bytes = 100
+
+        # Call method under test
+        available = self.grbl_controller.getBufferAvailable()
+
+        # Assertions
+        assert available == 0
+
+    def test_get_lines_in_flight(self):
+        # Set test values for controller's buffers
+        for command in ['$H', 'G54', 'G00 X0 Y0']:
+            self.grbl_controller.streaming.sent(command)
+        self.grbl_controller.sendCommand('G1 X10')
+        self.grbl_controller.sendCommand('G1 X20')
+
+        # Call method under test
+        lines = self.grbl_controller.getLinesInFlight()
+
+        # Assertions
+        assert lines == 5
+        assert self.grbl_controller._queued_bytes == 14
+
+    def test_wait_for_ack(self):
+        # Simulate an acknowledgement from another thread
+        acks_count = self.grbl_controller.getAcksCount()
+        timer = threading.Timer(0.01, self.grbl_controller.notifyAck)
+        timer.start()
+
+        # Call method under test
+        acknowledged = self.grbl_controller.waitForAck(acks_count, timeout=1.0)
+
+        # Assertions
+        assert acknowledged is True
+        assert self.grbl_controller.getAcksCount() == acks_count + 1
+
+    def test_wait_for_ack_timeout(self):
+        # Call method under test
+        acks_count = self.grbl_controller.getAcksCount()
+        acknowledged = self.grbl_controller.waitForAck(acks_count, timeout=0.01)
+
+        # Assertions
+        assert acknowledged is False
+
     def test_empty_command_queue(self, mocker: MockerFixture):
         # Mock queue contents
         self.grbl_controller.queue.put('Command 1')
@@ -371,7 +1091,7 @@ class TestGrblController:
         self.grbl_controller.emptyQueue()
 
         # Assertions
-        assert mock_queue_size.call_count == 4
+        assert mock_queue_size.call_count == 5
         assert mock_queue_get.call_count == 3
 
     def test_empty_command_queue_empty(self, mocker: MockerFixture):
@@ -383,8 +1103,8 @@ class TestGrblController:
         self.grbl_controller.emptyQueue()
 
         # Assertions
-        assert mock_queue_size.call_count == 1
-        assert mock_queue_get.call_count == 1
+        assert mock_queue_size.call_count == 2
+        assert mock_queue_get.call_count == 2
 
     # PARSER
 
@@ -393,17 +1113,17 @@ class TestGrblController:
         self.grbl_controller.parameters = {}
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse('[G54:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G55:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G56:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G57:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G58:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G59:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G28:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G30:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[G92:0.000,0.000,0.000]', [], [])
-        self.grbl_controller.parseResponse('[TLO:0.000]', [], [])
-        self.grbl_controller.parseResponse('[PRB:0.000,0.000,0.000:0]', [], [])
+        self.grbl_controller.parseResponse('[G54:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G55:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G56:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G57:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G58:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G59:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G28:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G30:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[G92:0.000,0.000,0.000]')
+        self.grbl_controller.parseResponse('[TLO:0.000]')
+        self.grbl_controller.parseResponse('[PRB:0.000,0.000,0.000:0]')
 
         # Assertions
         assert self.grbl_controller.parameters == {
@@ -425,8 +1145,8 @@ class TestGrblController:
         self.grbl_controller.settings = {}
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse('$0=100.200', [], [])
-        self.grbl_controller.parseResponse('$102=1.000', [], [])
+        self.grbl_controller.parseResponse('$0=100.200')
+        self.grbl_controller.parseResponse('$102=1.000')
 
         # Assertions
         assert self.grbl_controller.settings == {
@@ -487,11 +1207,50 @@ class TestGrblController:
 
         # Simulate getting responses from GRBL
         for message in messages:
-            self.grbl_controller.parseResponse(message, [], [])
+            self.grbl_controller.parseResponse(message)
 
         # Assertions
         assert self.grbl_controller.build_info == expected
 
+    def test_parser_receive_grbl_build_info_buffer_size(self):
+        # Set test values for controller's state
+        self.grbl_controller.build_info = {}
+        self.grbl_controller.streaming.sent('G1 X' + '0' * 59)
+
+        # Simulate getting responses from GRBL
+        self.grbl_controller.parseResponse('[OPT:VL,31,256]')
+
+        # Assertions
+        assert self.grbl_controller.build_info['blockBufferSize'] == 31
+        assert self.grbl_controller.streaming.rx_buffer_size == 256
+        assert self.grbl_controller.getBufferFill() == 25.0
+        assert self.grbl_controller.getBufferAvailable() == 191
+
+    def test_wait_until_processed(self, mocker: MockerFixture):
+        # Set test values for controller's state
+        self.grbl_controller.streaming.sent('$I')
+
+        # Simulate an acknowledgement from another thread
+        timer = threading.Timer(0.01, self.grbl_controller.parseResponse, args=['ok'])
+        timer.start()
+
+        # Call method under test
+        processed = self.grbl_controller.waitUntilProcessed(timeout=1.0)
+
+        # Assertions
+        assert processed is True
+        assert self.grbl_controller.getLinesInFlight() == 0
+
+    def test_wait_until_processed_timeout(self):
+        # Set test values for controller's state
+        self.grbl_controller.sendCommand('$I')
+
+        # Call method under test
+        processed = self.grbl_controller.waitUntilProcessed(timeout=0.01)
+
+        # Assertions
+        assert processed is False
+
     @pytest.mark.parametrize(
         'message,expected_state',
         [
@@ -509,7 +1268,7 @@ class TestGrblController:
         mock_monitor_info = mocker.patch.object(GrblMonitor, 'info')
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse(message, [], [])
+        self.grbl_controller.parseResponse(message)
 
         # Assertions
         assert mock_monitor_info.call_count == 1
@@ -523,9 +1282,7 @@ class TestGrblController:
 
         # Simulate getting responses from GRBL
         self.grbl_controller.parseResponse(
-            '[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $C $X $H ~ ! ? ctrl-x]',
-            [],
-            []
+            '[HLP:$$ $# $G $I $N $x=val $Nx=line $J=line $C $X $H ~ ! ? ctrl-x]'
         )
 
         # Assertions
@@ -536,9 +1293,7 @@ class TestGrblController:
     def test_parser_receive_parser_state(self, mocker: MockerFixture):
         # Simulate getting responses from GRBL
         self.grbl_controller.parseResponse(
-            '[GC:G38.2 G54 G17 G21 G91 G94 M0 M5 M7 M8 T0 F20. S0.]',
-            [],
-            []
+            '[GC:G38.2 G54 G17 G21 G91 G94 M0 M5 M7 M8 T0 F20. S0.]'
         )
 
         # Assertions
@@ -563,9 +1318,7 @@ class TestGrblController:
     def test_parser_receive_status_report(self):
         # Simulate getting responses from GRBL
         self.grbl_controller.parseResponse(
-            '<Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>',
-            [],
-            []
+            '<Idle|MPos:5.000,2.000,0.000|FS:0,0|Ov:100,100,100>'
         )
 
         # Assertions
@@ -587,29 +1340,28 @@ class TestGrblController:
 
     def test_parser_receive_disable_alarm_feedback(self):
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse('[MSG:Caution: Unlocked]', [], [])
+        self.grbl_controller.parseResponse('[MSG:Caution: Unlocked]')
 
         # Assertions
         assert self.grbl_status.is_alarm() is False
 
     def test_parser_receive_ok(self):
         # Set test values
-        cline = [1, 2, 3]
-        sline = ['$H', 'G54', 'G00 X0 Y0']
-        self.grbl_controller._sumcline = 6  # sum([1, 2, 3])
+        for command in ['$H', 'G54', 'G00 X0 Y0']:
+            self.grbl_controller.streaming.sent(command)
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse('ok', cline, sline)
+        self.grbl_controller.parseResponse('ok')
 
         # Assertions
-        assert cline == [2, 3]
-        assert sline == ['G54', 'G00 X0 Y0']
-        assert self.grbl_controller._sumcline == 5
+        assert self.grbl_controller.streaming.pending_commands() == ['G54', 'G00 X0 Y0']
+        assert self.grbl_controller.streaming.used_bytes() == 14
+        assert self.grbl_controller.getAcksCount() == 1
 
     def test_parser_receive_error(self, mocker: MockerFixture):
         # Set test values
-        cline = [1, 2, 3]
-        sline = ['G54 G54', 'G90', 'G00 X0 Y0']
+        for command in ['G54 G54', 'G90', 'G00 X0 Y0']:
+            self.grbl_controller.streaming.sent(command)
 
         # Mock status methods
         mock_set_error = mocker.patch.object(GrblStatus, 'set_error')
@@ -621,11 +1373,10 @@ class TestGrblController:
         mock_pause = mocker.patch.object(self.grbl_controller, 'grbl_pause')
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse('error:25', cline, sline)
+        self.grbl_controller.parseResponse('error:25')
 
         # Assertions
-        assert cline == [2, 3]
-        assert sline == ['G90', 'G00 X0 Y0']
+        assert self.grbl_controller.streaming.pending_commands() == ['G90', 'G00 X0 Y0']
         assert mock_set_error.call_count == 1
         mock_set_error.assert_called_with(
             'G54 G54',
@@ -644,8 +1395,8 @@ class TestGrblController:
 
     def test_parser_receive_alarm(self, mocker: MockerFixture):
         # Set test values
-        cline = [1, 2, 3]
-        sline = ['$H', 'G54', 'G00 X0 Y0']
+        for command in ['$H', 'G54', 'G00 X0 Y0']:
+            self.grbl_controller.streaming.sent(command)
 
         # Mock status methods
         mock_set_error = mocker.patch.object(GrblStatus, 'set_error')
@@ -654,11 +1405,10 @@ class TestGrblController:
         mock_monitor_critical = mocker.patch.object(GrblMonitor, 'critical')
 
         # Simulate getting responses from GRBL
-        self.grbl_controller.parseResponse('ALARM:6', cline, sline)
+        self.grbl_controller.parseResponse('ALARM:6')
 
         # Assertions
-        assert cline == [2, 3]
-        assert sline == ['G54', 'G00 X0 Y0']
+        assert self.grbl_controller.streaming.pending_commands() == ['G54', 'G00 X0 Y0']
         assert mock_set_error.call_count == 1
         mock_set_error.assert_called_with(
             '$H',
@@ -678,116 +1428,330 @@ class TestGrblController:
 
     # SERIAL I/O
 
-    @pytest.mark.parametrize('paused', [True, False])
-    def test_serial_io(self, mocker: MockerFixture, paused):
-        # **Test case description (no pause)**
-        # Round 1: query status + get command to send + read line + parse line + send command
-        # Round 2: query status + get command to send + send command
-        # Round 3: query status + read line (no response)
-
-        # Mock attributes
-        self.grbl_controller.serial_thread = threading.Thread()
+    def test_start_and_stop_io(self, mocker: MockerFixture):
+        # Mock thread methods
+        mock_thread_start = mocker.patch.object(threading.Thread, 'start')
+        mock_thread_alive = mocker.patch.object(threading.Thread, 'is_alive', return_value=True)
+        mock_thread_join = mocker.patch.object(threading.Thread, 'join')
 
-        # Mock queue contents
-        self.grbl_controller.queue.put('Command 1')
-        self.grbl_controller.queue.put('Command 2')
+        # Call methods under test
+        self.grbl_controller.startIO()
+        threads_count = len(self.grbl_controller.io_threads)
+        self.grbl_controller.stopIO()
 
-        # Mock time and thread life cycle
-        self.count = 0
-        self.current_time = 1703991600.0    # 2023-12-31 03:00:00.3 (UTC)
+        # Assertions
+        assert threads_count == 3
+        assert mock_thread_start.call_count == 3
+        assert mock_thread_alive.call_count == 3
+        assert mock_thread_join.call_count == 3
+        assert self.grbl_controller._io_stop.is_set()
+        assert self.grbl_controller.io_threads == []
+
+    def test_serial_reader(self, mocker: MockerFixture):
+        # Mock thread life cycle
+        responses = ['test message', '', 'another message']
 
-        def manage_time():
-            # Manage thread
-            if self.count == 3:
-                self.grbl_controller.serial_thread = None
-            self.count = self.count + 1
+        def read_line():
+            response = responses.pop(0)
+            if not responses:
+                self.grbl_controller._io_stop.set()
+            return response
 
-            # Fake time, adding 200 ms each time
-            new_time = self.current_time
-            self.current_time = self.current_time + 0.2
-            return new_time
+        # Mock controller methods
+        mock_parse_response = mocker.patch.object(GrblController, 'parseResponse')
 
-        # Mock timer method
-        mock_time = mocker.patch.object(
-            time,
-            'time',
-            side_effect=manage_time
+        # Mock serial methods
+        mock_serial_read_line = mocker.patch.object(
+            SerialService,
+            'readLine',
+            side_effect=read_line
         )
 
-        # Mock status methods
-        mocker.patch.object(GrblStatus, 'paused', return_value=paused)
+        # Call method under test
+        self.grbl_controller.serialReader()
+
+        # Assertions
+        assert mock_serial_read_line.call_count == 3
+        assert mock_parse_response.call_count == 2
 
+    def test_serial_reader_serial_error(self, mocker: MockerFixture):
         # Mock controller methods
-        mock_query_status_report = mocker.patch.object(GrblController, 'queryStatusReport')
+        mock_disconnect = mocker.patch.object(GrblController, 'disconnect')
         mock_parse_response = mocker.patch.object(GrblController, 'parseResponse')
 
         # Mock serial methods
-        mock_serial_waiting = mocker.patch.object(
-            SerialService,
-            'waiting',
-            side_effect=[True, False, True]
-        )
-        mock_serial_read_line = mocker.patch.object(
+        mocker.patch.object(
             SerialService,
             'readLine',
-            side_effect=['test message', '', '']
+            side_effect=SerialException('mocked-error')
         )
-        mock_serial_send_line = mocker.patch.object(SerialService, 'sendLine')
 
         # Mock monitor methods
-        mock_monitor_sent = mocker.patch.object(GrblMonitor, 'sent')
+        mock_monitor_error = mocker.patch.object(GrblMonitor, 'error')
 
-        # Spy queue methods
-        spy_queue_size = mocker.spy(Queue, 'qsize')
-        spy_queue_get = mocker.spy(Queue, 'get_nowait')
+        # Call method under test
+        self.grbl_controller.serialReader()
+
+        # Assertions
+        assert mock_parse_response.call_count == 0
+        assert mock_monitor_error.call_count == 1
+        assert mock_disconnect.call_count == 1
+
+    def test_status_poller(self, mocker: MockerFixture):
+        # Mock controller methods
+        def side_effect_query():
+            if mock_query_status_report.call_count == 3:
+                self.grbl_controller._io_stop.set()
+
+        mock_query_status_report = mocker.patch.object(
+            GrblController,
+            'queryStatusReport',
+            side_effect=side_effect_query
+        )
+        mock_get_poll_interval = mocker.patch.object(
+            GrblController,
+            'getPollInterval',
+            return_value=0.01
+        )
 
         # Call method under test
-        self.grbl_controller.serialIO()
+        self.grbl_controller.statusPoller()
 
         # Assertions
-        # **Query GRBL status section**
-        assert mock_time.call_count == 4
         assert mock_query_status_report.call_count == 3
-        # **Read serial section**
-        assert mock_serial_waiting.call_count == 3
-        assert mock_serial_read_line.call_count == (3 if paused else 2)
-        assert mock_parse_response.call_count == 1
-        # **Write serial section**
-        assert spy_queue_size.call_count == (0 if paused else 3)
-        assert spy_queue_get.call_count == (0 if paused else 2)
+        assert mock_get_poll_interval.call_count == 3
+
+    def test_set_polling_rates(self):
+        # Call method under test
+        self.grbl_controller.setPollingRates(fast=0.2, burst=0.01)
+
+        # Assertions
+        assert self.grbl_controller.poll_fast == 0.2
+        assert self.grbl_controller.poll_slow == 1.0
+        assert self.grbl_controller.poll_burst == 0.01
+        assert self.grbl_controller._poll_wakeup.is_set()
+
+    def test_request_status_burst(self):
+        # Call method under test
+        self.grbl_controller.requestStatusBurst()
+
+        # Assertions
+        assert self.grbl_controller._poll_wakeup.is_set()
+        assert self.grbl_controller.getPollInterval() == 0.05
+
+    @pytest.mark.parametrize(
+            'active_state,expected',
+            [
+                ('Idle', 1.0),
+                ('Alarm', 1.0),
+                ('Sleep', 1.0),
+                ('Run', 0.125),
+                ('Jog', 0.125),
+                ('Home', 0.125),
+                ('Hold', 0.125)
+            ]
+        )
+    def test_get_poll_interval(self, mocker: MockerFixture, active_state, expected):
+        # Mock status methods
+        mocker.patch.object(
+            GrblStatus,
+            'get_status_report',
+            return_value={'activeState': active_state}
+        )
+
+        # Call method under test
+        response = self.grbl_controller.getPollInterval()
+
+        # Assertions
+        assert response == expected
+
+    def test_get_poll_interval_lines_in_flight(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(
+            GrblStatus,
+            'get_status_report',
+            return_value={'activeState': 'Idle'}
+        )
+
+        # Mock queue contents
+        self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Call method under test
+        response = self.grbl_controller.getPollInterval()
+
+        # Assertions
+        assert response == 0.125
+
+    def test_send_command_wakes_status_poller(self):
+        # Call method under test
+        self.grbl_controller.sendCommand('G1 X10 F100')
+
+        # Assertions
+        assert self.grbl_controller._poll_wakeup.is_set()
+
+    def test_status_mask_tuning(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'connected', return_value=True)
+
+        # Mock GRBL methods
+        mock_query_settings = mocker.patch.object(GrblController, 'queryGrblSettings')
+
+        # Call method under test
+        self.grbl_controller.setStatusMaskTuning()
+        self.grbl_controller.setStatusMaskTuning()
+        self.grbl_controller.parseResponse('$10=3')
+        queued_running = self.grbl_controller.getQueueDepth()
+        self.grbl_controller.parseResponse('<Run|MPos:0.000,0.000,0.000|Bf:15,128|FS:0,0>')
+        queued_running += self.grbl_controller.getQueueDepth()
+        self.grbl_controller.parseResponse('<Idle|MPos:0.000,0.000,0.000|Bf:15,128|FS:0,0>')
+
+        # Assertions
+        assert mock_query_settings.call_count == 1
+        assert queued_running == 0
+        assert self.grbl_controller.getStatusMask() == 1
+        assert self.grbl_controller.priority_queue.get_nowait() == '$10=1'
+        self.grbl_controller.parseResponse('<Idle|MPos:0.000,0.000,0.000|FS:0,0>')
+        assert self.grbl_controller.getStats()['status_bytes_saved'] == 10
+
+    def test_status_mask_tuning_known_settings(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'connected', return_value=True)
+
+        # Mock GRBL methods
+        mock_query_settings = mocker.patch.object(GrblController, 'queryGrblSettings')
+
+        # Set test values for controller's settings
+        self.grbl_controller.parseResponse('$10=3')
+        self.grbl_controller.parseResponse('<Idle|MPos:0.000,0.000,0.000|Bf:15,128|FS:0,0>')
+
+        # Call method under test
+        self.grbl_controller.setStatusMaskTuning()
+
+        # Assertions
+        assert mock_query_settings.call_count == 0
+        assert self.grbl_controller.getStatusMask() == 1
+        assert self.grbl_controller.priority_queue.get_nowait() == '$10=1'
+
+    def test_status_mask_tuning_disabled(self, mocker: MockerFixture):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'connected', return_value=True)
+
+        # Call method under test
+        self.grbl_controller.setStatusRequirements('test', ['buffer'])
+        self.grbl_controller.parseResponse('$10=1')
+        self.grbl_controller.parseResponse('<Idle|MPos:0.000,0.000,0.000|FS:0,0>')
+
+        # Assertions
+        assert self.grbl_controller.getRequiredStatusFields() == {'buffer'}
+        assert self.grbl_controller.getStatusMask() is None
+        assert self.grbl_controller.getQueueDepth() == 0
+
+    @pytest.mark.parametrize('io_thread', [False, True])
+    def test_disconnect_restores_status_mask(self, mocker: MockerFixture, io_thread):
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'connected', return_value=True)
+
+        # Mock serial methods
+        mocker.patch.object(SerialService, 'stopConnection')
+
+        # Mock controller methods
+        mocker.patch.object(GrblController, 'isIOThread', return_value=io_thread)
+        mocker.patch.object(GrblController, 'queryGrblSettings')
+
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Mock GRBL response
+        sent = []
+
+        def answer():
+            with self.grbl_controller._io_condition:
+                command = self.grbl_controller._fetchNextCommand()
+            if command:
+                sent.append(command)
+                self.grbl_controller.streaming.sent(command)
+                self.grbl_controller.parseResponse('ok')
+
+        # Set up tuned mask for test
+        self.grbl_controller.setStatusMaskTuning()
+        self.grbl_controller.parseResponse('<Idle|MPos:0.000,0.000,0.000|FS:0,0>')
+        self.grbl_controller.parseResponse('$10=3')
+        answer()
+        timer = threading.Timer(0.05, answer)
+        timer.start()
+
+        # Call method under test
+        self.grbl_controller.disconnect()
+        timer.join()
+
+        # Assertions
+        assert sent == (['$10=1'] if io_thread else ['$10=1', '$10=3'])
+
+    @pytest.mark.parametrize('paused', [True, False])
+    def test_serial_writer(self, mocker: MockerFixture, paused):
+        # Mock queue contents
+        self.grbl_controller.sendCommand('Command 1')
+        self.grbl_controller.sendCommand('Command 2')
+
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=paused)
+
+        # Mock thread life cycle
+        mocker.patch('grbl.grblController.WRITER_TIMEOUT', 0.01)
+        timer = threading.Timer(0.1, self.grbl_controller._io_stop.set)
+        timer.start()
+
+        # Mock serial methods
+        mock_serial_send_line = mocker.patch.object(SerialService, 'sendLine')
+
+        # Mock monitor methods
+        mock_monitor_sent = mocker.patch.object(GrblMonitor, 'sent')
+
+        # Call method under test
+        self.grbl_controller.serialWriter()
+        timer.join()
+
+        # Assertions
         assert mock_serial_send_line.call_count == (0 if paused else 2)
         assert mock_monitor_sent.call_count == (0 if paused else 2)
+        assert self.grbl_controller.queue.qsize() == (2 if paused else 0)
+        sent_commands = [] if paused else ['Command 1', 'Command 2']
+        assert self.grbl_controller.streaming.pending_commands() == sent_commands
+        assert self.grbl_controller.streaming.used_bytes() == (0 if paused else 20)
 
-    @pytest.mark.parametrize(
-        'error_read,error_send',
-        [
-            (True, False),
-            (False, True)
-        ]
-    )
-    def test_serial_io_serial_error(self, mocker: MockerFixture, error_read, error_send):
-        # Mock attributes
-        self.grbl_controller.serial_thread = threading.Thread()
+    def test_serial_writer_wakes_up_on_new_command(self, mocker: MockerFixture):
+        # Mock serial methods
+        def stop_thread(command):
+            self.grbl_controller._io_stop.set()
+
+        mock_serial_send_line = mocker.patch.object(
+            SerialService,
+            'sendLine',
+            side_effect=stop_thread
+        )
+
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # Start the writer thread, waiting for commands
+        writer = threading.Thread(target=self.grbl_controller.serialWriter)
+        writer.start()
 
+        # Call method under test
+        self.grbl_controller.sendCommand('Command 1')
+        writer.join(1.0)
+
+        # Assertions
+        assert not writer.is_alive()
+        mock_serial_send_line.assert_called_once_with('Command 1')
+
+    def test_serial_writer_serial_error(self, mocker: MockerFixture):
         # Mock queue contents
         self.grbl_controller.queue.put('Command')
 
         # Mock controller methods
-        mocker.patch.object(GrblController, 'queryStatusReport')
         mock_disconnect = mocker.patch.object(GrblController, 'disconnect')
-        mock_parse_response = mocker.patch.object(GrblController, 'parseResponse')
 
         # Mock serial methods
-        mock_serial_waiting = mocker.patch.object(
-            SerialService,
-            'waiting',
-            return_value=error_read
-        )
-        mock_serial_read_line = mocker.patch.object(
-            SerialService,
-            'readLine',
-            side_effect=SerialException('mocked-error')
-        )
         mock_serial_send_line = mocker.patch.object(
             SerialService,
             'sendLine',
@@ -796,55 +1760,56 @@ class TestGrblController:
 
         # Mock status methods
         mocker.patch.object(GrblStatus, 'paused', return_value=False)
+        mock_set_error = mocker.patch.object(GrblStatus, 'set_error')
 
         # Mock monitor methods
         mock_monitor_error = mocker.patch.object(GrblMonitor, 'error')
 
         # Call method under test
-        self.grbl_controller.serialIO()
+        self.grbl_controller.serialWriter()
 
         # Assertions
-        assert mock_serial_waiting.call_count == 1
-        assert mock_serial_read_line.call_count == (1 if error_read else 0)
-        assert mock_serial_send_line.call_count == (1 if error_send else 0)
-        assert mock_parse_response.call_count == 0
+        assert mock_serial_send_line.call_count == 1
         assert mock_monitor_error.call_count == 1
+        assert mock_set_error.call_count == 1
         assert mock_disconnect.call_count == 1
 
-    def test_serial_io_stop(self, mocker: MockerFixture):
+    def test_serial_writer_stop(self, mocker: MockerFixture):
         # Mock attributes
-        self.grbl_controller.serial_thread = threading.Thread()
         self.grbl_controller.grbl_status._flags['stop'] = True
+        self.grbl_controller.streaming.sent('G1 X10 Y10')
+
+        # Mock queue contents
+        self.grbl_controller.sendCommand('Command 1')
 
         # Mock thread life cycle
-        def stop_thread():
-            self.grbl_controller.serial_thread = None
+        def stop_thread(timeout):
+            self.grbl_controller._io_stop.set()
 
-        # Mock controller methods
-        mocker.patch.object(GrblController, 'queryStatusReport')
+        mocker.patch.object(
+            self.grbl_controller._io_condition,
+            'wait',
+            side_effect=stop_thread
+        )
 
         # Mock serial methods
-        mocker.patch.object(SerialService, 'waiting', return_value=False)
-        mocker.patch.object(SerialService, 'readLine', return_value='')
-
-        # Mock status methods
-        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+        mock_serial_send_line = mocker.patch.object(SerialService, 'sendLine')
 
         # Mock monitor methods
-        mocker.patch.object(GrblController, 'emptyQueue', side_effect=stop_thread)
         mock_monitor_info = mocker.patch.object(GrblMonitor, 'info')
 
         # Call method under test
-        self.grbl_controller.serialIO()
+        self.grbl_controller.serialWriter()
 
         # Assertions
+        assert mock_serial_send_line.call_count == 0
         assert mock_monitor_info.call_count == 1
         assert self.grbl_controller.grbl_status._flags['stop'] is False
+        assert self.grbl_controller.queue.qsize() == 0
+        assert self.grbl_controller.streaming.used_bytes() == 0
+        assert self.grbl_controller.streaming.pending_commands() == []
 
-    def test_serial_io_query_parser_state(self, mocker: MockerFixture):
-        # Mock attributes
-        self.grbl_controller.serial_thread = threading.Thread()
-
+    def test_serial_writer_query_parser_state(self, mocker: MockerFixture):
         # Mock queue contents
         self.grbl_controller.queue.put('Command 1')
 
@@ -866,10 +1831,9 @@ class TestGrblController:
 
         # Mock thread life cycle
         def stop_thread():
-            self.grbl_controller.serial_thread = None
+            self.grbl_controller._io_stop.set()
 
         # Mock controller methods
-        mocker.patch.object(GrblController, 'queryStatusReport')
         mock_query_parser_state = mocker.patch.object(
             GrblController,
             'queryGcodeParserState',
@@ -877,44 +1841,36 @@ class TestGrblController:
         )
 
         # Mock serial methods
-        mocker.patch.object(SerialService, 'waiting', return_value=False)
-        mocker.patch.object(SerialService, 'readLine', return_value='')
         mocker.patch.object(SerialService, 'sendLine')
 
         # Mock status methods
         mocker.patch.object(GrblStatus, 'paused', return_value=False)
 
-        # Mock monitor methods
-        mocker.patch.object(GrblMonitor, 'sent')
-
         # Call method under test
-        self.grbl_controller.serialIO()
+        self.grbl_controller.serialWriter()
 
         # Assertions
         assert mock_time.call_count == 2
         assert mock_query_parser_state.call_count == 1
 
-    def test_serial_io_query_buffer_full(self, mocker: MockerFixture):
+    def test_serial_writer_buffer_full(self, mocker: MockerFixture):
         # Mock attributes
-        self.grbl_controller.serial_thread = threading.Thread()
+        self.grbl_controller.streaming.sent('G1 X' + '0' * 120)
 
         # Mock queue contents
         self.grbl_controller.queue.put('Command 1')
 
         # Mock thread life cycle
-        def stop_thread():
-            self.grbl_controller.serial_thread = None
-            return False
+        def stop_thread(timeout):
+            self.grbl_controller._io_stop.set()
 
-        # Mock builtin 'sum' fucntion
-        mock_sum = mocker.patch('builtins.sum', return_value=500)
-
-        # Mock controller methods
-        mocker.patch.object(GrblController, 'queryStatusReport')
+        mock_wait = mocker.patch.object(
+            self.grbl_controller._io_condition,
+            'wait',
+            side_effect=stop_thread
+        )
 
         # Mock serial methods
-        mocker.patch.object(SerialService, 'waiting', side_effect=stop_thread)
-        mocker.patch.object(SerialService, 'readLine', return_value='')
         mock_send_line = mocker.patch.object(SerialService, 'sendLine')
 
         # Mock status methods
@@ -924,26 +1880,19 @@ class TestGrblController:
         mock_monitor_sent = mocker.patch.object(GrblMonitor, 'sent')
 
         # Call method under test
-        self.grbl_controller.serialIO()
+        self.grbl_controller.serialWriter()
 
         # Assertions
-        assert mock_sum.call_count == 1
+        assert mock_wait.call_count == 1
         assert mock_send_line.call_count == 0
         assert mock_monitor_sent.call_count == 0
 
-    def test_serial_io_end_command(self, mocker: MockerFixture):
-        # Mock attributes
-        self.grbl_controller.serial_thread = threading.Thread()
-
+    def test_serial_writer_end_command(self, mocker: MockerFixture):
         # Mock queue contents
         self.grbl_controller.queue.put('Command 1')
         self.grbl_controller.queue.put('M30')
 
-        # Mock controller methods
-        mocker.patch.object(GrblController, 'queryStatusReport')
-
         # Mock serial methods
-        mocker.patch.object(SerialService, 'waiting', return_value=False)
         mock_serial_send_line = mocker.patch.object(SerialService, 'sendLine')
 
         # Mock status methods
@@ -953,7 +1902,7 @@ class TestGrblController:
         mock_monitor_info = mocker.patch.object(GrblMonitor, 'info')
 
         # Call method under test
-        self.grbl_controller.serialIO()
+        self.grbl_controller.serialWriter()
 
         # Assertions
         assert mock_serial_send_line.call_count == 2
@@ -0,0 +1,180 @@
+from grbl.grblDeviceHub import GrblDeviceHub, HubGrblController
+from grbl.grblController import GrblController
+from grbl.grblMonitor import GrblMonitor
+from grbl.grblStatus import GrblStatus
+from utils.serial import SerialService
+from serial import SerialException
+import logging
+import os
+import pytest
+from pytest_mock.plugin import MockerFixture
+import threading
+
+
+class TestGrblDeviceHub:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker: MockerFixture):
+        # Mock logger methods
+        mocker.patch.object(GrblMonitor, 'debug')
+        mocker.patch.object(GrblMonitor, 'info')
+        mocker.patch.object(GrblMonitor, 'warning')
+        mocker.patch.object(GrblMonitor, 'error')
+        mocker.patch.object(GrblMonitor, 'critical')
+        mocker.patch.object(GrblMonitor, 'sent')
+        mocker.patch.object(GrblMonitor, 'received')
+
+        # Mock serial port, with a file descriptor the selector can watch
+        self.read_fd, self.write_fd = os.pipe()
+        mocker.patch.object(SerialService, 'fileno', return_value=self.read_fd)
+        mocker.patch.object(SerialService, 'stopConnection')
+        self.mock_send_line = mocker.patch.object(SerialService, 'sendLine')
+        self.mock_send_bytes = mocker.patch.object(SerialService, 'sendBytes')
+        self.mock_read = mocker.patch.object(SerialService, 'readAvailable')
+
+        # Mock status methods
+        mocker.patch.object(GrblStatus, 'paused', return_value=False)
+
+        # The hub loop is run step by step by the tests
+        self.mock_thread_start = mocker.patch.object(threading.Thread, 'start')
+
+        self.hub = GrblDeviceHub()
+        self.controller = HubGrblController(logging.getLogger('test_logger'), self.hub)
+        self.controller.grbl_status.set_flag('connected', True)
+
+        yield
+
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def test_register(self):
+        # Call method under test
+        self.controller.startIO()
+
+        # Assertions
+        assert self.hub.devices == [self.controller]
+        assert self.hub.selector.get_key(self.read_fd).data is self.controller
+        assert self.mock_thread_start.call_count == 1
+
+    def test_unregister(self):
+        # Register the device
+        self.controller.startIO()
+
+        # Call method under test
+        self.controller.stopIO()
+
+        # Assertions
+        assert self.hub.devices == []
+        with pytest.raises(KeyError):
+            self.hub.selector.get_key(self.read_fd)
+
+    def test_sends_queued_commands(self):
+        # Register the device
+        self.controller.startIO()
+
+        # Call method under test
+        self.controller.sendCommand('G1 X10 F100')
+        self.controller.sendCommand('G1 X20')
+        self.hub._runOnce(0)
+
+        # Assertions
+        assert self.mock_send_line.call_count == 2
+        assert self.controller.getLinesInFlight() == 2
+        self.mock_send_bytes.assert_called_once_with(b'?')
+
+    def test_reads_responses(self):
+        # Register the device and send a command
+        self.controller.startIO()
+        self.controller.sendCommand('G1 X10 F100')
+        self.hub._runOnce(0)
+
+        # Mock GRBL response
+        os.write(self.write_fd, b'ok\r\n')
+        self.mock_read.return_value = b'ok\r\n'
+
+        # Call method under test
+        self.hub._runOnce(0)
+
+        # Assertions
+        assert self.mock_read.call_count == 1
+        assert self.controller.getAcksCount() == 1
+        assert self.controller.getLinesInFlight() == 0
+
+    def test_serial_reader_error(self, mocker: MockerFixture):
+        # Register the device
+        self.controller.startIO()
+
+        # Mock serial methods
+        os.write(self.write_fd, b'ok\r\n')
+        self.mock_read.side_effect = SerialException('mocked error')
+
+        # Call method under test
+        self.hub._runOnce(0)
+
+        # Assertions
+        assert self.hub.devices == []
+        assert GrblMonitor.error.call_count == 1
+        assert self.controller.grbl_status.connected() is False
+
+    def test_status_polling(self, mocker: MockerFixture):
+        # Mock controller methods
+        mocker.patch.object(GrblController, 'getPollInterval', return_value=0.01)
+
+        # Mock time
+        self.current_time = 1703991600.0
+
+        def manage_time():
+            return self.current_time
+
+        mocker.patch('time.time', side_effect=manage_time)
+
+        # Register the device
+        self.controller.startIO()
+
+        # Call method under test
+        self.hub._runOnce(0)
+        self.hub._runOnce(0)
+        self.current_time += 0.02
+        self.hub._runOnce(0)
+
+        # Assertions
+        assert self.mock_send_bytes.call_count == 2
+        assert len(self.hub._polls) == 1
+
+    def test_status_burst_replaces_scheduled_query(self):
+        # Register the device
+        self.controller.startIO()
+        self.hub._runOnce(0)
+
+        # Call method under test
+        self.controller.requestStatusBurst()
+        self.hub._runOnce(0)
+
+        # Assertions
+        assert self.mock_send_bytes.call_count == 2
+        assert len(self.hub._polls) == 2
+        assert sum(seq == self.controller._poll_seq for _, seq, _ in self.hub._polls) == 1
+
+    def test_close(self):
+        # Register the device
+        self.controller.startIO()
+
+        # Call method under test
+        self.hub.close()
+
+        # Assertions
+        assert self.hub.devices == []
+        assert self.controller.grbl_status.connected() is False
+
+    def test_devices_state_is_independent(self):
+        # Register another device
+        other = HubGrblController(logging.getLogger('test_logger'), self.hub)
+
+        # Call method under test
+        self.controller.parseResponse('[G54:1.000,2.000,3.000]')
+        self.controller.parseResponse('<Run|MPos:1.000,2.000,3.000|FS:500,0>')
+
+        # Assertions
+        assert self.controller.getParameters()['G54'] == {'x': 1.0, 'y': 2.0, 'z': 3.0}
+        assert other.getParameters()['G54'] == {'x': 0.0, 'y': 0.0, 'z': 0.0}
+        assert self.controller.grbl_status.get_status_report()['activeState'] == 'Run'
+        assert other.grbl_status.get_status_report()['activeState'] == ''
@@ -0,0 +1,214 @@
+from grbl.grblController import GrblController
+import grbl.grblDiscovery as grbl_discovery
+from grbl.grblDiscovery import discover_devices, probe_port, wait_for_startup
+from grbl.grblMonitor import GrblMonitor
+from mocks.grbl_emulator import GrblEmulator
+import logging
+import pytest
+from pytest_mock.plugin import MockerFixture
+from serial import SerialException
+import time
+from utils.transport import Transport
+
+WELCOME = "Grbl 1.1h ['$' for help]"
+
+
+class RunningDevice(Transport):
+    """GRBL device which doesn't reset when the port is opened: it sends some noise,
+    and only prints the startup message after a soft reset.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.output = bytearray(b'\x00\xff<Idle|MPos:0.000,0.000,0.000>\r\nok\r\n')
+        self.written = bytearray()
+        self._open = False
+
+    def open(self, port: str, baudrate: int):
+        self._open = True
+
+    def isOpen(self) -> bool:
+        return self._open
+
+    def close(self):
+        self._open = False
+
+    def fileno(self) -> int:
+        raise NotImplementedError
+
+    def _readChunk(self, timeout: float) -> bytes:
+        if not self.output:
+            time.sleep(timeout)
+        data = bytes(self.output)
+        self.output.clear()
+        return data
+
+    def _write(self, data: bytes):
+        self.written += data
+        if b'\x18' in data:
+            self.output += f'\r\n{WELCOME}\r\n'.encode()
+
+
+def test_wait_for_startup():
+    # Mock device, which prints the startup message when the port is opened
+    emulator = GrblEmulator(speedup=None)
+    emulator.openConnection('emulator', 115200, timeout=1)
+
+    # Call method under test
+    response, payload = wait_for_startup(emulator, timeout=1, reset_after=None)
+
+    # Assertions
+    assert response == WELCOME
+    assert payload['version'] == '1.1h'
+
+
+def test_wait_for_startup_soft_reset():
+    # Mock device
+    device = RunningDevice()
+    device.openConnection('port', 115200)
+
+    # Call method under test
+    response, payload = wait_for_startup(device, timeout=1, reset_after=0.01)
+
+    # Assertions
+    assert response == WELCOME
+    assert payload['firmware'] == 'Grbl'
+    assert device.written == b'\x18'
+
+
+def test_wait_for_startup_timeout():
+    # Mock device
+    device = RunningDevice()
+    device.openConnection('port', 115200)
+
+    # Call method under test
+    start = time.monotonic()
+    response, payload = wait_for_startup(device, timeout=0.05, reset_after=None)
+
+    # Assertions
+    assert response == ''
+    assert payload is None
+    assert time.monotonic() - start < 1
+    assert device.written == b''
+
+
+def test_probe_port(mocker: MockerFixture):
+    # Mock transport
+    device = RunningDevice()
+    mocker.patch.object(grbl_discovery, 'get_transport', return_value=device)
+
+    # Call method under test
+    result = probe_port('/dev/ttyUSB0', timeout=1)
+
+    # Assertions
+    assert result == {
+        'port': '/dev/ttyUSB0',
+        'baudrate': 115200,
+        'firmware': 'Grbl',
+        'version': '1.1h',
+        'message': " ['$' for help]"
+    }
+    assert not device.isOpen()
+
+
+def test_probe_port_baudrates(mocker: MockerFixture):
+    # Mock transport, only answering with the last baud rate
+    mocker.patch.object(
+        grbl_discovery,
+        'get_transport',
+        side_effect=lambda port: RunningDevice()
+    )
+    mock_wait_startup = mocker.patch.object(
+        grbl_discovery,
+        'wait_for_startup',
+        side_effect=[
+            ('', None),
+            (WELCOME, {'firmware': 'Grbl', 'version': '1.1h', 'message': None})
+        ]
+    )
+
+    # Call method under test
+    result = probe_port('/dev/ttyUSB0', baudrates=[9600, 115200], timeout=1)
+
+    # Assertions
+    assert result['baudrate'] == 115200
+    assert mock_wait_startup.call_count == 2
+
+
+def test_probe_port_serial_error(mocker: MockerFixture):
+    # Mock transport
+    device = RunningDevice()
+    mocker.patch.object(grbl_discovery, 'get_transport', return_value=device)
+    mocker.patch.object(RunningDevice, 'open', side_effect=SerialException('Not found'))
+
+    # Call method under test
+    result = probe_port('/dev/ttyUSB9', baudrates=[115200, 9600])
+
+    # Assertions
+    assert result is None
+
+
+def test_discover_devices(mocker: MockerFixture):
+    # Mock available ports
+    port_info = mocker.MagicMock()
+    port_info.device = '/dev/ttyUSB1'
+    mocker.patch.object(grbl_discovery.SerialService, 'get_ports', return_value=[port_info])
+
+    # Mock probes, which take some time
+    def probe(port: str, baudrates: list[int], timeout: float):
+        time.sleep(0.2)
+        if port.endswith('0'):
+            return None
+        return {'port': port, 'baudrate': 115200, 'firmware': 'Grbl', 'version': '1.1h'}
+
+    mocker.patch.object(grbl_discovery, 'probe_port', side_effect=probe)
+
+    # Call method under test
+    start = time.monotonic()
+    devices = discover_devices([f'/dev/ttyUSB{index}' for index in range(4)])
+    elapsed = time.monotonic() - start
+    default_devices = discover_devices()
+
+    # Assertions
+    assert [device['port'] for device in devices] == [
+        '/dev/ttyUSB1', '/dev/ttyUSB2', '/dev/ttyUSB3'
+    ]
+    assert elapsed < 0.6
+    assert [device['port'] for device in default_devices] == ['/dev/ttyUSB1']
+
+
+def test_discover_devices_no_ports():
+    # Call method under test
+    devices = discover_devices([])
+
+    # Assertions
+    assert devices == []
+
+
+@pytest.mark.parametrize('device', ['emulator', 'running'])
+def test_controller_fast_connect(mocker: MockerFixture, device):
+    # Mock logger methods
+    for method in ['debug', 'info', 'warning', 'error', 'critical', 'sent', 'received']:
+        mocker.patch.object(GrblMonitor, method)
+
+    # Mock device
+    emulator = GrblEmulator(speedup=1000.0)
+    if device == 'running':
+        # Nothing printed when the port is opened, only noise
+        def open_running(port: str, baudrate: int):
+            emulator._open = True
+            emulator._output[:] = b'\xff\xfe\r\n'
+
+        mocker.patch.object(emulator, 'open', side_effect=open_running)
+    grbl_controller = GrblController(logging.getLogger('test_logger'), emulator)
+
+    # Call method under test
+    start = time.monotonic()
+    response = grbl_controller.connect('emulator', 115200, fast=True)
+    elapsed = time.monotonic() - start
+    grbl_controller.disconnect()
+
+    # Assertions
+    assert response['version'] == '1.1h'
+    assert grbl_controller.getBuildInfo()['rxBufferSize'] == 128
+    assert elapsed < 2
@@ -0,0 +1,322 @@
+from gcode.gcodeFileSender import FinishedFile, GcodeFileSender
+from grbl.grblController import GrblController
+from grbl.grblMonitor import GrblMonitor
+from mocks.grbl_emulator import GrblEmulator
+import logging
+import pytest
+from pytest_mock.plugin import MockerFixture
+import time
+
+
+class TestGrblEmulator:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        # The simulated time only advances when requested by the test
+        self.emulator = GrblEmulator(rx_buffer_size=128, planner_size=4, speedup=None)
+        self.welcome = self.emulator.startConnection('emulator', 115200, timeout=1)
+        self.emulator.timeout = 0
+
+        # High rates and accelerations, so the motions take the time given by the feed rate
+        for axis in range(3):
+            self.send(f'$11{axis}=1000')
+            self.send(f'$12{axis}=100000')
+
+        yield
+
+        self.emulator.stopConnection()
+
+    def send(self, line: str) -> list[str]:
+        """Sends a line and returns the responses received so far.
+        """
+        self.emulator.sendLine(line)
+        return self.receive()
+
+    def receive(self) -> list[str]:
+        return self.emulator.readAvailable().decode().split('\r\n')[:-1]
+
+    def test_start_connection(self):
+        # Assertions
+        assert self.welcome == "Grbl 1.1h ['$' for help]"
+        assert self.emulator.isOpen()
+
+    def test_build_info(self):
+        # Call method under test
+        responses = self.send('$I')
+
+        # Assertions
+        assert responses == ['[VER:1.1h.20190825:]', '[OPT:V,4,128]', 'ok']
+
+    def test_parser_state(self):
+        # Call method under test
+        self.send('G91 G20 M3 S1000 F10')
+        responses = self.send('$G')
+
+        # Assertions
+        assert responses == ['[GC:G0 G54 G17 G20 G91 G94 M0 M3 M9 T0 F254 S1000]', 'ok']
+
+    def test_settings(self):
+        # Call method under test
+        assert self.send('$110=2000') == ['ok']
+        responses = self.send('$$')
+
+        # Assertions
+        assert '$10=3' in responses
+        assert '$110=2000.000' in responses
+        assert responses[-1] == 'ok'
+        assert self.send('$999=1') == ['error:3']
+
+    def test_parameters(self):
+        # Call method under test
+        self.send('G10 L2 P1 X10 Y20 Z-5')
+        responses = self.send('$#')
+
+        # Assertions
+        assert responses[0] == '[G54:10.000,20.000,-5.000]'
+        assert '[PRB:0.000,0.000,0.000:0]' in responses
+        assert responses[-1] == 'ok'
+
+    def test_planner_full_holds_ack(self):
+        # Call method under test
+        responses = [self.send(f'G1 X{i + 1} F60') for i in range(5)]
+
+        # Assertions
+        assert responses == [['ok'], ['ok'], ['ok'], ['ok'], []]
+
+        self.emulator.sendBytes(b'?')
+        assert self.receive() == ['<Run|MPos:0.000,0.000,0.000|Bf:0,117|FS:60,0>']
+
+        # Finish the first motion, which takes about one second
+        self.emulator.advance(1.01)
+        assert self.receive() == ['ok']
+
+    def test_status_report(self):
+        # Call method under test
+        self.send('G1 X10 F600')
+        self.emulator.advance(0.5)
+        self.emulator.sendBytes(b'?')
+        running = self.receive()
+        self.emulator.advance(0.51)
+        self.emulator.sendBytes(b'?')
+        idle = self.receive()
+
+        # Assertions
+        assert running == ['<Run|MPos:5.000,0.000,0.000|Bf:3,127|FS:600,0>']
+        assert idle == ['<Idle|MPos:10.000,0.000,0.000|Bf:4,127|FS:0,0>']
+
+    def test_status_report_work_position(self):
+        # Call method under test
+        self.send('$10=0')
+        self.send('G10 L2 P1 X1 Y2 Z3')
+        self.emulator.sendBytes(b'?')
+
+        # Assertions
+        assert self.receive() == ['<Idle|WPos:-1.000,-2.000,-3.000|FS:0,0>']
+
+    def test_rx_buffer_overflow(self):
+        # Call method under test
+        self.emulator.sendBytes(b'G1' * 70)
+
+        # Assertions
+        assert self.emulator.stats['rx_overflows'] == 13
+        assert self.emulator.stats['rx_max_used'] == 127
+
+    @pytest.mark.parametrize(
+        'line,expected',
+        [
+            ('G1 X10', 'error:22'),
+            ('G99', 'error:20'),
+            ('X1.2.3', 'error:2'),
+            ('$Z', 'error:3'),
+            ('$H', 'error:5')
+        ]
+    )
+    def test_errors(self, line, expected):
+        # Call method under test
+        responses = self.send(line)
+
+        # Assertions
+        assert responses == [expected]
+
+    def test_soft_limits_alarm(self):
+        # Enable soft limits
+        self.send('$20=1')
+
+        # Call method under test
+        alarm = self.send('G0 X10')
+        locked = self.send('G0 X-1')
+        unlocked = self.send('$X')
+
+        # Assertions
+        assert alarm == ['ALARM:2', 'ok']
+        assert locked == ['error:9']
+        assert unlocked == ['[MSG:Caution: Unlocked]', 'ok']
+        assert self.emulator.getState() == 'Idle'
+
+    def test_trigger_alarm(self):
+        # Call method under test
+        self.emulator.triggerAlarm(1)
+
+        # Assertions
+        assert self.receive() == ['ALARM:1']
+        assert self.emulator.getState() == 'Alarm'
+        assert self.send('G0 X1') == ['error:9']
+
+    def test_feed_hold(self):
+        # Call method under test
+        self.send('G1 X10 F600')
+        self.emulator.advance(0.5)
+        self.emulator.sendBytes(b'!')
+        self.emulator.advance(10)
+        self.emulator.sendBytes(b'?')
+        on_hold = self.receive()
+        self.emulator.sendBytes(b'~')
+        self.emulator.advance(0.51)
+
+        # Assertions
+        assert on_hold == ['<Hold:0|MPos:5.000,0.000,0.000|Bf:3,127|FS:0,0>']
+        assert self.emulator.getState() == 'Idle'
+        assert self.emulator.position == [10.0, 0.0, 0.0]
+
+    def test_jog_cancel(self):
+        # Call method under test
+        self.send('$J=G91 X10 F600')
+        self.emulator.advance(0.5)
+        state = self.emulator.getState()
+        self.emulator.sendBytes(b'\x85')
+
+        # Assertions
+        assert state == 'Jog'
+        assert self.emulator.getState() == 'Idle'
+        assert self.emulator.position[0] == pytest.approx(5.0, abs=0.1)
+
+    def test_soft_reset(self):
+        # Call method under test
+        self.send('G1 X10 F600')
+        self.emulator.sendBytes(b'\x18')
+
+        # Assertions
+        assert self.receive() == [
+            'ALARM:3',
+            '',
+            "Grbl 1.1h ['$' for help]",
+            "[MSG:'$H'|'$X' to unlock]"
+        ]
+        assert self.emulator.getState() == 'Alarm'
+
+    def test_check_mode(self):
+        # Call method under test
+        enabled = self.send('$C')
+        self.send('G1 X10 F600')
+        state = self.emulator.getState()
+
+        # Assertions
+        assert enabled == ['[MSG:Enabled]', 'ok']
+        assert state == 'Check'
+        assert self.emulator.position == [0.0, 0.0, 0.0]
+
+
+def test_stream_file_with_controller(mocker: MockerFixture, tmp_path):
+    # Mock logger methods
+    mocker.patch.object(GrblMonitor, 'debug')
+    mocker.patch.object(GrblMonitor, 'info')
+    mocker.patch.object(GrblMonitor, 'warning')
+    mocker.patch.object(GrblMonitor, 'error')
+    mocker.patch.object(GrblMonitor, 'critical')
+    mocker.patch.object(GrblMonitor, 'sent')
+    mocker.patch.object(GrblMonitor, 'received')
+
+    # Mock file to stream
+    file_path = tmp_path / 'test.gcode'
+    lines = ['G21 G90', 'F1000'] + [f'G1 X{i % 10} Y{i % 7}' for i in range(300)] + ['M30']
+    file_path.write_text('\n'.join(lines) + '\n')
+
+    emulator = GrblEmulator(speedup=1000.0)
+    grbl_controller = GrblController(logging.getLogger('test_logger'), emulator)
+    grbl_controller.connect('emulator', 115200)
+    sender = GcodeFileSender(grbl_controller, str(file_path))
+    sender.start()
+
+    # Call method under test
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            sender.fill_buffer()
+        except FinishedFile:
+            break
+        time.sleep(0.001)
+    grbl_controller.waitUntilProcessed(10)
+    grbl_controller.disconnect()
+
+    # Assertions
+    assert emulator.stats['oks'] >= len(lines)
+    assert emulator.stats['errors'] == 0
+    assert emulator.stats['rx_overflows'] == 0
+    assert emulator.stats['planner_max_used'] > 1
+    assert grbl_controller.getBuildInfo()['rxBufferSize'] == 128
+
+
+def test_status_mask_tuning_with_controller(mocker: MockerFixture):
+    # Mock logger methods
+    for method in ['debug', 'info', 'warning', 'error', 'critical', 'sent', 'received']:
+        mocker.patch.object(GrblMonitor, method)
+
+    emulator = GrblEmulator(speedup=1000.0)
+    grbl_controller = GrblController(logging.getLogger('test_logger'), emulator)
+    grbl_controller.setPollingRates(slow=0.01)
+    grbl_controller.setStatusMaskTuning()
+
+    def wait_for_mask(mask: int):
+        deadline = time.time() + 5
+        while emulator.settings[10] != mask and time.time() < deadline:
+            time.sleep(0.01)
+
+    # Call method under test
+    grbl_controller.connect('emulator', 115200, fast=True)
+    wait_for_mask(1.0)
+    tuned = emulator.settings[10]
+    time.sleep(0.05)
+    saved = grbl_controller.getStats()['status_bytes_saved']
+
+    grbl_controller.setStatusRequirements('test', ['wpos', 'buffer'])
+    wait_for_mask(2.0)
+    required = emulator.settings[10]
+
+    status = grbl_controller.grbl_status.get_status_report()
+    grbl_controller.disconnect()
+
+    # Assertions
+    assert tuned == 1.0
+    assert required == 2.0
+    assert saved > 0
+    assert status['buffer'] is not None
+    assert emulator.settings[10] == 3.0
+    assert grbl_controller.getStatusMask() == 3
+
+
+def test_sync_settings_with_controller(mocker: MockerFixture):
+    # Mock logger methods
+    for method in ['debug', 'info', 'warning', 'error', 'critical', 'sent', 'received']:
+        mocker.patch.object(GrblMonitor, method)
+
+    emulator = GrblEmulator(speedup=1000.0)
+    grbl_controller = GrblController(logging.getLogger('test_logger'), emulator)
+
+    # Call method under test
+    grbl_controller.connect('emulator', 115200, fast=True)
+    changed = grbl_controller.syncSettings({'$22': '0', '$23': '3', '$27': '5.200'})
+    grbl_controller.disconnect()
+
+    # Reconnect the device, without resetting its settings
+    mocker.patch.object(emulator, 'default_settings', dict(emulator.settings))
+    mock_query_settings = mocker.patch.object(GrblController, 'queryGrblSettings')
+    reconnected = GrblController(logging.getLogger('test_logger'), emulator)
+    reconnected.connect('emulator', 115200, fast=True)
+    unchanged = reconnected.syncSettings({'$22': '0', '$23': '3', '$27': '5.2'})
+    reconnected.disconnect()
+
+    # Assertions
+    assert changed == {'$23': '3', '$27': '5.200'}
+    assert emulator.settings[23] == 3.0
+    assert emulator.settings[27] == 5.2
+    assert unchanged == {}
+    assert mock_query_settings.call_count == 0
@@ -314,6 +314,20 @@ from grbl.grblLineParser import GrblLineParser
                     }
                 )
             ),
+            (
+                '<Idle|WPos:1.000,2.000,0.000|Bf:15,128|FS:0,0>',
+                (
+                    'GrblMsgStatus',
+                    {
+                        'activeState': 'Idle',
+                        'wpos': {'x': 1.0, 'y': 2.0, 'z': 0.0},
+                        'buffer': {'planner': 15, 'rx': 128},
+                        'feedrate': 0.0,
+                        'spindle': 0,
+                        'raw': '<Idle|WPos:1.000,2.000,0.000|Bf:15,128|FS:0,0>'
+                    }
+                )
+            ),
             (
                 '<Run|MPos:23.036,1.620,0.000|FS:500,0>',
                 (
@@ -0,0 +1,108 @@
+from grbl.grblModalState import GrblModalState, normalize_code
+import pytest
+
+
+@pytest.mark.parametrize(
+    'letter,value,expected',
+    [
+        ('G', '01', 'G1'),
+        ('G', '38.20', 'G38.2'),
+        ('M', '3', 'M3'),
+        ('G', '90.0', 'G90'),
+    ]
+)
+def test_normalize_code(letter, value, expected):
+    # Call method under test
+    result = normalize_code(letter, value)
+
+    # Assertions
+    assert result == expected
+
+
+class TestGrblModalState:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.modal_state = GrblModalState()
+
+    def test_initial_state_unknown(self):
+        # Assertions
+        assert set(self.modal_state.get_modal().values()) == {None}
+        assert self.modal_state.feedrate is None
+        assert self.modal_state.spindle is None
+        assert self.modal_state.tool is None
+
+    def test_update(self):
+        # Call method under test
+        self.modal_state.update('G21 G90 G01 X10 F500')
+        self.modal_state.update('M3 S1000 T2')
+        self.modal_state.update('$G')
+
+        # Assertions
+        modal = self.modal_state.get_modal()
+        assert modal['units'] == 'G21'
+        assert modal['distance'] == 'G90'
+        assert modal['motion'] == 'G1'
+        assert modal['spindle'] == 'M3'
+        assert modal['plane'] is None
+        assert self.modal_state.feedrate == 500.0
+        assert self.modal_state.spindle == 1000.0
+        assert self.modal_state.tool == 2
+
+    @pytest.mark.parametrize(
+        'lines,expected',
+        [
+            (['M7'], 'M7'),
+            (['M8', 'M7'], ['M7', 'M8']),
+            (['M7', 'M8', 'M9'], 'M9'),
+            (['M8', 'M8'], 'M8'),
+        ]
+    )
+    def test_update_coolant(self, lines, expected):
+        # Call method under test
+        for line in lines:
+            self.modal_state.update(line)
+
+        # Assertions
+        assert self.modal_state.get_modal()['coolant'] == expected
+
+    def test_update_program_end(self):
+        # Call method under test
+        self.modal_state.update('G0 G91 G55 G18 M3 M8')
+        self.modal_state.update('M30')
+
+        # Assertions
+        modal = self.modal_state.get_modal()
+        assert modal['motion'] == 'G1'
+        assert modal['distance'] == 'G90'
+        assert modal['wcs'] == 'G54'
+        assert modal['plane'] == 'G17'
+        assert modal['spindle'] == 'M5'
+        assert modal['coolant'] == 'M9'
+        assert modal['program'] == 'M30'
+
+    def test_is_current(self):
+        # Mock state
+        self.modal_state.update('G1 G90 M8 F100')
+
+        # Call method under test and assertions
+        assert self.modal_state.is_current('G', '01') is True
+        assert self.modal_state.is_current('G', '0') is False
+        assert self.modal_state.is_current('F', '100.0') is True
+        assert self.modal_state.is_current('F', '200') is False
+        assert self.modal_state.is_current('S', '100') is False
+        assert self.modal_state.is_current('M', '8') is False
+        assert self.modal_state.is_current('G', '21') is False
+        assert self.modal_state.is_current('X', '1') is False
+
+    def test_reset(self):
+        # Mock state
+        self.modal_state.update('G1 F100 S100 T1')
+
+        # Call method under test
+        self.modal_state.reset()
+
+        # Assertions
+        assert self.modal_state.get_modal()['motion'] is None
+        assert self.modal_state.feedrate is None
+        assert self.modal_state.spindle is None
+        assert self.modal_state.tool is None
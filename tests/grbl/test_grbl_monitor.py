@@ -114,6 +114,72 @@ class TestGrblMonitor:
         assert mock_logger_info.call_count == (0 if debug else 2)
         assert mock_queue.call_count == (0 if debug else 1)
 
+    @pytest.mark.parametrize('subscribers', [0, 2])
+    def test_sent_publish(self, mocker, subscribers):
+        # Mock methods
+        mocker.patch.object(self.grbl_logger, 'info')
+        mock_count = mocker.patch.object(
+            self.grbl_monitor.redis,
+            'count_subscribers',
+            return_value=subscribers
+        )
+        mock_publish = mocker.patch.object(self.grbl_monitor.redis, 'publish')
+
+        # Call method under test
+        self.grbl_monitor.sent('Test command')
+        self.grbl_monitor.sent('Test command')
+
+        # Assertions
+        assert mock_count.call_count == 1
+        assert mock_publish.call_count == (2 if subscribers else 0)
+
+    @pytest.mark.parametrize('subscribers', [0, 2])
+    def test_received_publish(self, mocker, subscribers):
+        # Mock methods
+        mocker.patch.object(self.grbl_logger, 'info')
+        mocker.patch.object(self.grbl_monitor.redis, 'count_subscribers', return_value=subscribers)
+        mock_publish = mocker.patch.object(self.grbl_monitor.redis, 'publish')
+
+        # Call method under test
+        self.grbl_monitor.received('ok', 'AnotherType', {'key': 'value'})
+
+        # Assertions
+        assert mock_publish.call_count == (1 if subscribers else 0)
+        if subscribers:
+            mock_publish.assert_called_with(
+                'grbl_messages',
+                '{"type": "received", "message": "ok"}'
+            )
+
+    def test_has_subscribers_cached(self, mocker):
+        # Mock methods
+        mock_count = mocker.patch.object(
+            self.grbl_monitor.redis,
+            'count_subscribers',
+            side_effect=[0, 1]
+        )
+        mocker.patch('time.monotonic', side_effect=[100.0, 100.5, 101.0])
+
+        # Call method under test
+        responses = [self.grbl_monitor.hasSubscribers() for _ in range(3)]
+
+        # Assertions
+        assert responses == [False, False, True]
+        assert mock_count.call_count == 2
+
+    @pytest.mark.parametrize('level,expected', [(logging.DEBUG, False), (logging.ERROR, True)])
+    def test_is_enabled_for(self, level, expected):
+        # Mock logger level
+        logger = logging.getLogger('test_logger_level')
+        logger.setLevel(logging.WARNING)
+        self.grbl_monitor.logger = logger
+
+        # Call method under test
+        response = self.grbl_monitor.isEnabledFor(level)
+
+        # Assertions
+        assert response == expected
+
     def test_queue_log(self, mocker):
         # Spy queue methods
         mock_queue = mocker.spy(Queue, 'put')
@@ -0,0 +1,111 @@
+from grbl.grblStats import GrblStats, LATENCY_BUCKETS, RATE_WINDOW
+from grbl.parsers.grblMsgTypes import GRBL_MSG_ALARM, GRBL_MSG_STATUS, GRBL_RESULT_ERROR, \
+    GRBL_RESULT_OK
+import pytest
+from pytest_mock.plugin import MockerFixture
+import time
+
+
+class TestGrblStats:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.grbl_stats = GrblStats()
+
+    def test_register_traffic(self):
+        # Call methods under test
+        self.grbl_stats.register_sent('G1 X10', 5.0)
+        self.grbl_stats.register_sent('G1 Y10', 95.0)
+        self.grbl_stats.register_realtime()
+        self.grbl_stats.register_received('ok', GRBL_RESULT_OK)
+        self.grbl_stats.register_received('error:20', GRBL_RESULT_ERROR)
+        self.grbl_stats.register_received('ALARM:1', GRBL_MSG_ALARM)
+        self.grbl_stats.register_received('<Idle|MPos:0.000,0.000,0.000>', GRBL_MSG_STATUS)
+        self.grbl_stats.register_received('invalid', None)
+        stats = self.grbl_stats.get_stats(paused_time=1.5)
+
+        # Assertions
+        assert stats['bytes_sent'] == 15
+        assert stats['lines_sent'] == 2
+        assert stats['realtime_sent'] == 1
+        assert stats['lines_received'] == 5
+        assert stats['bytes_received'] == 63
+        assert stats['oks'] == 1
+        assert stats['errors'] == 1
+        assert stats['alarms'] == 1
+        assert stats['status_reports'] == 1
+        assert stats['parse_failures'] == 1
+        assert stats['rx_buffer']['histogram'] == [1, 0, 0, 0, 0, 0, 0, 0, 0, 1]
+        assert stats['paused_time'] == 1.5
+
+    def test_status_bytes_saved(self):
+        # Call methods under test
+        self.grbl_stats.register_received('<Idle|MPos:0.000,0.000|Bf:15,128>', GRBL_MSG_STATUS)
+        self.grbl_stats.set_status_report_savings(10)
+        self.grbl_stats.register_received('<Idle|MPos:0.000,0.000,0.000>', GRBL_MSG_STATUS)
+        self.grbl_stats.register_received('<Idle|MPos:0.000,0.000,0.000>', GRBL_MSG_STATUS)
+        self.grbl_stats.register_received('ok', GRBL_RESULT_OK)
+        stats = self.grbl_stats.get_stats()
+
+        # Assertions
+        assert stats['status_bytes_saved'] == 20
+
+    def test_rates(self, mocker: MockerFixture):
+        # Mock time
+        mocker.patch.object(
+            time,
+            'monotonic',
+            side_effect=[10.0, 10.5, 10.9, 11.2, 11.3 + RATE_WINDOW - 1.0]
+        )
+
+        # Call methods under test
+        self.grbl_stats.register_received('ok', GRBL_RESULT_OK)
+        self.grbl_stats.register_received('ok', GRBL_RESULT_OK)
+        self.grbl_stats.register_received('<Idle>', GRBL_MSG_STATUS)
+        self.grbl_stats.register_received('ok', GRBL_RESULT_OK)
+        stats = self.grbl_stats.get_stats()
+
+        # Assertions
+        assert stats['oks'] == 3
+        assert stats['acks_per_second'] == 2 / RATE_WINDOW
+        assert stats['status_reports_per_second'] == 1 / RATE_WINDOW
+
+    def test_latency(self):
+        # Call methods under test
+        for latency in range(1, 101):
+            self.grbl_stats.register_latency(latency / 1000)
+        self.grbl_stats.register_latency(5.0)
+        stats = self.grbl_stats.get_stats()
+
+        # Assertions
+        latency = stats['latency_ms']
+        assert latency['samples'] == 101
+        assert latency['p50'] == pytest.approx(51)
+        assert latency['p95'] == pytest.approx(96)
+        assert latency['p99'] == pytest.approx(100)
+        assert latency['max'] == pytest.approx(5000)
+        assert latency['buckets'] == LATENCY_BUCKETS
+        assert latency['counts'] == [1, 1, 3, 5, 10, 30, 50, 0, 0, 0, 1]
+
+    def test_occupancy(self):
+        # Call methods under test
+        self.grbl_stats.register_occupancy(25.0)
+        self.grbl_stats.register_occupancy(75.0)
+        stats = self.grbl_stats.get_stats()
+
+        # Assertions
+        occupancy = stats['rx_buffer']
+        assert occupancy['mean'] == 50.0
+        assert occupancy['max'] == 75.0
+        assert [fill for _, fill in occupancy['samples']] == [25.0, 75.0]
+
+    def test_get_stats_empty(self):
+        # Call method under test
+        stats = self.grbl_stats.get_stats()
+
+        # Assertions
+        assert stats['lines_sent'] == 0
+        assert stats['acks_per_second'] == 0.0
+        assert stats['latency_ms']['samples'] == 0
+        assert stats['latency_ms']['p99'] == 0.0
+        assert stats['rx_buffer']['mean'] == 0.0
+        assert stats['rx_buffer']['samples'] == []
@@ -1,9 +1,11 @@
 from grbl.constants import GRBL_ACTIVE_STATE_IDLE, GRBL_ACTIVE_STATE_RUN, \
     GRBL_ACTIVE_STATE_HOLD, GRBL_ACTIVE_STATE_DOOR, GRBL_ACTIVE_STATE_HOME, \
     GRBL_ACTIVE_STATE_SLEEP, GRBL_ACTIVE_STATE_ALARM, GRBL_ACTIVE_STATE_CHECK
-from grbl.grblStatus import GrblStatus
+from grbl.grblStatus import GrblStatus, FLAG_PAUSED
 import mocks.grbl_mocks as grbl_mocks
 import pytest
+from pytest_mock.plugin import MockerFixture
+import time
 
 
 class TestGrblStatus:
@@ -62,3 +64,19 @@ class TestGrblStatus:
         assert is_alarm == (active_state == GRBL_ACTIVE_STATE_ALARM)
         assert is_idle == (active_state == GRBL_ACTIVE_STATE_IDLE)
         assert is_checkmode == (active_state == GRBL_ACTIVE_STATE_CHECK)
+
+    def test_get_paused_time(self, mocker: MockerFixture):
+        # Mock time
+        mocker.patch.object(time, 'monotonic', side_effect=[10.0, 12.5, 20.0, 21.0])
+
+        # Pause twice, repeating the flag doesn't restart the pause
+        self.grbl_status.set_flag(FLAG_PAUSED, True)
+        self.grbl_status.set_flag(FLAG_PAUSED, True)
+        self.grbl_status.set_flag(FLAG_PAUSED, False)
+        self.grbl_status.set_flag(FLAG_PAUSED, True)
+
+        # Call method under test
+        paused_time = self.grbl_status.get_paused_time()
+
+        # Assertions
+        assert paused_time == 3.5
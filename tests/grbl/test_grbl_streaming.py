@@ -0,0 +1,146 @@
+from grbl.streaming.adaptiveStrategy import AdaptiveStrategy
+from grbl.streaming.characterCountingStrategy import CharacterCountingStrategy
+from grbl.streaming.sendResponseStrategy import SendResponseStrategy
+from grbl.streaming.streamingStrategy import STREAMING_CHARACTER_COUNTING, \
+    STREAMING_SEND_RESPONSE
+import pytest
+
+
+class TestCharacterCountingStrategy:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.strategy = CharacterCountingStrategy(15)
+
+    def test_bookkeeping(self):
+        # Call methods under test
+        self.strategy.sent('G1 X10')
+        self.strategy.sent('G1 Y10')
+
+        # Assertions
+        assert self.strategy.used_bytes() == 14
+        assert self.strategy.pending_lines() == 2
+        assert self.strategy.pending_commands() == ['G1 X10', 'G1 Y10']
+
+    def test_acknowledged(self):
+        # Set test values
+        self.strategy.sent('G1 X10')
+        self.strategy.sent('G1 Y10')
+
+        # Call methods under test
+        first = self.strategy.acknowledged()
+        second = self.strategy.acknowledged(error=True)
+        none = self.strategy.acknowledged()
+
+        # Assertions
+        assert first == 'G1 X10'
+        assert second == 'G1 Y10'
+        assert none == ''
+        assert self.strategy.used_bytes() == 0
+        assert self.strategy.pending_lines() == 0
+
+    @pytest.mark.parametrize(
+        'pending,command,expected',
+        [
+            ([], 'G1 X10', True),
+            ([], 'G1 X1000000000000000000000000', True),
+            (['G1 X10'], 'G1 X10', True),
+            (['G1 X10'], 'G1 X100', False),
+            (['G1 X10', 'G1 Y10'], 'G1', False),
+        ]
+    )
+    def test_can_send(self, pending, command, expected):
+        # Set test values
+        for line in pending:
+            self.strategy.sent(line)
+
+        # Call method under test and assert result
+        assert self.strategy.can_send(command) is expected
+
+    def test_reset(self):
+        # Set test values
+        self.strategy.sent('G1 X10')
+
+        # Call method under test
+        self.strategy.reset()
+
+        # Assertions
+        assert self.strategy.used_bytes() == 0
+        assert self.strategy.pending_commands() == []
+
+    def test_set_buffer_size(self):
+        # Set test values
+        self.strategy.sent('G1 X10')
+
+        # Call method under test
+        self.strategy.set_buffer_size(256)
+
+        # Assertions
+        assert self.strategy.can_send('G1 X' + '0' * 100) is True
+
+
+class TestSendResponseStrategy:
+    def test_can_send(self):
+        # Instantiate strategy
+        strategy = SendResponseStrategy(128)
+
+        # Call method under test and assert result
+        assert strategy.can_send('G1 X10') is True
+        strategy.sent('G1 X10')
+        assert strategy.can_send('G1 X10') is False
+        strategy.acknowledged()
+        assert strategy.can_send('G1 X10') is True
+
+
+class TestAdaptiveStrategy:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.strategy = AdaptiveStrategy(
+            128,
+            errors_window=10,
+            max_error_rate=0.1,
+            recovery_responses=5
+        )
+
+    def send_and_acknowledge(self, responses: list[bool]):
+        for error in responses:
+            self.strategy.sent('G1 X10')
+            self.strategy.acknowledged(error=error)
+
+    def test_keeps_character_counting_on_reliable_link(self):
+        # Simulate responses: 1 error in 10 responses
+        self.send_and_acknowledge([True] + [False] * 9)
+
+        # Assertions
+        assert self.strategy.mode == STREAMING_CHARACTER_COUNTING
+        assert self.strategy.get_error_rate() == 0.1
+        self.strategy.sent('G1 X10')
+        assert self.strategy.can_send('G1 X10') is True
+
+    def test_switches_to_send_response(self):
+        # Simulate responses: 2 errors in 10 responses
+        self.send_and_acknowledge([True, True] + [False] * 8)
+
+        # Assertions
+        assert self.strategy.mode == STREAMING_SEND_RESPONSE
+        assert self.strategy.switches == 1
+        self.strategy.sent('G1 X10')
+        assert self.strategy.can_send('G1 X10') is False
+
+    def test_switches_back_to_character_counting(self):
+        # Simulate responses: 2 errors in 10 responses, then recovery
+        self.send_and_acknowledge([True, True] + [False] * 8)
+        self.send_and_acknowledge([False] * 4)
+        mode_before_recovery = self.strategy.mode
+        self.send_and_acknowledge([False])
+
+        # Assertions
+        assert mode_before_recovery == STREAMING_SEND_RESPONSE
+        assert self.strategy.mode == STREAMING_CHARACTER_COUNTING
+        assert self.strategy.switches == 2
+
+    def test_error_rate_only_considers_window(self):
+        # Simulate responses: 1 error, then 10 clean responses
+        self.send_and_acknowledge([True] + [False] * 10)
+
+        # Assertions
+        assert self.strategy.get_error_rate() == 0.0
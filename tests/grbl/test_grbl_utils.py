@@ -1,5 +1,7 @@
-from grbl.grblUtils import build_jog_command, get_grbl_setting, is_setting_update_command, \
-    JOG_DISTANCE_ABSOLUTE, JOG_DISTANCE_INCREMENTAL, JOG_UNIT_INCHES, JOG_UNIT_MILIMETERS
+from grbl.grblUtils import build_jog_command, get_grbl_setting, get_status_mask, \
+    get_status_mask_savings, is_interactive_command, is_setting_update_command, \
+    split_gcode_words, JOG_DISTANCE_ABSOLUTE, JOG_DISTANCE_INCREMENTAL, JOG_UNIT_INCHES, \
+    JOG_UNIT_MILIMETERS
 import pytest
 
 
@@ -235,3 +237,75 @@ def test_get_grbl_setting(key, expected):
 
     # Assertions
     assert response == expected
+
+
+@pytest.mark.parametrize(
+    'line,expected',
+    [
+        ('G1 X10.5 Y-2', [('G', '1'), ('X', '10.5'), ('Y', '-2')]),
+        ('g0x.5z+1.', [('G', '0'), ('X', '.5'), ('Z', '+1.')]),
+        ('', []),
+        ('G1 X#1', None),
+        ('G1 X10 (comment)', None),
+    ]
+)
+def test_split_gcode_words(line, expected):
+    # Call the method under test
+    response = split_gcode_words(line)
+
+    # Assertions
+    assert response == expected
+
+
+@pytest.mark.parametrize(
+    'command,expected',
+    [
+        ('$X', True),
+        (' $J=G91 X10 F100\n', True),
+        ('$$', True),
+        ('G1 X10', False),
+        ('', False),
+    ]
+)
+def test_is_interactive_command(command, expected):
+    # Call the method under test
+    response = is_interactive_command(command)
+
+    # Assertions
+    assert response == expected
+
+
+@pytest.mark.parametrize(
+    'fields,current,expected',
+    [
+        (set(), 3, 1),
+        (set(), 2, 0),
+        ({'buffer'}, 1, 3),
+        ({'wpos'}, 3, 0),
+        ({'mpos'}, 0, 1),
+        ({'mpos', 'wpos', 'buffer'}, 0, 3),
+    ]
+)
+def test_get_status_mask(fields, current, expected):
+    # Call the method under test
+    response = get_status_mask(fields, current)
+
+    # Assertions
+    assert response == expected
+
+
+@pytest.mark.parametrize(
+    'original,mask,expected',
+    [
+        (3, 1, 10),
+        (3, 0, 10),
+        (1, 0, 0),
+        (1, 3, -10),
+    ]
+)
+def test_get_status_mask_savings(original, mask, expected):
+    # Call the method under test
+    response = get_status_mask_savings(original, mask)
+
+    # Assertions
+    assert response == expected
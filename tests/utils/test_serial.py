@@ -1,9 +1,22 @@
 import pytest
 from pytest_mock.plugin import MockerFixture
 import serial
+import time
 from utils.serial import SerialService
 
 
+def slow_reads(responses: list[bytes], delay: float):
+    """Mocks reads of the serial port which take some time, like with a timeout.
+    """
+    pending = iter(responses)
+
+    def read(size: int) -> bytes:
+        time.sleep(delay)
+        return next(pending, b'')
+
+    return read
+
+
 @pytest.mark.parametrize('open_port', [True, False])
 def test_start_connection(mocker: MockerFixture, open_port):
     # Input values for the startConnection method
@@ -26,11 +39,13 @@ def test_start_connection(mocker: MockerFixture, open_port):
         side_effect=side_effect_close_port
     )
     mock_open_port = mocker.patch.object(serial.Serial, 'open')
-    mock_read_port = mocker.patch.object(
+    mocker.patch.object(
         serial.Serial,
-        'readline',
-        return_value=b'start-message'
+        'in_waiting',
+        new_callable=mocker.PropertyMock,
+        return_value=15
     )
+    mock_read_port = mocker.patch.object(serial.Serial, 'read', return_value=b'start-message\r\n')
 
     # Call method under test
     serial_service.startConnection(port, baudrate, timeout)
@@ -39,6 +54,7 @@ def test_start_connection(mocker: MockerFixture, open_port):
     assert mock_close_port.call_count == (1 if open_port else 0)
     assert mock_open_port.call_count == 1
     assert mock_read_port.call_count == 1
+    assert serial_service.interface.timeout == timeout
 
 
 def test_send_bytes(mocker: MockerFixture):
@@ -71,35 +87,118 @@ def test_send_line(mocker: MockerFixture):
     assert mock_write_port.call_count == 1
 
 
-@pytest.mark.parametrize('received', ['', 'worked great'])
-def test_read_line(mocker: MockerFixture, received):
-    # Mock serial port methods
+def test_read_line(mocker: MockerFixture):
+    # Mock serial port methods, with several responses already received
+    mocker.patch.object(
+        serial.Serial,
+        'in_waiting',
+        new_callable=mocker.PropertyMock,
+        return_value=22
+    )
     mock_read_port = mocker.patch.object(
         serial.Serial,
-        'readline',
-        return_value=bytes(received, 'utf-8')
+        'read',
+        return_value=b'ok\r\n\r\nerror:20\r\nok\r\n<Idl'
     )
 
     # Call method under test
     serial_service = SerialService()
+    responses = [serial_service.readLine() for _ in range(3)]
+
+    # Assertions
+    mock_read_port.assert_called_once_with(22)
+    assert responses == ['ok', 'error:20', 'ok']
+    assert serial_service.waiting()
+
+
+@pytest.mark.parametrize('received', [b'', b'partial'])
+def test_read_line_timeout(mocker: MockerFixture, received):
+    # Mock serial port methods, nothing received before the timeout
+    mocker.patch.object(
+        serial.Serial,
+        'in_waiting',
+        new_callable=mocker.PropertyMock,
+        return_value=0
+    )
+    mock_read_port = mocker.patch.object(
+        serial.Serial,
+        'read',
+        side_effect=slow_reads([received], 0.02)
+    )
+
+    # Call method under test
+    serial_service = SerialService()
+    serial_service.timeout = 0.01
     response = serial_service.readLine()
 
+    # Assertions
+    mock_read_port.assert_called_with(1)
+    assert response == received.decode()
+
+
+@pytest.mark.parametrize('in_waiting,expected', [(0, 1), (5, 5)])
+def test_read_available(mocker: MockerFixture, in_waiting, expected):
+    # Mock serial port methods
+    mocker.patch.object(
+        serial.Serial,
+        'in_waiting',
+        new_callable=mocker.PropertyMock,
+        return_value=in_waiting
+    )
+    mock_read_port = mocker.patch.object(serial.Serial, 'read', return_value=b'ok\r\n')
+
+    # Call method under test
+    serial_service = SerialService()
+    response = serial_service.readAvailable()
+
+    # Assertions
+    mock_read_port.assert_called_once_with(expected)
+    assert response == b'ok\r\n'
+
+
+def test_read_available_after_read_line(mocker: MockerFixture):
+    # Mock serial port methods
+    mocker.patch.object(
+        serial.Serial,
+        'in_waiting',
+        new_callable=mocker.PropertyMock,
+        return_value=14
+    )
+    mock_read_port = mocker.patch.object(
+        serial.Serial,
+        'read',
+        return_value=b'ok\r\nerror:20\r\nok'
+    )
+
+    # Call method under test
+    serial_service = SerialService()
+    serial_service.readLine()
+    response = serial_service.readAvailable()
+
     # Assertions
     assert mock_read_port.call_count == 1
-    assert response == received
+    assert response == b'error:20\nok'
+    assert not serial_service._framer
 
 
 @pytest.mark.parametrize('retries', [0, 1, 2, 3])
 def test_read_line_until_message(mocker: MockerFixture, retries):
     # Mock serial port methods
+    mocker.patch.object(
+        serial.Serial,
+        'in_waiting',
+        new_callable=mocker.PropertyMock,
+        return_value=0
+    )
     mock_read_port = mocker.patch.object(
         serial.Serial,
-        'readline',
-        side_effect=[b'', b'', b'worked great']
+        'read',
+        side_effect=slow_reads([b'', b'', b'worked great\n'], 0.02)
     )
 
     # Call method under test
     serial_service = SerialService()
+    serial_service.timeout = 0.01
     response = serial_service.readLineUntilMessage(max_retries=retries)
 
     # Assertions
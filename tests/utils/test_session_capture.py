@@ -0,0 +1,164 @@
+from grbl.grblController import GrblController
+from grbl.grblMonitor import GrblMonitor
+import logging
+from mocks.grbl_emulator import GrblEmulator
+import pytest
+from pytest_mock.plugin import MockerFixture
+import time
+from utils.sessionCapture import CAPTURE_MAGIC, RECORD_HEADER, ReplayTransport, \
+    SessionRecorder, get_received_lines, get_sent_lines, new_capture_path, read_capture
+from utils.transport import DIRECTION_RX, DIRECTION_TX
+
+WELCOME = b"\r\nGrbl 1.1h ['$' for help]\r\n"
+
+
+def test_record_and_read_capture(tmp_path):
+    # Call method under test
+    path = new_capture_path(str(tmp_path / 'captures'), 'task_1')
+    recorder = SessionRecorder(path)
+    recorder.record(DIRECTION_RX, WELCOME)
+    recorder.record(DIRECTION_TX, b'G1 X10 F100\n')
+    recorder.close()
+    recorder.record(DIRECTION_RX, b'ok\r\n')
+
+    # Assertions
+    records = list(read_capture(path))
+    assert path.endswith('.cap')
+    assert [(direction, data) for _, direction, data in records] == [
+        (DIRECTION_RX, WELCOME),
+        (DIRECTION_TX, b'G1 X10 F100\n')
+    ]
+    assert 0 <= records[0][0] <= records[1][0]
+
+
+def test_read_capture_truncated(tmp_path):
+    # Mock capture, whose last record was cut
+    path = tmp_path / 'session.cap'
+    path.write_bytes(
+        CAPTURE_MAGIC +
+        RECORD_HEADER.pack(10, DIRECTION_RX, 4) + b'ok\r\n' +
+        RECORD_HEADER.pack(20, DIRECTION_RX, 4) + b'ok'
+    )
+
+    # Call method under test
+    records = list(read_capture(str(path)))
+
+    # Assertions
+    assert records == [(10, DIRECTION_RX, b'ok\r\n')]
+
+
+def test_read_capture_invalid(tmp_path):
+    # Mock capture
+    path = tmp_path / 'session.log'
+    path.write_bytes(b'[2024-01-01 00:00:00] ok')
+
+    # Call method under test
+    with pytest.raises(Exception) as error:
+        list(read_capture(str(path)))
+
+    # Assertions
+    assert 'Invalid capture file' in str(error.value)
+
+
+def test_get_lines():
+    # Mock capture records
+    records = [
+        (0, DIRECTION_RX, WELCOME),
+        (1, DIRECTION_TX, b'$I\n'),
+        (2, DIRECTION_TX, b'?'),
+        (3, DIRECTION_RX, b'[VER:1.1h.20190825:]\r\nok\r\n<Idle|MPos:0'),
+        (4, DIRECTION_TX, b'G1 X10 F100\n'),
+        (5, DIRECTION_RX, b'.000,0.000,0.000|FS:0,0>\r\n'),
+    ]
+
+    # Call method under test
+    sent = get_sent_lines(records)
+    received = get_received_lines(records)
+
+    # Assertions
+    assert sent == ['$I', 'G1 X10 F100']
+    assert received == [
+        "Grbl 1.1h ['$' for help]",
+        '[VER:1.1h.20190825:]',
+        'ok',
+        '<Idle|MPos:0.000,0.000,0.000|FS:0,0>'
+    ]
+
+
+def test_replay_waits_for_host():
+    # Mock capture records
+    replay = ReplayTransport([
+        (0, DIRECTION_RX, WELCOME),
+        (1000, DIRECTION_TX, b'G1 X10 F100\n'),
+        (2000, DIRECTION_TX, b'?'),
+        (3000, DIRECTION_RX, b'ok\r\n'),
+    ])
+    replay.openConnection('replay', 115200, timeout=0.01)
+
+    # Call method under test
+    welcome = replay.readLine()
+    early = replay.readLine()
+    replay.sendBytes(b'?')
+    ignored = replay.readLine()
+    replay.sendLine('G1 X10 F100')
+    response = replay.readLine()
+
+    # Assertions
+    assert welcome == "Grbl 1.1h ['$' for help]"
+    assert early == ''
+    assert ignored == ''
+    assert response == 'ok'
+    assert replay.finished()
+
+
+def test_replay_real_speed():
+    # Mock capture records, the response is received 100 ms later
+    replay = ReplayTransport(
+        [(0, DIRECTION_RX, WELCOME), (100000000, DIRECTION_RX, b'ok\r\n')],
+        speed=2.0
+    )
+    replay.openConnection('replay', 115200, timeout=1)
+
+    # Call method under test
+    start = time.monotonic()
+    replay.readLine()
+    replay.readLine()
+    elapsed = time.monotonic() - start
+
+    # Assertions
+    assert 0.04 <= elapsed < 0.5
+
+
+def test_replay_session_with_controller(mocker: MockerFixture, tmp_path):
+    # Mock logger methods
+    for method in ['debug', 'info', 'warning', 'error', 'critical', 'sent', 'received']:
+        mocker.patch.object(GrblMonitor, method)
+
+    lines = ['G21 G90', 'F1000'] + [f'G1 X{i % 10} Y{i % 7}' for i in range(50)] + ['G99']
+
+    # Record a session with the emulator
+    path = str(tmp_path / 'session.cap')
+    emulator = GrblEmulator(speedup=1000.0)
+    emulator.startRecording(path)
+    grbl_controller = GrblController(logging.getLogger('test_logger'), emulator)
+    grbl_controller.connect('emulator', 115200, fast=True)
+    for line in lines:
+        grbl_controller.sendCommand(line)
+    grbl_controller.waitUntilProcessed(5)
+    grbl_controller.disconnect()
+
+    # Call method under test
+    records = list(read_capture(path))
+    replay = ReplayTransport(records)
+    replayed = GrblController(logging.getLogger('test_logger'), replay)
+    replayed.connect('replay', 115200, fast=True)
+    for line in get_sent_lines(records)[replay.sent_lines:]:
+        replayed.sendCommand(line)
+    replayed.waitUntilProcessed(5)
+    replayed.disconnect()
+
+    # Assertions
+    assert replay.finished()
+    assert replayed.getCommandsCount() == grbl_controller.getCommandsCount()
+    assert replayed.getAcksCount() == grbl_controller.getAcksCount()
+    assert '(code: 20) while executing line: G99' in replayed.grbl_status.get_error_message()
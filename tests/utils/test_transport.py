@@ -0,0 +1,244 @@
+from serial import SerialException
+import os
+import pytest
+import socket
+import sys
+import threading
+from utils.serial import SerialService
+from utils.sessionCapture import read_capture
+from utils.transport import DIRECTION_RX, DIRECTION_TX, LineFramer, PtyTransport, \
+    TcpTransport, get_transport
+
+# Fake GRBL device, answering 'ok' to every line
+FAKE_GRBL = (
+    'import sys\n'
+    'sys.stdout.write("\\r\\nGrbl 1.1h\\r\\n")\n'
+    'sys.stdout.flush()\n'
+    'for line in sys.stdin:\n'
+    '    sys.stdout.write("ok\\r\\n")\n'
+    '    sys.stdout.flush()\n'
+)
+
+posix_only = pytest.mark.skipif(sys.platform == 'win32', reason='Requires pseudo-terminals')
+
+
+@pytest.mark.parametrize(
+    'port,expected',
+    [
+        ('tcp://localhost:23', TcpTransport),
+        ('pty:///dev/pts/3', PtyTransport),
+        ('exec://./grbl_sim.exe -n', PtyTransport),
+        ('/dev/ttyUSB0', SerialService),
+        ('COM3', SerialService)
+    ]
+)
+def test_get_transport(port, expected):
+    # Call method under test
+    transport = get_transport(port)
+
+    # Assertions
+    assert type(transport) is expected
+
+
+def test_line_framer():
+    framer = LineFramer()
+
+    # Call method under test
+    framer.feed(b'ok\r\n\r\nerror:')
+    framer.feed(b'20\r')
+    framer.feed(b'\n<Idle|MPos:0.000,0.000,0.000|FS:0,0>\r\nGrb')
+
+    # Assertions
+    assert list(framer.lines) == ['ok', 'error:20', '<Idle|MPos:0.000,0.000,0.000|FS:0,0>']
+    assert framer.buffer == b'Grb'
+    assert framer
+
+
+def test_line_framer_flush_and_drain():
+    framer = LineFramer()
+    framer.feed(b'ok\r\nok\r\nALARM')
+
+    # Call methods under test
+    framer.lines.popleft()
+    drained = framer.drain()
+    framer.feed(b'Grbl')
+    flushed = framer.flush()
+
+    # Assertions
+    assert drained == b'ok\nALARM'
+    assert flushed == 'Grbl'
+    assert not framer
+
+
+@posix_only
+class TestPtyTransport:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.master, slave = os.openpty()
+        self.port = f'pty://{os.ttyname(slave)}'
+        self.transport = PtyTransport()
+        self.transport.startConnection(self.port, 115200, timeout=0)
+
+        yield
+
+        self.transport.stopConnection()
+        os.close(slave)
+        os.close(self.master)
+
+    def test_read_line(self):
+        # Mock device responses, in a single chunk
+        os.write(self.master, b'ok\r\nerror:20\r\n<Idle|MPos:0.000,0.000,0.000|FS:0,0>\r\n')
+        self.transport.timeout = 1
+
+        # Call method under test
+        responses = [self.transport.readLine() for _ in range(3)]
+
+        # Assertions
+        assert responses == ['ok', 'error:20', '<Idle|MPos:0.000,0.000,0.000|FS:0,0>']
+
+    def test_read_line_timeout(self):
+        # Mock device responses, partially received
+        os.write(self.master, b'o')
+        self.transport.timeout = 0.01
+
+        # Call method under test
+        response = self.transport.readLine()
+
+        # Assertions
+        assert response == 'o'
+
+    def test_wait_for_line(self):
+        # Mock device responses, partially received
+        os.write(self.master, b'Grbl 1.')
+
+        # Call method under test
+        partial = self.transport.waitForLine(0.01)
+        os.write(self.master, b"1h ['$' for help]\r\n")
+        complete = self.transport.waitForLine(1)
+
+        # Assertions
+        assert partial is None
+        assert complete == "Grbl 1.1h ['$' for help]"
+
+    def test_read_available(self):
+        # Mock device responses
+        os.write(self.master, b'ok\r\nok')
+
+        # Call method under test
+        response = self.transport.readAvailable()
+
+        # Assertions
+        assert response == b'ok\r\nok'
+        assert not self.transport.waiting()
+
+    def test_send_line(self):
+        # Call method under test
+        self.transport.sendLine('G1 X10 F100\n')
+        self.transport.sendBytes(b'?')
+
+        # Assertions
+        assert os.read(self.master, 100) == b'G1 X10 F100\n?'
+
+    def test_recording(self, tmp_path):
+        # Mock device responses
+        os.write(self.master, b'ok\r\n')
+        self.transport.timeout = 1
+        path = str(tmp_path / 'session.cap')
+
+        # Call method under test
+        self.transport.startRecording(path)
+        self.transport.sendLine('G1 X10 F100')
+        self.transport.sendBytes(b'?')
+        self.transport.readLine()
+        self.transport.stopConnection()
+
+        # Assertions
+        records = list(read_capture(path))
+        assert [(direction, data) for _, direction, data in records] == [
+            (DIRECTION_TX, b'G1 X10 F100\n'),
+            (DIRECTION_TX, b'?'),
+            (DIRECTION_RX, b'ok\r\n')
+        ]
+        assert records[0][0] <= records[1][0] <= records[2][0]
+        assert self.transport.recorder is None
+
+
+@posix_only
+def test_pty_transport_exec():
+    transport = PtyTransport()
+
+    # Call method under test
+    welcome = transport.startConnection(
+        f'exec://{sys.executable} -c \'{FAKE_GRBL}\'',
+        115200,
+        timeout=5
+    )
+    transport.sendLine('G1 X10 F100')
+    response = transport.readLine()
+    process = transport.process
+    transport.stopConnection()
+
+    # Assertions
+    assert welcome == 'Grbl 1.1h'
+    assert response == 'ok'
+    assert process.poll() is not None
+    assert not transport.isOpen()
+
+
+def test_pty_transport_invalid_port():
+    # Call method under test and assert exception
+    with pytest.raises(SerialException):
+        PtyTransport().startConnection('pty:///dev/not-a-pty', 115200)
+
+
+class TestTcpTransport:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        # Mock serial-over-TCP bridge
+        self.server = socket.create_server(('127.0.0.1', 0))
+        port = self.server.getsockname()[1]
+        accepted = []
+
+        def accept():
+            connection, _ = self.server.accept()
+            connection.sendall(b"\r\nGrbl 1.1h ['$' for help]\r\n")
+            accepted.append(connection)
+
+        thread = threading.Thread(target=accept)
+        thread.start()
+
+        self.transport = TcpTransport()
+        self.welcome = self.transport.startConnection(f'tcp://127.0.0.1:{port}', 115200, 1)
+        thread.join()
+        self.connection = accepted[0]
+
+        yield
+
+        self.transport.stopConnection()
+        self.connection.close()
+        self.server.close()
+
+    def test_start_connection(self):
+        # Assertions
+        assert self.welcome == "Grbl 1.1h ['$' for help]"
+        nodelay = self.transport.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert nodelay != 0
+
+    def test_send_and_read_lines(self):
+        # Call method under test
+        self.transport.sendLine('G1 X10 F100')
+        received = self.connection.recv(100)
+        self.connection.sendall(b'ok\r\n')
+        response = self.transport.readLine()
+
+        # Assertions
+        assert received == b'G1 X10 F100\n'
+        assert response == 'ok'
+
+    def test_connection_closed(self):
+        # Mock the bridge closing the connection
+        self.connection.close()
+
+        # Call method under test and assert exception
+        with pytest.raises(SerialException):
+            self.transport.readAvailable()
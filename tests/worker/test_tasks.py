@@ -6,7 +6,8 @@ from gcode.gcodeFileSender import GcodeFileSender, FinishedFile
 from grbl.grblController import GrblController, GrblStatus
 from pytest_mock.plugin import MockerFixture
 import time
-from worker import executeTask
+from utils.redisPubSubManager import RedisPubSubManagerSync
+from worker import executeTask, resumeTask
 
 
 def test_execute_tasks(mocker: MockerFixture):
@@ -53,7 +54,7 @@ def test_execute_tasks(mocker: MockerFixture):
     mocker.patch.object(GcodeFileSender, 'start', return_value=3)
     mock_stream_line = mocker.patch.object(
         GcodeFileSender,
-        'send_line',
+        'fill_buffer',
         side_effect=increment_commands_count
     )
 
@@ -91,7 +92,7 @@ def test_no_tasks_to_execute(mocker: MockerFixture):
     # Mock GRBL methods
     mock_start_connection = mocker.patch.object(GrblController, 'connect')
     # Mock file sender methods
-    mock_stream_line = mocker.patch.object(GcodeFileSender, 'send_line')
+    mock_stream_line = mocker.patch.object(GcodeFileSender, 'fill_buffer')
 
     # Call method under test
     with pytest.raises(Exception) as error:
@@ -192,7 +193,7 @@ def test_execute_tasks_grbl_error(mocker: MockerFixture):
 
     # Mock file sender methods
     mocker.patch.object(GcodeFileSender, 'start', return_value=3)
-    mocker.patch.object(GcodeFileSender, 'send_line')
+    mocker.patch.object(GcodeFileSender, 'fill_buffer')
 
     # Mock Celery class methods
     mocker.patch.object(Task, 'update_state')
@@ -279,7 +280,7 @@ def test_execute_tasks_pause(mocker: MockerFixture):
     mocker.patch.object(GcodeFileSender, 'start', return_value=3)
     mock_stream_line = mocker.patch.object(
         GcodeFileSender,
-        'send_line',
+        'fill_buffer',
         side_effect=increment_commands_count
     )
     mocker.patch.object(GcodeFileSender, 'pause')
@@ -302,3 +303,140 @@ def test_execute_tasks_pause(mocker: MockerFixture):
     # Assertions
     assert mock_process_request.call_count == 8
     assert mock_stream_line.call_count == 4
+
+
+# Mock checkpoint
+CHECKPOINT_STATE = {
+    'modal': {
+        'motion': 'G1', 'wcs': 'G54', 'plane': 'G17', 'units': 'G21', 'distance': 'G90',
+        'feedrate': 'G94', 'program': None, 'spindle': 'M3', 'coolant': 'M9'
+    },
+    'feedrate': 300.0,
+    'spindle': 10000.0,
+    'tool': None,
+    'position': {'x': 10.0, 'y': 20.0, 'z': -1.0},
+    'safe_z': 5.0
+}
+
+
+@pytest.mark.parametrize('checkpoint_task_id', [None, 2])
+def test_resume_task_checkpoint_not_found(mocker: MockerFixture, checkpoint_task_id):
+    # Mock DB methods
+    mocker.patch.object(TaskRepository, 'are_there_tasks_in_progress', return_value=False)
+    mocker.patch.object(
+        TaskRepository,
+        'get_task_by_id',
+        return_value=mocker.Mock(id=1, status='failed')
+    )
+    mocker.patch.object(
+        TaskRepository,
+        'get_checkpoint_by_id',
+        return_value=mocker.Mock(task_id=2) if checkpoint_task_id else None
+    )
+
+    # Mock GRBL methods
+    mock_connect = mocker.patch.object(GrblController, 'connect')
+
+    # Call method under test
+    with pytest.raises(Exception) as error:
+        resumeTask(
+            task_id=1,
+            checkpoint_id=1,
+            base_path='path/to/project',
+            serial_port='test-port',
+            serial_baudrate=115200
+        )
+
+    # Assertions
+    assert str(error.value) == 'No se encontró el punto de control de la tarea'
+    assert mock_connect.call_count == 0
+
+
+def test_resume_task_wrong_status(mocker: MockerFixture):
+    # Mock DB methods
+    mocker.patch.object(TaskRepository, 'are_there_tasks_in_progress', return_value=False)
+    mocker.patch.object(
+        TaskRepository,
+        'get_task_by_id',
+        return_value=mocker.Mock(id=1, status='finished')
+    )
+
+    # Call method under test
+    with pytest.raises(Exception) as error:
+        resumeTask(
+            task_id=1,
+            checkpoint_id=1,
+            base_path='path/to/project',
+            serial_port='test-port',
+            serial_baudrate=115200
+        )
+
+    # Assertions
+    assert str(error.value) == 'La tarea tiene un estado incorrecto: finished'
+
+
+def test_resume_task_saves_checkpoint_on_error(mocker: MockerFixture, tmp_path):
+    # Mock file
+    file_path = tmp_path / 'program.nc'
+    file_path.write_text('G21\nG0 Z5\nG1 X10 Y20 F300\nG1 Z-1\nG1 X20\nG1 X30\n')
+    mocker.patch('worker.getFilePath', return_value=str(file_path))
+
+    # Mock DB methods
+    mocker.patch.object(TaskRepository, 'are_there_tasks_in_progress', return_value=False)
+    mocker.patch.object(
+        TaskRepository,
+        'get_task_by_id',
+        return_value=mocker.Mock(id=1, status='failed', tool_id=1)
+    )
+    mocker.patch.object(
+        TaskRepository,
+        'get_checkpoint_by_id',
+        return_value=mocker.Mock(task_id=1, line=4, offset=33, state=CHECKPOINT_STATE)
+    )
+    mock_update_task_status = mocker.patch.object(TaskRepository, 'update_task_status')
+    mock_create_checkpoint = mocker.patch.object(TaskRepository, 'create_checkpoint')
+
+    # Mock PubSub methods
+    mocker.patch.object(RedisPubSubManagerSync, 'publish')
+    mocker.patch.object(RedisPubSubManagerSync, 'disconnect')
+
+    # Mock GRBL methods
+    mocker.patch.object(GrblController, 'connect')
+    mocker.patch.object(GrblController, 'disconnect')
+    mock_send_command = mocker.patch.object(GrblController, 'sendCommand')
+    mocker.patch.object(GrblController, 'getCommandsCount', return_value=9)
+    mocker.patch.object(GrblStatus, 'failed', return_value=True)
+    mocker.patch.object(GrblStatus, 'get_error_message', return_value='An error message')
+
+    # Mock file sender methods
+    mock_start = mocker.patch.object(GcodeFileSender, 'start', return_value=6)
+    mocker.patch.object(GcodeFileSender, 'fill_buffer', return_value=6)
+    mock_executed_line = mocker.patch.object(GcodeFileSender, 'get_executed_line', return_value=5)
+
+    # Mock Celery class methods
+    mocker.patch.object(Task, 'update_state')
+
+    # Call method under test
+    with pytest.raises(Exception) as error:
+        resumeTask(
+            task_id=1,
+            checkpoint_id=1,
+            base_path='path/to/project',
+            serial_port='test-port',
+            serial_baudrate=115200
+        )
+
+    # Assertions
+    assert str(error.value) == 'An error message'
+    mock_start.assert_called_with(4, 33)
+    assert mock_send_command.call_args_list[0] == mocker.call('G21 G17 G54 G90 G94')
+    assert mock_send_command.call_count == 7
+    mock_executed_line.assert_called_with(2)
+    assert mock_create_checkpoint.call_count == 1
+    task_id, line, offset, state = mock_create_checkpoint.call_args.args
+    assert (task_id, line, offset) == (1, 5, 40)
+    assert state['position'] == {'x': 20.0, 'y': 20.0, 'z': -1.0}
+    assert mock_update_task_status.call_args_list == [
+        mocker.call(1, 'in_progress'),
+        mocker.call(1, 'failed')
+    ]
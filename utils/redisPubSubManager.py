@@ -43,6 +43,19 @@ class RedisPubSubManager:
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def count_subscribers(self, channel: str) -> int:
+        """
+        Counts the clients subscribed to a specific Redis channel.
+
+        Args:
+            channel (str): Channel.
+
+        Returns:
+            int: Amount of subscribers.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def get_message(self) -> PubSubMessage:
         """
@@ -97,6 +110,10 @@ class RedisPubSubManagerAsync(RedisPubSubManager):
     async def publish(self, channel: str, message: str) -> None:
         await self.redis_connection.publish(channel, message)
 
+    async def count_subscribers(self, channel: str) -> int:
+        [(_, count)] = await self.redis_connection.pubsub_numsub(channel)
+        return count
+
     async def get_message(self) -> PubSubMessage:
         return await self.pubsub.get_message(ignore_subscribe_messages=True)
 
@@ -126,6 +143,10 @@ class RedisPubSubManagerSync(RedisPubSubManager):
     def publish(self, channel: str, message: str) -> None:
         self.redis_connection.publish(channel, message)
 
+    def count_subscribers(self, channel: str) -> int:
+        [(_, count)] = self.redis_connection.pubsub_numsub(channel)
+        return count
+
     def get_message(self) -> PubSubMessage:
         return self.pubsub.get_message(ignore_subscribe_messages=True)
 
@@ -1,71 +1,60 @@
 import serial
 import serial.tools.list_ports as serial_ports
 
+try:
+    from .transport import Transport
+except ImportError:
+    from utils.transport import Transport
+
+
+class SerialService(Transport):
+    """Transport for a serial port, using pyserial.
+    """
 
-class SerialService:
     def __init__(self):
+        super().__init__()
         self.interface = serial.Serial()
 
     @classmethod
     def get_ports(cls):
         return serial_ports.comports()
 
-    def startConnection(self, port: str, baudrate: int, timeout: int = 2) -> str:
-        """Closes any previous connection and starts a new one.
-        """
-        # Close any previous serial connection
-        if self.interface.is_open:
-            self.interface.close()
-
-        # Configure the new values
+    def open(self, port: str, baudrate: int):
         self.interface.port = port
         self.interface.baudrate = baudrate
-        self.interface.timeout = timeout
-
-        # Start the connection
+        self.interface.timeout = self.timeout
         self.interface.open()
 
-        # Dump any data already received
-        # self.interface.reset_input_buffer()
+    def isOpen(self) -> bool:
+        return self.interface.is_open
 
-        # Wait for the response
-        return self.readLineUntilMessage()
+    def close(self):
+        self.interface.close()
 
-    def waiting(self) -> bool:
-        return self.interface.in_waiting
+    def _readChunk(self, timeout: float) -> bytes:
+        # Data already received, read at once without reconfiguring the port
+        waiting = self.interface.in_waiting
+        if waiting:
+            return self.interface.read(waiting)
 
-    def sendBytes(self, code: bytes):
-        """Sends byte(s) via serial port.
-        """
-        self.interface.write(code)
+        previous_timeout = self.interface.timeout
+        self.interface.timeout = timeout
+        try:
+            data = self.interface.read(1)
+        finally:
+            self.interface.timeout = previous_timeout
 
-    def sendLine(self, code: str):
-        """Sends a line via serial port.
-        """
-        # Strip all EOL characters for consistency
-        message = code.strip() + '\n'
-        # Send line
-        self.interface.write(message.encode())
+        # Whatever arrived along with the first byte
+        waiting = self.interface.in_waiting if data else 0
+        return data + self.interface.read(waiting) if waiting else data
 
-    def readLine(self) -> str:
-        """Waits for response with carriage return.
-        """
-        return str(self.interface.readline().decode('ascii', 'ignore')).strip()
+    def _write(self, data: bytes):
+        self.interface.write(data)
 
-    def readLineUntilMessage(self, max_retries: int = 30) -> str:
-        """Waits for response with carriage return.
-        Ignores empty messages and timeouts until an actual message arrives.
-        """
-        response = ''
-        retries = 0
-        while not response and retries <= max_retries:
-            response = self.readLine().strip()
-            retries = retries + 1
-        return response
+    def waiting(self) -> bool:
+        if self._framer:
+            return True
+        return self.interface.in_waiting
 
-    def stopConnection(self):
-        """Closes any previous connection.
-        """
-        if self.interface.is_open:
-            self.interface.close()
-        return
+    def fileno(self) -> int:
+        return self.interface.fileno()
@@ -0,0 +1,203 @@
+"""Recording and replay of the traffic of a serial session.
+
+A capture is a binary file with every chunk of bytes sent to (TX) and received
+from (RX) the device, with a monotonic timestamp in nanoseconds since the start
+of the recording:
+
+    Header:  CAPTURE_MAGIC
+    Records: timestamp (uint64), direction (uint8), length (uint32), data
+             (little endian, RECORD_HEADER)
+
+Captures are recorded by any transport (see Transport.startRecording),
+and replayed with a ReplayTransport in place of the device.
+"""
+
+import datetime
+import os
+import re
+import struct
+import threading
+import time
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+try:
+    from .transport import DIRECTION_RX, DIRECTION_TX, LineFramer, Transport
+except ImportError:
+    from utils.transport import DIRECTION_RX, DIRECTION_TX, LineFramer, Transport
+
+# Constants
+CAPTURE_MAGIC = b'GRBLCAP1'
+CAPTURE_EXTENSION = '.cap'
+RECORD_HEADER = struct.Struct('<QBI')
+REALTIME_PATTERN = re.compile(rb'[?!~\x18\x80-\xff]')   # Single byte, real-time commands
+
+# Types definition
+CaptureRecord = Tuple[int, int, bytes]  # Timestamp (ns), direction, data
+
+
+class SessionRecorder:
+    """Writes a capture of the traffic of a session, as it happens.
+
+    It can be used from several threads at the same time (reader and writer).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = open(path, 'wb')
+        self._file.write(CAPTURE_MAGIC)
+        self._started_at = time.monotonic_ns()
+
+    def record(self, direction: int, data: bytes):
+        """Appends a chunk of data sent or received, timestamped now.
+        """
+        timestamp = time.monotonic_ns() - self._started_at
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(RECORD_HEADER.pack(timestamp, direction, len(data)))
+            self._file.write(data)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def new_capture_path(folder: str, name: str) -> str:
+    """Returns the path of a new capture in the given folder, named after the current time.
+    """
+    os.makedirs(folder, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(folder, f'{name}_{timestamp}{CAPTURE_EXTENSION}')
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """Returns the records of a capture, in the order they were recorded.
+    A record truncated by an abrupt end of the recording is ignored.
+    """
+    with open(path, 'rb') as capture:
+        if capture.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise Exception(f'Invalid capture file: {path}')
+
+        while True:
+            header = capture.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, direction, length = RECORD_HEADER.unpack(header)
+            data = capture.read(length)
+            if len(data) < length:
+                return
+            yield timestamp, direction, data
+
+
+def get_sent_lines(records: Iterable[CaptureRecord]) -> list[str]:
+    """Returns the lines sent to the device, without the real-time commands.
+    """
+    sent = b''.join(data for _, direction, data in records if direction == DIRECTION_TX)
+    framer = LineFramer()
+    framer.feed(REALTIME_PATTERN.sub(b'', sent) + b'\n')
+    return list(framer.lines)
+
+
+def get_received_lines(records: Iterable[CaptureRecord]) -> list[str]:
+    """Returns the lines received from the device.
+    """
+    framer = LineFramer()
+    for _, direction, data in records:
+        if direction == DIRECTION_RX:
+            framer.feed(data)
+    framer.feed(b'\n')
+    return list(framer.lines)
+
+
+class ReplayTransport(Transport):
+    """Replays the data received in a capture, in place of the device.
+
+    To make the replay deterministic, each received chunk is only replayed
+    once the host sent as many lines as before it was recorded, so the
+    responses follow the commands like in the original session.
+    With a speed, the chunks are not replayed before their recorded time
+    (divided by the speed), otherwise they are replayed as fast as possible.
+
+    Like the emulator, it can only be used by threaded controllers.
+    """
+
+    def __init__(self, records: Iterable[CaptureRecord], speed: Optional[float] = None):
+        super().__init__()
+        self.speed = speed
+        self._replies: list[tuple[int, int, bytes]] = []   # Timestamp, lines sent before, data
+
+        sent_lines = 0
+        for timestamp, direction, data in records:
+            if direction == DIRECTION_TX:
+                sent_lines += REALTIME_PATTERN.sub(b'', data).count(b'\n')
+            else:
+                self._replies.append((timestamp, sent_lines, data))
+
+        self._condition = threading.Condition()
+        self._open = False
+        self._next = 0
+        self.sent_lines = 0     # Lines sent by the host during the replay
+        self._started_at = 0.0
+
+    def open(self, port: str, baudrate: int):
+        with self._condition:
+            self._open = True
+            self._next = 0
+            self.sent_lines = 0
+            self._started_at = time.monotonic()
+
+    def isOpen(self) -> bool:
+        return self._open
+
+    def close(self):
+        with self._condition:
+            self._open = False
+            self._condition.notify_all()
+
+    def fileno(self) -> int:
+        raise NotImplementedError('The replay can only be used by threaded controllers')
+
+    def finished(self) -> bool:
+        """Checks if every received chunk was already replayed.
+        """
+        return self._next >= len(self._replies)
+
+    def _readChunk(self, timeout: float) -> bytes:
+        deadline = time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                wait = self._waitForReply()
+                if wait == 0:
+                    data = self._replies[self._next][2]
+                    self._next += 1
+                    return data
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._open:
+                    return b''
+                self._condition.wait(min(remaining, wait) if wait else remaining)
+
+    def _waitForReply(self) -> Optional[float]:
+        """Returns the time to wait for the next chunk (0 if ready),
+        or None if it waits for the host.
+        """
+        if self.finished():
+            return None
+
+        timestamp, sent_lines, _ = self._replies[self._next]
+        if self.sent_lines < sent_lines:
+            return None
+        if self.speed is None:
+            return 0
+
+        due = self._started_at + timestamp / 1e9 / self.speed
+        return max(due - time.monotonic(), 0)
+
+    def _write(self, data: bytes):
+        with self._condition:
+            self.sent_lines += REALTIME_PATTERN.sub(b'', data).count(b'\n')
+            self._condition.notify_all()
@@ -0,0 +1,404 @@
+from abc import abstractmethod
+from collections import deque
+import os
+import select
+from serial import SerialException
+import shlex
+import socket
+import subprocess
+import time
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .sessionCapture import SessionRecorder
+
+# Constants
+READ_CHUNK_SIZE = 4096
+TCP_PREFIX = 'tcp://'       # tcp://host:port, for serial-over-TCP bridges
+PTY_PREFIX = 'pty://'       # pty:///dev/pts/N, for an existing pseudo-terminal
+EXEC_PREFIX = 'exec://'     # exec://command args, for a simulator attached to a new pty
+PROCESS_STOP_TIMEOUT = 1.0  # seconds
+DIRECTION_RX = 0    # Recorded data received from the device
+DIRECTION_TX = 1    # Recorded data sent to the device
+
+
+class LineFramer:
+    """Splits a byte stream in lines.
+
+    The data is appended to a buffer as it arrives, and every complete line in it
+    is decoded and split at once, so the cost doesn't grow with each byte or line.
+    Empty lines are discarded, and the EOL characters stripped.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()       # Data not yet terminated by EOL
+        self.lines: deque[str] = deque()    # Complete lines, not yet consumed
+
+    def __bool__(self) -> bool:
+        return bool(self.lines or self.buffer)
+
+    def feed(self, data: bytes):
+        """Appends the received data, and frames the complete lines.
+        """
+        self.buffer += data
+        if b'\n' not in data:
+            return
+
+        end = self.buffer.rfind(b'\n')
+        text = self.buffer[:end].decode('ascii', 'ignore')
+        del self.buffer[:end + 1]
+        self.lines.extend(filter(None, map(str.strip, text.split('\n'))))
+
+    def flush(self) -> str:
+        """Returns the data not yet terminated by EOL, and discards it.
+        """
+        line = self.buffer.decode('ascii', 'ignore').strip()
+        self.buffer.clear()
+        return line
+
+    def drain(self) -> bytes:
+        """Returns every line not yet consumed, plus the data not yet terminated
+        by EOL, as they were received, and discards them.
+        """
+        data = b''.join(line.encode() + b'\n' for line in self.lines) + bytes(self.buffer)
+        self.clear()
+        return data
+
+    def clear(self):
+        self.buffer.clear()
+        self.lines.clear()
+
+
+class Transport:
+    """Byte stream connecting to a GRBL device.
+
+    The data is read in chunks, as much as already received, and split in lines
+    by a LineFramer, so reading a response doesn't take one system call per byte.
+
+    Errors are reported as SerialException, whatever the implementation.
+
+    The traffic can be recorded to a capture file, see startRecording.
+    """
+
+    def __init__(self):
+        self.timeout: float = 2
+        self._framer = LineFramer()
+        self.recorder: Optional['SessionRecorder'] = None
+
+    @abstractmethod
+    def open(self, port: str, baudrate: int) -> None:
+        """
+        Opens the connection to the given port.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def isOpen(self) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def fileno(self) -> int:
+        """
+        Returns the file descriptor of the connection, to be watched by an event loop.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _readChunk(self, timeout: float) -> bytes:
+        """
+        Reads the data already received, waiting up to timeout seconds for it.
+        Returns an empty value if nothing arrived.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def startConnection(self, port: str, baudrate: int, timeout: float = 2) -> str:
+        """Closes any previous connection and starts a new one.
+        """
+        self.openConnection(port, baudrate, timeout)
+
+        # Wait for the response
+        return self.readLineUntilMessage()
+
+    def openConnection(self, port: str, baudrate: int, timeout: float = 2):
+        """Closes any previous connection and starts a new one,
+        without waiting for any message from the device.
+        """
+        self.stopConnection()
+
+        self.timeout = timeout
+        self._framer.clear()
+        self.open(port, baudrate)
+
+    def startRecording(self, path: str):
+        """Records every byte sent and received to a capture file (see utils.sessionCapture),
+        until the connection is closed or stopRecording is called.
+        """
+        try:
+            from .sessionCapture import SessionRecorder
+        except ImportError:
+            from utils.sessionCapture import SessionRecorder
+
+        self.stopRecording()
+        self.recorder = SessionRecorder(path)
+
+    def stopRecording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def _read(self, timeout: float) -> bytes:
+        data = self._readChunk(timeout)
+        if data and self.recorder is not None:
+            self.recorder.record(DIRECTION_RX, data)
+        return data
+
+    def _send(self, data: bytes):
+        if self.recorder is not None:
+            self.recorder.record(DIRECTION_TX, data)
+        self._write(data)
+
+    def waiting(self) -> bool:
+        if self._framer:
+            return True
+        return bool(select.select([self.fileno()], [], [], 0)[0])
+
+    def sendBytes(self, code: bytes):
+        """Sends byte(s) to the device.
+        """
+        self._send(code)
+
+    def sendLine(self, code: str):
+        """Sends a line to the device.
+        """
+        # Strip all EOL characters for consistency
+        self._send((code.strip() + '\n').encode())
+
+    def readLine(self) -> str:
+        """Waits for response with carriage return, skipping empty lines.
+        Returns the data received so far if the timeout expires.
+        """
+        line = self.waitForLine(self.timeout)
+        return self._framer.flush() if line is None else line
+
+    def waitForLine(self, timeout: float) -> Optional[str]:
+        """Waits up to timeout seconds for a complete line, skipping empty lines.
+        Returns None if the timeout expires, keeping the data received so far.
+        """
+        lines = self._framer.lines
+        if lines:
+            return lines.popleft()
+
+        deadline = time.monotonic() + timeout
+        while not lines:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._framer.feed(self._read(remaining))
+
+        return lines.popleft()
+
+    def readAvailable(self) -> bytes:
+        """Reads the bytes already received, without blocking
+        when the connection was reported as readable.
+        """
+        if self._framer:
+            return self._framer.drain()
+        return self._read(self.timeout)
+
+    def readLineUntilMessage(self, max_retries: int = 30) -> str:
+        """Waits for response with carriage return.
+        Ignores empty messages and timeouts until an actual message arrives.
+        """
+        response = ''
+        retries = 0
+        while not response and retries <= max_retries:
+            response = self.readLine()
+            retries = retries + 1
+        return response
+
+    def stopConnection(self):
+        """Closes any previous connection, and its recording.
+        """
+        if self.isOpen():
+            self.close()
+            self.stopRecording()
+
+
+class PtyTransport(Transport):
+    """Raw pseudo-terminal, without the overhead of a serial driver.
+
+    The port can be either:
+        - pty:///dev/pts/N: An existing pseudo-terminal.
+        - exec://command args: A program attached to a new pseudo-terminal,
+        like the GRBL simulator, which doesn't require socat.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.fd: Optional[int] = None
+        self.process: Optional[subprocess.Popen] = None
+
+    def open(self, port: str, baudrate: int):
+        # Only available in POSIX systems
+        import pty
+        import tty
+
+        try:
+            if port.startswith(EXEC_PREFIX):
+                master, slave = pty.openpty()
+                tty.setraw(slave)
+                self.process = subprocess.Popen(
+                    shlex.split(port[len(EXEC_PREFIX):]),
+                    stdin=slave,
+                    stdout=slave,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+                os.close(slave)
+                fd = master
+            else:
+                path = port[len(PTY_PREFIX):] if port.startswith(PTY_PREFIX) else port
+                fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+                tty.setraw(fd)
+        except OSError as error:
+            raise SerialException(f'Could not open port {port}: {error}') from error
+
+        os.set_blocking(fd, False)
+        self.fd = fd
+
+    def isOpen(self) -> bool:
+        return self.fd is not None
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(PROCESS_STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+    def fileno(self) -> int:
+        if self.fd is None:
+            raise SerialException('Port not open')
+        return self.fd
+
+    def _readChunk(self, timeout: float) -> bytes:
+        fd = self.fileno()
+        if not select.select([fd], [], [], timeout)[0]:
+            return b''
+
+        try:
+            data = os.read(fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return b''
+        except OSError as error:
+            # EIO: the other end of the pseudo-terminal was closed
+            raise SerialException(f'Pseudo-terminal closed: {error}') from error
+        if not data:
+            raise SerialException('Pseudo-terminal closed')
+        return data
+
+    def _write(self, data: bytes):
+        fd = self.fileno()
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(fd, view)
+            except BlockingIOError:
+                select.select([], [fd], [], self.timeout)
+                continue
+            except OSError as error:
+                raise SerialException(f'Write failed: {error}') from error
+            view = view[written:]
+
+
+class TcpTransport(Transport):
+    """TCP socket to a serial-over-TCP bridge, with the Nagle's algorithm disabled,
+    so each command is sent without waiting for more data.
+
+    The port has the format tcp://host:port (the baudrate is set in the bridge).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.socket: Optional[socket.socket] = None
+
+    def open(self, port: str, baudrate: int):
+        address = port[len(TCP_PREFIX):] if port.startswith(TCP_PREFIX) else port
+        host, _, tcp_port = address.rpartition(':')
+
+        try:
+            sock = socket.create_connection((host, int(tcp_port)), timeout=self.timeout)
+        except (OSError, ValueError) as error:
+            raise SerialException(f'Could not open port {port}: {error}') from error
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setblocking(False)
+        self.socket = sock
+
+    def isOpen(self) -> bool:
+        return self.socket is not None
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def fileno(self) -> int:
+        if self.socket is None:
+            raise SerialException('Port not open')
+        return self.socket.fileno()
+
+    def _readChunk(self, timeout: float) -> bytes:
+        if not select.select([self.fileno()], [], [], timeout)[0]:
+            return b''
+
+        try:
+            data = self.socket.recv(READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return b''
+        except OSError as error:
+            raise SerialException(f'Connection lost: {error}') from error
+        if not data:
+            raise SerialException('Connection closed by the remote end')
+        return data
+
+    def _write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            try:
+                sent = self.socket.send(view)
+            except BlockingIOError:
+                select.select([], [self.fileno()], [], self.timeout)
+                continue
+            except (OSError, AttributeError) as error:
+                raise SerialException(f'Write failed: {error}') from error
+            view = view[sent:]
+
+
+def get_transport(port: str) -> Transport:
+    """Returns the transport able to open the given port.
+    """
+    if port.startswith(TCP_PREFIX):
+        return TcpTransport()
+    if port.startswith(PTY_PREFIX) or port.startswith(EXEC_PREFIX):
+        return PtyTransport()
+
+    try:
+        from .serial import SerialService
+    except ImportError:
+        from utils.serial import SerialService
+    return SerialService()
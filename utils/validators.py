@@ -3,7 +3,7 @@ valid_transitions = {
     'on_hold': ['in_progress', 'cancelled'],
     'in_progress': ['finished', 'failed'],
     'finished': [],
-    'failed': ['pending_approval'],
+    'failed': ['pending_approval', 'in_progress'],
     'cancelled': ['pending_approval']
 }
 
@@ -2,33 +2,52 @@ from celery import Task
 from celery.utils.log import get_task_logger
 import json
 import time
+from typing import Optional
 
 try:
     from .cncworker.app import app
+    from .config import GRBL_CAPTURE_FOLDER
     from .cncworker.workerStatusManager import WorkerStatusManager
     from .database.base import Session as SessionLocal
+    from .database.exceptions import DatabaseError
     from .database.models import TASK_FINISHED_STATUS, TASK_IN_PROGRESS_STATUS, \
         TASK_FAILED_STATUS, TASK_APPROVED_STATUS
     from .database.repositories.taskRepository import TaskRepository
+    from .gcode.gcodeCheckpoint import Checkpoint, GcodeCheckpointTracker, \
+        build_resume_preamble
     from .gcode.gcodeFileSender import GcodeFileSender, FinishedFile
+    from .gcode.gcodeNormalizer import GcodeNormalizer
     from .grbl.grblController import GrblController
+    from .grbl.grblUtils import is_interactive_command
     from .utils.files import getFilePath
     from .utils.redisPubSubManager import RedisPubSubManagerSync
+    from .utils.sessionCapture import new_capture_path
+    from .utils.transport import Transport, get_transport
 except ImportError:
     from cncworker.app import app
+    from config import GRBL_CAPTURE_FOLDER
     from cncworker.workerStatusManager import WorkerStatusManager
     from database.base import Session as SessionLocal
+    from database.exceptions import DatabaseError
     from database.models import TASK_FINISHED_STATUS, TASK_IN_PROGRESS_STATUS, \
         TASK_FAILED_STATUS, TASK_APPROVED_STATUS
     from database.repositories.taskRepository import TaskRepository
+    from gcode.gcodeCheckpoint import Checkpoint, GcodeCheckpointTracker, \
+        build_resume_preamble
     from gcode.gcodeFileSender import GcodeFileSender, FinishedFile
+    from gcode.gcodeNormalizer import GcodeNormalizer
     from grbl.grblController import GrblController
+    from grbl.grblUtils import is_interactive_command
     from utils.files import getFilePath
     from utils.redisPubSubManager import RedisPubSubManagerSync
+    from utils.sessionCapture import new_capture_path
+    from utils.transport import Transport, get_transport
 
 # Constants
-SEND_INTERVAL = 0.10    # Seconds
+REQUEST_POLL = 0.10     # Seconds
 STATUS_POLL = 0.10      # Seconds
+COMMAND_QUEUE_TIMEOUT = 1.0     # Seconds
+CHECKPOINT_INTERVAL = 30.0      # Seconds
 STATUS_CHANNEL = 'grbl_status'
 COMMANDS_CHANNEL = 'worker_commands'
 
@@ -41,6 +60,66 @@ def executeTask(
     serial_port: str,
     serial_baudrate: int
 ) -> bool:
+    return runFile(self, task_id, base_path, serial_port, serial_baudrate)
+
+
+@app.task(name='worker.tasks.resumeTask', bind=True)
+def resumeTask(
+    self: Task,
+    task_id: int,
+    checkpoint_id: int,
+    base_path: str,
+    serial_port: str,
+    serial_baudrate: int
+) -> bool:
+    """Executes a failed task again, starting after the line of one of its checkpoints,
+    see TaskRepository.get_checkpoints.
+    """
+    return runFile(self, task_id, base_path, serial_port, serial_baudrate, checkpoint_id)
+
+
+def saveCheckpoint(
+    repository: TaskRepository,
+    task_id: int,
+    tracker: GcodeCheckpointTracker,
+    line: int
+) -> Checkpoint:
+    """Stores the state of the job after the given line of the file.
+    A failure is only logged, the execution of the file goes on.
+    """
+    checkpoint = tracker.advance(line)
+    state = {key: value for key, value in checkpoint.items() if key not in ['line', 'offset']}
+    try:
+        repository.create_checkpoint(task_id, checkpoint['line'], checkpoint['offset'], state)
+    except DatabaseError as error:
+        get_task_logger(__name__).warning('Error al guardar el punto de control: %s', error)
+    return checkpoint
+
+
+def getTransport(serial_port: str, session: str) -> Transport:
+    """Returns the transport to the device, recording its traffic
+    when a capture folder is configured (GRBL_CAPTURE_FOLDER).
+    """
+    transport = get_transport(serial_port)
+    if GRBL_CAPTURE_FOLDER:
+        transport.startRecording(new_capture_path(GRBL_CAPTURE_FOLDER, session))
+    return transport
+
+
+def runFile(
+    self: Task,
+    task_id: int,
+    base_path: str,
+    serial_port: str,
+    serial_baudrate: int,
+    checkpoint_id: Optional[int] = None
+) -> bool:
+    """Sends the file of a task to the GRBL device, from the beginning
+    or resuming it from a checkpoint.
+
+    While the file is executed, a checkpoint is stored every CHECKPOINT_INTERVAL
+    seconds, and once more when the execution fails.
+    """
     db_session = SessionLocal()
     repository = TaskRepository(db_session)
     # 1. Check if there is a task currently in progress, in which case return an exception
@@ -52,14 +131,22 @@ def executeTask(
     if not task:
         raise Exception('No se encontró la tarea en la base de datos')
 
-    if task.status != TASK_APPROVED_STATUS:
+    expected_status = TASK_APPROVED_STATUS if checkpoint_id is None else TASK_FAILED_STATUS
+    if task.status != expected_status:
         raise Exception(f'La tarea tiene un estado incorrecto: {task.status}')
 
+    checkpoint: Optional[Checkpoint] = None
+    if checkpoint_id is not None:
+        stored = repository.get_checkpoint_by_id(checkpoint_id)
+        if not stored or stored.task_id != task.id:
+            raise Exception('No se encontró el punto de control de la tarea')
+        checkpoint = {'line': stored.line, 'offset': stored.offset, **stored.state}
+
     file_path = getFilePath(base_path, task.file.user_id, task.file.file_name)
 
     # 3. Instantiate a GrblController object and start communication with Arduino
     task_logger = get_task_logger(__name__)
-    cnc = GrblController(logger=task_logger)
+    cnc = GrblController(logger=task_logger, transport=getTransport(serial_port, f'task_{task_id}'))
     cnc_status = cnc.grbl_status
     cnc.connect(serial_port, serial_baudrate)
 
@@ -74,11 +161,14 @@ def executeTask(
     parserstate = cnc_status.get_parser_state()
     cnc_status.set_tool(task.tool_id)
 
-    # 4. Initiate the file sender
-    file_sender = GcodeFileSender(cnc, file_path)
+    # 4. Initiate the file sender, and the tracking of the executed lines
+    file_sender = GcodeFileSender(cnc, file_path, GcodeNormalizer())
+    tracker = GcodeCheckpointTracker(file_path, checkpoint)
+    start_line = checkpoint['line'] if checkpoint else 0
+    start_offset = checkpoint['offset'] if checkpoint else 0
     try:
         # Account for line added at the end (G4 P0)
-        total_lines = file_sender.start() + 1
+        total_lines = file_sender.start(start_line, start_offset) + 1
     except Exception as error:
         cnc.disconnect()
         task_logger.critical('Error al abrir el archivo: %s', file_path)
@@ -93,17 +183,27 @@ def executeTask(
     redis = RedisPubSubManagerSync()
     redis.connect()
 
-    # 6. Send G-code lines in a loop, until either the file is finished or there is an error
-    ts = tp = time.time()  # last time a command was sent and info was queried
+    # 6. When resuming, restore the machine state before continuing with the file
+    preamble = build_resume_preamble(checkpoint) if checkpoint else []
+    for line in preamble:
+        cnc.sendCommand(line)
+    if checkpoint:
+        task_logger.info('Reanudando la ejecución desde la línea: %d', start_line)
+
+    # 7. Send G-code lines in a loop, until either the file is finished or there is an error
+    tr = tp = tc = time.time()  # last time a request was checked, info was queried and saved
+    last_checkpoint = start_line
 
     while True:
         t = time.time()
+        acks_count = cnc.getAcksCount()
 
         # Refresh machine position?
         if t - tp > STATUS_POLL:
             status = cnc_status.get_status_report()
             parserstate = cnc_status.get_parser_state()
-            processed_lines = cnc.getCommandsCount()
+            commands_count = max(cnc.getCommandsCount() - len(preamble), 0)
+            processed_lines = start_line + commands_count
             self.update_state(
                 state='PROGRESS',
                 meta={
@@ -115,10 +215,12 @@ def executeTask(
                 }
             )
             message = json.dumps({
+                'sent_lines': sent_lines,
                 'processed_lines': processed_lines,
                 'total_lines': total_lines,
                 'status': status,
-                'parserstate': parserstate
+                'parserstate': parserstate,
+                'stream': file_sender.get_stats()
             })
             redis.publish(STATUS_CHANNEL, message)
 
@@ -132,11 +234,18 @@ def executeTask(
             if processed_lines >= total_lines and finished_sending:
                 break
 
+            # Save a checkpoint to resume the execution, in case it fails
+            if t - tc > CHECKPOINT_INTERVAL:
+                line = file_sender.get_executed_line(commands_count)
+                if line > last_checkpoint:
+                    saveCheckpoint(repository, task.id, tracker, line)
+                    last_checkpoint = line
+                tc = t
+
             tp = t
 
-        # Send new command?
-        if t - ts > SEND_INTERVAL and not finished_sending:
-            # Check if PAUSE or RESUME was requested
+        # Check if PAUSE or RESUME was requested
+        if t - tr > REQUEST_POLL and not finished_sending:
             pause, resume = worker_status.process_request()
 
             if pause:
@@ -151,34 +260,22 @@ def executeTask(
                 time.sleep(1)
                 continue
 
+            tr = t
+
+        # Send as many lines as fit in the GRBL buffer
+        if not finished_sending:
             try:
-                sent_lines = file_sender.send_line()
+                sent_lines = file_sender.fill_buffer()
             except FinishedFile:
                 cnc.sendCommand('G4 P0')    # Ask to wait for finish
-                sent_lines += 1
+                sent_lines = file_sender.current_line + 1
                 finished_sending = True
                 file_sender.stop()
 
-            # update task progress
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'sent_lines': sent_lines,
-                    'processed_lines': processed_lines,
-                    'total_lines': total_lines,
-                    'status': status,
-                    'parserstate': parserstate
-                }
-            )
-            message = json.dumps({
-                'sent_lines': sent_lines,
-                'total_lines': total_lines
-            })
-            redis.publish(STATUS_CHANNEL, message)
-
-            ts = t
+        # Wait until GRBL frees space in its buffer, or it is time to refresh the status
+        cnc.waitForAck(acks_count, timeout=max(STATUS_POLL - (time.time() - tp), 0))
 
-    # 7. When the file finishes (or fails), disconnect from the GRBL device
+    # 8. When the file finishes (or fails), disconnect from the GRBL device
     # and update its status in the DB
 
     cnc.disconnect()
@@ -186,6 +283,15 @@ def executeTask(
 
     if cnc_status.failed():
         task_logger.critical('Error durante la ejecución del archivo: %s', file_path)
+        commands_count = max(cnc.getCommandsCount() - len(preamble), 0)
+        checkpoint = saveCheckpoint(
+            repository,
+            task.id,
+            tracker,
+            file_sender.get_executed_line(commands_count)
+        )
+        task_logger.info('Punto de control guardado en la línea: %d', checkpoint['line'])
+        tracker.close()
         repository.update_task_status(task.id, TASK_FAILED_STATUS)
 
         error_message = cnc_status.get_error_message()
@@ -193,7 +299,14 @@ def executeTask(
         raise Exception(error_message)
 
     # SUCCESS
+    tracker.close()
     task_logger.info('Finalizada la ejecución del archivo: %s', file_path)
+    normalizer_stats = file_sender.normalizer.get_stats()
+    task_logger.info(
+        'Bytes enviados: %d, ahorrados por normalización: %d',
+        normalizer_stats['bytes_out'],
+        normalizer_stats['bytes_saved']
+    )
     repository.update_task_status(task.id, TASK_FINISHED_STATUS)
 
     return True
@@ -213,7 +326,7 @@ def cncServer(
 
     # 2. Instantiate a GrblController object and start communication with Arduino
     task_logger = get_task_logger(__name__)
-    cnc = GrblController(logger=task_logger)
+    cnc = GrblController(logger=task_logger, transport=getTransport(serial_port, 'server'))
     cnc_status = cnc.grbl_status
     cnc.connect(serial_port, serial_baudrate)
 
@@ -271,8 +384,15 @@ def cncServer(
             # Check if a command was requested
             message = redis.get_message()
             if message is not None and 'data' in message.keys():
-                data: bytes = message['data']
-                cnc.sendCommand(data.decode())
+                command = message['data'].decode()
+                if not cnc.sendCommand(
+                    command,
+                    timeout=COMMAND_QUEUE_TIMEOUT,
+                    priority=is_interactive_command(command)
+                ):
+                    task_logger.warning('Cola de comandos llena, comando descartado: %s', command)
+                # Give the client a fast feedback of the command's effect
+                cnc.requestStatusBurst()
 
             tp = t
 